@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+BM25 index ingest and query-latency benchmark.
+
+Indexes synthetic Chinese/English operator notes (device codes, tariff terms,
+regulation articles drawn from a Zipf-like vocabulary) into a ``BM25Index`` in
+a temporary directory, then reports the mean and p95 latency of short keyword
+queries and the on-disk size of the posting lists.
+
+Usage:
+    uv run python benchmarks/bm25.py
+    uv run python benchmarks/bm25.py --chunks 500000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.rag.bm25_index import BM25Index  # noqa: E402
+
+CHINESE = "储能变流器削峰填谷分时电价负荷预测光伏逆变器并网调度虚拟电厂需求响应频率调节备用容量电网公司供配电设计规范"
+
+
+def make_vocabulary(rng, size: int) -> list:
+    words = [f"PCS-{i}" for i in range(size // 4)]
+    words += [f"GB{50000 + i}-20{i % 25:02d}" for i in range(size // 4)]
+    words += [f"第{i // 100}.{i // 10 % 10}.{i % 10}条" for i in range(size // 4)]
+    words += ["".join(rng.choice(list(CHINESE), 4)) for _ in range(size - len(words))]
+    return words
+
+
+def make_documents(rng, vocabulary: list, count: int, words_per_chunk: int):
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    for i in range(count):
+        words = rng.choice(len(vocabulary), words_per_chunk, p=weights)
+        yield f"doc{i}", " ".join(vocabulary[w] for w in words), None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure BM25 index ingest and query latency"
+    )
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--words", type=int, default=40, help="words per chunk")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    with tempfile.TemporaryDirectory() as root:
+        index = BM25Index(root)
+        index.add_dataset("bench", "bench")
+        start = time.perf_counter()
+        documents = make_documents(rng, vocabulary, args.chunks, args.words)
+        batch = 20000
+        for _ in range(0, args.chunks, batch):
+            index.add_documents(
+                "bench",
+                [next(documents) for _ in range(min(batch, args.chunks - len(index)))],
+            )
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(root, "bm25.sqlite")) / 2**20
+        print(
+            f"indexed {len(index):,} chunks in {elapsed:.1f}s ({size_mb:.0f} MB incl. chunk texts)"
+        )
+
+        queries = [" ".join(rng.choice(vocabulary, 3)) for _ in range(args.queries)]
+        index.search(queries[0])
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"3-term queries: mean {np.mean(latencies):.2f} ms  p95 {np.percentile(latencies, 95):.2f} ms"
+        )
+
+        start = time.perf_counter()
+        index.add_documents(
+            "bench", [("late", "PCS-1 储能变流器 新增文档", None, None)]
+        )
+        print(
+            f"incremental add of one document: {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Per-request graph overhead benchmark.
+
+Compares compiling a workflow on every request (``build_graph()``) with
+looking up the shared instance compiled once by the component registry
+(``builder.workflow``), for each endpoint-backed workflow.
+
+Usage:
+    uv run python benchmarks/graph_build.py
+    uv run python benchmarks/graph_build.py --requests 200
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORKFLOWS = {
+    "podcast": "src.podcast.graph.builder",
+    "ppt": "src.ppt.graph.builder",
+    "prose": "src.prose.graph.builder",
+    "prompt_enhancer": "src.prompt_enhancer.graph.builder",
+}
+
+
+def per_request_ms(func, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure per-request graph build overhead"
+    )
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'workflow':<18}{'build per request':>20}{'shared instance':>20}")
+    for name, module_name in WORKFLOWS.items():
+        builder = importlib.import_module(module_name)
+        build_ms = per_request_ms(builder.build_graph, args.requests)
+        builder.workflow  # compile once, as the first request would
+        shared_ms = per_request_ms(lambda: builder.workflow, args.requests * 100)
+        print(f"{name:<18}{build_ms:>17.3f} ms{shared_ms * 1000:>17.3f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Import-time benchmark.
+
+Each module is imported in a fresh interpreter so the measurement reflects
+server cold start and test collection, not a warm module cache. The report
+also lists which heavy dependencies were pulled in by the import.
+
+Usage:
+    uv run python benchmarks/import_time.py
+    uv run python benchmarks/import_time.py --repeat 5 src.server.app
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = [
+    "src.graph_solver.opt_nodes",
+    "src.graph_solver.opt_subgraph",
+    "src.graph.builder",
+    "src.server.app",
+]
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "pyomo"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """Import the module `repeat` times in fresh interpreters and summarise."""
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1]}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "heavy_imports": heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        if "error" in result:
+            print(f"{module:<36} ERROR {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy_imports"]) or "-"
+        print(
+            f"{module:<36} median {result['median_ms']:>8.1f} ms"
+            f"  min {result['min_ms']:>8.1f} ms  heavy: {heavy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Local RAG index query-latency benchmark.
+
+Builds a ``LocalVectorIndex`` of random unit-norm chunk embeddings in a
+temporary directory and reports the mean and p95 query latency of a brute-force
+scan and of the IVF index, together with the IVF recall@k against the brute
+force. Query embedding time is excluded; only the index search is measured.
+
+Usage:
+    uv run python benchmarks/local_rag.py
+    uv run python benchmarks/local_rag.py --chunks 200000 --dim 384
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.rag.local_index import LocalVectorIndex  # noqa: E402
+
+
+class RandomEmbedder:
+    """Clustered random embeddings; the text is "<seed>" so queries are reproducible."""
+
+    def __init__(self, dim: int, clusters: int = 256):
+        self.dim = dim
+        self.centers = (
+            np.random.default_rng(0).normal(size=(clusters, dim)).astype(np.float32)
+        )
+
+    def embed(self, texts):
+        seeds = [int(text.split()[0]) for text in texts]
+        rng = np.random.default_rng(seeds[0] if seeds else 0)
+        vectors = (
+            self.centers[np.array(seeds) % len(self.centers)]
+            + rng.normal(size=(len(texts), self.dim)) * 0.5
+        )
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(
+            np.float32
+        )
+
+
+def measure(index: LocalVectorIndex, queries, k: int):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append({row for row, _ in index.search([query], k)[0]})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.mean(latencies), np.percentile(latencies, 95), results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure local RAG index query latency"
+    )
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        index = LocalVectorIndex(root, RandomEmbedder(args.dim), nprobe=args.nprobe)
+        index.add_dataset("bench", "bench")
+        start = time.perf_counter()
+        index.add_documents(
+            "bench", ((f"doc{i}", f"{i} chunk", None, None) for i in range(args.chunks))
+        )
+        print(f"ingested {args.chunks:,} chunks in {time.perf_counter() - start:.1f}s")
+
+        queries = [f"{i * 7919} query" for i in range(args.queries)]
+        index.search(queries[:1], args.k)
+        brute_mean, brute_p95, expected = measure(index, queries, args.k)
+        print(f"{'brute force':<12} mean {brute_mean:7.2f} ms  p95 {brute_p95:7.2f} ms")
+
+        start = time.perf_counter()
+        lists = index.build_ivf()
+        print(f"built IVF with {lists} lists in {time.perf_counter() - start:.1f}s")
+        ivf_mean, ivf_p95, found = measure(index, queries, args.k)
+        recall = np.mean([len(a & b) / len(a) for a, b in zip(expected, found)])
+        print(
+            f"{'IVF':<12} mean {ivf_mean:7.2f} ms  p95 {ivf_p95:7.2f} ms  recall@{args.k} {recall:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
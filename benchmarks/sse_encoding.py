@@ -0,0 +1,146 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Chat stream encoding micro-benchmark.
+
+Encodes a realistic mix of token, tool-call and tool-result events on a single
+core and reports events per second for the previous path (two ``json.dumps``
+calls per event plus INFO logging of every chunk) and for ``SSEEncoder`` with
+each JSON backend, with stream logging off and at DEBUG with sampling.
+
+Usage:
+    uv run python benchmarks/sse_encoding.py
+    uv run python benchmarks/sse_encoding.py --events 50000
+"""
+
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.server.sse import SSEEncoder, StreamEventLogger  # noqa: E402
+
+
+def make_events(count: int) -> list:
+    events = []
+    for i in range(count):
+        base = {
+            "thread_id": "bench-thread",
+            "agent": "researcher",
+            "id": f"run-{i // 50}",
+            "role": "assistant",
+        }
+        if i % 50 == 49:
+            events.append(
+                (
+                    "tool_call_result",
+                    {
+                        **base,
+                        "content": "当前负荷 18.6MW，" * 40,
+                        "tool_call_id": "call_1",
+                    },
+                )
+            )
+        elif i % 50 == 48:
+            events.append(
+                (
+                    "tool_calls",
+                    {
+                        **base,
+                        "content": "",
+                        "tool_calls": [
+                            {
+                                "name": "web_search",
+                                "args": {"query": "虚拟电厂 削峰"},
+                                "id": "call_1",
+                                "type": "tool_call",
+                            }
+                        ],
+                        "tool_call_chunks": [],
+                    },
+                )
+            )
+        else:
+            events.append(("message_chunk", {**base, "content": "削峰"}))
+    return events
+
+
+def _stream_logger(level: int) -> logging.Logger:
+    log = logging.getLogger(f"bench.{level}")
+    log.handlers = [logging.StreamHandler(io.StringIO())]
+    log.setLevel(level)
+    log.propagate = False
+    return log
+
+
+def legacy(events: list, log: logging.Logger):
+    for event_type, data in events:
+        log.info(f"event_stream_message: {data}")
+        if data.get("content") == "":
+            data.pop("content")
+        log.info(
+            f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        )
+        f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def encoder(backend: str, debug: bool):
+    sse = SSEEncoder(backend)
+    stream_log = StreamEventLogger(
+        sample_every=100, log=_stream_logger(logging.DEBUG if debug else logging.INFO)
+    )
+
+    def run(events: list, _log):
+        for event_type, data in events:
+            frame = sse.encode(event_type, data)
+            if stream_log.enabled:
+                stream_log.record(event_type, frame, data["thread_id"], data["agent"])
+
+    return run
+
+
+def measure(run, events_count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        events = make_events(events_count)
+        log = _stream_logger(logging.INFO)
+        start = time.perf_counter()
+        run(events, log)
+        best = min(best, time.perf_counter() - start)
+    return events_count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure SSE events per second per core"
+    )
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [("legacy json.dumps x2 + INFO logs", legacy)]
+    for backend in ("json", "orjson"):
+        try:
+            SSEEncoder(backend)
+        except ValueError:
+            continue
+        cases.append((f"SSEEncoder[{backend}]", encoder(backend, debug=False)))
+        cases.append(
+            (f"SSEEncoder[{backend}] + sampled DEBUG", encoder(backend, debug=True))
+        )
+
+    baseline = None
+    for label, run in cases:
+        rate = measure(run, args.events, args.repeat)
+        baseline = baseline or rate
+        print(f"{label:<40} {rate:>12,.0f} events/s  x{rate / baseline:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
+from pydantic import BaseModel
 
 from src.prompts import apply_prompt_template
 from src.llms.llm import get_llm_by_type
 from src.config.agents import AGENT_LLM_MAP
+from src.tools.mcp_sessions import MCP_SESSION_METADATA_KEY, on_tools_changed
+
+# Fields every BaseTool has; callbacks and bookkeeping do not change tool behaviour
+_BASE_TOOL_FIELDS = set(BaseTool.model_fields) - {"name", "description"}
 
 
 # Create agents using configured LLM types
@@ -42,12 +54,131 @@ class AgentWrapper:
         return getattr(self._agent, attr)
 
 
+def _jsonable(value):
+    """Reduce a tool field to something stable to hash; opaque objects count by type only."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, BaseModel):
+        return _jsonable(value.model_dump())
+    return type(value).__qualname__
+
+
+def tool_fingerprint(tools: list) -> str:
+    """
+    Hash of the tool names, descriptions, argument schemas, configuration fields and,
+    for MCP tools, the client session they call.
+
+    Two tool lists with the same fingerprint behave the same, so an agent compiled
+    for one can serve the other.
+    """
+    parts = []
+    for tool in tools:
+        part = {
+            "name": getattr(tool, "name", None),
+            "description": getattr(tool, "description", None),
+        }
+        if isinstance(tool, BaseTool):
+            part["schema"] = tool.args
+            part["fields"] = {
+                name: _jsonable(getattr(tool, name, None))
+                for name in type(tool).model_fields
+                if name not in _BASE_TOOL_FIELDS
+                and not callable(getattr(tool, name, None))
+            }
+        else:
+            part["type"] = type(tool).__qualname__
+        part["mcp_session"] = (getattr(tool, "metadata", None) or {}).get(
+            MCP_SESSION_METADATA_KEY
+        )
+        parts.append(part)
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class AgentCache:
+    """
+    Bounded LRU cache of compiled ReAct agents keyed by
+    (agent name, agent type, prompt template, model, tool fingerprint).
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._agents: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: tuple, tool_names: frozenset, factory):
+        with self._lock:
+            if key in self._agents:
+                self._agents.move_to_end(key)
+                self.hits += 1
+                return self._agents[key][0]
+            self.misses += 1
+        agent = factory()
+        with self._lock:
+            self._agents[key] = (agent, tool_names)
+            self._agents.move_to_end(key)
+            while len(self._agents) > self.max_size:
+                self._agents.popitem(last=False)
+        return agent
+
+    def invalidate(self, tool_names=None) -> int:
+        """Drop agents using any of the given tools (all agents when None); returns how many were dropped."""
+        with self._lock:
+            if tool_names is None:
+                dropped = len(self._agents)
+                self._agents.clear()
+                return dropped
+            names = set(tool_names)
+            stale = [key for key, (_, used) in self._agents.items() if used & names]
+            for key in stale:
+                del self._agents[key]
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._agents),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+agent_cache = AgentCache(max_size=int(os.getenv("AGENT_CACHE_SIZE", "32")))
+# Agents holding tools of a restarted MCP server would call a dead session
+on_tools_changed(agent_cache.invalidate)
+
+
 def create_agent(agent_name: str, agent_type: str, tools: list, prompt_template: str):
-    """Factory to create an agent and wrap it with tools accessor."""
-    agent = create_react_agent(
-        name=agent_name,
-        model=get_llm_by_type(AGENT_LLM_MAP[agent_type]),
-        tools=tools,
-        prompt=lambda state: apply_prompt_template(prompt_template, state),
+    """Factory to create an agent and wrap it with tools accessor.
+
+    Compiled agents are reused from ``agent_cache`` when the agent type, model and
+    tool set are unchanged.
+    """
+    model = get_llm_by_type(AGENT_LLM_MAP[agent_type])
+    key = (
+        agent_name,
+        agent_type,
+        prompt_template,
+        AGENT_LLM_MAP[agent_type],
+        id(model),
+        tool_fingerprint(tools),
+    )
+    agent = agent_cache.get_or_create(
+        key,
+        frozenset(getattr(tool, "name", "") for tool in tools),
+        lambda: create_react_agent(
+            name=agent_name,
+            model=model,
+            tools=tools,
+            prompt=lambda state: apply_prompt_template(prompt_template, state),
+        ),
     )
     return AgentWrapper(agent, tools)
@@ -24,6 +24,10 @@ class Configuration:
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
     report_style: str = ReportStyle.ACADEMIC.value  # Report style
     enable_deep_thinking: bool = False  # Whether to enable deep thinking
+    tenant_id: str = "default"  # Aggregator / VPP portfolio the request belongs to
+    dispatch_priority: str = (
+        "operator"  # Dispatch priority class: grid_event, operator or what_if
+    )
 
     @classmethod
     def from_runnable_config(
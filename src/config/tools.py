@@ -22,6 +22,9 @@ SELECTED_SEARCH_ENGINE = os.getenv("SEARCH_API", SearchEngine.TAVILY.value)
 class RAGProvider(enum.Enum):
     RAGFLOW = "ragflow"
     VIKINGDB_KNOWLEDGE_BASE = "vikingdb_knowledge_base"
+    LOCAL_INDEX = "local_index"
+    BM25 = "bm25"
+    HYBRID = "hybrid"
 
 
 SELECTED_RAG_PROVIDER = os.getenv("RAG_PROVIDER")
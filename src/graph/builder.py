@@ -1,6 +1,8 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import os
+
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from src.prompts.planner_model import StepType
@@ -19,7 +21,8 @@ from .nodes import (
     vpp_node,
     curve_node,
 )
-from src.graph_solver.opt_subgraph import subgraph
+from src.graph_solver.opt_subgraph import get_subgraph
+from src.utils.registry import component_registry
 
 
 def continue_to_running_research_team(state: State):
@@ -56,17 +59,29 @@ def _build_base_graph():
     builder.add_node("reporter", reporter_node)
     builder.add_node("human_feedback", human_feedback_node)
     builder.add_node("vpp", vpp_node)
-    builder.add_node("vpp_subgraph", subgraph)
+    builder.add_node("vpp_subgraph", get_subgraph())
     builder.add_node("curve", curve_node)
     builder.add_edge("reporter", END)
     return builder
 
 
+def build_checkpointer():
+    """Return the checkpointer selected by CHECKPOINT_BACKEND ("memory" or "sqlite")."""
+    backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        from .checkpoint import build_sqlite_checkpointer
+
+        return build_sqlite_checkpointer()
+    if backend != "memory":
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+    return MemorySaver()
+
+
 def build_graph_with_memory():
     """Build and return the agent workflow graph with memory."""
     # use persistent memory to save conversation history
-    # TODO: be compatible with SQLite / PostgreSQL
-    memory = MemorySaver()
+    # TODO: be compatible with PostgreSQL
+    memory = build_checkpointer()
 
     # build state graph
     builder = _build_base_graph()
@@ -80,4 +95,11 @@ def build_graph():
     return builder.compile()
 
 
-graph = build_graph()
+component_registry.register("graph.main", build_graph)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "graph":
+        return component_registry.get("graph.main")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
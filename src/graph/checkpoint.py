@@ -0,0 +1,511 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Durable SQLite checkpointer for the main workflow graph.
+
+Checkpoints are written to a local SQLite file in WAL mode, so conversation
+state survives restarts and does not accumulate in server RAM. Channel values
+are stored as deltas: a checkpoint only records the channel versions it refers
+to, and a value is written once per (channel, version), so unchanged channels
+such as long ``messages`` lists are not copied into every checkpoint.
+
+After each checkpoint the thread is compacted to its last ``keep_last``
+checkpoints, and when ``max_storage_bytes`` is set the least recently updated
+threads are evicted until the stored payload fits again.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS, ChannelProtocol
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    channel_versions TEXT,
+    updated_at REAL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpoint saver backed by a local SQLite database."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        keep_last: int = 10,
+        max_storage_bytes: Optional[int] = None,
+        cache_bytes: int = 16 * 1024 * 1024,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            path: SQLite database file (``:memory:`` for tests)
+            keep_last: Checkpoints kept per thread and namespace, older ones are compacted away
+            max_storage_bytes: Cap on the stored payload; least recently updated threads are evicted beyond it
+            cache_bytes: SQLite page cache size, bounds the memory used by the checkpointer
+        """
+        super().__init__(serde=serde)
+        if keep_last < 1:
+            raise ValueError("keep_last must be >= 1")
+        self.path = path
+        self.keep_last = keep_last
+        self.max_storage_bytes = max_storage_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA cache_size=-{max(cache_bytes // 1024, 1)}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # ---- reads ----
+
+    def _load_tuple(
+        self, thread_id: str, checkpoint_ns: str, row: tuple
+    ) -> CheckpointTuple:
+        (
+            checkpoint_id,
+            parent_checkpoint_id,
+            type_,
+            checkpoint_b,
+            metadata_type,
+            metadata_b,
+        ) = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed((blob[0], blob[1]))
+
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = self.conn.execute(
+                "SELECT type, value FROM writes "
+                "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? AND channel=? "
+                "ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": channel_values,
+                "pending_sends": [self.serde.loads_typed(s) for s in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            pending_writes=[
+                (task_id, c, self.serde.loads_typed((t, v)))
+                for task_id, c, t, v in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            result = self._load_tuple(thread_id, checkpoint_ns, row)
+        if checkpoint_id:
+            # Keep the caller's config, as the in-memory saver does
+            return result._replace(config=config)
+        return result
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                clauses.append("checkpoint_ns=?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id=?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id<?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                "metadata_type, metadata "
+                f"FROM checkpoints {where} ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC",
+                params,
+            ).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self._lock:
+                item = self._load_tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield item
+
+    # ---- writes ----
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        values: dict[str, Any] = c.pop("channel_values")
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        metadata_type, metadata_b = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+
+        # Only channels updated by this step get a new blob
+        blobs = [
+            (
+                thread_id,
+                checkpoint_ns,
+                channel,
+                str(version),
+                *(
+                    self.serde.dumps_typed(values[channel])
+                    if channel in values
+                    else ("empty", None)
+                ),
+            )
+            for channel, version in new_versions.items()
+        ]
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        type_,
+                        checkpoint_b,
+                        metadata_type,
+                        metadata_b,
+                        json.dumps(
+                            {
+                                k: str(v)
+                                for k, v in checkpoint["channel_versions"].items()
+                            }
+                        ),
+                        time.time(),
+                    ),
+                )
+                self._compact(thread_id, checkpoint_ns)
+                if self.max_storage_bytes:
+                    self._enforce_storage_cap(keep_thread=thread_id)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special writes (errors, interrupts, ...) replace earlier ones; regular writes are only stored once
+        special, regular = [], []
+        for idx, (c, v) in enumerate(writes):
+            row = (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(c, idx),
+                c,
+                *self.serde.dumps_typed(v),
+                task_path,
+            )
+            (special if c in WRITES_IDX_MAP else regular).append(row)
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                special,
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                regular,
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.conn.execute("BEGIN")
+            for table in ("checkpoints", "blobs", "writes"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id=?", (thread_id,)
+                )
+            self.conn.execute("COMMIT")
+
+    # ---- compaction ----
+
+    def _compact(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop checkpoints beyond the last ``keep_last`` and the blobs no kept checkpoint refers to."""
+        stale = self.conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last),
+        ).fetchall()
+        if not stale:
+            return
+        oldest_kept = self.conn.execute(
+            "SELECT MIN(checkpoint_id) FROM ("
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+            "ORDER BY checkpoint_id DESC LIMIT ?)",
+            (thread_id, checkpoint_ns, self.keep_last),
+        ).fetchone()[0]
+        self.conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id<?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+        self.conn.execute(
+            "DELETE FROM writes WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id<?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+
+        referenced = set()
+        for (versions,) in self.conn.execute(
+            "SELECT channel_versions FROM checkpoints WHERE thread_id=? AND checkpoint_ns=?",
+            (thread_id, checkpoint_ns),
+        ):
+            referenced.update(json.loads(versions).items())
+        stored = self.conn.execute(
+            "SELECT channel, version FROM blobs WHERE thread_id=? AND checkpoint_ns=?",
+            (thread_id, checkpoint_ns),
+        ).fetchall()
+        self.conn.executemany(
+            "DELETE FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+            [
+                (thread_id, checkpoint_ns, c, v)
+                for c, v in stored
+                if (c, v) not in referenced
+            ],
+        )
+
+    def storage_bytes(self) -> int:
+        """Bytes of serialized checkpoint, blob and write payload currently stored."""
+        total = 0
+        for query in (
+            "SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints",
+            "SELECT SUM(LENGTH(blob)) FROM blobs",
+            "SELECT SUM(LENGTH(value)) FROM writes",
+        ):
+            total += self.conn.execute(query).fetchone()[0] or 0
+        return total
+
+    def _enforce_storage_cap(self, keep_thread: str) -> None:
+        if self.storage_bytes() <= self.max_storage_bytes:
+            return
+        threads = self.conn.execute(
+            "SELECT thread_id FROM checkpoints WHERE thread_id<>? GROUP BY thread_id ORDER BY MAX(updated_at)",
+            (keep_thread,),
+        ).fetchall()
+        for (thread_id,) in threads:
+            logger.info(
+                f"Checkpoint storage above {self.max_storage_bytes} bytes, evicting thread {thread_id}"
+            )
+            for table in ("checkpoints", "blobs", "writes"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id=?", (thread_id,)
+                )
+            if self.storage_bytes() <= self.max_storage_bytes:
+                return
+
+    # ---- async ----
+    # SQLite calls block, so they run in worker threads; the lock serialises them
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = self.list(config, filter=filter, before=before, limit=limit)
+        done = object()
+        while (item := await asyncio.to_thread(next, items, done)) is not done:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: ChannelProtocol) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def build_sqlite_checkpointer() -> SQLiteCheckpointSaver:
+    """Create the SQLite checkpointer configured by the CHECKPOINT_* environment variables."""
+    max_mb = os.getenv("CHECKPOINT_MAX_STORAGE_MB")
+    return SQLiteCheckpointSaver(
+        os.getenv("CHECKPOINT_SQLITE_PATH", os.path.join("data", "checkpoints.sqlite")),
+        keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", "10")),
+        max_storage_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+        cache_bytes=int(float(os.getenv("CHECKPOINT_CACHE_MB", "16")) * 1024 * 1024),
+    )
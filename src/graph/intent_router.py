@@ -0,0 +1,265 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Deterministic fast path for the coordinator.
+
+Routine operator commands such as "20MW削峰，温度28度，信用优先" only carry a
+demand, a temperature limit, an optimisation mode or a curve request. They are
+parsed here into the same tool call the coordinator LLM would produce, so the
+workflow can start without an LLM round-trip. Anything the parser does not fully
+understand falls back to the LLM.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Leftover characters (after removing everything recognised) tolerated before
+# the command is considered not understood
+MAX_UNPARSED_CHARS = 2
+# Leftover characters that change the meaning of a command (negation, questions)
+_BLOCKING_CHARS = set("不别勿没非吗呢么?？")
+# Verbs that withdraw or halt a dispatch rather than request one; anywhere in the
+# command they send it to the LLM, however short the leftover is
+_BLOCKING_VERBS = (
+    "取消",
+    "停止",
+    "撤销",
+    "撤回",
+    "暂停",
+    "终止",
+    "中止",
+    "中断",
+    "结束",
+    "作废",
+    "放弃",
+    "停掉",
+    "关闭",
+    "cancel",
+    "stop",
+    "revoke",
+    "abort",
+    "pause",
+    "halt",
+)
+# Leftover digits, latin letters and unit characters carry parameters the parser
+# did not understand (a time, a duration, a multiplier), so they are never dropped
+_PARAMETER_LEFTOVER = re.compile(r"[0-9a-z%％]|[点时分秒天周月年倍次个号]")
+# Share of the command that must be recognised for the fast path to be taken
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_DEMAND_PATTERN = re.compile(_NUMBER + r"\s*(mw|兆瓦|kw|千瓦)", re.IGNORECASE)
+_TEMPERATURE_PATTERN = re.compile(
+    r"(?:温度|暖通|空调|末端)?(?:上限|不超过|不高于|最高|设为|设置为|为|是|:|：)?\s*"
+    + _NUMBER
+    + r"\s*(?:℃|°c|摄氏度|度)",
+    re.IGNORECASE,
+)
+
+# Optimisation modes, longest phrases first so they win over their prefixes
+_REQUIREMENT_KEYWORDS = [
+    "考虑信用和成本",
+    "综合考虑各因素",
+    "综合考虑",
+    "信用优先",
+    "成本优先",
+    "收益优先",
+    "收益最大",
+    "直控优先",
+]
+_CURVE_KEYWORDS = [
+    "功率温度特性曲线",
+    "温度特性曲线",
+    "功率温度曲线",
+    "特性曲线",
+    "功率曲线",
+]
+_DISPATCH_KEYWORDS = ["需求响应", "削峰", "填谷", "响应"]
+
+# Filler words that carry no information for routing
+_FILLER = [
+    "电网下发",
+    "下发",
+    "指令",
+    "请",
+    "帮我",
+    "进行",
+    "执行",
+    "一下",
+    "一次",
+    "查看",
+    "展示",
+    "显示",
+    "看看",
+    "模式",
+    "的",
+    "了",
+    "按",
+    "按照",
+    "温度",
+    "上限",
+    "虚拟电厂",
+    "vpp",
+]
+_PUNCTUATION = re.compile(r"[\s,，。.;；、!！?？:：()（）\"'“”]+")
+
+
+@dataclass
+class FastPathResult:
+    """A tool call recognised without the LLM."""
+
+    name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 1.0
+
+    def as_tool_call(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "args": self.args,
+            "id": "fast_path",
+            "type": "tool_call",
+        }
+
+
+def _strip(text: str, spans: list) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + text[end:]
+    return text
+
+
+def parse_command(text: str) -> Optional[FastPathResult]:
+    """
+    Parse a short operator command into a coordinator tool call.
+
+    Args:
+        text: The latest user message
+
+    Returns:
+        A FastPathResult, or None when the command should go to the LLM
+    """
+    if not text or len(text) > 200:
+        return None
+    lowered = text.lower()
+    if any(char in _BLOCKING_CHARS for char in _strip_known_phrases(lowered)):
+        return None
+    if any(verb in lowered for verb in _BLOCKING_VERBS):
+        logger.debug(f"Fast path declined, cancel/stop command: {lowered}")
+        return None
+    spans = []
+
+    for keyword in _CURVE_KEYWORDS:
+        index = lowered.find(keyword)
+        if index >= 0:
+            spans.append((index, index + len(keyword)))
+            return _accept(
+                FastPathResult("curve_trader", {"research_topic": text.strip()}),
+                lowered,
+                _residual(lowered, spans),
+            )
+
+    args: Dict[str, Any] = {}
+    demand_matches = list(_DEMAND_PATTERN.finditer(lowered))
+    if len(demand_matches) > 1:
+        return None
+    if demand_matches:
+        match = demand_matches[0]
+        value = float(match.group(1))
+        if match.group(2) in ("kw", "千瓦"):
+            value /= 1000
+        args["demand"] = value
+        spans.append(match.span())
+
+    temperature_matches = [
+        m
+        for m in _TEMPERATURE_PATTERN.finditer(lowered)
+        if not any(m.start() < end and start < m.end() for start, end in spans)
+    ]
+    if len(temperature_matches) > 1:
+        return None
+    if temperature_matches:
+        match = temperature_matches[0]
+        args["hvac_max_temp"] = float(match.group(1))
+        spans.append(match.span())
+
+    for keyword in _REQUIREMENT_KEYWORDS:
+        index = lowered.find(keyword)
+        if index >= 0 and not any(
+            index < end and start < index + len(keyword) for start, end in spans
+        ):
+            if "requirement" in args:
+                # Several modes in one command need the LLM to reconcile them
+                return None
+            args["requirement"] = keyword
+            spans.append((index, index + len(keyword)))
+
+    is_dispatch = bool(args)
+    for keyword in _DISPATCH_KEYWORDS:
+        index = lowered.find(keyword)
+        if index >= 0 and not any(
+            index < end and start < index + len(keyword) for start, end in spans
+        ):
+            is_dispatch = True
+            spans.append((index, index + len(keyword)))
+    if not is_dispatch:
+        return None
+
+    args.setdefault("user_modified_request", "")
+    return _accept(
+        FastPathResult("vpp_trader", args), lowered, _residual(lowered, spans)
+    )
+
+
+def _accept(
+    result: FastPathResult, lowered: str, leftover: str
+) -> Optional[FastPathResult]:
+    """Return the result if the unparsed text is harmless and the confidence is high enough."""
+    if len(leftover) > MAX_UNPARSED_CHARS or _PARAMETER_LEFTOVER.search(leftover):
+        logger.debug(f"Fast path declined, unparsed text: {leftover}")
+        return None
+    result.confidence = _confidence(lowered, leftover)
+    if result.confidence < fast_path_min_confidence():
+        logger.debug(
+            f"Fast path declined, confidence {result.confidence} for: {lowered}"
+        )
+        return None
+    return result
+
+
+def _residual(lowered: str, spans: list) -> str:
+    remaining = _strip(lowered, spans)
+    for word in _FILLER:
+        remaining = remaining.replace(word, "")
+    return _PUNCTUATION.sub("", remaining)
+
+
+def _strip_known_phrases(lowered: str) -> str:
+    # "不超过" / "不高于" belong to the temperature grammar and are not negations
+    for phrase in ("不超过", "不高于"):
+        lowered = lowered.replace(phrase, "")
+    return lowered
+
+
+def _confidence(lowered: str, leftover: str) -> float:
+    """Share of the meaningful characters that the parser recognised."""
+    total = len(_PUNCTUATION.sub("", lowered)) or 1
+    return round(1 - len(leftover) / total, 3)
+
+
+def fast_path_enabled() -> bool:
+    return os.getenv("COORDINATOR_FAST_PATH", "true").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
+def fast_path_min_confidence() -> float:
+    return float(
+        os.getenv("COORDINATOR_FAST_PATH_MIN_CONFIDENCE", str(DEFAULT_MIN_CONFIDENCE))
+    )
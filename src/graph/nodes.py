@@ -1,6 +1,7 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import copy
 import json
 import logging
 import os
@@ -10,9 +11,9 @@ from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.types import Command, interrupt
-from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from src.agents import create_agent
+from src.tools.mcp_sessions import get_mcp_session_manager
 from src.tools.search import LoggedTavilySearch
 from src.tools import (
     crawl_tool,
@@ -26,11 +27,13 @@ from src.config.configuration import Configuration
 from src.llms.llm import get_llm_by_type
 from src.prompts.planner_model import Plan
 from src.prompts.template import apply_prompt_template
+from src.utils.artifacts import offload_charts
 from src.utils.json_utils import repair_json_output
 
+from .intent_router import fast_path_enabled, parse_command
 from .types import State
 from ..config import SELECTED_SEARCH_ENGINE, SearchEngine
-from src.graph_solver.opt_subgraph import subgraph
+from src.graph_solver.dispatch_scheduler import get_dispatch_scheduler
 from src.utils.extra_tools import *
 from src.utils.curve import *
 
@@ -76,7 +79,7 @@ def curve_node(state: State, config: RunnableConfig
                ) -> Command[Literal["human_feedback", "reporter", "__end__"]]:
     """Planner node that generate the full plan."""
     logger.info("查看功率温度的特性曲线")
-    output = plot_curve()
+    output = offload_charts(plot_curve())
     response_content = (
         "## 功率温度的特性曲线\n"
         f"{output}\n"
@@ -198,19 +201,37 @@ def human_feedback_node(
     )
 
 
+def _last_user_text(state: State) -> str:
+    """Return the text of the latest message, which may be a message object or a dict."""
+    messages = state.get("messages") or []
+    if not messages:
+        return ""
+    last = messages[-1]
+    content = last.get("content", "") if isinstance(last, dict) else getattr(last, "content", "")
+    return content if isinstance(content, str) else ""
+
+
 def coordinator_node(
         state: State, config: RunnableConfig
 ) -> Command[Literal["planner", "__end__"]]:
     """Coordinator node that communicate with customers."""
     logger.info("Coordinator talking.")
     configurable = Configuration.from_runnable_config(config)
-    messages = apply_prompt_template("coordinator", state)
-    logger.info(f"coordinator_node messages: {messages}")
-    response = (
-        get_llm_by_type(AGENT_LLM_MAP["coordinator"])
-            .bind_tools([vpp_trader, curve_trader], tool_choice="auto")
-            .invoke(messages)
-    )
+    fast_path = parse_command(_last_user_text(state)) if fast_path_enabled() else None
+    if fast_path is not None:
+        # Structured operator command: skip the LLM round-trip
+        logger.info(f"Coordinator fast path: {fast_path}")
+        response = None
+        tool_calls = [fast_path.as_tool_call()]
+    else:
+        messages = apply_prompt_template("coordinator", state)
+        logger.info(f"coordinator_node messages: {messages}")
+        response = (
+            get_llm_by_type(AGENT_LLM_MAP["coordinator"])
+                .bind_tools([vpp_trader, curve_trader], tool_choice="auto")
+                .invoke(messages)
+        )
+        tool_calls = response.tool_calls
     logger.debug(f"Current state messages: {state['messages']}")
 
     goto = "__end__"
@@ -225,10 +246,10 @@ def coordinator_node(
     last_demand = state.get("last_demand", 0)
     last_requirement = state.get("last_requirement", "")
 
-    logger.info(f"response.tool_calls: {response.tool_calls}")
-    if len(response.tool_calls) > 0:
+    logger.info(f"response.tool_calls: {tool_calls}")
+    if len(tool_calls) > 0:
         try:
-            for tool_call in response.tool_calls:
+            for tool_call in tool_calls:
                 if tool_call.get("name", "") == "vpp_trader":
                     logger.info(f"Tool call name: {tool_call['name']}")
                     if tool_call.get("args", {}).get("demand"):
@@ -516,16 +537,17 @@ async def _setup_and_execute_agent_step(
 
     # Create and execute agent with MCP tools if available
     if mcp_servers:
-        async with MultiServerMCPClient(mcp_servers) as client:
-            loaded_tools = default_tools[:]
-            for tool in client.get_tools():
-                if tool.name in enabled_tools:
-                    tool.description = (
-                        f"Powered by '{enabled_tools[tool.name]}'.\n{tool.description}"
-                    )
-                    loaded_tools.append(tool)
-            agent = create_agent(agent_type, agent_type, loaded_tools, agent_type)
-            return await _execute_agent_step(state, agent, agent_type)
+        loaded_tools = default_tools[:]
+        for tool in await get_mcp_session_manager().get_tools(mcp_servers):
+            if tool.name in enabled_tools:
+                # Pooled tools are shared across requests, so annotate a copy
+                tool = copy.copy(tool)
+                tool.description = (
+                    f"Powered by '{enabled_tools[tool.name]}'.\n{tool.description}"
+                )
+                loaded_tools.append(tool)
+        agent = create_agent(agent_type, agent_type, loaded_tools, agent_type)
+        return await _execute_agent_step(state, agent, agent_type)
     else:
         # Use default tools if no MCP servers are configured
         agent = create_agent(agent_type, agent_type, default_tools, agent_type)
@@ -599,9 +621,10 @@ async def ppt_node(
 
 
 async def _vpp_execute_agent_step(
-        state: State, agent, agent_name: str
+        state: State, agent, agent_name: str, config: RunnableConfig = None
 ) -> Command[Literal["reporter"]]:
     """Helper function to execute a step using the specified agent."""
+    configurable = Configuration.from_runnable_config(config)
     logger.info("自定义VPP node is generating.")
     research_topic = state.get("research_topic")
     temperature = state.get("temperature", 30)
@@ -634,13 +657,19 @@ async def _vpp_execute_agent_step(
                   "temperature": temperature,
                   "device_health_check": device_health_check}
     logger.info(f"【{agent_name}】test_input: {test_input}")
-    result = await subgraph.ainvoke(test_input, config={"recursion_limit": 100})
+    result = await get_dispatch_scheduler().run(
+        test_input,
+        tenant=configurable.tenant_id,
+        priority=configurable.dispatch_priority,
+    )
     logger.info(f"subgraph result = {result}")
 
     markdown_table, plans_curve, report_content = get_vpp_alloc_plan(result)
-    response_content = (
-            markdown_table + "\n" + plans_curve
+    # Charts go to the artefact store; state and checkpoints only keep references
+    response_content = offload_charts(
+        markdown_table + "\n" + plans_curve
     )
+    report_content = offload_charts(report_content)
 
     logger.info(f"【{agent_name}】 full response type: {type(response_content)}: {response_content}")
     return Command(
@@ -648,6 +677,12 @@ async def _vpp_execute_agent_step(
             "messages": [AIMessage(content=response_content, name=agent_name,
                                    response_metadata={"finish_reason": "stop"})],
             "report_content": report_content,
+            "dispatch_sensitivity": result.get("interpretation", {}).get("sensitivity"),
+            "dispatch_formulation": result.get("formulation"),
+            "dispatch_allocation": {
+                ele["name"]: ele["value"]
+                for ele in result.get("interpretation", {}).get("variables", [])
+            },
         },
         goto="reporter",
     )
@@ -661,5 +696,6 @@ async def vpp_node(
     return await _vpp_execute_agent_step(
         state,
         "vpp",
-        "vpp"
+        "vpp",
+        config,
     )
@@ -31,4 +31,6 @@ class State(MessagesState):
     device_health_check: str = ""
     last_demand: float = 0
     last_requirement: str = ""
-
+    dispatch_sensitivity: dict = None
+    dispatch_formulation: dict = None
+    dispatch_allocation: dict = None
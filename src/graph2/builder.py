@@ -4,6 +4,7 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from src.prompts.planner_model import StepType
+from src.utils.registry import component_registry
 
 from .types import State
 from .nodes import (
@@ -85,4 +86,11 @@ def build_graph2():
     return builder.compile()
 
 
-graph = build_graph2()
+component_registry.register("graph2.main", build_graph2)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "graph":
+        return component_registry.get("graph2.main")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,460 @@
+"""
+基线预测服务
+
+按设备把 15 分钟粒度的历史遥测写入列式存储（每台设备一个 天 × 96 时段 的矩阵），
+并在其上提供两类向量化预测模型：
+- 相似日平均（SimilarDayModel）：取目标日之前最近若干个同类型日（工作日/周末）同一时段的均值
+- 指数平滑（ExponentialSmoothingModel）：按时段维护平滑水平值，新数据到达时增量更新
+
+新区间到达时通过 ingest 增量写入；预测按时段切片读取，复杂度为 O(窗口长度)。
+持久化时新写入的区间追加到日志文件，日志超过矩阵大小时才重写快照。
+"""
+
+import csv
+import logging
+import os
+import threading
+import warnings
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.registry import component_registry
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // INTERVAL_MINUTES
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_csv_path = os.path.join(script_dir, "combined_15min_data.csv")
+default_store_dir = os.path.join(script_dir, "baseline_store")
+
+_TIME_FORMATS = (
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+
+def parse_time(value) -> datetime:
+    """解析遥测时间戳，兼容 CSV 中的 2025/7/25 11:00 与 ISO 格式"""
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return datetime.fromisoformat(text)
+
+
+def to_slot_index(times: Sequence[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+    """把时间戳拆成 (日序号, 日内时段) 两个整型数组，时段向下取整到 15 分钟"""
+    days = np.fromiter((t.toordinal() for t in times), dtype=np.int64, count=len(times))
+    slots = np.fromiter(
+        ((t.hour * 60 + t.minute) // INTERVAL_MINUTES for t in times),
+        dtype=np.int64,
+        count=len(times),
+    )
+    return days, slots
+
+
+def slot_to_time(day_ordinal: int, slot: int) -> datetime:
+    return datetime.combine(date.fromordinal(int(day_ordinal)), time()) + timedelta(
+        minutes=int(slot) * INTERVAL_MINUTES
+    )
+
+
+# 追加日志中的一条记录：(日序号, 时段, 数值)
+_LOG_DTYPE = np.dtype([("day", "<i8"), ("slot", "<i8"), ("value", "<f8")])
+
+
+def is_weekend(day_ordinals: np.ndarray) -> np.ndarray:
+    # date.fromordinal(1) 为周一，(ordinal - 1) % 7 即 weekday()
+    return (day_ordinals - 1) % 7 >= 5
+
+
+class BaselineStore:
+    """
+    列式基线存储：每台设备保存一列有序的日序号 days 与一个 (天数 × 96) 的数值矩阵，缺失值为 NaN。
+    指定 directory 时以 .npy 快照持久化（每台设备两个文件），快照之后的写入追加到 .log 文件，
+    加载时先读快照再重放日志。
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._days: Dict[str, np.ndarray] = {}
+        self._values: Dict[str, np.ndarray] = {}
+        self._observed: Optional[Tuple[int, int]] = None
+        # 尚未持久化的写入（日志记录）；为 None 表示积压过多，下次保存直接重写快照
+        self._pending: Dict[str, Optional[List[np.ndarray]]] = {}
+        if directory:
+            self.load()
+
+    def devices(self) -> List[str]:
+        return list(self._days.keys())
+
+    def is_empty(self) -> bool:
+        return not self._days
+
+    def ingest(
+        self, device: str, times: Sequence[datetime], values: Sequence[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        写入一批区间数据（可乱序、可覆盖旧值），返回写入的 (日序号, 时段) 数组
+        """
+        if len(times) != len(values):
+            raise ValueError("times 与 values 长度不一致")
+        if len(times) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        day_idx, slot_idx = to_slot_index(times)
+        vals = np.asarray(values, dtype=np.float64)
+        self._write(device, day_idx, slot_idx, vals)
+        pending = self._pending.setdefault(device, [])
+        if self.directory and pending is not None:
+            records = np.empty(day_idx.size, dtype=_LOG_DTYPE)
+            records["day"], records["slot"], records["value"] = day_idx, slot_idx, vals
+            pending.append(records)
+            if sum(r.size for r in pending) > self._values[device].size:
+                self._pending[device] = None
+        return day_idx, slot_idx
+
+    def _write(
+        self, device: str, day_idx: np.ndarray, slot_idx: np.ndarray, vals: np.ndarray
+    ):
+        days = self._days.get(device, np.empty(0, dtype=np.int64))
+        matrix = self._values.get(
+            device, np.empty((0, SLOTS_PER_DAY), dtype=np.float64)
+        )
+
+        new_days = np.setdiff1d(np.unique(day_idx), days, assume_unique=True)
+        if new_days.size:
+            merged = np.union1d(days, new_days)
+            grown = np.full((merged.size, SLOTS_PER_DAY), np.nan)
+            grown[np.searchsorted(merged, days)] = matrix
+            days, matrix = merged, grown
+
+        rows = np.searchsorted(days, day_idx)
+        matrix[rows, slot_idx] = vals
+        self._update_observed(slot_idx[~np.isnan(vals)])
+        self._days[device] = days
+        self._values[device] = matrix
+
+    def history(self, device: str) -> Tuple[np.ndarray, np.ndarray]:
+        """返回设备的 (日序号数组, 天 × 96 矩阵)，不拷贝"""
+        if device not in self._days:
+            raise KeyError(f"基线存储中没有设备: {device}")
+        return self._days[device], self._values[device]
+
+    def observed_slots(self) -> Optional[Tuple[int, int]]:
+        """返回所有设备出现过数据的最早与最晚时段（闭区间），写入时增量维护"""
+        return self._observed
+
+    def _update_observed(self, slots: np.ndarray):
+        if slots.size == 0:
+            return
+        first, last = int(slots.min()), int(slots.max())
+        if self._observed is not None:
+            first, last = min(first, self._observed[0]), max(last, self._observed[1])
+        self._observed = (first, last)
+
+    def _paths(self, device: str) -> Tuple[str, str, str]:
+        return (
+            os.path.join(self.directory, f"{device}.days.npy"),
+            os.path.join(self.directory, f"{device}.values.npy"),
+            os.path.join(self.directory, f"{device}.log"),
+        )
+
+    def save(self, devices: Optional[Iterable[str]] = None):
+        """把未持久化的写入追加到日志；没有快照或日志记录数超过矩阵元素数时重写快照"""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for device in devices if devices is not None else self.devices():
+            days_path, values_path, log_path = self._paths(device)
+            pending = self._pending.pop(device, [])
+            if (
+                pending is not None
+                and os.path.exists(days_path)
+                and os.path.exists(values_path)
+            ):
+                if pending:
+                    with open(log_path, "ab") as f:
+                        for records in pending:
+                            f.write(records.tobytes())
+                log_records = (
+                    os.path.getsize(log_path) // _LOG_DTYPE.itemsize
+                    if os.path.exists(log_path)
+                    else 0
+                )
+                if log_records <= self._values[device].size:
+                    continue
+            np.save(days_path, self._days[device])
+            np.save(values_path, self._values[device])
+            if os.path.exists(log_path):
+                os.remove(log_path)
+
+    def load(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if not name.endswith(".days.npy"):
+                continue
+            device = name[: -len(".days.npy")]
+            days_path, values_path, log_path = self._paths(device)
+            if not os.path.exists(values_path):
+                continue
+            self._days[device] = np.load(days_path)
+            self._values[device] = np.load(values_path)
+            self._update_observed(
+                np.flatnonzero(~np.all(np.isnan(self._values[device]), axis=0))
+            )
+            if os.path.exists(log_path):
+                # 忽略写入中断留下的不完整记录
+                records = np.fromfile(log_path, dtype=np.uint8)
+                records = records[
+                    : records.size - records.size % _LOG_DTYPE.itemsize
+                ].view(_LOG_DTYPE)
+                if records.size:
+                    self._write(
+                        device, records["day"], records["slot"], records["value"]
+                    )
+
+
+class SimilarDayModel:
+    """
+    相似日平均：目标日之前最近 lookback_days 个同类型日（工作日/周末）同一时段取均值。
+
+    只在目标日之前最近的 (lookback_days // 2 + 1) 周对应行数内挑选，连续数据中这一范围
+    至少包含 lookback_days 个周末日，预测开销与历史长度无关。
+    """
+
+    def __init__(self, lookback_days: int = 7):
+        self.lookback_days = lookback_days
+
+    def forecast(
+        self, store: BaselineStore, device: str, day_ordinal: int, slots: slice
+    ) -> np.ndarray:
+        days, matrix = store.history(device)
+        end = int(np.searchsorted(days, day_ordinal))
+        if end == 0:
+            end = days.size
+        span = (self.lookback_days // 2 + 1) * 7
+        candidates = np.arange(max(end - span, 0), end)
+        same_type = candidates[
+            is_weekend(days[candidates]) == is_weekend(np.array([day_ordinal]))[0]
+        ]
+        if same_type.size:
+            candidates = same_type
+        rows = candidates[-self.lookback_days :]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmean(matrix[rows, slots], axis=0)
+
+
+class ExponentialSmoothingModel:
+    """按时段的指数平滑：level[s] = alpha * x + (1 - alpha) * level[s]，每个新区间 O(1) 更新"""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._levels: Dict[str, np.ndarray] = {}
+        self._last_applied: Dict[str, Tuple[int, int]] = {}
+
+    def fit(self, store: BaselineStore, device: str):
+        days, matrix = store.history(device)
+        self._levels.pop(device, None)
+        self._last_applied.pop(device, None)
+        for row, day in enumerate(days):
+            observed = np.flatnonzero(~np.isnan(matrix[row]))
+            if observed.size:
+                self._apply(device, int(day), observed, matrix[row, observed])
+
+    def update(
+        self,
+        store: BaselineStore,
+        device: str,
+        day_idx: np.ndarray,
+        slot_idx: np.ndarray,
+        values: np.ndarray,
+    ):
+        """增量更新；若收到早于已处理位置的数据（补录），则对该设备重新拟合"""
+        last = self._last_applied.get(device)
+        order = np.lexsort((slot_idx, day_idx))
+        day_idx, slot_idx, values = day_idx[order], slot_idx[order], values[order]
+        if last is not None and (int(day_idx[0]), int(slot_idx[0])) <= last:
+            self.fit(store, device)
+            return
+        for day in np.unique(day_idx):
+            mask = day_idx == day
+            self._apply(device, int(day), slot_idx[mask], values[mask])
+
+    def _apply(self, device: str, day: int, slots: np.ndarray, values: np.ndarray):
+        observed = ~np.isnan(values)
+        if not observed.any():
+            return
+        slots, values = slots[observed], values[observed]
+        level = self._levels.get(device)
+        if level is None:
+            level = np.full(SLOTS_PER_DAY, np.nan)
+            self._levels[device] = level
+        current = level[slots]
+        level[slots] = np.where(
+            np.isnan(current), values, self.alpha * values + (1 - self.alpha) * current
+        )
+        self._last_applied[device] = (day, int(slots[-1]))
+
+    def forecast(self, device: str, slots: slice) -> np.ndarray:
+        level = self._levels.get(device)
+        if level is None:
+            raise KeyError(f"指数平滑模型中没有设备: {device}")
+        return level[slots].copy()
+
+
+class BaselineService:
+    """
+    基线预测服务：管理列式存储与预测模型，对外提供增量写入与窗口预测
+    """
+
+    METHODS = ("similar_day", "exp_smoothing")
+
+    def __init__(
+        self,
+        store: BaselineStore,
+        method: str = "similar_day",
+        lookback_days: int = 7,
+        alpha: float = 0.3,
+    ):
+        if method not in self.METHODS:
+            raise ValueError(f"不支持的基线预测方法: {method}")
+        self.store = store
+        self.method = method
+        self.similar_day = SimilarDayModel(lookback_days=lookback_days)
+        self.exp_smoothing = ExponentialSmoothingModel(alpha=alpha)
+        self._lock = threading.RLock()
+        for device in store.devices():
+            self.exp_smoothing.fit(store, device)
+
+    def devices(self) -> List[str]:
+        return self.store.devices()
+
+    def ingest(
+        self,
+        device: str,
+        times: Sequence,
+        values: Sequence[float],
+        persist: bool = True,
+    ):
+        """写入新到达的区间数据，并增量更新预测模型"""
+        parsed = [parse_time(t) for t in times]
+        with self._lock:
+            day_idx, slot_idx = self.store.ingest(device, parsed, values)
+            if day_idx.size:
+                self.exp_smoothing.update(
+                    self.store,
+                    device,
+                    day_idx,
+                    slot_idx,
+                    np.asarray(values, dtype=np.float64),
+                )
+            if persist:
+                self.store.save([device])
+
+    def ingest_csv(self, path: str, persist: bool = True):
+        """导入 time + 各设备列 格式的 CSV 历史数据"""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if "time" not in (reader.fieldnames or []):
+                raise ValueError("CSV文件缺少 time 字段")
+            devices = [col for col in reader.fieldnames if col != "time"]
+            times, columns = [], {device: [] for device in devices}
+            for row in reader:
+                times.append(parse_time(row["time"]))
+                for device in devices:
+                    value = row.get(device)
+                    columns[device].append(
+                        float(value) if value not in (None, "") else np.nan
+                    )
+        for device in devices:
+            self.ingest(device, times, columns[device], persist=persist)
+        logger.info(f"基线存储已导入 {path}: {len(times)} 个区间, 设备 {devices}")
+
+    def _forecast_slots(
+        self, device: str, day_ordinal: int, slots: slice, method: str
+    ) -> np.ndarray:
+        if method == "exp_smoothing":
+            values = self.exp_smoothing.forecast(device, slots)
+        else:
+            values = self.similar_day.forecast(self.store, device, day_ordinal, slots)
+        return np.nan_to_num(values, nan=0.0)
+
+    def forecast(
+        self, device: str, start: datetime, end: datetime, method: Optional[str] = None
+    ) -> Tuple[List[datetime], np.ndarray]:
+        """
+        预测 [start, end) 内每个 15 分钟区间的基线，可跨天
+        """
+        method = method or self.method
+        start_day, start_slot = to_slot_index([start])
+        end_day, end_slot = to_slot_index([end - timedelta(microseconds=1)])
+        times, parts = [], []
+        with self._lock:
+            for day in range(int(start_day[0]), int(end_day[0]) + 1):
+                first = int(start_slot[0]) if day == start_day[0] else 0
+                last = int(end_slot[0]) if day == end_day[0] else SLOTS_PER_DAY - 1
+                parts.append(
+                    self._forecast_slots(device, day, slice(first, last + 1), method)
+                )
+                times.extend(slot_to_time(day, s) for s in range(first, last + 1))
+        values = np.concatenate(parts) if parts else np.empty(0)
+        return times, values
+
+    def forecast_horizon(
+        self,
+        day: Optional[date] = None,
+        devices: Optional[Sequence[str]] = None,
+        method: Optional[str] = None,
+    ) -> Tuple[List[datetime], Dict[str, np.ndarray]]:
+        """
+        预测目标日在历史数据覆盖时段内（闭区间）的全部设备基线
+        """
+        day = day or date.today()
+        devices = list(devices) if devices is not None else self.devices()
+        method = method or self.method
+        with self._lock:
+            observed = self.store.observed_slots()
+            if observed is None:
+                return [], {device: np.empty(0) for device in devices}
+            first, last = observed
+            slots = slice(first, last + 1)
+            times = [slot_to_time(day.toordinal(), s) for s in range(first, last + 1)]
+            values = {
+                device: self._forecast_slots(device, day.toordinal(), slots, method)
+                for device in devices
+            }
+        return times, values
+
+
+def build_baseline_service() -> BaselineService:
+    store = BaselineStore(os.getenv("BASELINE_STORE_DIR", default_store_dir))
+    service = BaselineService(
+        store,
+        method=os.getenv("BASELINE_FORECAST_METHOD", "similar_day"),
+        lookback_days=int(os.getenv("BASELINE_LOOKBACK_DAYS", "7")),
+        alpha=float(os.getenv("BASELINE_SMOOTHING_ALPHA", "0.3")),
+    )
+    if store.is_empty():
+        # 首次启动时用随仓库附带的样例数据初始化存储
+        service.ingest_csv(os.getenv("BASELINE_SEED_CSV", default_csv_path))
+    return service
+
+
+component_registry.register("graph_solver.baseline_service", build_baseline_service)
+
+
+def get_baseline_service() -> BaselineService:
+    """返回进程内共享的基线预测服务（首次调用时加载存储）"""
+    return component_registry.get("graph_solver.baseline_service")
@@ -0,0 +1,404 @@
+import asyncio
+import enum
+import functools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.registry import component_registry
+
+# 调度器把多个聚合商 / VPP 组合的并发调度请求放在求解子图之前统一排队：
+# LLM 调用、求解器执行、调度计划生成各自使用独立的有界并发池，
+# 池内按优先级类别出队，同一优先级内在租户之间公平分配。
+
+DEFAULT_TENANT = "default"
+
+
+class DispatchPriority(enum.Enum):
+    """调度请求的优先级类别，rank 越小越先获得资源"""
+
+    GRID_EVENT = "grid_event"  # 电网下发的需求响应事件
+    OPERATOR = "operator"  # 运营人员发起的常规调度
+    WHAT_IF = "what_if"  # 假设分析 / 试算
+
+    @property
+    def rank(self) -> int:
+        return _PRIORITY_RANK[self]
+
+
+_PRIORITY_RANK = {
+    DispatchPriority.GRID_EVENT: 0,
+    DispatchPriority.OPERATOR: 1,
+    DispatchPriority.WHAT_IF: 2,
+}
+
+_current_tenant: ContextVar[str] = ContextVar("dispatch_tenant", default=DEFAULT_TENANT)
+_current_priority: ContextVar[DispatchPriority] = ContextVar(
+    "dispatch_priority", default=DispatchPriority.OPERATOR
+)
+
+
+def to_priority(value) -> DispatchPriority:
+    """把字符串或枚举转换为 DispatchPriority，空值返回默认的 OPERATOR"""
+    if not value:
+        return DispatchPriority.OPERATOR
+    if isinstance(value, DispatchPriority):
+        return value
+    return DispatchPriority(value)
+
+
+@contextmanager
+def dispatch_context(tenant: Optional[str] = None, priority=None):
+    """
+    设置当前调度请求所属的租户和优先级。
+    LangGraph 在执行同步节点时会复制 contextvars，因此子图内各节点都能读取到。
+    """
+    tenant_token = _current_tenant.set(tenant or DEFAULT_TENANT)
+    priority_token = _current_priority.set(to_priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(priority_token)
+        _current_tenant.reset(tenant_token)
+
+
+class _Waiter:
+    __slots__ = ("tenant", "priority", "seq", "enqueued_at", "granted", "wake")
+
+    def __init__(
+        self,
+        tenant: str,
+        priority: DispatchPriority,
+        seq: int,
+        wake: Callable[[], None],
+    ):
+        self.tenant = tenant
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+        self.granted = False
+        self.wake = wake
+
+
+class ResourcePool:
+    """
+    有界并发池，同时支持线程（同步节点）和协程两种获取方式。
+
+    出队顺序：先比较优先级类别；同一类别内优先选择当前在本池占用最少、
+    累计获得次数最少的租户；最后按入队先后。突发请求因此不会被单个租户独占。
+    """
+
+    def __init__(self, name: str, limit: int):
+        if limit < 1:
+            raise ValueError(f"Pool '{name}' limit must be >= 1, got {limit}")
+        self.name = name
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = 0
+        self._in_use = 0
+        self._tenant_in_use: Dict[str, int] = {}
+        self._tenant_granted: Dict[str, int] = {}
+        self._granted_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._peak_queue = 0
+
+    # ---- 内部状态维护（调用方需持有 _lock）----
+
+    def _grant(self, tenant: str, wait_seconds: float):
+        self._in_use += 1
+        self._tenant_in_use[tenant] = self._tenant_in_use.get(tenant, 0) + 1
+        self._tenant_granted[tenant] = self._tenant_granted.get(tenant, 0) + 1
+        self._granted_total += 1
+        self._wait_seconds_total += wait_seconds
+        self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+
+    def _pick_next(self) -> Optional[_Waiter]:
+        if not self._waiters:
+            return None
+        return min(
+            self._waiters,
+            key=lambda w: (
+                w.priority.rank,
+                self._tenant_in_use.get(w.tenant, 0),
+                self._tenant_granted.get(w.tenant, 0),
+                w.seq,
+            ),
+        )
+
+    def _try_acquire(
+        self, tenant: str, priority: DispatchPriority, wake: Callable[[], None]
+    ) -> Optional[_Waiter]:
+        """空闲且无人排队时直接获得资源并返回 None，否则登记并返回等待者"""
+        if self._in_use < self.limit and not self._waiters:
+            self._grant(tenant, 0.0)
+            return None
+        self._seq += 1
+        waiter = _Waiter(tenant, priority, self._seq, wake)
+        self._waiters.append(waiter)
+        self._peak_queue = max(self._peak_queue, len(self._waiters))
+        return waiter
+
+    def _dispatch_waiters(self):
+        while self._in_use < self.limit:
+            waiter = self._pick_next()
+            if waiter is None:
+                return
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self._grant(waiter.tenant, time.perf_counter() - waiter.enqueued_at)
+            waiter.wake()
+
+    def _abandon(self, waiter: _Waiter):
+        """等待被取消：未获得资源则出队，已获得则归还"""
+        with self._lock:
+            if waiter.granted:
+                self._release_locked(waiter.tenant)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release_locked(self, tenant: str):
+        self._in_use -= 1
+        remaining = self._tenant_in_use.get(tenant, 1) - 1
+        if remaining:
+            self._tenant_in_use[tenant] = remaining
+        else:
+            self._tenant_in_use.pop(tenant, None)
+        self._dispatch_waiters()
+
+    # ---- 对外接口 ----
+
+    def release(self, tenant: str):
+        with self._lock:
+            self._release_locked(tenant)
+
+    @contextmanager
+    def acquire(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        priority: DispatchPriority = DispatchPriority.OPERATOR,
+    ):
+        """在线程中阻塞获取一个并发槽位"""
+        event = threading.Event()
+        with self._lock:
+            waiter = self._try_acquire(tenant, priority, event.set)
+        if waiter is not None:
+            try:
+                event.wait()
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    async def wait_async(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        priority: DispatchPriority = DispatchPriority.OPERATOR,
+    ):
+        """在协程中等待直到获得一个槽位，由调用方负责 release；等待被取消时不占用槽位"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            waiter = self._try_acquire(tenant, priority, wake)
+        if waiter is not None:
+            try:
+                await future
+            except BaseException:
+                self._abandon(waiter)
+                raise
+
+    @asynccontextmanager
+    async def acquire_async(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        priority: DispatchPriority = DispatchPriority.OPERATOR,
+    ):
+        """在协程中等待获取一个并发槽位，不阻塞事件循环"""
+        await self.wait_async(tenant, priority)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def metrics(self) -> Dict[str, Any]:
+        """返回池的占用、排队深度（按优先级细分）和等待时间统计"""
+        with self._lock:
+            queued_by_priority = {p.value: 0 for p in DispatchPriority}
+            queued_by_tenant: Dict[str, int] = {}
+            for waiter in self._waiters:
+                queued_by_priority[waiter.priority.value] += 1
+                queued_by_tenant[waiter.tenant] = (
+                    queued_by_tenant.get(waiter.tenant, 0) + 1
+                )
+            return {
+                "limit": self.limit,
+                "in_use": self._in_use,
+                "queued": len(self._waiters),
+                "peak_queued": self._peak_queue,
+                "queued_by_priority": queued_by_priority,
+                "queued_by_tenant": queued_by_tenant,
+                "in_use_by_tenant": dict(self._tenant_in_use),
+                "granted_total": self._granted_total,
+                "avg_wait_ms": (
+                    round(self._wait_seconds_total / self._granted_total * 1000, 3)
+                    if self._granted_total
+                    else 0.0
+                ),
+                "max_wait_ms": round(self._wait_seconds_max * 1000, 3),
+            }
+
+
+class DispatchScheduler:
+    """
+    多 VPP 并发调度的统一入口。
+
+    - llm：LLM 调用（转译、建模、代码生成、结果解释等节点）
+    - solver：优化求解代码执行
+    - plan：基线读取与调度计划生成
+    """
+
+    POOLS = ("llm", "solver", "plan")
+
+    def __init__(
+        self,
+        llm_concurrency: int = 8,
+        solver_concurrency: int = 2,
+        plan_concurrency: int = 4,
+    ):
+        self.pools: Dict[str, ResourcePool] = {
+            "llm": ResourcePool("llm", llm_concurrency),
+            "solver": ResourcePool("solver", solver_concurrency),
+            "plan": ResourcePool("plan", plan_concurrency),
+        }
+        self._lock = threading.Lock()
+        self._active_runs = 0
+        self._completed_runs = 0
+        self._failed_runs = 0
+
+    def pool(self, name: str) -> ResourcePool:
+        try:
+            return self.pools[name]
+        except KeyError:
+            raise ValueError(f"Unknown dispatch pool: {name}") from None
+
+    @contextmanager
+    def slot(self, pool_name: str):
+        """按当前上下文的租户和优先级，在线程中占用指定池的一个槽位"""
+        with self.pool(pool_name).acquire(
+            _current_tenant.get(), _current_priority.get()
+        ):
+            yield
+
+    @asynccontextmanager
+    async def slot_async(self, pool_name: str):
+        """slot 的协程版本"""
+        async with self.pool(pool_name).acquire_async(
+            _current_tenant.get(), _current_priority.get()
+        ):
+            yield
+
+    async def run(
+        self,
+        inputs: dict,
+        tenant: Optional[str] = None,
+        priority=None,
+        config: Optional[dict] = None,
+    ):
+        """以指定租户和优先级运行一次求解子图"""
+        from src.graph_solver.opt_subgraph import get_subgraph
+
+        with self._lock:
+            self._active_runs += 1
+        try:
+            with dispatch_context(tenant, priority):
+                result = await get_subgraph().ainvoke(
+                    inputs, config=config or {"recursion_limit": 100}
+                )
+        except BaseException:
+            with self._lock:
+                self._failed_runs += 1
+            raise
+        else:
+            with self._lock:
+                self._completed_runs += 1
+            return result
+        finally:
+            with self._lock:
+                self._active_runs -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """返回各资源池的排队深度与等待时间，以及子图运行计数"""
+        with self._lock:
+            runs = {
+                "active": self._active_runs,
+                "completed": self._completed_runs,
+                "failed": self._failed_runs,
+            }
+        return {
+            "runs": runs,
+            "pools": {name: pool.metrics() for name, pool in self.pools.items()},
+        }
+
+
+def build_dispatch_scheduler() -> DispatchScheduler:
+    """根据环境变量创建调度器"""
+    return DispatchScheduler(
+        llm_concurrency=int(os.getenv("DISPATCH_LLM_CONCURRENCY", "8")),
+        solver_concurrency=int(
+            os.getenv("DISPATCH_SOLVER_CONCURRENCY", str(min(4, os.cpu_count() or 1)))
+        ),
+        plan_concurrency=int(os.getenv("DISPATCH_PLAN_CONCURRENCY", "4")),
+    )
+
+
+component_registry.register("graph_solver.dispatch_scheduler", build_dispatch_scheduler)
+
+
+def get_dispatch_scheduler() -> DispatchScheduler:
+    """返回进程内共享的调度器（首次调用时创建）"""
+    return component_registry.get("graph_solver.dispatch_scheduler")
+
+
+def dispatch_slot(pool_name: str):
+    """
+    装饰同步节点函数，使其在执行期间占用指定资源池的一个槽位。
+
+    返回的函数带有协程版本 afunc：先在事件循环中排队，获得槽位后才把节点交给线程执行，
+    排队中的节点不会占满默认线程池而挡住其他 asyncio.to_thread 调用。
+    以 RunnableLambda(node, afunc=node.afunc) 注册节点即可在异步执行时使用它。
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_dispatch_scheduler().slot(pool_name):
+                return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        async def awrapper(*args, **kwargs):
+            async with get_dispatch_scheduler().slot_async(pool_name):
+                return await asyncio.to_thread(func, *args, **kwargs)
+
+        wrapper.afunc = awrapper
+        return wrapper
+
+    return decorator
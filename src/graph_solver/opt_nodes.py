@@ -1,26 +1,24 @@
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import io
-import pandas as pd
-import numpy as np
 import copy
+from datetime import date
 from contextlib import redirect_stdout
 import os
+import logging
 from src.llms.llm import get_llm_by_type
 from src.config.agents import AGENT_LLM_MAP
+from src.utils.registry import component_registry
+from src.graph_solver.dispatch_scheduler import dispatch_slot, get_dispatch_scheduler
 from langgraph.config import get_stream_writer
 import textwrap
 from uuid import uuid4
 import re
 
-script_path = os.path.abspath(__file__)
-script_dir = os.path.dirname(script_path)
-csv_path = os.path.join(script_dir, 'combined_15min_data.csv')
-
-llm = get_llm_by_type(AGENT_LLM_MAP["planner"])
+# numpy、基线预测服务及灵敏度分析仅在求解、生成计划、读取基线时按需导入，避免拖慢服务启动和测试收集
 
+logger = logging.getLogger(__name__)
 local_solver_path = os.getenv("local_solver_path")
-csv_path = os.path.join(script_dir, 'combined_15min_data.csv')
 MaxRetryCount = 2
 device_name_map = {'HVAC': '暖通', 'ESS_HBN': '华贝纳储能', 'ESS_ML': '美力储能', 'ESS_HY': '环益储能', 'EV': '充电桩', 'PV': '光伏'}
 
@@ -65,7 +63,7 @@ device_name_map = {'HVAC': '暖通', 'ESS_HBN': '华贝纳储能', 'ESS_ML': '
 #     ("human", "原始文本：{text}\n\n特殊说明：{extra_instructions}")
 # ])
 
-preprocess_prompt = ChatPromptTemplate.from_messages([
+preprocess_messages = [
     ("system", """
 你是一个电力需求响应调度优化的文本预处理专家。你的任务是根据给定的“特殊说明”（extra_instructions），对输入的中文调度描述文本进行信息删除、修改或优先化处理，使其满足后续调度/建模计算要求。
 
@@ -84,10 +82,10 @@ preprocess_prompt = ChatPromptTemplate.from_messages([
 特殊说明：{extra_instructions}
 """),
     ("human", "原始文本：{text}\n\n特殊说明：{extra_instructions}")
-])
+]
 
 
-translator_prompt = ChatPromptTemplate.from_messages([
+translator_messages = [
     ("system", """
 你是一名运筹优化技术问题的写作优化助手。你的任务是：
 - 如果输入是中文，输出保持中文，必要时优化语句，使其更清晰、更专业，但不能改变含义。
@@ -97,9 +95,9 @@ translator_prompt = ChatPromptTemplate.from_messages([
 - 注意，暖通温度相关的因素已经在前置环节进行过处理，这里必须要忽略！
 """),
     ("human", "问题描述：{problem_description} 要求：{requirement}")
-])
+]
 
-adjust_capacity_prompt = ChatPromptTemplate.from_messages([
+adjust_capacity_messages = [
     ("system", """
 You are an assistant that edits numerical lists based on instructions.
 The input text describes devices and their capacities. The devices are listed in a fixed order in the text.
@@ -118,9 +116,9 @@ Original text:
 
 Delta (MW): {delta}
 """)
-])
+]
 
-formulator_prompt = ChatPromptTemplate.from_messages([
+formulator_messages = [
     ("system", """You are an operations research expert. Your task is to translate the given natural language description into a formal optimization formulation.
 
 Follow these instructions carefully:
@@ -177,9 +175,9 @@ Follow these instructions carefully:
 
 """),
     ("human", "{problem_description}")
-])
+]
 
-coder_prompt = ChatPromptTemplate.from_messages([
+coder_messages = [
     ("system", """You are an expert in mathematical programming and Python coding. You will receive an optimization formulation as a structured Python dict. Generate executable Python code using Pyomo following these rules:
 
 Follow these rules:
@@ -226,6 +224,8 @@ Follow these rules:
 15. **Avoid Pyomo warnings about replacing components**:
    - Use unique names for constraints and avoid reassigning the same name for different components.
    - Use `ConstraintList()` for multiple constraints and name it `capacity_constraints`.
+16. **Sensitivity information**:
+   - Name the model `model`, and before solving declare `model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)` and `model.rc = pyo.Suffix(direction=pyo.Suffix.IMPORT)` so that duals and reduced costs are imported when the solver provides them.
 
 If there was a previous solver error, here is the error message:
 {solver_error_info}
@@ -247,9 +247,9 @@ Output format:
 3. 输出 JSON 格式必须严格符合示例结构，字段名保持英文。
 """),
     ("human", "Here is the formulation Dict:\n{formulation_dict}")
-])
+]
 
-interpreter_prompt = ChatPromptTemplate.from_messages([
+interpreter_messages = [
     ("system", """You are a helpful assistant that converts raw optimization solver output into structured JSON.
 
 The raw text contains:
@@ -278,10 +278,10 @@ Your task:
 }}
 """),
     ("human", "device_names: {device_names}\n\nText:\n{solution}")
-])
+]
 
 
-interpretation_validator_prompt = ChatPromptTemplate.from_messages([
+interpretation_validator_messages = [
     ("system", """You are a validation agent that checks whether an optimization result is valid.
 
 Inputs:
@@ -301,7 +301,7 @@ Return JSON:
 }}
 """),
     ("human", "solver_error_info: {solver_error_info}\n\ninterpretation: {interpretation}")
-])
+]
 
 
 class Variable(BaseModel):
@@ -335,6 +335,7 @@ class CodeOutput(BaseModel):
 
 class SolverOutput(BaseModel):
     raw_output: str = Field(description="Raw console output from executing the optimization code")
+    solver_duals: dict = Field(default_factory=dict, description="Duals and reduced costs imported via Pyomo suffixes")
 
 
 class VariableItem(BaseModel):
@@ -353,14 +354,65 @@ class InterpretationValidationResult(BaseModel):
     reason: str = Field(..., description="Explanation why valid or invalid")
 
 
-preprocess_chain = preprocess_prompt | llm
-translator_chain = translator_prompt | llm
-formulator_chain = formulator_prompt | llm.with_structured_output(Formulation)
-coder_chain = coder_prompt | llm.with_structured_output(CodeOutput)
-interpreter_chain = interpreter_prompt | llm.with_structured_output(OptimizationResult)
-interpretation_validator_chain = interpretation_validator_prompt | llm.with_structured_output(InterpretationValidationResult)
+# LLM、提示词模板与结构化输出链均在首次使用时构建并缓存，导入本模块不会创建 LLM 客户端
+_prompt_messages = {
+    "preprocess": preprocess_messages,
+    "translator": translator_messages,
+    "adjust_capacity": adjust_capacity_messages,
+    "formulator": formulator_messages,
+    "coder": coder_messages,
+    "interpreter": interpreter_messages,
+    "interpretation_validator": interpretation_validator_messages,
+}
+_structured_outputs = {
+    "preprocess": None,
+    "translator": None,
+    "formulator": Formulation,
+    "coder": CodeOutput,
+    "interpreter": OptimizationResult,
+    "interpretation_validator": InterpretationValidationResult,
+}
+
+
+def _register_prompt(name: str, messages: list):
+    component_registry.register(
+        f"graph_solver.{name}_prompt", lambda: ChatPromptTemplate.from_messages(messages)
+    )
+
+
+def _register_chain(name: str, schema):
+    def factory():
+        prompt = get_prompt(name)
+        if schema is None:
+            return prompt | get_llm()
+        return prompt | get_llm().with_structured_output(schema)
+
+    component_registry.register(f"graph_solver.{name}_chain", factory)
+
+
+component_registry.register("graph_solver.llm", lambda: get_llm_by_type(AGENT_LLM_MAP["planner"]))
+for _name, _messages in _prompt_messages.items():
+    _register_prompt(_name, _messages)
+for _name, _schema in _structured_outputs.items():
+    _register_chain(_name, _schema)
+
+
+def get_llm():
+    """返回求解子图使用的 LLM（首次调用时创建）"""
+    return component_registry.get("graph_solver.llm")
 
 
+def get_prompt(name: str) -> ChatPromptTemplate:
+    """返回指定名称的提示词模板（首次调用时构建）"""
+    return component_registry.get(f"graph_solver.{name}_prompt")
+
+
+def get_chain(name: str):
+    """返回指定名称的 LLM 调用链（首次调用时构建）"""
+    return component_registry.get(f"graph_solver.{name}_chain")
+
+
+@dispatch_slot("llm")
 def preprocess_node(inputs: dict) -> dict:
     """
     输入: {"text": "...", "extra_instructions": "..."}
@@ -369,7 +421,7 @@ def preprocess_node(inputs: dict) -> dict:
     text = inputs.get("text", "")
     extra = inputs.get("device_health_check", "")
     try:
-        result = preprocess_chain.invoke({"text": text, "extra_instructions": extra})
+        result = get_chain("preprocess").invoke({"text": text, "extra_instructions": extra})
         modified_text = result.content.strip() if hasattr(result, "content") else str(result).strip()
         print(f"经预处理后，输入模型文本：\n{modified_text}\n")
         return {"text": modified_text}
@@ -378,6 +430,7 @@ def preprocess_node(inputs: dict) -> dict:
         return {"text": text}
 
 
+@dispatch_slot("llm")
 def translator_node(inputs: dict) -> dict:
     """
     LangGraph 节点，输入 {text: "..."}，输出 {"translated": "..."}
@@ -396,7 +449,7 @@ def translator_node(inputs: dict) -> dict:
         "- [ ] 调度计划生成 — 基于求解结果和基线数据，生成最终的调度与分配计划\n"
     )
     writer({f"custom_text{str(uuid4())}": markdown_text})
-    result = translator_chain.invoke({"problem_description": problem_description, "requirement": requirement})
+    result = get_chain("translator").invoke({"problem_description": problem_description, "requirement": requirement})
     markdown_text = (
         "#### 虚拟电厂需求侧响应分配与调度计划生成\n"
         "- [✔] 需求转译 — 将用户需求转译成运筹优化可理解的描述方式\n"
@@ -421,11 +474,12 @@ def hvac_adjust_node(state: dict) -> dict:
     if delta == 0:
         adjusted_text = translated_text
     else:
-        messages = adjust_capacity_prompt.format_messages(
+        messages = get_prompt("adjust_capacity").format_messages(
             translated_text=translated_text,
             delta=delta
         )
-        response = llm.invoke(messages)
+        with get_dispatch_scheduler().slot("llm"):
+            response = get_llm().invoke(messages)
         adjusted_text = response.content
 
     return {
@@ -436,11 +490,12 @@ def hvac_adjust_node(state: dict) -> dict:
     }
 
 
+@dispatch_slot("llm")
 def formulator_node(inputs: dict) -> dict:
     translated_text = inputs.get("adjusted_translated", "")
     requirement = inputs.get("device_health_check", "")
     writer = get_stream_writer()
-    result = formulator_chain.invoke({"problem_description": translated_text})
+    result = get_chain("formulator").invoke({"problem_description": translated_text})
     result = result.dict()
     device_names_en = result.get('device_names', [])
     result['device_names_cn'] = device_names_en
@@ -510,11 +565,12 @@ def show_code(code_dict: dict, width: int = 60) -> str:
     return f"```python\n{imports}\n\n{code}\n```"
 
 
+@dispatch_slot("llm")
 def coder_node(inputs: dict) -> dict:
     formulation = inputs.get("formulation", {})
     solver_error_info = inputs.get("solver_error_info", "")
     writer = get_stream_writer()
-    result = coder_chain.invoke({
+    result = get_chain("coder").invoke({
         "formulation_dict": formulation,
         "solver_path": local_solver_path,
         "solver_error_info": solver_error_info})
@@ -534,6 +590,7 @@ def coder_node(inputs: dict) -> dict:
     return {"code_output": result.dict()}
 
 
+@dispatch_slot("solver")
 def solver_node(inputs: dict) -> dict:
     code_output = inputs.get("code_output", {})
     imports = code_output.get("imports", "")
@@ -549,7 +606,8 @@ def solver_node(inputs: dict) -> dict:
         with redirect_stdout(f):
             exec(imports + "\n" + code, context, context)
         raw_out = f.getvalue()
-        result = SolverOutput(raw_output=raw_out)
+        from src.graph_solver.sensitivity import extract_solver_duals
+        result = SolverOutput(raw_output=raw_out, solver_duals=extract_solver_duals(context))
         markdown_text = (
             "#### 虚拟电厂需求侧响应分配与调度计划生成\n"
             "- [✔] 需求转译 — 将用户需求转译成运筹优化可理解的描述方式\n"
@@ -571,12 +629,29 @@ def solver_node(inputs: dict) -> dict:
         }
 
 
+def get_sensitivity(inputs: dict, variables: list):
+    """根据建模结果和解释后的分配方案计算对偶 / 灵敏度信息，无法计算时返回 None"""
+    if not variables:
+        return None
+    from src.graph_solver.sensitivity import build_sensitivity
+    try:
+        return build_sensitivity(
+            inputs.get("formulation", {}),
+            {ele["name"]: ele["value"] for ele in variables},
+            solver_duals=inputs.get("solution", {}).get("solver_duals"),
+        )
+    except Exception:
+        logger.exception("Sensitivity analysis failed")
+        return None
+
+
+@dispatch_slot("llm")
 def interpreter_node(inputs: dict) -> dict:
     solution_text = inputs.get("solution", {}).get("raw_output", "")
     device_names = inputs.get("formulation", {}).get("device_names", [])
 
     try:
-        result = interpreter_chain.invoke({
+        result = get_chain("interpreter").invoke({
             "solution": solution_text,
             "device_names": device_names
         })
@@ -590,7 +665,8 @@ def interpreter_node(inputs: dict) -> dict:
                 "status": parsed.get("status", "unknown"),
                 "variables": variables,
                 "response_allocation": response_allocation,
-                "interpretation": parsed.get("interpretation", "No interpretation provided")
+                "interpretation": parsed.get("interpretation", "No interpretation provided"),
+                "sensitivity": get_sensitivity(inputs, variables)
             }
         }
     except Exception as e:
@@ -610,16 +686,25 @@ def generate_dr_plan(
         start_time: str = "16:00:00",
         end_time: str = "17:00:00",
         sampling_frequency: float = 0.25,
-        response_price: float = 3.0
+        response_price: float = 3.0,
+        plan_date: date = None,
+        initial_soc: dict = None,
+        storage: dict = None
 ):
+    """
+    storage: 储能设备参数 {设备: {rated_power_kw, energy_capacity_kwh, initial_soc, soc_min, soc_max}}，
+    缺省时读取 conf.yaml 的 STORAGE_DEVICES；initial_soc（遥测 / 请求给出）优先于配置中的初始 SOC。
+    储能参数缺失时抛出 ValueError。
+    """
     if not response_cost: response_cost = {k: 0 for k, v in response_alloc.items()}
     # （此处略，使用你之前的完整generate_dr_plan函数实现）
-    rated_power = {'ESS_HBN': 1200, 'ESS_HY': 1500, 'ESS_ML': 1300}
-    df = pd.read_csv(csv_path)
-    df['time'] = pd.to_datetime(df['time'])
-    full_data = df.copy()
-    mask = (df['time'].dt.strftime("%H:%M:%S") >= start_time) & (df['time'].dt.strftime("%H:%M:%S") < end_time)
-    response_window = df.loc[mask].copy()
+    import numpy as np
+    from src.graph_solver.baseline_service import get_baseline_service
+
+    # 基线窗口由基线预测服务提供
+    times, baseline_values = get_baseline_service().forecast_horizon(day=plan_date, devices=list(response_alloc.keys()))
+    time_labels = [t.strftime("%H:%M:%S") for t in times]
+    response_window = [i for i, label in enumerate(time_labels) if start_time <= label < end_time]
     intervals = len(response_window)
 
     ori_response_alloc = copy.deepcopy(response_alloc)
@@ -628,65 +713,72 @@ def generate_dr_plan(
 
     json_plan = {"VPP_Response_Plan": []}
 
+    # 储能设备统一做注水法分配：削峰量超过单台储能可上调空间 / SOC 余量时转移给其他储能
+    ess_devices = [d for d in response_alloc if d.startswith("ESS_")]
+    ess_dispatch = None
+    if ess_devices and intervals:
+        from src.graph_solver.storage_dispatch import build_storage_fleet, dispatch_storage, load_storage_config
+        fleet = build_storage_fleet(
+            ess_devices,
+            load_storage_config() if storage is None else storage,
+            initial_soc,
+        )
+        ess_dispatch = dispatch_storage(
+            fleet,
+            np.array([baseline_values[d][response_window] for d in ess_devices]),
+            np.array([response_alloc[d] for d in ess_devices]),
+            dt=sampling_frequency,
+        )
+
     for device, alloc in response_alloc.items():
+        baseline = baseline_values[device]
         baseline_dict = {
-            "time": [t.strftime("%H:%M:%S") for t in df['time']],
-            "value": [float(round(v, 2)) for v in df[device].tolist()]  # ✅ 转为 float
+            "time": time_labels,
+            "value": [float(round(v, 2)) for v in baseline.tolist()]  # ✅ 转为 float
         }
-        new_values_full = df[device].tolist()
+        new_values_full = baseline.tolist()
         if device == "PV":
             pass
         elif device == "EV":
             if alloc > 0:
-                for i in response_window.index:
+                for i in response_window:
                     new_values_full[i] = 0.0
         elif device == "HVAC":
             reduce_each = alloc / intervals
-            for i in response_window.index:
-                new_values_full[i] = max(0, df.loc[i, device] - reduce_each)
-        elif device in ["ESS_HBN", "ESS_HY", "ESS_ML"]:
-            max_power = rated_power[device]
-            baseline_power = df.loc[response_window.index, device].tolist()
-            available = []
-            for v in baseline_power:
-                if v < 0:
-                    available.append(abs(v))
-                else:
-                    available.append(max_power - v if v < max_power else 0)
-            if sum(available) == 0:
-                increments = [0.0] * intervals
-            else:
-                increments = [(a / sum(available)) * alloc for a in available]
-            for idx, (i, inc) in enumerate(zip(response_window.index, increments)):
-                v = df.loc[i, device]
-                if v < 0:
-                    adjust = min(abs(v), inc)
-                    new_values_full[i] = v + adjust
-                    leftover = inc - adjust
-                    if leftover > 0:
-                        new_values_full[i] = min(max_power, new_values_full[i] + leftover)
-                else:
-                    new_values_full[i] = min(max_power, v + inc)
-                new_values_full[i] = round(new_values_full[i], 2)
-        full_data[device] = new_values_full
+            for i in response_window:
+                new_values_full[i] = max(0, baseline[i] - reduce_each)
+        elif device in ess_devices and ess_dispatch is not None:
+            row = ess_devices.index(device)
+            for idx, i in enumerate(response_window):
+                new_values_full[i] = round(float(ess_dispatch.power[row, idx]), 2)
         response_dict = {
-            "time": [t.strftime("%H:%M:%S") for t in df['time']],
+            "time": time_labels,
             "value": [float(round(v, 2)) for v in new_values_full]  # ✅ 转为 float
         }
+        response_info = {
+            "allocated_amount": ori_response_alloc[device],
+            "baseline": baseline_dict,
+            "response_plan": response_dict,
+            "response_price": response_price,
+            "response_profit": round((response_price - response_cost[device]) * ori_response_alloc[device] * 1000, 2)
+        }
+        if device in ess_devices and ess_dispatch is not None:
+            row = ess_devices.index(device)
+            # 实际承担的响应量（MW），可能因其他储能空间不足而转入，或因自身空间不足而转出
+            response_info["dispatched_amount"] = round(float(ess_dispatch.delivered[row]) / 1000 / intervals, 4)
+            response_info["soc"] = {
+                "time": [time_labels[i] for i in response_window],
+                "value": [float(round(v, 4)) for v in ess_dispatch.soc[row].tolist()]
+            }
         json_plan["VPP_Response_Plan"].append({
             "device_id": device,
             "device_name": device_name_map[device],
-            "response_info": {
-                "allocated_amount": ori_response_alloc[device],
-                "baseline": baseline_dict,
-                "response_plan": response_dict,
-                "response_price": response_price,
-                "response_profit": round((response_price - response_cost[device]) * ori_response_alloc[device] * 1000, 2)
-            }
+            "response_info": response_info
         })
     return json_plan
 
 
+@dispatch_slot("plan")
 def plan_node(state: dict) -> dict:
     interpretation = state.get("interpretation", {})
     variables = interpretation.get("variables", [])
@@ -703,7 +795,11 @@ def plan_node(state: dict) -> dict:
         plan = {"error": "No variables found in interpretation"}
     else:
         response_alloc = {item["name"]: float(item["value"]) for item in variables}
-        plan = generate_dr_plan(response_alloc=response_alloc, response_cost=response_cost_dict)
+        plan = generate_dr_plan(
+            response_alloc=response_alloc,
+            response_cost=response_cost_dict,
+            storage=state.get("formulation", {}).get("storage"),
+        )
 
     # 更新状态中的历史计划列表
     plans = state.get("plans", [])
@@ -729,6 +825,8 @@ def get_p_temperature_curve(ratedPower, x, t0=20, t1=32):
     """
     功率与温度的关系曲线
     """
+    import numpy as np
+
     T = t0 + (t1 - t0) * (1 + np.tanh(-(x - ratedPower / 2) / ratedPower * 4)) / 2
     return T
 
@@ -785,13 +883,14 @@ def retry_manager_node(inputs: dict) -> dict:
     return {"retry": False, "retry_count": retry_count}
 
 
+@dispatch_slot("llm")
 def interpretation_validator_node(inputs: dict) -> dict:
     interpretation = inputs.get("interpretation", {})
     solver_error_info = inputs.get("solver_error_info", "")
 
     writer = get_stream_writer()
 
-    result = interpretation_validator_chain.invoke({
+    result = get_chain("interpretation_validator").invoke({
         "solver_error_info": solver_error_info,
         "interpretation": interpretation
     })
@@ -811,33 +910,24 @@ def interpretation_validator_node(inputs: dict) -> dict:
     return result.dict()  # {"valid": bool, "reason": str}
 
 
-def get_baselines():
+def get_baselines(plan_date: date = None):
     """
-    基线预测节点：从本地CSV读取数据，返回指定结构。
-
-    CSV字段示例：
-    time    HVAC    ESS_HBN ESS_ML  ESS_HY  PV  EV
-    2025-08-04 00:00:00    10    5   2   3   100  20
+    基线预测节点：从基线预测服务获取目标日（默认当天）的设备基线，返回指定结构。
     """
-    # 读取CSV
-    df = pd.read_csv(csv_path)
-
-    # 确认包含 time 字段
-    if 'time' not in df.columns:
-        raise ValueError("CSV文件缺少 time 字段")
+    from src.graph_solver.baseline_service import get_baseline_service
 
-    # 设备字段（排除 time）
-    device_columns = [col for col in df.columns if col != 'time']
+    times, baseline_values = get_baseline_service().forecast_horizon(day=plan_date)
+    time_labels = [t.strftime("%Y-%m-%d %H:%M:%S") for t in times]
 
     baselines = []
 
     # 遍历每个设备
-    for device in device_columns:
+    for device, values in baseline_values.items():
         device_data = {
             "device_name": device_name_map[device],
             "baseline": {
-                "times": df['time'].tolist(),
-                "value": df[device].tolist()
+                "times": time_labels,
+                "value": values.tolist()
             }
         }
         baselines.append(device_data)
@@ -845,10 +935,11 @@ def get_baselines():
     return baselines
 
 
+@dispatch_slot("plan")
 def baseline_node(state: dict) -> dict:
-    state["baselines"] = get_baselines()
-    from src.utils.extra_tools import generate_echarts_config
     baselines = get_baselines()
+    state["baselines"] = baselines
+    from src.utils.extra_tools import generate_echarts_config
     x_data = []
     baseline_list = []
     for baseline in baselines:
@@ -0,0 +1,268 @@
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import json_repair
+import numpy as np
+
+# 需求响应分配问题：
+#   max  Σ (w1·credit_i + w2·direct_i − w3·cost_i) · x_i
+#   s.t. Σ x_i = TotalDemand,  0 ≤ x_i ≤ capacity_i
+# 各因子按 coder 提示词中的规则做 min-max 归一化（偏移 ε = 0.01）。
+# 该线性规划只有一条总量约束，加权和最优解即按得分降序依次填满容量，
+# 因此一次权重扫描可以对全部权重组合做矩阵化求解，无需为每个点单独建模、调用 LLM 或求解器。
+
+NORMALIZE_EPSILON = 0.01
+CRITERIA = ("credit", "direct_control", "cost")
+
+
+def normalize(values) -> np.ndarray:
+    """min-max 归一化，与生成的 Pyomo 代码保持一致；各值相同时返回全 1"""
+    values = np.asarray(values, dtype=float)
+    span = values.max() - values.min()
+    if span == 0:
+        return np.ones_like(values)
+    return NORMALIZE_EPSILON + (1 - NORMALIZE_EPSILON) * (values - values.min()) / span
+
+
+@dataclass
+class ParetoProblem:
+    """一个 VPP 设备集群的多目标分配问题，归一化因子只计算一次，供所有扫描点复用"""
+
+    device_names: list
+    capacity: np.ndarray
+    credit: np.ndarray
+    direct_control: np.ndarray
+    cost: np.ndarray
+    demand: float
+
+    def __post_init__(self):
+        self.capacity = np.asarray(self.capacity, dtype=float)
+        self.credit = np.asarray(self.credit, dtype=float)
+        self.direct_control = np.asarray(self.direct_control, dtype=float)
+        self.cost = np.asarray(self.cost, dtype=float)
+        n = len(self.device_names)
+        for name in ("capacity", "credit", "direct_control", "cost"):
+            if getattr(self, name).shape != (n,):
+                raise ValueError(f"'{name}' must have one value per device ({n})")
+        if n == 0:
+            raise ValueError("At least one device is required")
+        if self.demand < 0 or self.demand > self.capacity.sum() + 1e-9:
+            raise ValueError(
+                f"Total demand {self.demand} is outside the fleet capacity [0, {self.capacity.sum()}]"
+            )
+        # 行顺序与 CRITERIA 一致；成本为最小化目标，取负号
+        self.factors = np.vstack(
+            [
+                normalize(self.credit),
+                normalize(self.direct_control),
+                -normalize(self.cost),
+            ]
+        )
+
+    @classmethod
+    def from_formulation(cls, formulation: dict) -> "ParetoProblem":
+        """从 formulator 节点输出的结构化建模结果构造问题"""
+        notes = formulation.get("notes") or {}
+        if isinstance(notes, str):
+            notes = json_repair.loads(notes) or {}
+            if not isinstance(notes, dict):
+                notes = {}
+        device_names = formulation.get("device_names", [])
+        direct_control = notes.get("direct_control")
+        demand = notes.get("TotalDemand")
+        if direct_control is None or demand is None:
+            raise ValueError(
+                "Formulation notes must contain 'direct_control' and 'TotalDemand'"
+            )
+        return cls(
+            device_names=device_names,
+            capacity=formulation.get("response_capacity", []),
+            credit=formulation.get("credit_scores", []),
+            direct_control=direct_control,
+            cost=formulation.get("response_cost", []),
+            demand=float(demand),
+        )
+
+    # ---- 求解 ----
+
+    def solve_weighted(self, weights: np.ndarray) -> np.ndarray:
+        """
+        批量求解加权和问题。
+        weights: (K, 3) 权重矩阵；返回 (K, n) 的分配矩阵，每行对应一组权重。
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        return self._greedy(weights @ self.factors)
+
+    def _greedy(self, scores: np.ndarray) -> np.ndarray:
+        """按得分降序填满容量，直到满足总需求（对每一行得分独立进行）"""
+        order = np.argsort(-scores, axis=1, kind="stable")
+        cap_sorted = self.capacity[order]
+        filled_before = np.cumsum(cap_sorted, axis=1) - cap_sorted
+        alloc_sorted = np.clip(self.demand - filled_before, 0, cap_sorted)
+        alloc = np.empty_like(alloc_sorted)
+        np.put_along_axis(alloc, order, alloc_sorted, axis=1)
+        return alloc
+
+    def solve_cost_bounded(
+        self, score: np.ndarray, budget: float
+    ) -> Optional[np.ndarray]:
+        """
+        ε-约束子问题：max score·x，s.t. Σx = demand、0 ≤ x ≤ capacity、cost·x ≤ budget。
+
+        对成本约束做拉格朗日松弛，score − λ·cost 的排序只在有限个断点处变化；
+        在断点处混合左右两个贪心解使成本约束取等号，即为原问题的精确最优解。
+        预算低于最小可行成本时返回 None。
+        """
+        lambdas = self._breakpoints(score)
+        probes = (
+            np.concatenate(
+                [[0.0], (lambdas[:-1] + lambdas[1:]) / 2, [lambdas[-1] + 1.0]]
+            )
+            if len(lambdas)
+            else np.array([0.0])
+        )
+        candidates = self._greedy(score[None, :] - probes[:, None] * self.cost[None, :])
+        costs = candidates @ self.cost
+        feasible = np.nonzero(costs <= budget + 1e-9)[0]
+        if not len(feasible):
+            return None
+        k = feasible[0]
+        if k == 0:
+            return candidates[0]
+        left, right = candidates[k - 1], candidates[k]
+        t = (costs[k - 1] - budget) / (costs[k - 1] - costs[k])
+        return (1 - t) * left + t * right
+
+    def _breakpoints(self, score: np.ndarray) -> np.ndarray:
+        """两两设备得分与成本交叉处的正 λ 值（升序、去重）"""
+        ds = score[:, None] - score[None, :]
+        dc = self.cost[:, None] - self.cost[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lam = ds / dc
+        lam = lam[(dc != 0) & (lam > 0) & np.isfinite(lam)]
+        return np.unique(lam)
+
+    # ---- 指标 ----
+
+    def evaluate(self, alloc: np.ndarray, response_price: float = 3.0) -> dict:
+        """计算单个分配方案的各项指标；收益口径与 generate_dr_plan 中 response_profit 一致"""
+        device_profit = (response_price - self.cost) * alloc * 1000
+        demand = self.demand or 1.0
+        return {
+            "allocation": {
+                name: round(float(v), 6) for name, v in zip(self.device_names, alloc)
+            },
+            "credit": round(float(self.credit @ alloc / demand), 6),
+            "direct_control": round(float(self.direct_control @ alloc / demand), 6),
+            "cost": round(float(self.cost @ alloc), 6),
+            "profit": round(float(device_profit.sum()), 2),
+            "device_profit": {
+                name: round(float(v), 2)
+                for name, v in zip(self.device_names, device_profit)
+            },
+        }
+
+
+def weight_grid(steps: int) -> np.ndarray:
+    """三项权重在单纯形上的均匀网格（每组权重之和为 1），共 (steps+1)(steps+2)/2 组"""
+    if steps < 1:
+        raise ValueError("steps must be >= 1")
+    rows = [
+        (a, b, steps - a - b) for a in range(steps + 1) for b in range(steps + 1 - a)
+    ]
+    return np.asarray(rows, dtype=float) / steps
+
+
+# non_dominated 每个分块的临时布尔数组大小上限（约 4 MB）
+_DOMINANCE_BLOCK_CELLS = 1 << 22
+
+
+def non_dominated(metrics: np.ndarray) -> np.ndarray:
+    """
+    返回非支配点的布尔掩码。
+    metrics: (K, 3)，列依次为信用、直控（越大越好）和成本（越小越好）。
+    按列分块比较，临时布尔数组不超过 _DOMINANCE_BLOCK_CELLS 个元素，而不是 K × K × 3。
+    """
+    oriented = metrics * np.array([1.0, 1.0, -1.0])
+    block = max(1, _DOMINANCE_BLOCK_CELLS // (3 * max(len(oriented), 1)))
+    dominated = np.zeros(len(oriented), dtype=bool)
+    for start in range(0, len(oriented), block):
+        others = oriented[None, start : start + block, :]
+        ge = (oriented[:, None, :] >= others - 1e-9).all(axis=2)
+        gt = (oriented[:, None, :] > others + 1e-9).any(axis=2)
+        dominated[start : start + block] = (ge & gt).any(axis=0)
+    return ~dominated
+
+
+def pareto_front(
+    problem: ParetoProblem,
+    method: str = "weighted_sum",
+    steps: int = 10,
+    response_price: float = 3.0,
+    credit_weight: float = 1.0,
+    direct_weight: float = 1.0,
+) -> dict:
+    """
+    生成信用 / 直控 / 成本三目标的帕累托前沿。
+
+    method:
+      - weighted_sum：在权重单纯形网格上批量求解加权和问题
+      - epsilon_constraint：以 credit_weight·信用 + direct_weight·直控 为主目标，
+        在 [最小成本, 主目标最优解的成本] 区间内均匀扫描 steps+1 个成本上限
+    返回去重后的非支配分配方案（按成本升序）及其收益。
+    """
+    if method == "weighted_sum":
+        weights = weight_grid(steps)
+        allocations = problem.solve_weighted(weights)
+        labels = [
+            {"weights": dict(zip(CRITERIA, map(float, np.round(w, 6))))}
+            for w in weights
+        ]
+    elif method == "epsilon_constraint":
+        score = credit_weight * problem.factors[0] + direct_weight * problem.factors[1]
+        cheapest, best = problem.solve_weighted(
+            np.array([[0, 0, 1], [credit_weight, direct_weight, 0]])
+        )
+        budgets = np.linspace(cheapest @ problem.cost, best @ problem.cost, steps + 1)
+        solved = [(b, problem.solve_cost_bounded(score, b)) for b in budgets]
+        solved = [(b, x) for b, x in solved if x is not None]
+        allocations = np.array([x for _, x in solved]).reshape(
+            -1, len(problem.device_names)
+        )
+        labels = [{"cost_budget": round(float(b), 6)} for b, _ in solved]
+    else:
+        raise ValueError(f"Unknown Pareto method: {method}")
+
+    metrics = np.column_stack(
+        [
+            allocations @ problem.credit,
+            allocations @ problem.direct_control,
+            allocations @ problem.cost,
+        ]
+    )
+    mask = non_dominated(metrics)
+
+    points, seen = [], set()
+    for idx in np.nonzero(mask)[0]:
+        key = tuple(np.round(allocations[idx], 6))
+        if key in seen:
+            continue
+        seen.add(key)
+        points.append(
+            {**labels[idx], **problem.evaluate(allocations[idx], response_price)}
+        )
+    points.sort(key=lambda p: (p["cost"], -p["credit"]))
+    return {"method": method, "evaluated": len(allocations), "points": points}
+
+
+if __name__ == "__main__":
+    demo = ParetoProblem(
+        device_names=["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+        capacity=[6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+        credit=[3, 4, 4, 5, 2, 5],
+        direct_control=[1, 1, 1, 1, 0, 0],
+        cost=[0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+        demand=20,
+    )
+    print(json.dumps(pareto_front(demo), ensure_ascii=False, indent=2))
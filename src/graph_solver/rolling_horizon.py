@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as day_time
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+from src.graph_solver.baseline_service import INTERVAL_MINUTES
+from src.graph_solver.dispatch_scheduler import (
+    DispatchPriority,
+    dispatch_context,
+    get_dispatch_scheduler,
+)
+from src.graph_solver.pareto import ParetoProblem
+from src.graph_solver.sensitivity import objective_weights
+from src.graph_solver.storage_dispatch import build_storage_fleet, load_storage_config
+from src.utils.registry import component_registry
+
+logger = logging.getLogger(__name__)
+
+# 滚动时域重调度：
+# 复用首次对话中已生成的建模结果（跳过 translator / formulator 等 LLM 环节），
+# 根据最新遥测（可用容量、储能 SOC、响应窗口前的实测功率）只对响应窗口内剩余时段重新求解，
+# 并把与上次发布计划的差异作为增量推送给订阅者。
+
+
+@dataclass
+class TelemetryUpdate:
+    """单个设备的一条遥测数据"""
+
+    device: str
+    time: datetime
+    power_kw: Optional[float] = None  # 实测功率，响应窗口开始前的数据写入基线库
+    available_mw: Optional[float] = None  # 当前可响应容量，设备故障时为 0
+    soc: Optional[float] = None  # 储能 SOC（0~1）
+
+
+def slot_label(moment: datetime) -> str:
+    """向下取整到所在 15 分钟时段的起始时刻，格式 %H:%M:%S"""
+    minute = moment.minute - moment.minute % INTERVAL_MINUTES
+    return f"{moment.hour:02d}:{minute:02d}:00"
+
+
+class RollingDispatchSession:
+    """
+    一个响应事件的滚动调度会话。
+
+    求解热启动：设备得分只取决于信用、直控、成本与权重，容量变化不会改变排序，
+    因此排序只计算一次，之后每次重新求解都是沿缓存顺序的 O(n) 填充。
+    """
+
+    def __init__(
+        self,
+        formulation: dict,
+        allocation: Optional[dict] = None,
+        start_time: str = "16:00:00",
+        end_time: str = "17:00:00",
+        plan_date: Optional[date] = None,
+        response_price: float = 3.0,
+        tenant: Optional[str] = None,
+        priority=DispatchPriority.GRID_EVENT,
+        clock: Callable[[], datetime] = datetime.now,
+        session_id: Optional[str] = None,
+        storage: Optional[dict] = None,
+        initial_soc: Optional[Dict[str, float]] = None,
+    ):
+        self.session_id = session_id or str(uuid4())
+        self.problem = ParetoProblem.from_formulation(formulation)
+        self.device_names = list(self.problem.device_names)
+        self.response_cost = dict(zip(self.device_names, self.problem.cost.tolist()))
+        score = objective_weights(formulation) @ self.problem.factors
+        self._order = np.argsort(-score, kind="stable")
+        self.capacity = self.problem.capacity.copy()
+        self.allocation = dict(allocation) if allocation else self._solve()
+        self._capacity_changed = False
+        self.start_time = start_time
+        self.end_time = end_time
+        self.plan_date = plan_date
+        self.response_price = response_price
+        self.tenant = tenant
+        self.priority = priority
+        self.clock = clock
+        # 储能参数缺省取 conf.yaml；容量或初始 SOC 缺失时在创建会话时就报错，而不是等到后台重调度
+        self.storage = load_storage_config() if storage is None else storage
+        self.soc: Dict[str, float] = dict(initial_soc or {})
+        build_storage_fleet(
+            [name for name in self.device_names if name.startswith("ESS_")],
+            self.storage,
+            self.soc,
+        )
+        self.plan: Dict[str, Dict[str, float]] = {}
+        self.version = 0
+        self.finished = False
+        self.error: Optional[str] = None  # 连续重调度失败后放弃时的错误信息
+        self.trigger = asyncio.Event()
+        self._lock = threading.Lock()
+
+    def _solve(self) -> dict:
+        cap_sorted = self.capacity[self._order]
+        filled_before = np.cumsum(cap_sorted) - cap_sorted
+        alloc_sorted = np.clip(self.problem.demand - filled_before, 0, cap_sorted)
+        alloc = np.empty_like(alloc_sorted)
+        alloc[self._order] = alloc_sorted
+        return {name: round(float(v), 6) for name, v in zip(self.device_names, alloc)}
+
+    def apply_telemetry(self, updates: List[TelemetryUpdate]):
+        """写入遥测：更新可用容量、SOC，窗口开始前的实测功率写入基线库"""
+        baseline_points: Dict[str, list] = {}
+        with self._lock:
+            for update in updates:
+                if update.device not in self.device_names:
+                    logger.warning(
+                        f"Ignoring telemetry for unknown device: {update.device}"
+                    )
+                    continue
+                if update.available_mw is not None:
+                    idx = self.device_names.index(update.device)
+                    available = max(float(update.available_mw), 0.0)
+                    if available != self.capacity[idx]:
+                        self.capacity[idx] = available
+                        self._capacity_changed = True
+                if update.soc is not None:
+                    self.soc[update.device] = float(update.soc)
+                if (
+                    update.power_kw is not None
+                    and update.time < self.window(update.time)[0]
+                ):
+                    baseline_points.setdefault(update.device, []).append(
+                        (update.time, update.power_kw)
+                    )
+        if baseline_points:
+            from src.graph_solver.baseline_service import get_baseline_service
+
+            service = get_baseline_service()
+            for device, points in baseline_points.items():
+                service.ingest(device, [t for t, _ in points], [v for _, v in points])
+
+    def window(self, moment: datetime) -> Tuple[datetime, datetime]:
+        """响应窗口的起止时刻（未指定计划日期时取 moment 当天，时区与 moment 一致）"""
+        day = self.plan_date or moment.date()
+        return tuple(
+            datetime.combine(day, day_time.fromisoformat(label), tzinfo=moment.tzinfo)
+            for label in (self.start_time, self.end_time)
+        )
+
+    def remaining_window(self, now: Optional[datetime] = None) -> Optional[str]:
+        """返回剩余时段的起始时刻，响应窗口已结束时返回 None"""
+        now = now or self.clock()
+        start, end = self.window(now)
+        return slot_label(max(now, start)) if now < end else None
+
+    def redispatch(self, now: Optional[datetime] = None) -> Optional[dict]:
+        """重新求解剩余时段并返回与上次发布计划的差异；响应窗口已结束时返回 None"""
+        from src.graph_solver.opt_nodes import generate_dr_plan
+
+        now = now or self.clock()
+        start = self.remaining_window(now)
+        if start is None:
+            self.finished = True
+            return None
+        with self._lock:
+            previous_alloc = self.allocation
+            # 容量未变化时沿用当前分配（首次即为对话中求得的方案），否则沿缓存顺序重新填充
+            if self._capacity_changed:
+                self.allocation = self._solve()
+                self._capacity_changed = False
+            shortfall = max(self.problem.demand - float(self.capacity.sum()), 0.0)
+            soc = dict(self.soc)
+        plan = generate_dr_plan(
+            self.allocation,
+            self.response_cost,
+            start_time=start,
+            end_time=self.end_time,
+            response_price=self.response_price,
+            plan_date=self.plan_date,
+            initial_soc=soc,
+            storage=self.storage,
+        )
+
+        allocation_changes = {
+            name: {"old": previous_alloc.get(name), "new": value}
+            for name, value in self.allocation.items()
+            if self.version == 0 or abs(previous_alloc.get(name, 0.0) - value) > 1e-9
+        }
+        plan_changes: Dict[str, list] = {}
+        remaining: List[str] = []
+        for item in plan["VPP_Response_Plan"]:
+            device = item["device_id"]
+            curve = item["response_info"]["response_plan"]
+            published = self.plan.setdefault(device, {})
+            for label, value in zip(curve["time"], curve["value"]):
+                if not (start <= label < self.end_time):
+                    continue
+                if label not in remaining:
+                    remaining.append(label)
+                old = published.get(label)
+                if old is None or abs(old - value) > 1e-6:
+                    plan_changes.setdefault(device, []).append(
+                        {"time": label, "old": old, "new": value}
+                    )
+                published[label] = value
+
+        self.version += 1
+        return {
+            "session_id": self.session_id,
+            "version": self.version,
+            "time": now.isoformat(),
+            "remaining": remaining,
+            "allocation": dict(self.allocation),
+            "allocation_changes": allocation_changes,
+            "plan_changes": plan_changes,
+            "shortfall_mw": round(shortfall, 6),
+        }
+
+
+class RollingHorizonDispatcher:
+    """
+    后台滚动调度：每个会话一个协程，每个时段（或收到遥测时立即）重新求解一次，
+    求解在调度器的 plan 资源池中执行，增量推送到所有订阅队列。
+
+    重调度连续失败 max_failures 次后会话标记为失败并结束，最后一条增量为 {"error": ...}。
+
+    已结束（窗口结束、被停止或失败）的会话保留 retention_seconds 供迟到的订阅者读取历史，
+    之后或已结束会话超过 max_finished 个时（最早结束的先淘汰）整体移除。
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = INTERVAL_MINUTES * 60,
+        retention_seconds: float = 3600,
+        max_finished: int = 100,
+        max_failures: int = 3,
+    ):
+        self.interval_seconds = interval_seconds
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self.max_failures = max_failures
+        self.sessions: Dict[str, RollingDispatchSession] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._history: Dict[str, List[dict]] = {}
+        self._finished_at: Dict[str, float] = {}  # 按结束先后排列
+
+    def start(self, session: RollingDispatchSession) -> str:
+        """登记会话并启动后台重调度协程（需在事件循环中调用）"""
+        self._prune()
+        self.sessions[session.session_id] = session
+        self._subscribers.setdefault(session.session_id, [])
+        self._history[session.session_id] = []
+        self._tasks[session.session_id] = asyncio.create_task(self._run(session))
+        return session.session_id
+
+    def get(self, session_id: str) -> RollingDispatchSession:
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise KeyError(f"No rolling dispatch session: {session_id}") from None
+
+    def submit_telemetry(self, session_id: str, updates: List[TelemetryUpdate]):
+        """写入遥测并立即触发一次重调度"""
+        session = self.get(session_id)
+        session.apply_telemetry(updates)
+        session.trigger.set()
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """订阅会话的计划增量；已发布的增量会先放入队列，会话结束时放入 None"""
+        self.get(session_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        for delta in self._history.get(session_id, []):
+            queue.put_nowait(delta)
+        if self.sessions[session_id].finished:
+            queue.put_nowait(None)
+        else:
+            self._subscribers[session_id].append(queue)
+        return queue
+
+    def history(self, session_id: str) -> List[dict]:
+        self.get(session_id)
+        return list(self._history.get(session_id, []))
+
+    async def stop(self, session_id: str):
+        """停止会话的后台协程；会话不存在时抛出 KeyError"""
+        self.get(session_id)
+        task = self._tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        session = self.sessions.get(session_id)
+        if session is not None and session_id not in self._finished_at:
+            self._finish(session_id)
+
+    def _finish(self, session_id: str):
+        """通知订阅者会话结束，登记结束时间并淘汰过期会话"""
+        self.sessions[session_id].finished = True
+        self._tasks.pop(session_id, None)
+        self._publish(session_id, None)
+        self._finished_at[session_id] = time.monotonic()
+        self._prune()
+
+    def _prune(self):
+        deadline = time.monotonic() - self.retention_seconds
+        expired = [
+            sid
+            for sid, finished_at in self._finished_at.items()
+            if finished_at <= deadline
+        ]
+        overflow = len(self._finished_at) - len(expired) - self.max_finished
+        if overflow > 0:
+            expired += [sid for sid in self._finished_at if sid not in expired][
+                :overflow
+            ]
+        for session_id in expired:
+            del self._finished_at[session_id]
+            self.sessions.pop(session_id, None)
+            self._history.pop(session_id, None)
+            self._subscribers.pop(session_id, None)
+
+    def _publish(self, session_id: str, delta: Optional[dict]):
+        if delta is not None:
+            self._history[session_id].append(delta)
+        for queue in self._subscribers.get(session_id, []):
+            queue.put_nowait(delta)
+        if delta is None:
+            self._subscribers[session_id] = []
+
+    async def _run(self, session: RollingDispatchSession):
+        scheduler = get_dispatch_scheduler()
+        failures = 0
+        while True:
+            session.trigger.clear()
+            try:
+                with dispatch_context(session.tenant, session.priority):
+                    async with scheduler.slot_async("plan"):
+                        delta = await asyncio.to_thread(session.redispatch)
+            except Exception as e:
+                failures += 1
+                logger.exception(
+                    f"Rolling re-dispatch failed for session {session.session_id} "
+                    f"({failures}/{self.max_failures}): {e}"
+                )
+                if failures >= self.max_failures:
+                    session.error = str(e)
+                    self._publish(
+                        session.session_id,
+                        {"session_id": session.session_id, "error": session.error},
+                    )
+                    self._finish(session.session_id)
+                    return
+            else:
+                failures = 0
+                if delta is None:
+                    self._finish(session.session_id)
+                    return
+                self._publish(session.session_id, delta)
+            try:
+                await asyncio.wait_for(
+                    session.trigger.wait(), timeout=self.interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+def build_rolling_dispatcher() -> RollingHorizonDispatcher:
+    return RollingHorizonDispatcher(
+        interval_seconds=float(
+            os.getenv("ROLLING_DISPATCH_INTERVAL_SECONDS", str(INTERVAL_MINUTES * 60))
+        ),
+        retention_seconds=float(
+            os.getenv("ROLLING_DISPATCH_RETENTION_SECONDS", "3600")
+        ),
+        max_finished=int(os.getenv("ROLLING_DISPATCH_MAX_FINISHED", "100")),
+        max_failures=int(os.getenv("ROLLING_DISPATCH_MAX_FAILURES", "3")),
+    )
+
+
+component_registry.register("graph_solver.rolling_dispatcher", build_rolling_dispatcher)
+
+
+def get_rolling_dispatcher() -> RollingHorizonDispatcher:
+    """返回进程内共享的滚动调度器（首次调用时创建）"""
+    return component_registry.get("graph_solver.rolling_dispatcher")
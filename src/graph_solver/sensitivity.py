@@ -0,0 +1,252 @@
+import json
+from typing import Optional
+
+import json_repair
+import numpy as np
+
+from src.graph_solver.pareto import ParetoProblem
+
+# 需求响应分配 LP 只有一条总量等式约束和容量上下界：
+# 最优基中至多一个设备处于容量区间内部（边际设备），总量约束的对偶价格就是边际设备的目标系数，
+# 其余设备的 reduced cost = 目标系数 − 对偶价格。
+# 据此可以直接给出需求、容量小幅变化时的收益变化，无需重新调用 LLM 或求解器。
+
+TOLERANCE = 1e-6
+
+
+def extract_solver_duals(context: dict) -> dict:
+    """
+    从执行求解代码后的上下文中读取 Pyomo IMPORT 后缀（model.dual / model.rc）。
+    生成的代码未声明后缀或求解器未返回对偶信息时返回空字典。
+    """
+    model = context.get("model")
+    duals, reduced_costs = {}, {}
+    for suffix_name, target in (("dual", duals), ("rc", reduced_costs)):
+        suffix = getattr(model, suffix_name, None) if model is not None else None
+        if suffix is None or not hasattr(suffix, "items"):
+            continue
+        try:
+            for component, value in suffix.items():
+                if value is not None:
+                    target[str(component.name)] = float(value)
+        except Exception:
+            continue
+    result = {}
+    if duals:
+        result["duals"] = duals
+    if reduced_costs:
+        result["reduced_costs"] = reduced_costs
+    return result
+
+
+def objective_weights(formulation: dict) -> np.ndarray:
+    """建模结果 notes 中的 [信用, 直控, 成本] 权重，缺失时默认全为 1.0"""
+    notes = formulation.get("notes") or {}
+    if isinstance(notes, str):
+        notes = json_repair.loads(notes) or {}
+    weights = notes.get("weights") if isinstance(notes, dict) else None
+    if not weights or len(weights) != 3:
+        return np.ones(3)
+    return np.asarray(weights, dtype=float)
+
+
+def build_sensitivity(
+    formulation: dict,
+    allocation: dict,
+    solver_duals: Optional[dict] = None,
+    response_price: float = 3.0,
+) -> dict:
+    """
+    根据建模结果与求解得到的分配方案计算灵敏度信息。
+
+    返回总量约束的对偶价格（需求增 / 减 1MW 时的目标与收益变化及有效范围）、
+    各设备的 reduced cost、容量是否紧约束及其影子收益。
+    """
+    problem = ParetoProblem.from_formulation(formulation)
+    names = problem.device_names
+    score = objective_weights(formulation) @ problem.factors
+    x = np.array([float(allocation.get(name, 0.0)) for name in names])
+    cap = problem.capacity
+
+    at_upper = x >= cap - TOLERANCE
+    at_lower = x <= TOLERANCE
+    basic = ~at_upper & ~at_lower
+
+    def pick(mask, best):
+        idx = np.nonzero(mask)[0]
+        if not len(idx):
+            return None
+        return int(idx[np.argmax(score[idx])] if best else idx[np.argmin(score[idx])])
+
+    # 需求增加时由边际设备（或得分最高的空闲设备）承担，减少时由边际设备（或得分最低的满载设备）让出
+    up = pick(basic, True) if basic.any() else pick(at_lower & (cap > TOLERANCE), True)
+    down = (
+        pick(basic, True) if basic.any() else pick(at_upper & (cap > TOLERANCE), False)
+    )
+    dual = (
+        float(score[up if up is not None else down])
+        if (up is not None or down is not None)
+        else 0.0
+    )
+
+    def margin(device: Optional[int], increase: bool) -> Optional[dict]:
+        if device is None:
+            return None
+        return {
+            "device": names[device],
+            "objective_per_mw": round(float(score[device]), 6),
+            "profit_per_mw": round(
+                (response_price - float(problem.cost[device])) * 1000, 2
+            ),
+            "range_mw": round(
+                float(cap[device] - x[device] if increase else x[device]), 6
+            ),
+        }
+
+    devices = {}
+    for i, name in enumerate(names):
+        status = (
+            "at_capacity" if at_upper[i] else ("idle" if at_lower[i] else "marginal")
+        )
+        reduced_cost = float(score[i]) - dual
+        binding = bool(
+            at_upper[i] and reduced_cost > TOLERANCE and down is not None and down != i
+        )
+        entry = {
+            "allocation": round(float(x[i]), 6),
+            "capacity": round(float(cap[i]), 6),
+            "status": status,
+            "reduced_cost": round(reduced_cost, 6),
+            "capacity_binding": binding,
+        }
+        if binding:
+            # 多 1MW 容量会替换掉 down 设备的 1MW
+            entry["capacity_objective_per_mw"] = round(reduced_cost, 6)
+            entry["capacity_profit_per_mw"] = round(
+                float(problem.cost[down] - problem.cost[i]) * 1000, 2
+            )
+            entry["capacity_range_mw"] = round(float(x[down]), 6)
+        devices[name] = entry
+
+    return {
+        "source": "solver+analytic" if solver_duals else "analytic",
+        "weights": objective_weights(formulation).tolist(),
+        "demand": problem.demand,
+        "response_price": response_price,
+        "response_cost": dict(zip(names, problem.cost.tolist())),
+        "demand_constraint": {
+            "dual": round(dual, 6),
+            "increase": margin(up, True),
+            "decrease": margin(down, False),
+        },
+        "devices": devices,
+        "solver_duals": solver_duals or {},
+    }
+
+
+def answer_what_if(
+    sensitivity: dict, parameter: str, delta: float, device: Optional[str] = None
+) -> dict:
+    """
+    基于灵敏度信息回答单个参数的小幅变化。
+
+    parameter:
+      - demand：总需求变化 delta MW
+      - capacity：device 的可响应容量变化 delta MW
+    变化超出当前最优基的有效范围时 answerable=False，需要重新求解。
+    """
+    devices = sensitivity["devices"]
+    price = sensitivity.get("response_price", 3.0)
+    costs = sensitivity.get("response_cost", {})
+    allocation = {name: info["allocation"] for name, info in devices.items()}
+    shifts = {}
+
+    def out_of_range(reason: str) -> dict:
+        return {
+            "answerable": False,
+            "profit_delta": None,
+            "allocation": None,
+            "explanation": reason,
+        }
+
+    if parameter == "demand":
+        side = sensitivity["demand_constraint"][
+            "increase" if delta >= 0 else "decrease"
+        ]
+        if delta == 0:
+            side = side or {}
+        elif side is None or abs(delta) > side["range_mw"] + TOLERANCE:
+            return out_of_range(
+                f"需求变化 {delta}MW 超出当前最优方案的有效范围，需要重新求解"
+            )
+        if delta:
+            shifts[side["device"]] = delta
+    elif parameter == "capacity":
+        if device not in devices:
+            raise ValueError(f"Unknown device: {device}")
+        info = devices[device]
+        new_capacity = info["capacity"] + delta
+        if new_capacity < -TOLERANCE:
+            return out_of_range(f"{device} 容量不能小于 0")
+        if delta > 0 and info["capacity_binding"]:
+            if delta > info["capacity_range_mw"] + TOLERANCE:
+                return out_of_range(
+                    f"{device} 扩容 {delta}MW 超出有效范围，需要重新求解"
+                )
+            shifts[device] = delta
+            shifts[sensitivity["demand_constraint"]["decrease"]["device"]] = -delta
+        elif delta < 0 and new_capacity < info["allocation"] - TOLERANCE:
+            # 容量收紧到当前分配以下，缺口由需求增加方向的边际设备补足
+            shortfall = info["allocation"] - new_capacity
+            side = sensitivity["demand_constraint"]["increase"]
+            if (
+                side is None
+                or side["device"] == device
+                or shortfall > side["range_mw"] + TOLERANCE
+            ):
+                return out_of_range(
+                    f"{device} 减容 {-delta}MW 超出有效范围，需要重新求解"
+                )
+            shifts[device] = -shortfall
+            shifts[side["device"]] = shortfall
+    else:
+        raise ValueError(f"Unknown what-if parameter: {parameter}")
+
+    profit_delta = 0.0
+    for name, shift in shifts.items():
+        allocation[name] = round(allocation[name] + shift, 6)
+        profit_delta += (price - costs.get(name, 0.0)) * shift * 1000
+    if shifts:
+        moves = "，".join(f"{name} {shift:+g}MW" for name, shift in shifts.items())
+        explanation = f"最优方案结构不变，调整：{moves}；收益变化 {profit_delta:+.2f}"
+    else:
+        explanation = "该变化不影响当前最优分配，收益不变"
+    return {
+        "answerable": True,
+        "profit_delta": round(profit_delta, 2),
+        "allocation": allocation,
+        "explanation": explanation,
+    }
+
+
+if __name__ == "__main__":
+    demo_formulation = {
+        "device_names": ["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+        "response_capacity": [6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+        "credit_scores": [3, 4, 4, 5, 2, 5],
+        "response_cost": [0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+        "notes": json.dumps(
+            {
+                "direct_control": [1, 1, 1, 1, 0, 0],
+                "TotalDemand": 20,
+                "weights": [1, 1, 1],
+            }
+        ),
+    }
+    demo_problem = ParetoProblem.from_formulation(demo_formulation)
+    demo_alloc = dict(
+        zip(demo_problem.device_names, demo_problem.solve_weighted(np.ones((1, 3)))[0])
+    )
+    report = build_sensitivity(demo_formulation, demo_alloc)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(answer_what_if(report, "demand", 1.0))
@@ -0,0 +1,268 @@
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from src.config.loader import load_yaml_config
+
+# 储能集群响应功率分配（注水法）：
+# 所有数组均为 (储能单元 × 时段) 矩阵，每轮迭代按剩余可上调空间比例分配未完成的响应量，
+# 超出额定功率或 SOC 下限的部分在下一轮重新分配给仍有空间的时段 / 单元，
+# 每轮计算量为 O(单元数 × 时段数)（SOC 校核按时段顺序推进，对所有单元向量化）。功率正值表示放电，负值表示充电。
+# 基线功率先截断到 [-额定功率, 额定功率]，再逐时段截断到 SOC 不越出 [soc_min, soc_max] 的范围。
+
+_CONF_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "conf.yaml",
+)
+
+
+@dataclass
+class StorageFleet:
+    """储能集群参数，功率单位 kW，容量单位 kWh，SOC 取值 0~1"""
+
+    names: list
+    rated_power: np.ndarray
+    energy_capacity: np.ndarray
+    initial_soc: np.ndarray
+    soc_min: np.ndarray
+    soc_max: np.ndarray = 1.0
+    charge_efficiency: float = 0.95
+    discharge_efficiency: float = 0.95
+
+    def __post_init__(self):
+        n = len(self.names)
+        for name in (
+            "rated_power",
+            "energy_capacity",
+            "initial_soc",
+            "soc_min",
+            "soc_max",
+        ):
+            value = np.broadcast_to(
+                np.asarray(getattr(self, name), dtype=float), (n,)
+            ).copy()
+            setattr(self, name, value)
+        if (self.energy_capacity <= 0).any():
+            raise ValueError("储能容量必须为正数")
+        if ((self.initial_soc < 0) | (self.initial_soc > 1)).any():
+            raise ValueError("储能初始 SOC 必须在 0~1 之间")
+        if (
+            (self.soc_min < 0) | (self.soc_min >= self.soc_max) | (self.soc_max > 1)
+        ).any():
+            raise ValueError("储能 SOC 上下限必须满足 0 <= soc_min < soc_max <= 1")
+
+    def soc_trajectory(self, power: np.ndarray, dt: float) -> np.ndarray:
+        """按给定功率曲线计算每个时段末的 SOC（计入充放电效率）"""
+        energy_out = np.where(
+            power > 0,
+            power * dt / self.discharge_efficiency,
+            power * dt * self.charge_efficiency,
+        )
+        return (
+            self.initial_soc[:, None]
+            - np.cumsum(energy_out, axis=1) / self.energy_capacity[:, None]
+        )
+
+
+def load_storage_config(path: str = _CONF_PATH) -> dict:
+    """读取 conf.yaml 中 STORAGE_DEVICES 段的储能参数 {设备: {rated_power_kw, energy_capacity_kwh, ...}}"""
+    return load_yaml_config(path).get("STORAGE_DEVICES") or {}
+
+
+def build_storage_fleet(
+    names: list, config: dict, initial_soc: Optional[dict] = None
+) -> StorageFleet:
+    """
+    按设备配置组装储能集群。
+
+    容量与初始 SOC 缺失时直接报错，而不是套用默认值；initial_soc（遥测或请求给出）优先于配置。
+    """
+    initial_soc = initial_soc or {}
+    params = {}
+    for name in names:
+        device = config.get(name) or {}
+        missing = [
+            key
+            for key in ("rated_power_kw", "energy_capacity_kwh")
+            if device.get(key) is None
+        ]
+        if name not in initial_soc and device.get("initial_soc") is None:
+            missing.append("initial_soc")
+        if missing:
+            raise ValueError(f"储能设备 {name} 缺少参数: {', '.join(missing)}")
+        params[name] = device
+    return StorageFleet(
+        names=list(names),
+        rated_power=[params[n]["rated_power_kw"] for n in names],
+        energy_capacity=[params[n]["energy_capacity_kwh"] for n in names],
+        initial_soc=[initial_soc.get(n, params[n].get("initial_soc")) for n in names],
+        soc_min=[params[n].get("soc_min", 0.1) for n in names],
+        soc_max=[params[n].get("soc_max", 0.9) for n in names],
+    )
+
+
+def _clip_to_soc_bounds(
+    power: np.ndarray, fleet: StorageFleet, dt: float
+) -> np.ndarray:
+    """逐时段截断功率，使 SOC 不越出 [soc_min, soc_max]；已越界时只允许向区间内移动"""
+    power = power.copy()
+    soc = fleet.initial_soc.copy()
+    for t in range(power.shape[1]):
+        max_discharge = (
+            np.maximum(soc - fleet.soc_min, 0)
+            * fleet.energy_capacity
+            / dt
+            * fleet.discharge_efficiency
+        )
+        max_charge = (
+            np.maximum(fleet.soc_max - soc, 0)
+            * fleet.energy_capacity
+            / dt
+            / fleet.charge_efficiency
+        )
+        power[:, t] = np.clip(power[:, t], -max_charge, max_discharge)
+        p = power[:, t]
+        soc = (
+            soc
+            - np.where(
+                p > 0,
+                p * dt / fleet.discharge_efficiency,
+                p * dt * fleet.charge_efficiency,
+            )
+            / fleet.energy_capacity
+        )
+    return power
+
+
+@dataclass
+class StorageDispatchResult:
+    power: np.ndarray  # 调整后功率 (U, T)
+    increments: np.ndarray  # 相对基线（已按额定功率截断）的上调量 (U, T)
+    delivered: np.ndarray  # 各单元实际承担的响应量，单位 kW·时段 (U,)
+    soc: np.ndarray  # 调整后各时段末 SOC (U, T)
+    unmet: float  # 集群整体未能完成的响应量
+    iterations: int
+    spilled: dict = field(default_factory=dict)  # 转移给其他单元的响应量 {单元: 量}
+
+
+def _soc_impact(
+    inc: np.ndarray, charge_part: np.ndarray, fleet: StorageFleet
+) -> np.ndarray:
+    """上调量对 SOC 的消耗：先抵消充电（按充电效率），再增加放电（按放电效率）"""
+    reduced_charge = np.minimum(inc, charge_part)
+    return (
+        fleet.charge_efficiency * reduced_charge
+        + np.maximum(inc - charge_part, 0) / fleet.discharge_efficiency
+    )
+
+
+def _inverse_soc_impact(
+    impact: np.ndarray, charge_part: np.ndarray, fleet: StorageFleet
+) -> np.ndarray:
+    charge_impact = fleet.charge_efficiency * charge_part
+    return np.where(
+        impact <= charge_impact,
+        impact / fleet.charge_efficiency,
+        charge_part + (impact - charge_impact) * fleet.discharge_efficiency,
+    )
+
+
+def dispatch_storage(
+    fleet: StorageFleet,
+    baseline: np.ndarray,
+    targets: np.ndarray,
+    dt: float = 0.25,
+    spill: bool = True,
+    max_iterations: int = 50,
+    tolerance: float = 1e-6,
+) -> StorageDispatchResult:
+    """
+    把各储能单元的响应量（单位 kW·时段，即各时段上调功率之和）分配到响应时段。
+
+    - 基线功率先按额定功率截断到 [-rated_power, rated_power]，再按 SOC 上下限截断，
+      单元在时段 t 的上调空间为 rated_power − baseline
+    - SOC 在任何时段末都不得低于 soc_min；上调只会消耗电量，因此累计消耗需不超过
+      此后各时段 SOC 余量的最小值
+    - spill=True 时，单元自身空间不足的部分按剩余空间比例转移给其他单元，使集群总量尽量精确完成
+    """
+    baseline = np.atleast_2d(np.asarray(baseline, dtype=float))
+    targets = np.asarray(targets, dtype=float).copy()
+    requested = float(targets.sum())
+    rated = fleet.rated_power[:, None]
+
+    base = _clip_to_soc_bounds(np.clip(baseline, -rated, rated), fleet, dt)
+    headroom = np.maximum(rated - base, 0)
+    charge_part = np.maximum(-base, 0)
+
+    # SOC 余量换算为可承受的累计 SOC 消耗（kW·时段），取后缀最小值保证此后所有时段都不越限
+    soc_base = fleet.soc_trajectory(base, dt)
+    cap = np.maximum(
+        (soc_base - fleet.soc_min[:, None]) * fleet.energy_capacity[:, None] / dt, 0
+    )
+    cap = np.flip(np.minimum.accumulate(np.flip(cap, axis=1), axis=1), axis=1)
+
+    inc = np.zeros_like(base)
+    blocked = np.zeros(base.shape, dtype=bool)
+    spilled = {}
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        remaining = np.maximum(targets - inc.sum(axis=1), 0)
+        room = np.where(blocked, 0, headroom - inc)
+        room_total = room.sum(axis=1)
+
+        if spill:
+            # 自身已无空间的单元把剩余量转移给仍有空间的单元
+            stuck = (remaining > tolerance) & (room_total <= tolerance)
+            pool = remaining[stuck].sum()
+            if pool > tolerance and room_total.sum() > tolerance:
+                for i in np.nonzero(stuck)[0]:
+                    spilled[fleet.names[i]] = spilled.get(fleet.names[i], 0.0) + float(
+                        remaining[i]
+                    )
+                targets[stuck] -= remaining[stuck]
+                free = np.maximum(room_total - remaining, 0)
+                if free.sum() > tolerance:
+                    targets += pool * free / free.sum()
+                remaining = np.maximum(targets - inc.sum(axis=1), 0)
+
+        active = (remaining > tolerance) & (room_total > tolerance)
+        if not active.any():
+            break
+
+        share = np.divide(
+            remaining, room_total, out=np.zeros_like(remaining), where=room_total > 0
+        )
+        inc = (
+            inc
+            + np.minimum(np.minimum(share, 1.0)[:, None] * room, room) * active[:, None]
+        )
+
+        # SOC 约束：逐时段截断超出 SOC 余量的上调量，截掉的部分留到下一轮重新分配；
+        # 余量耗尽的时段及其之前的时段不再分配
+        impact = _soc_impact(inc, charge_part, fleet)
+        cumulative = np.zeros(len(targets))
+        saturated = np.zeros(base.shape, dtype=bool)
+        for t in range(base.shape[1]):
+            allowed = np.minimum(impact[:, t], np.maximum(cap[:, t] - cumulative, 0))
+            inc[:, t] = np.minimum(
+                inc[:, t], _inverse_soc_impact(allowed, charge_part[:, t], fleet)
+            )
+            cumulative += _soc_impact(inc[:, t], charge_part[:, t], fleet)
+            saturated[:, t] = cumulative >= cap[:, t] - tolerance
+        blocked |= np.flip(
+            np.logical_or.accumulate(np.flip(saturated, axis=1), axis=1), axis=1
+        )
+
+    delivered = inc.sum(axis=1)
+    power = base + inc
+    return StorageDispatchResult(
+        power=power,
+        increments=inc,
+        delivered=delivered,
+        soc=fleet.soc_trajectory(power, dt),
+        unmet=max(requested - float(delivered.sum()), 0.0),
+        iterations=iterations,
+        spilled=spilled,
+    )
@@ -7,6 +7,7 @@ from src.podcast.graph.audio_mixer_node import audio_mixer_node
 from src.podcast.graph.script_writer_node import script_writer_node
 from src.podcast.graph.state import PodcastState
 from src.podcast.graph.tts_node import tts_node
+from src.utils.registry import component_registry
 
 
 def build_graph():
@@ -23,13 +24,23 @@ def build_graph():
     return builder.compile()
 
 
-workflow = build_graph()
+component_registry.register("podcast.workflow", build_graph)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "workflow":
+        return component_registry.get("podcast.workflow")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
 
     load_dotenv()
 
+    workflow = build_graph()
+
     report_content = open("examples/nanjing_tangbao.md").read()
     final_state = workflow.invoke({"input": report_content})
     for line in final_state["script"].lines:
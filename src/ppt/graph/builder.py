@@ -6,6 +6,7 @@ from langgraph.graph import END, START, StateGraph
 from src.ppt.graph.ppt_composer_node import ppt_composer_node
 from src.ppt.graph.ppt_generator_node import ppt_generator_node
 from src.ppt.graph.state import PPTState
+from src.utils.registry import component_registry
 
 
 def build_graph():
@@ -20,12 +21,22 @@ def build_graph():
     return builder.compile()
 
 
-workflow = build_graph()
+component_registry.register("ppt.workflow", build_graph)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "workflow":
+        return component_registry.get("ppt.workflow")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
 
     load_dotenv()
 
+    workflow = build_graph()
+
     report_content = open("examples/nanjing_tangbao.md").read()
     final_state = workflow.invoke({"input": report_content})
@@ -0,0 +1,54 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Response cache for the prompt enhancer.
+
+Users often re-enhance the same prompt, or variants that only differ in
+whitespace and casing. Model responses are cached under the normalised
+(prompt, context, report_style, model) with LRU and TTL eviction, and
+concurrent identical requests share a single in-flight LLM call.
+"""
+
+import os
+from typing import Any, Optional, Tuple
+
+from src.utils.cache import ResponseCache
+from src.utils.registry import component_registry
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace and casefold, so trivially different prompts share an entry."""
+    return " ".join((text or "").split()).casefold()
+
+
+def enhancer_cache_key(
+    prompt: str, context: Optional[str], report_style: Any, model: Any
+) -> Optional[Tuple]:
+    """Cache key of an enhancement request, or None when the model has no stable name."""
+    model_name = getattr(model, "model_name", None) or getattr(model, "model", None)
+    if not isinstance(model_name, str):
+        return None
+    style = getattr(report_style, "value", report_style)
+    return (
+        normalize_text(prompt),
+        normalize_text(context),
+        str(style).lower() if style else "",
+        type(model).__name__,
+        model_name,
+    )
+
+
+def build_enhancer_cache() -> ResponseCache:
+    return ResponseCache(
+        max_size=int(os.getenv("PROMPT_ENHANCER_CACHE_SIZE", "512")),
+        ttl_seconds=float(os.getenv("PROMPT_ENHANCER_CACHE_TTL_SECONDS", "3600")),
+    )
+
+
+component_registry.register("prompt_enhancer.response_cache", build_enhancer_cache)
+
+
+def get_enhancer_cache() -> ResponseCache:
+    """Return the process-wide enhancer response cache (created on first use)."""
+    return component_registry.get("prompt_enhancer.response_cache")
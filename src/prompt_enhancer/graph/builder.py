@@ -3,13 +3,21 @@
 
 from langgraph.graph import StateGraph, START, END
 
-from src.prompt_enhancer.graph.enhancer_node import prompt_enhancer_node, human_feedback_node
+from src.prompt_enhancer.graph.enhancer_node import (
+    prompt_enhancer_node,
+    human_feedback_node,
+)
 from src.prompt_enhancer.graph.state import PromptEnhancerState
 from langgraph.checkpoint.memory import MemorySaver
+from src.utils.registry import component_registry
 
 
-def build_graph():
-    """Build and return the prompt enhancer workflow graph."""
+def build_graph(with_memory: bool = True):
+    """Build and return the prompt enhancer workflow graph.
+
+    Args:
+        with_memory: Compile with a MemorySaver; invocations then need a thread_id
+    """
     # Build state graph
     builder = StateGraph(PromptEnhancerState)
 
@@ -24,6 +32,21 @@ def build_graph():
     # builder.set_finish_point("enhancer")
     builder.add_edge(START, "enhancer")
     builder.add_edge("enhancer", END)
+    if not with_memory:
+        return builder.compile()
     memory = MemorySaver()
     # Compile and return the graph
     return builder.compile(checkpointer=memory)
+
+
+# The shared instance serves single-shot requests, a checkpointer would only accumulate state
+component_registry.register(
+    "prompt_enhancer.workflow", lambda: build_graph(with_memory=False)
+)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "workflow":
+        return component_registry.get("prompt_enhancer.workflow")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,9 +9,11 @@ from langchain_core.messages import AIMessageChunk
 from src.config.agents import AGENT_LLM_MAP
 from src.llms.llm import get_llm_by_type
 from src.prompts.template import apply_prompt_template
+from src.prompt_enhancer.cache import enhancer_cache_key, get_enhancer_cache
 from src.prompt_enhancer.graph.state import PromptEnhancerState
 from langgraph.types import Command, interrupt
 from typing import Annotated, Literal
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,15 +41,20 @@ def human_feedback_node(
 
     return Command(
         update={
-            "messages": [AIMessage(content=state.get("output", "用原始的prompt"), name="enhancer")],
-            "output": "用原始的prompt"
+            "messages": [
+                AIMessage(
+                    content=state.get("output", "用原始的prompt"), name="enhancer"
+                )
+            ],
+            "output": "用原始的prompt",
         },
         goto="enhancer",
     )
 
+
 def prompt_enhancer_node(state: PromptEnhancerState):
-# def prompt_enhancer_node(state: PromptEnhancerState
-# ) -> Command[Literal["human_feedback"]]:
+    # def prompt_enhancer_node(state: PromptEnhancerState
+    # ) -> Command[Literal["human_feedback"]]:
     """Node that enhances user prompts using AI analysis."""
     logger.info("Enhancing user prompt...")
 
@@ -64,19 +71,26 @@ def prompt_enhancer_node(state: PromptEnhancerState):
             content=f"Please enhance this prompt:{context_info}\n\nOriginal prompt: {state['prompt']}"
         )
 
-        messages = apply_prompt_template(
-            "prompt_enhancer/prompt_enhancer",
-            {
-                "messages": [original_prompt_message],
-                "report_style": state.get("report_style"),
-            },
-        )
+        def enhance() -> str:
+            messages = apply_prompt_template(
+                "prompt_enhancer/prompt_enhancer",
+                {
+                    "messages": [original_prompt_message],
+                    "report_style": state.get("report_style"),
+                },
+            )
 
-        # Get the response from the model
-        response = model.invoke(messages)
+            # Get the response from the model
+            response = model.invoke(messages)
 
-        # Extract content from response
-        response_content = response.content.strip()
+            # Extract content from response
+            return response.content.strip()
+
+        # Identical (normalised) requests share one model call and its cached response
+        cache_key = enhancer_cache_key(
+            state["prompt"], state.get("context"), state.get("report_style"), model
+        )
+        response_content = get_enhancer_cache().get_or_compute(cache_key, enhance)
         logger.debug(f"Response content: {response_content}")
 
         # Try to extract content from XML tags first
@@ -114,7 +128,7 @@ def prompt_enhancer_node(state: PromptEnhancerState):
         return Command(
             update={
                 "messages": [AIMessage(content=enhanced_prompt, name="enhancer")],
-                "output": enhanced_prompt
+                "output": enhanced_prompt,
             },
             goto="human_feedback",
         )
@@ -123,8 +137,12 @@ def prompt_enhancer_node(state: PromptEnhancerState):
         # return {"output": state["prompt"]}
         return Command(
             update={
-                "messages": [AIMessage(content=state.get("prompt", "用原始的prompt"), name="enhancer")],
-                "output": "用原始的prompt"
+                "messages": [
+                    AIMessage(
+                        content=state.get("prompt", "用原始的prompt"), name="enhancer"
+                    )
+                ],
+                "output": "用原始的prompt",
             },
             goto="human_feedback",
         )
@@ -1,12 +1,29 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+"""
+Prompt templates.
+
+Templates are compiled once and the variables each one references are recorded,
+so rendering only looks up those variables instead of splatting the whole
+agent state. Per-call data (``CURRENT_TIME``) is kept out of the system prompt
+and sent in a trailing runtime-context message: the system prompt then only
+depends on configuration such as ``locale`` or ``report_style``, is memoised,
+and stays byte-identical across calls so provider-side prompt prefix caching
+can reuse it.
+"""
+
 import os
 import dataclasses
+import threading
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, NamedTuple
+from jinja2 import Environment, FileSystemLoader, meta, select_autoescape
+from langchain_core.messages import BaseMessage
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from src.config.configuration import Configuration
+from src.utils.artifacts import summarize_artifacts
 
 # Initialize Jinja2 environment
 env = Environment(
@@ -16,6 +33,52 @@ env = Environment(
     lstrip_blocks=True,
 )
 
+# Variables whose value changes on every call; they never enter the system prompt
+DYNAMIC_VARIABLES = ("CURRENT_TIME",)
+RUNTIME_CONTEXT_PLACEHOLDER = "(see the runtime context at the end of the conversation)"
+
+
+class CompiledPrompt(NamedTuple):
+    template: Any
+    variables: FrozenSet[str]
+
+
+_compiled: Dict[str, CompiledPrompt] = {}
+_compile_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"renders": 0, "static_chars": 0, "dynamic_chars": 0, "uncacheable": 0}
+
+
+def _compile(prompt_name: str) -> CompiledPrompt:
+    compiled = _compiled.get(prompt_name)
+    if compiled is not None:
+        return compiled
+    with _compile_lock:
+        if prompt_name not in _compiled:
+            filename = f"{prompt_name}.md"
+            source, _, _ = env.loader.get_source(env, filename)
+            variables = frozenset(meta.find_undeclared_variables(env.parse(source)))
+            _compiled[prompt_name] = CompiledPrompt(
+                env.get_template(filename), variables
+            )
+        return _compiled[prompt_name]
+
+
+def precompile_templates() -> int:
+    """Compile every prompt template up front; returns the number of templates."""
+    for filename in env.list_templates(extensions=["md"]):
+        _compile(filename[: -len(".md")])
+    return len(_compiled)
+
+
+def stable_prefix_enabled() -> bool:
+    return os.getenv("PROMPT_STABLE_PREFIX", "true").lower() not in ("false", "0", "no")
+
+
+@lru_cache(maxsize=256)
+def _render_static(prompt_name: str, variables: tuple) -> str:
+    return _compile(prompt_name).template.render(**dict(variables))
+
 
 def get_prompt_template(prompt_name: str) -> str:
     """
@@ -28,8 +91,7 @@ def get_prompt_template(prompt_name: str) -> str:
         The template string with proper variable substitution syntax
     """
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        return template.render()
+        return _render_static(prompt_name, ())
     except Exception as e:
         raise ValueError(f"Error loading template {prompt_name}: {e}")
 
@@ -40,6 +102,10 @@ def apply_prompt_template(
     """
     Apply template variables to a prompt template and return formatted messages.
 
+    With ``PROMPT_STABLE_PREFIX`` enabled (the default) the current time is sent
+    in a trailing user message instead of inside the system prompt; several providers
+    reject or ignore a system message that does not open the conversation.
+
     Args:
         prompt_name: Name of the prompt template to use
         state: Current agent state containing variables to substitute
@@ -47,19 +113,96 @@ def apply_prompt_template(
     Returns:
         List of messages with the system prompt as the first message
     """
-    # Convert state to dict for template rendering
-    state_vars = {
-        "CURRENT_TIME": datetime.now().strftime("%a %b %d %Y %H:%M:%S %z"),
-        **state,
-    }
+    try:
+        compiled = _compile(prompt_name)
+        config_vars = dataclasses.asdict(configurable) if configurable else {}
+        dynamic_vars = {
+            "CURRENT_TIME": datetime.now().strftime("%a %b %d %Y %H:%M:%S %z")
+        }
+        template_vars = {
+            name: config_vars[name] if name in config_vars else state[name]
+            for name in compiled.variables
+            if name not in DYNAMIC_VARIABLES and (name in config_vars or name in state)
+        }
+        used_dynamic = [
+            name for name in DYNAMIC_VARIABLES if name in compiled.variables
+        ]
+        stable = stable_prefix_enabled()
 
-    # Add configurable variables
-    if configurable:
-        state_vars.update(dataclasses.asdict(configurable))
+        if stable:
+            template_vars.update(
+                {name: RUNTIME_CONTEXT_PLACEHOLDER for name in used_dynamic}
+            )
+        else:
+            template_vars.update({name: dynamic_vars[name] for name in used_dynamic})
 
-    try:
-        template = env.get_template(f"{prompt_name}.md")
-        system_prompt = template.render(**state_vars)
-        return [{"role": "system", "content": system_prompt}] + state["messages"]
+        try:
+            system_prompt = _render_static(
+                prompt_name, tuple(sorted(template_vars.items()))
+            )
+            cacheable = stable or not used_dynamic
+        except TypeError:
+            # Unhashable variable values (lists, dicts) cannot be memoised
+            system_prompt = compiled.template.render(**template_vars)
+            cacheable = False
+
+        messages = [{"role": "system", "content": system_prompt}] + [
+            _summarize_message(message) for message in state["messages"]
+        ]
+        runtime_context = ""
+        if stable and used_dynamic:
+            runtime_context = "Runtime context:\n" + "\n".join(
+                f"{name}: {dynamic_vars[name]}" for name in used_dynamic
+            )
+            messages.append({"role": "user", "content": runtime_context})
     except Exception as e:
         raise ValueError(f"Error applying template {prompt_name}: {e}")
+
+    with _stats_lock:
+        _stats["renders"] += 1
+        if cacheable:
+            _stats["static_chars"] += len(system_prompt)
+        else:
+            _stats["uncacheable"] += 1
+            _stats["dynamic_chars"] += len(system_prompt)
+        _stats["dynamic_chars"] += len(runtime_context)
+    return messages
+
+
+def prompt_cache_stats() -> Dict[str, Any]:
+    """
+    Template compilation and memoisation counters.
+
+    ``prefix_cache_ratio`` is the share of rendered prompt characters that sit in a
+    byte-stable system prompt, i.e. what a provider-side prefix cache can reuse.
+    """
+    info = _render_static.cache_info()
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["static_chars"] + stats["dynamic_chars"]
+    stats.update(
+        compiled_templates=len(_compiled),
+        memo_hits=info.hits,
+        memo_misses=info.misses,
+        prefix_cache_ratio=round(stats["static_chars"] / total, 4) if total else 0.0,
+    )
+    return stats
+
+
+def _summarize_message(message):
+    """Replace artefact references in a message with their short summaries."""
+    if isinstance(message, BaseMessage):
+        content = summarize_artifacts(message.content)
+        return (
+            message
+            if content is message.content
+            else message.model_copy(update={"content": content})
+        )
+    if isinstance(message, dict):
+        content = summarize_artifacts(message.get("content"))
+        return (
+            message
+            if content is message.get("content")
+            else {**message, "content": content}
+        )
+    return message
@@ -12,6 +12,7 @@ from src.prose.graph.prose_longer_node import prose_longer_node
 from src.prose.graph.prose_shorter_node import prose_shorter_node
 from src.prose.graph.prose_zap_node import prose_zap_node
 from src.prose.graph.state import ProseState
+from src.utils.registry import component_registry
 
 
 def optional_node(state: ProseState):
@@ -44,6 +45,16 @@ def build_graph():
     return builder.compile()
 
 
+component_registry.register("prose.workflow", build_graph)
+
+
+def __getattr__(name):
+    # Compile the module-level graph on first access instead of at import time
+    if name == "workflow":
+        return component_registry.get("prose.workflow")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 async def _test_workflow():
     workflow = build_graph()
     events = workflow.astream(
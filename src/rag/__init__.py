@@ -4,7 +4,9 @@
 from .retriever import Retriever, Document, Resource, Chunk
 from .ragflow import RAGFlowProvider
 from .vikingdb_knowledge_base import VikingDBKnowledgeBaseProvider
-from .builder import build_retriever
+from .local_index import LocalIndexProvider, LocalVectorIndex
+from .bm25_index import BM25Index, BM25Provider, HybridRetriever
+from .builder import CachedRetriever, build_retriever, get_retriever
 
 __all__ = [
     Retriever,
@@ -12,6 +14,13 @@ __all__ = [
     Resource,
     RAGFlowProvider,
     VikingDBKnowledgeBaseProvider,
+    LocalIndexProvider,
+    LocalVectorIndex,
+    BM25Index,
+    BM25Provider,
+    HybridRetriever,
     Chunk,
     build_retriever,
+    get_retriever,
+    CachedRetriever,
 ]
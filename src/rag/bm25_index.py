@@ -0,0 +1,472 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Local lexical (BM25) retrieval and hybrid rank fusion.
+
+Operator queries are often exact terms (device names, tariff names,
+regulation article numbers) for which lexical matching beats dense
+embeddings. ``BM25Index`` keeps an inverted index on disk in SQLite:
+
+- one row per term, holding its posting list: delta-encoded chunk ids and
+  term frequencies, each packed to the narrowest unsigned integer width, so
+  decoding is ``np.frombuffer`` plus ``np.cumsum`` with no per-entry work;
+- adding documents appends to the posting lists of their terms; removing a
+  document tombstones its chunks and decrements the document frequencies,
+  and ``compact`` drops tombstoned ids from the posting lists;
+- chunk liveness and BM25 length norms are kept in memory as NumPy arrays,
+  so a query is a handful of posting-list reads, one ``np.bincount`` and an
+  ``argpartition``.
+
+Latin text is tokenised into words and codes such as ``gb50052-2009`` or
+``3.2.1``; Chinese text into character bigrams (and unigrams for isolated
+characters), so no word segmenter is required.
+
+``HybridRetriever`` fuses the ranking of this index with a dense provider
+through reciprocal rank fusion.
+"""
+
+import asyncio
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.rag.local_index import chunk_text
+from src.rag.local_store import LocalMetadataStore, LocalStoreProvider
+from src.rag.retriever import Document, Resource, Retriever
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY, document_id TEXT NOT NULL, content TEXT NOT NULL,
+    length INTEGER NOT NULL, deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS chunks_document ON chunks (document_id);
+CREATE TABLE IF NOT EXISTS postings (term TEXT PRIMARY KEY, df INTEGER NOT NULL, data BLOB NOT NULL);
+"""
+
+# Latin words and codes (keeping inner ".", "-", "_", "/"), or runs of CJK characters
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-_/][a-z0-9]+)*|[一-鿿]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words and codes, plus character bigrams of Chinese runs."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token[0] >= "一":
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _width(value: int) -> int:
+    return 1 if value < 1 << 8 else 2 if value < 1 << 16 else 4
+
+
+def encode_postings(ids: np.ndarray, tfs: np.ndarray) -> bytes:
+    """Compress a posting list of ascending chunk ids and their term frequencies."""
+    deltas = np.diff(ids, prepend=0)
+    id_width = _width(int(deltas.max())) if len(deltas) else 1
+    tf_width = _width(int(tfs.max())) if len(tfs) else 1
+    payload = (
+        deltas.astype(f"<u{id_width}").tobytes() + tfs.astype(f"<u{tf_width}").tobytes()
+    )
+    return bytes((id_width, tf_width)) + payload
+
+
+def decode_postings(blob: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    id_width, tf_width = blob[0], blob[1]
+    count = (len(blob) - 2) // (id_width + tf_width)
+    ids = np.cumsum(
+        np.frombuffer(blob, f"<u{id_width}", count, offset=2), dtype=np.int64
+    )
+    tfs = np.frombuffer(blob, f"<u{tf_width}", count, offset=2 + count * id_width)
+    return ids, tfs
+
+
+class BM25Index(LocalMetadataStore):
+    """On-disk inverted index with compressed posting lists and incremental updates."""
+
+    def __init__(self, root: str, k1: float = 1.2, b: float = 0.75):
+        super().__init__(root, "bm25.sqlite", _SCHEMA)
+        self.k1 = k1
+        self.b = b
+        self._load()
+
+    # ---- in-memory chunk table ----
+
+    def _load(self):
+        with self._lock:
+            self._lengths = np.zeros(0, dtype=np.float32)
+            self._live = np.zeros(0, dtype=bool)
+            self._row_document = np.zeros(0, dtype=np.int32)
+            self._row_dataset = np.zeros(0, dtype=np.int32)
+            self._document_codes, self._dataset_codes = {}, {}
+            self._append_rows(
+                self._db.execute(
+                    "SELECT c.id, c.length, c.deleted, c.document_id, d.dataset_id "
+                    "FROM chunks c JOIN documents d ON d.id = c.document_id ORDER BY c.id"
+                ).fetchall()
+            )
+            self._update_norms()
+            self._mark_loaded()
+
+    def _update_norms(self):
+        """Recompute the per-chunk BM25 length normalisation after the set of live chunks changed."""
+        self._live_count = int(np.count_nonzero(self._live))
+        avg_length = (
+            float(self._lengths[self._live].mean()) if self._live_count else 1.0
+        )
+        self._norms = (
+            self.k1 * (1 - self.b + self.b * self._lengths / max(avg_length, 1e-9))
+        ).astype(np.float32)
+
+    def _append_rows(self, rows: Sequence[Tuple[int, int, int, str, str]]):
+        """Extend the per-chunk arrays with (id, length, deleted, document_id, dataset_id) rows."""
+        if not rows:
+            return
+        documents = [
+            self._document_codes.setdefault(row[3], len(self._document_codes))
+            for row in rows
+        ]
+        datasets = [
+            self._dataset_codes.setdefault(row[4], len(self._dataset_codes))
+            for row in rows
+        ]
+        self._lengths = np.concatenate(
+            [self._lengths, np.array([row[1] for row in rows], dtype=np.float32)]
+        )
+        self._live = np.concatenate(
+            [self._live, np.array([not row[2] for row in rows], dtype=bool)]
+        )
+        self._row_document = np.concatenate(
+            [self._row_document, np.array(documents, dtype=np.int32)]
+        )
+        self._row_dataset = np.concatenate(
+            [self._row_dataset, np.array(datasets, dtype=np.int32)]
+        )
+
+    # ---- writing ----
+
+    def _update_postings(
+        self,
+        additions: Dict[str, Tuple[List[int], List[int]]],
+        df_deltas: Dict[str, int],
+    ):
+        """Append new (ids, tfs) to the posting lists of their terms and apply document-frequency changes."""
+        terms = sorted(set(additions) | set(df_deltas))
+        existing = {}
+        for start in range(0, len(terms), 500):
+            batch = terms[start : start + 500]
+            existing.update(
+                (term, (df, data))
+                for term, df, data in self._db.execute(
+                    f"SELECT term, df, data FROM postings WHERE term IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+            )
+        updates = []
+        for term in terms:
+            df, data = existing.get(term, (0, None))
+            if term in additions:
+                new_ids, new_tfs = additions[term]
+                ids, tfs = (
+                    decode_postings(data)
+                    if data is not None
+                    else (np.zeros(0, np.int64), np.zeros(0, np.int64))
+                )
+                data = encode_postings(
+                    np.concatenate([ids, np.array(new_ids, dtype=np.int64)]),
+                    np.concatenate(
+                        [tfs.astype(np.int64), np.array(new_tfs, dtype=np.int64)]
+                    ),
+                )
+            if data is not None:
+                updates.append((term, df + df_deltas.get(term, 0), data))
+        self._db.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?) "
+            "ON CONFLICT(term) DO UPDATE SET df = excluded.df, data = excluded.data",
+            updates,
+        )
+
+    def _tombstone(
+        self, document_ids: Iterable[str], df_deltas: Dict[str, int]
+    ) -> List[int]:
+        removed = []
+        for document_id in document_ids:
+            for chunk_id, content in self._db.execute(
+                "SELECT id, content FROM chunks WHERE document_id = ? AND deleted = 0",
+                (document_id,),
+            ).fetchall():
+                removed.append(chunk_id)
+                for term in set(tokenize(content)):
+                    df_deltas[term] -= 1
+            self._db.execute(
+                "UPDATE chunks SET deleted = 1 WHERE document_id = ?", (document_id,)
+            )
+        return removed
+
+    def add_documents(
+        self,
+        dataset_id: str,
+        documents: Iterable[Tuple[str, str, Optional[str], Optional[str]]],
+        chunk_chars: int = 800,
+    ) -> int:
+        """
+        Index (document_id, text, title, url) tuples; existing documents with the same ids are replaced.
+
+        Returns:
+            The number of chunks added
+        """
+        documents = list(documents)
+        with self._lock:
+            self._require_dataset(dataset_id)
+            with self._db:
+                df_deltas: Dict[str, int] = defaultdict(int)
+                removed = self._tombstone(
+                    [document[0] for document in documents], df_deltas
+                )
+                next_id = self._db.execute(
+                    "SELECT COALESCE(MAX(id) + 1, 0) FROM chunks"
+                ).fetchone()[0]
+                additions: Dict[str, Tuple[List[int], List[int]]] = defaultdict(
+                    lambda: ([], [])
+                )
+                rows, contents = [], []
+                for document_id, text, title, url in documents:
+                    self._upsert_document(document_id, dataset_id, title, url)
+                    for content in chunk_text(text, chunk_chars):
+                        counts = Counter(tokenize(content))
+                        length = sum(counts.values())
+                        for term, tf in counts.items():
+                            additions[term][0].append(next_id)
+                            additions[term][1].append(tf)
+                            df_deltas[term] += 1
+                        rows.append((next_id, length, 0, document_id, dataset_id))
+                        contents.append(content)
+                        next_id += 1
+                self._db.executemany(
+                    "INSERT INTO chunks (id, length, deleted, document_id, content) VALUES (?, ?, ?, ?, ?)",
+                    [row[:4] + (content,) for row, content in zip(rows, contents)],
+                )
+                self._update_postings(additions, df_deltas)
+            self._live[removed] = False
+            self._append_rows(rows)
+            self._update_norms()
+            self._mark_loaded()
+        return len(rows)
+
+    def remove_document(self, document_id: str):
+        with self._lock:
+            with self._db:
+                df_deltas: Dict[str, int] = defaultdict(int)
+                removed = self._tombstone([document_id], df_deltas)
+                self._update_postings({}, df_deltas)
+            self._live[removed] = False
+            self._update_norms()
+            self._mark_loaded()
+
+    def compact(self) -> int:
+        """
+        Drop tombstoned chunk ids from every posting list.
+
+        Returns:
+            The number of posting lists rewritten
+        """
+        # Postings may reference chunks committed by another connection since the last load
+        self.refresh()
+        with self._lock:
+            live = self._live
+            rewritten = []
+            for term, data in self._db.execute(
+                "SELECT term, data FROM postings"
+            ).fetchall():
+                ids, tfs = decode_postings(data)
+                # Chunks committed by another connection after the refresh are kept
+                keep = ids >= len(live)
+                keep[~keep] = live[ids[~keep]]
+                if not keep.all():
+                    rewritten.append(
+                        (
+                            term,
+                            (
+                                encode_postings(ids[keep], tfs[keep])
+                                if keep.any()
+                                else None
+                            ),
+                        )
+                    )
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM postings WHERE term = ?",
+                    [(t,) for t, d in rewritten if d is None],
+                )
+                self._db.executemany(
+                    "UPDATE postings SET data = ? WHERE term = ?",
+                    [(d, t) for t, d in rewritten if d is not None],
+                )
+            return len(rewritten)
+
+    # ---- search ----
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        scopes: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the top-k (chunk_id, BM25 score) pairs, best first.
+
+        Args:
+            query: Query text
+            k: Number of chunks
+            scopes: (dataset_id, document_id) pairs limiting the search; all chunks when None
+        """
+        terms = Counter(tokenize(query))
+        if not terms:
+            return []
+        self.refresh()
+        with self._lock:
+            allowed = self._allowed(scopes)
+            norms = self._norms
+            live_count = self._live_count
+            postings = self._db.execute(
+                f"SELECT term, df, data FROM postings WHERE term IN ({','.join('?' * len(terms))})",
+                list(terms),
+            ).fetchall()
+        if not postings or not live_count:
+            return []
+
+        all_ids, all_weights = [], []
+        for term, df, data in postings:
+            ids, tfs = decode_postings(data)
+            # Chunks committed by another process after the refresh above are not loaded yet
+            if len(ids) and ids[-1] >= len(norms):
+                keep = ids < len(norms)
+                ids, tfs = ids[keep], tfs[keep]
+            tfs = tfs.astype(np.float32)
+            idf = np.log(1 + (live_count - df + 0.5) / (df + 0.5))
+            all_ids.append(ids)
+            all_weights.append(
+                terms[term] * idf * (self.k1 + 1) * tfs / (tfs + norms[ids])
+            )
+        scores = np.bincount(
+            np.concatenate(all_ids),
+            weights=np.concatenate(all_weights),
+            minlength=len(norms),
+        )
+        # Every BM25 term weight is positive, so the matched chunks are exactly the non-zero scores
+        candidates = np.flatnonzero((scores > 0) & allowed)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.argsort(-scores[candidates], kind="stable")
+        return [(int(candidates[i]), float(scores[candidates[i]])) for i in order]
+
+
+class BM25Provider(LocalStoreProvider):
+    """
+    BM25Provider retrieves documents from a local BM25 inverted index.
+    """
+
+    index_dir: str
+    top_k: int = 10
+
+    def __init__(self):
+        self.index_dir = os.getenv("BM25_INDEX_DIR", os.path.join("data", "bm25_index"))
+
+        top_k = os.getenv("BM25_TOP_K")
+        if top_k:
+            self.top_k = int(top_k)
+
+        self.index = BM25Index(
+            self.index_dir,
+            k1=float(os.getenv("BM25_K1", "1.2")),
+            b=float(os.getenv("BM25_B", "0.75")),
+        )
+
+    def search(
+        self, query: str, scopes: List[Tuple[str, str]]
+    ) -> List[Tuple[int, float]]:
+        return self.index.search(query, self.top_k, scopes)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]], k: int = 60
+) -> List[Document]:
+    """
+    Fuse document rankings: each document scores sum(1 / (k + rank)) over the rankings it appears in.
+
+    Chunks of a document found by several retrievers are merged, keeping the
+    first copy of each chunk text.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    fused: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            scores[document.id] += 1.0 / (k + rank)
+            if document.id not in fused:
+                fused[document.id] = Document(
+                    id=document.id,
+                    url=document.url,
+                    title=document.title,
+                    chunks=list(document.chunks),
+                )
+                continue
+            merged = fused[document.id]
+            seen = {chunk.content for chunk in merged.chunks}
+            merged.chunks.extend(
+                chunk for chunk in document.chunks if chunk.content not in seen
+            )
+            merged.url = merged.url or document.url
+            merged.title = merged.title or document.title
+    return sorted(fused.values(), key=lambda document: -scores[document.id])
+
+
+class HybridRetriever(Retriever):
+    """
+    Queries a lexical and a dense retriever and fuses their rankings with RRF.
+
+    Both retrievers must index the same datasets under the same ids, so that
+    ``rag://`` resources and document ids mean the same thing in both.
+    """
+
+    def __init__(
+        self, lexical: Retriever, dense: Retriever, rrf_k: int = 60, top_k: int = 10
+    ):
+        self.lexical = lexical
+        self.dense = dense
+        self.rrf_k = rrf_k
+        self.top_k = top_k
+
+    def query_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        rankings = [
+            self.lexical.query_relevant_documents(query, resources),
+            self.dense.query_relevant_documents(query, resources),
+        ]
+        return reciprocal_rank_fusion(rankings, self.rrf_k)[: self.top_k]
+
+    async def aquery_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        rankings = await asyncio.gather(
+            self.lexical.aquery_relevant_documents(query, resources),
+            self.dense.aquery_relevant_documents(query, resources),
+        )
+        return reciprocal_rank_fusion(rankings, self.rrf_k)[: self.top_k]
+
+    def list_resources(self, query: str | None = None) -> list[Resource]:
+        resources = {}
+        for resource in self.lexical.list_resources(query) + self.dense.list_resources(
+            query
+        ):
+            resources.setdefault(resource.uri, resource)
+        return list(resources.values())
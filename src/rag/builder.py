@@ -1,17 +1,141 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from src.config.tools import SELECTED_RAG_PROVIDER, RAGProvider
+import os
+import threading
+
+from src.config.tools import RAGProvider
+from src.rag.bm25_index import BM25Provider, HybridRetriever
+from src.rag.local_index import LocalIndexProvider
 from src.rag.ragflow import RAGFlowProvider
 from src.rag.vikingdb_knowledge_base import VikingDBKnowledgeBaseProvider
-from src.rag.retriever import Retriever
+from src.rag.retriever import Document, Resource, Retriever
+from src.utils.cache import ResponseCache
 
+# Environment variables that configure a provider; a change to any of them builds a new one
+_CONFIG_PREFIXES = (
+    "RAG_",
+    "RAGFLOW_",
+    "VIKINGDB_KNOWLEDGE_BASE_",
+    "LOCAL_RAG_",
+    "BM25_",
+    "HYBRID_",
+)
 
-def build_retriever() -> Retriever | None:
-    if SELECTED_RAG_PROVIDER == RAGProvider.RAGFLOW.value:
+
+def _build_provider(name: str) -> Retriever:
+    if name == RAGProvider.RAGFLOW.value:
         return RAGFlowProvider()
-    elif SELECTED_RAG_PROVIDER == RAGProvider.VIKINGDB_KNOWLEDGE_BASE.value:
+    elif name == RAGProvider.VIKINGDB_KNOWLEDGE_BASE.value:
         return VikingDBKnowledgeBaseProvider()
-    elif SELECTED_RAG_PROVIDER:
-        raise ValueError(f"Unsupported RAG provider: {SELECTED_RAG_PROVIDER}")
+    elif name == RAGProvider.LOCAL_INDEX.value:
+        return LocalIndexProvider()
+    elif name == RAGProvider.BM25.value:
+        return BM25Provider()
+    elif name == RAGProvider.HYBRID.value:
+        dense = os.getenv("HYBRID_DENSE_PROVIDER", RAGProvider.LOCAL_INDEX.value)
+        if dense in (RAGProvider.BM25.value, RAGProvider.HYBRID.value):
+            raise ValueError(
+                f"HYBRID_DENSE_PROVIDER must be a dense provider, got: {dense}"
+            )
+        return HybridRetriever(
+            BM25Provider(),
+            _build_provider(dense),
+            rrf_k=int(os.getenv("HYBRID_RRF_K", "60")),
+            top_k=int(os.getenv("HYBRID_TOP_K", "10")),
+        )
+    raise ValueError(f"Unsupported RAG provider: {name}")
+
+
+def build_retriever() -> Retriever | None:
+    # Read at call time so a changed RAG_PROVIDER is picked up with the rest of the config
+    provider = os.getenv("RAG_PROVIDER")
+    if provider:
+        return _build_provider(provider)
     return None
+
+
+class CachedRetriever(Retriever):
+    """
+    Wraps a provider and caches ``list_resources`` results per query for a TTL.
+
+    The resource picker lists resources on every keystroke, while the set of
+    datasets changes rarely. Document queries are passed through uncached.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever,
+        resources_ttl_seconds: float = 60,
+        max_size: int = 256,
+    ):
+        self.retriever = retriever
+        self.resources_cache = ResponseCache(
+            max_size=max_size if resources_ttl_seconds > 0 else 0,
+            ttl_seconds=resources_ttl_seconds,
+        )
+
+    def list_resources(self, query: str | None = None) -> list[Resource]:
+        key = " ".join((query or "").split())
+        return list(
+            self.resources_cache.get_or_compute(
+                key, lambda: self.retriever.list_resources(query)
+            )
+        )
+
+    def query_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        return self.retriever.query_relevant_documents(query, resources)
+
+    async def aquery_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        return await self.retriever.aquery_relevant_documents(query, resources)
+
+
+_lock = threading.Lock()
+_current: tuple[tuple, Retriever | None] | None = None
+
+
+def _config_key() -> tuple:
+    return (os.getenv("RAG_PROVIDER"),) + tuple(
+        sorted(
+            (name, value)
+            for name, value in os.environ.items()
+            if name.startswith(_CONFIG_PREFIXES)
+        )
+    )
+
+
+def get_retriever() -> Retriever | None:
+    """
+    Return the shared retriever for the current configuration, building it on first use.
+
+    All callers share one provider instance (and its pooled HTTP connections)
+    until the RAG configuration changes.
+    """
+    global _current
+    key = _config_key()
+    current = _current
+    if current is not None and current[0] == key:
+        return current[1]
+    with _lock:
+        if _current is None or _current[0] != key:
+            retriever = build_retriever()
+            if retriever is not None:
+                retriever = CachedRetriever(
+                    retriever,
+                    resources_ttl_seconds=float(
+                        os.getenv("RAG_RESOURCES_CACHE_TTL_SECONDS", "60")
+                    ),
+                )
+            _current = (key, retriever)
+        return _current[1]
+
+
+def reset_retriever() -> None:
+    """Drop the shared retriever so the next call rebuilds it."""
+    global _current
+    with _lock:
+        _current = None
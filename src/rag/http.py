@@ -0,0 +1,43 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Shared HTTP session for the RAG providers.
+
+Every provider call used to go through bare ``requests.post``/``requests.get``,
+which opens a new TCP (and TLS) connection per query. The providers now share
+one ``requests.Session`` whose adapter keeps up to ``RAG_HTTP_POOL_SIZE``
+keep-alive connections per host, so repeated queries reuse warm connections.
+"""
+
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils.registry import component_registry
+
+
+def build_http_session() -> requests.Session:
+    pool_size = int(os.getenv("RAG_HTTP_POOL_SIZE", "16"))
+    # Only retry failed connects (e.g. a pooled socket the server already closed); never resend a request
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.1
+        ),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+component_registry.register("rag.http_session", build_http_session)
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide RAG HTTP session (created on first use)."""
+    return component_registry.get("rag.http_session")
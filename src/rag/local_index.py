@@ -0,0 +1,452 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Local, in-process vector index used by the ``local_index`` RAG provider.
+
+Chunk embeddings are appended to ``embeddings.f32``, a raw float32 matrix that
+is memory-mapped read-only for search; datasets, documents and chunk texts
+live in ``index.sqlite`` next to it, keyed by the chunk's row in the matrix.
+A query is embedded once and scored against the rows with blocked NumPy
+matrix products, keeping a running top-k, so no remote call is involved.
+
+For large corpora ``build_ivf`` clusters the rows (spherical k-means); search
+then only scores the rows of the ``nprobe`` closest clusters, plus any rows
+added after the clustering was built.
+
+Embeddings come from a pluggable embedder: any object with a ``dim``
+attribute and an ``embed(texts) -> ndarray`` method, loaded from a
+``module:factory`` path. The default ``HashingEmbedder`` needs no model files.
+"""
+
+import importlib
+import os
+import re
+import zlib
+from typing import Iterable, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from src.rag.local_store import LocalMetadataStore, LocalStoreProvider
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chunks (
+    row INTEGER PRIMARY KEY, document_id TEXT NOT NULL, content TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS chunks_document ON chunks (document_id);
+"""
+
+# Latin words, digits and single CJK characters
+_TOKEN = re.compile(r"[a-z0-9]+|[一-鿿]")
+
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return an (len(texts), dim) float32 matrix of L2-normalised embeddings."""
+        ...
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: signed feature hashing of words, CJK characters
+    and CJK character bigrams. Good enough for keyword-heavy technical
+    documents; plug in a neural embedder for semantic recall.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN.findall(text.lower())
+        features = list(tokens)
+        for a, b in zip(tokens, tokens[1:]):
+            if len(a) == 1 and len(b) == 1 and a >= "一" and b >= "一":
+                features.append(a + b)
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 rather than hash(), which is salted per process
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def load_embedder(spec: Optional[str] = None) -> Embedder:
+    """Build the embedder named by ``module:factory``; the hashing embedder when unset."""
+    if not spec or spec == "hashing":
+        return HashingEmbedder()
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Embedder must be given as 'module:factory', got: {spec}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split text into chunks of whole paragraphs (or lines) of at most ``max_chars``."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        pieces = [paragraph] if len(paragraph) <= max_chars else paragraph.splitlines()
+        for piece in pieces:
+            piece = piece.strip()
+            while len(piece) > max_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(piece[:max_chars])
+                piece = piece[max_chars:]
+            if not piece:
+                continue
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class LocalVectorIndex(LocalMetadataStore):
+    """Memory-mapped float32 embedding matrix plus SQLite metadata, with blocked top-k search."""
+
+    _chunk_key = "row"
+
+    def __init__(
+        self, root: str, embedder: Embedder, nprobe: int = 8, block_rows: int = 65536
+    ):
+        super().__init__(root, "index.sqlite", _SCHEMA)
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.nprobe = nprobe
+        self.block_rows = block_rows
+        self._matrix_path = os.path.join(root, "embeddings.f32")
+        self._ivf_path = os.path.join(root, "ivf.npz")
+        stored_dim = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'dim'"
+        ).fetchone()
+        if stored_dim is None:
+            with self._db:
+                self._db.execute("INSERT INTO meta VALUES ('dim', ?)", (str(self.dim),))
+        elif int(stored_dim[0]) != self.dim:
+            raise ValueError(
+                f"Index at {root} has dimension {stored_dim[0]}, the embedder produces {self.dim}"
+            )
+        self._load()
+
+    # ---- loading ----
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self._matrix_path)
+        except FileNotFoundError:
+            return 0
+
+    def _load(self):
+        """(Re)map the matrix and rebuild the row -> document -> dataset lookup arrays."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.row, c.deleted, c.document_id, d.dataset_id "
+                "FROM chunks c JOIN documents d ON d.id = c.document_id ORDER BY c.row"
+            ).fetchall()
+            # Rows appended to the file without committed metadata (interrupted write) are ignored
+            count = min(len(rows), self._file_size() // (4 * self.dim))
+            self._row_document = np.zeros(0, dtype=np.int32)
+            self._row_dataset = np.zeros(0, dtype=np.int32)
+            self._document_codes, self._dataset_codes = {}, {}
+            self._append_rows(rows[:count])
+            self._ivf = self._load_ivf(count)
+            self._mark_loaded()
+
+    @property
+    def _live(self) -> np.ndarray:
+        # Tombstoned rows have no document code
+        return self._row_document >= 0
+
+    def _append_rows(self, rows: Sequence[Tuple[int, int, str, str]]):
+        """Extend the lookup arrays with (row, deleted, document_id, dataset_id) rows and remap the matrix."""
+        documents = np.full(len(rows), -1, dtype=np.int32)
+        datasets = np.full(len(rows), -1, dtype=np.int32)
+        for i, (_, deleted, document_id, dataset_id) in enumerate(rows):
+            if not deleted:
+                documents[i] = self._document_codes.setdefault(
+                    document_id, len(self._document_codes)
+                )
+                datasets[i] = self._dataset_codes.setdefault(
+                    dataset_id, len(self._dataset_codes)
+                )
+        self._row_document = np.concatenate([self._row_document, documents])
+        self._row_dataset = np.concatenate([self._row_dataset, datasets])
+        count = len(self._row_document)
+        # Mapping only sets up the view; no rows are read until a search touches them
+        self._matrix = (
+            np.memmap(
+                self._matrix_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(count, self.dim),
+            )
+            if count
+            else np.zeros((0, self.dim), dtype=np.float32)
+        )
+
+    def _tombstone(self, rows: Sequence[int]):
+        """Drop deleted rows from the lookup arrays in place."""
+        self._row_document[rows] = -1
+        self._row_dataset[rows] = -1
+
+    def _load_ivf(self, count: int):
+        if not os.path.exists(self._ivf_path):
+            return None
+        data = np.load(self._ivf_path)
+        assignments = data["assignments"]
+        if len(assignments) > count:
+            return None
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(
+            assignments[order], np.arange(len(data["centroids"]) + 1)
+        )
+        return data["centroids"], order, offsets, len(assignments)
+
+    # ---- writing ----
+
+    def add_document(
+        self,
+        dataset_id: str,
+        document_id: str,
+        text: str,
+        title: Optional[str] = None,
+        url: Optional[str] = None,
+        chunk_chars: int = 800,
+    ) -> int:
+        """
+        Chunk, embed and append a document; an existing document with the same id is replaced.
+
+        Returns:
+            The number of chunks added
+        """
+        return self.add_documents(
+            dataset_id, [(document_id, text, title, url)], chunk_chars
+        )
+
+    def add_documents(
+        self,
+        dataset_id: str,
+        documents: Iterable[Tuple[str, str, Optional[str], Optional[str]]],
+        chunk_chars: int = 800,
+    ) -> int:
+        """
+        Add (document_id, text, title, url) tuples in one write; use this for bulk ingestion.
+
+        Returns:
+            The number of chunks added
+        """
+        rows, texts = [], []
+        for document_id, text, title, url in documents:
+            chunks = chunk_text(text, chunk_chars)
+            rows.append((document_id, title, url, chunks))
+            texts.extend(chunks)
+        embeddings = (
+            self.embedder.embed(texts) if texts else np.zeros((0, self.dim), np.float32)
+        )
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._lock:
+            self._require_dataset(dataset_id)
+            start = self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            with open(self._matrix_path, "ab") as f:
+                # Drop rows of an interrupted earlier write so rows stay aligned with the metadata
+                f.truncate(start * 4 * self.dim)
+                f.write(embeddings.tobytes())
+            removed, added = [], []
+            with self._db:
+                row = start
+                for document_id, title, url, chunks in rows:
+                    removed += self._live_rows(document_id)
+                    self._db.execute(
+                        "UPDATE chunks SET deleted = 1 WHERE document_id = ?",
+                        (document_id,),
+                    )
+                    self._upsert_document(document_id, dataset_id, title, url)
+                    self._db.executemany(
+                        "INSERT INTO chunks (row, document_id, content) VALUES (?, ?, ?)",
+                        [
+                            (row + i, document_id, chunk)
+                            for i, chunk in enumerate(chunks)
+                        ],
+                    )
+                    added += [
+                        (row + i, 0, document_id, dataset_id)
+                        for i in range(len(chunks))
+                    ]
+                    row += len(chunks)
+            # A document repeated within the batch tombstones rows added by this same write
+            self._append_rows(added)
+            self._tombstone(removed)
+            self._mark_loaded()
+        return len(texts)
+
+    def _live_rows(self, document_id: str) -> List[int]:
+        return [
+            row
+            for (row,) in self._db.execute(
+                "SELECT row FROM chunks WHERE document_id = ? AND deleted = 0",
+                (document_id,),
+            )
+        ]
+
+    def remove_document(self, document_id: str):
+        with self._lock:
+            with self._db:
+                removed = self._live_rows(document_id)
+                self._db.execute(
+                    "UPDATE chunks SET deleted = 1 WHERE document_id = ?",
+                    (document_id,),
+                )
+            self._tombstone(removed)
+            self._mark_loaded()
+
+    def build_ivf(
+        self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0
+    ) -> int:
+        """
+        Cluster the current rows with spherical k-means and save the inverted lists.
+
+        Returns:
+            The number of clusters
+        """
+        with self._lock:
+            matrix = self._matrix
+            count = len(matrix)
+            if count == 0:
+                return 0
+            n_lists = min(count, n_lists or max(1, int(np.sqrt(count))))
+            rng = np.random.default_rng(seed)
+            centroids = np.array(
+                matrix[np.sort(rng.choice(count, n_lists, replace=False))]
+            )
+            assignments = np.zeros(count, dtype=np.int32)
+            for _ in range(iterations):
+                sums = np.zeros_like(centroids)
+                for start in range(0, count, self.block_rows):
+                    block = matrix[start : start + self.block_rows]
+                    block_assignments = np.argmax(block @ centroids.T, axis=1)
+                    assignments[start : start + len(block)] = block_assignments
+                    np.add.at(sums, block_assignments, block)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Keep the old centroid of a cluster that lost all its rows
+                centroids = np.where(
+                    norms > 0, sums / np.maximum(norms, 1e-12), centroids
+                ).astype(np.float32)
+            np.savez(self._ivf_path, centroids=centroids, assignments=assignments)
+            self._ivf = self._load_ivf(count)
+            return n_lists
+
+    # ---- search ----
+
+    def _candidate_rows(self, queries: np.ndarray) -> Optional[np.ndarray]:
+        """Rows of the nprobe closest clusters of any query, or None to scan everything."""
+        if self._ivf is None:
+            return None
+        centroids, order, offsets, indexed = self._ivf
+        nprobe = min(self.nprobe, len(centroids))
+        if nprobe >= len(centroids):
+            return None
+        lists = np.unique(
+            np.argpartition(-(queries @ centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        )
+        rows = [order[offsets[i] : offsets[i + 1]] for i in lists]
+        rows.append(np.arange(indexed, len(self._matrix)))
+        return np.sort(np.concatenate(rows))
+
+    def search(
+        self,
+        queries: Sequence[str],
+        k: int = 10,
+        scopes: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Return the top-k (row, score) pairs for each query, best first.
+
+        Args:
+            queries: Query texts, embedded and scored together
+            k: Number of chunks per query
+            scopes: (dataset_id, document_id) pairs limiting the search; all rows when None
+        """
+        self.refresh()
+        embedded = np.ascontiguousarray(
+            self.embedder.embed(list(queries)), dtype=np.float32
+        )
+        with self._lock:
+            matrix = self._matrix
+            allowed = self._allowed(scopes)
+            candidates = self._candidate_rows(embedded)
+        rows = (
+            np.flatnonzero(allowed)
+            if candidates is None
+            else candidates[allowed[candidates]]
+        )
+        contiguous = candidates is None and len(rows) == len(matrix)
+
+        best_scores = np.empty((len(embedded), 0), dtype=np.float32)
+        best_rows = np.empty((len(embedded), 0), dtype=np.int64)
+        for start in range(0, len(rows), self.block_rows):
+            block_rows = rows[start : start + self.block_rows]
+            block = (
+                matrix[start : start + len(block_rows)]
+                if contiguous
+                else matrix[block_rows]
+            )
+            scores = np.concatenate([best_scores, embedded @ block.T], axis=1)
+            row_ids = np.concatenate(
+                [
+                    best_rows,
+                    np.broadcast_to(block_rows, (len(embedded), len(block_rows))),
+                ],
+                axis=1,
+            )
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                row_ids = np.take_along_axis(row_ids, top, axis=1)
+            best_scores, best_rows = scores, row_ids
+
+        results = []
+        for scores, row_ids in zip(best_scores, best_rows):
+            order = np.argsort(-scores, kind="stable")
+            results.append([(int(row_ids[i]), float(scores[i])) for i in order])
+        return results
+
+
+class LocalIndexProvider(LocalStoreProvider):
+    """
+    LocalIndexProvider retrieves documents from a local vector index, without any remote service.
+    """
+
+    index_dir: str
+    top_k: int = 10
+
+    def __init__(self):
+        self.index_dir = os.getenv(
+            "LOCAL_RAG_INDEX_DIR", os.path.join("data", "rag_index")
+        )
+
+        top_k = os.getenv("LOCAL_RAG_TOP_K")
+        if top_k:
+            self.top_k = int(top_k)
+
+        self.index = LocalVectorIndex(
+            self.index_dir,
+            load_embedder(os.getenv("LOCAL_RAG_EMBEDDER")),
+            nprobe=int(os.getenv("LOCAL_RAG_NPROBE", "8")),
+        )
+
+    def search(
+        self, query: str, scopes: List[Tuple[str, str]]
+    ) -> List[Tuple[int, float]]:
+        return self.index.search([query], self.top_k, scopes)[0]
@@ -0,0 +1,192 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Dataset and document metadata shared by the local, in-process indexes.
+
+``LocalMetadataStore`` owns the SQLite connection with the ``datasets`` and
+``documents`` tables and the per-chunk lookup arrays (chunk -> document code,
+chunk -> dataset code) used to restrict a search to ``rag://`` resources.
+Subclasses add their own ``chunks`` table and keep ``_live``, a boolean mask
+of the chunks that are not tombstoned, in step with the lookup arrays.
+``LocalStoreProvider`` is the matching ``Retriever`` on top of such an index.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from src.rag.retriever import Chunk, Document, Resource, Retriever
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT NOT NULL DEFAULT '');
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY, dataset_id TEXT NOT NULL, title TEXT, url TEXT
+);
+"""
+
+
+class LocalMetadataStore:
+    """SQLite dataset / document metadata plus the chunk scope lookup arrays of a local index."""
+
+    # Column of the chunks table holding the chunk id returned by search
+    _chunk_key = "id"
+    _live: np.ndarray
+
+    def __init__(self, root: str, filename: str, schema: str):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(
+            os.path.join(root, filename), check_same_thread=False
+        )
+        self._db.executescript(_SCHEMA + schema)
+        self._row_document = np.zeros(0, dtype=np.int32)
+        self._row_dataset = np.zeros(0, dtype=np.int32)
+        self._document_codes: Dict[str, int] = {}
+        self._dataset_codes: Dict[str, int] = {}
+        self._data_version = None
+
+    def _load(self):
+        """Rebuild the in-memory chunk arrays from the database."""
+        raise NotImplementedError
+
+    def _mark_loaded(self):
+        """Record the database version the in-memory arrays reflect."""
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self):
+        """Reload the chunk arrays when another connection has committed changes."""
+        if self._db.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            self._load()
+
+    # ---- writing ----
+
+    def add_dataset(self, dataset_id: str, name: str, description: str = ""):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO datasets VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, description = excluded.description",
+                (dataset_id, name, description),
+            )
+
+    def _require_dataset(self, dataset_id: str):
+        if (
+            self._db.execute(
+                "SELECT 1 FROM datasets WHERE id = ?", (dataset_id,)
+            ).fetchone()
+            is None
+        ):
+            raise ValueError(f"Unknown dataset: {dataset_id}")
+
+    def _upsert_document(
+        self,
+        document_id: str,
+        dataset_id: str,
+        title: Optional[str],
+        url: Optional[str],
+    ):
+        self._db.execute(
+            "INSERT INTO documents VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "dataset_id = excluded.dataset_id, title = excluded.title, url = excluded.url",
+            (document_id, dataset_id, title, url),
+        )
+
+    # ---- search ----
+
+    def _allowed(self, scopes: Optional[Iterable[Tuple[str, str]]]) -> np.ndarray:
+        """Boolean mask of live chunks inside the (dataset_id, document_id) scopes; "" means the whole dataset."""
+        if scopes is None:
+            return self._live
+        datasets, documents = [], []
+        for dataset_id, document_id in scopes:
+            if document_id:
+                documents.append(self._document_codes.get(document_id, -2))
+            else:
+                datasets.append(self._dataset_codes.get(dataset_id, -2))
+        return self._live & (
+            np.isin(self._row_dataset, datasets)
+            | np.isin(self._row_document, documents)
+        )
+
+    def documents_for(self, hits: Sequence[Tuple[int, float]]) -> List[Document]:
+        """Group search hits into documents, ordered by their best chunk."""
+        if not hits:
+            return []
+        with self._lock:
+            records = {
+                chunk_id: (document_id, content, title, url)
+                for chunk_id, document_id, content, title, url in self._db.execute(
+                    f"SELECT c.{self._chunk_key}, c.document_id, c.content, d.title, d.url "
+                    "FROM chunks c JOIN documents d ON d.id = c.document_id "
+                    f"WHERE c.{self._chunk_key} IN ({','.join('?' * len(hits))})",
+                    [chunk_id for chunk_id, _ in hits],
+                )
+            }
+        documents = {}
+        for chunk_id, score in hits:
+            if chunk_id not in records:
+                continue
+            document_id, content, title, url = records[chunk_id]
+            if document_id not in documents:
+                documents[document_id] = Document(
+                    id=document_id, url=url, title=title, chunks=[]
+                )
+            documents[document_id].chunks.append(
+                Chunk(content=content, similarity=score)
+            )
+        return list(documents.values())
+
+    def list_datasets(self, query: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        with self._lock:
+            datasets = self._db.execute(
+                "SELECT id, name, description FROM datasets ORDER BY name"
+            ).fetchall()
+        if query:
+            datasets = [d for d in datasets if query.lower() in d[1].lower()]
+        return datasets
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._live))
+
+
+class LocalStoreProvider(Retriever):
+    """
+    Retriever over a ``LocalMetadataStore``; subclasses build ``index`` and implement ``search``.
+    """
+
+    index: LocalMetadataStore
+    top_k: int = 10
+
+    def search(
+        self, query: str, scopes: List[Tuple[str, str]]
+    ) -> List[Tuple[int, float]]:
+        """Return the top_k (chunk_id, score) pairs within the scopes, best first."""
+        raise NotImplementedError
+
+    def query_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        if not resources:
+            return []
+        scopes = [parse_uri(resource.uri) for resource in resources]
+        return self.index.documents_for(self.search(query, scopes))
+
+    def list_resources(self, query: str | None = None) -> list[Resource]:
+        return [
+            Resource(
+                uri=f"rag://dataset/{dataset_id}", title=name, description=description
+            )
+            for dataset_id, name, description in self.index.list_datasets(query)
+        ]
+
+
+def parse_uri(uri: str) -> tuple[str, str]:
+    parsed = urlparse(uri)
+    if parsed.scheme != "rag":
+        raise ValueError(f"Invalid URI: {uri}")
+    return parsed.path.split("/")[1], parsed.fragment
@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 import os
-import requests
+from src.rag.http import get_http_session
 from src.rag.retriever import Chunk, Document, Resource, Retriever
 from urllib.parse import urlparse
 
@@ -31,6 +31,8 @@ class RAGFlowProvider(Retriever):
         if page_size:
             self.page_size = int(page_size)
 
+        self.session = get_http_session()
+
     def query_relevant_documents(
         self, query: str, resources: list[Resource] = []
     ) -> list[Document]:
@@ -55,7 +57,7 @@ class RAGFlowProvider(Retriever):
             "page_size": self.page_size,
         }
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.api_url}/api/v1/retrieval", headers=headers, json=payload
         )
 
@@ -96,7 +98,7 @@ class RAGFlowProvider(Retriever):
         if query:
             params["name"] = query
 
-        response = requests.get(
+        response = self.session.get(
             f"{self.api_url}/api/v1/datasets", headers=headers, params=params
         )
 
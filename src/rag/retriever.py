@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 import abc
+import asyncio
 from pydantic import BaseModel, Field
 
 
@@ -78,3 +79,14 @@ class Retriever(abc.ABC):
         Query relevant documents from the resources.
         """
         pass
+
+    async def aquery_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        """
+        Query relevant documents without blocking the event loop.
+
+        Providers with a native async path override this; by default the sync
+        query runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.query_relevant_documents, query, resources)
@@ -1,15 +1,20 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import json
+import logging
 import os
 import requests
-import json
+from src.rag.http import get_http_session
 from src.rag.retriever import Chunk, Document, Resource, Retriever
 from urllib.parse import urlparse
 from volcengine.auth.SignerV4 import SignerV4
 from volcengine.base.Request import Request
 from volcengine.Credentials import Credentials
 
+logger = logging.getLogger(__name__)
+
 
 class VikingDBKnowledgeBaseProvider(Retriever):
     """
@@ -20,6 +25,8 @@ class VikingDBKnowledgeBaseProvider(Retriever):
     api_ak: str
     api_sk: str
     retrieval_size: int = 10
+    max_concurrency: int = 4
+    timeout: float = 10
 
     def __init__(self):
         api_url = os.getenv("VIKINGDB_KNOWLEDGE_BASE_API_URL")
@@ -41,6 +48,16 @@ class VikingDBKnowledgeBaseProvider(Retriever):
         if retrieval_size:
             self.retrieval_size = int(retrieval_size)
 
+        max_concurrency = os.getenv("VIKINGDB_KNOWLEDGE_BASE_MAX_CONCURRENCY")
+        if max_concurrency:
+            self.max_concurrency = max(1, int(max_concurrency))
+
+        timeout = os.getenv("VIKINGDB_KNOWLEDGE_BASE_TIMEOUT_SECONDS")
+        if timeout:
+            self.timeout = float(timeout)
+
+        self.session = get_http_session()
+
     def prepare_request(self, method, path, params=None, data=None, doseq=0):
         """
         Prepare signed request using volcengine auth
@@ -77,6 +94,59 @@ class VikingDBKnowledgeBaseProvider(Retriever):
         SignerV4.sign(r, credentials)
         return r
 
+    def _search_resource(
+        self, query: str, resource: Resource, timeout: float | None = None
+    ) -> list[dict]:
+        """
+        Sign and send the search request for one resource and return its result list
+        """
+        resource_id, document_id = parse_uri(resource.uri)
+        request_params = {
+            "resource_id": resource_id,
+            "query": query,
+            "limit": self.retrieval_size,
+            "dense_weight": 0.5,
+            "pre_processing": {
+                "need_instruction": True,
+                "rewrite": False,
+                "return_token_usage": True,
+            },
+            "post_processing": {
+                "rerank_switch": True,
+                "chunk_diffusion_count": 0,
+                "chunk_group": True,
+                "get_attachment_link": True,
+            },
+        }
+        if document_id:
+            doc_filter = {"op": "must", "field": "doc_id", "conds": [document_id]}
+            query_param = {"doc_filter": doc_filter}
+            request_params["query_param"] = query_param
+
+        method = "POST"
+        path = "/api/knowledge/collection/search_knowledge"
+        info_req = self.prepare_request(method=method, path=path, data=request_params)
+        request_kwargs = {"timeout": timeout} if timeout else {}
+        rsp = self.session.request(
+            method=info_req.method,
+            url="http://{}{}".format(self.api_url, info_req.path),
+            headers=info_req.headers,
+            data=info_req.body,
+            **request_kwargs,
+        )
+
+        try:
+            response = json.loads(rsp.text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON response: {e}")
+
+        if response["code"] != 0:
+            raise ValueError(
+                f"Failed to query documents from resource: {response['message']}"
+            )
+
+        return response.get("data", {}).get("result_list", [])
+
     def query_relevant_documents(
         self, query: str, resources: list[Resource] = []
     ) -> list[Document]:
@@ -86,78 +156,47 @@ class VikingDBKnowledgeBaseProvider(Retriever):
         if not resources:
             return []
 
-        all_documents = {}
-        for resource in resources:
-            resource_id, document_id = parse_uri(resource.uri)
-            request_params = {
-                "resource_id": resource_id,
-                "query": query,
-                "limit": self.retrieval_size,
-                "dense_weight": 0.5,
-                "pre_processing": {
-                    "need_instruction": True,
-                    "rewrite": False,
-                    "return_token_usage": True,
-                },
-                "post_processing": {
-                    "rerank_switch": True,
-                    "chunk_diffusion_count": 0,
-                    "chunk_group": True,
-                    "get_attachment_link": True,
-                },
-            }
-            if document_id:
-                doc_filter = {"op": "must", "field": "doc_id", "conds": [document_id]}
-                query_param = {"doc_filter": doc_filter}
-                request_params["query_param"] = query_param
-
-            method = "POST"
-            path = "/api/knowledge/collection/search_knowledge"
-            info_req = self.prepare_request(
-                method=method, path=path, data=request_params
-            )
-            rsp = requests.request(
-                method=info_req.method,
-                url="http://{}{}".format(self.api_url, info_req.path),
-                headers=info_req.headers,
-                data=info_req.body,
-            )
-
-            try:
-                response = json.loads(rsp.text)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Failed to parse JSON response: {e}")
-
-            if response["code"] != 0:
-                raise ValueError(
-                    f"Failed to query documents from resource: {response['message']}"
-                )
-
-            rsp_data = response.get("data", {})
-
-            if "result_list" not in rsp_data:
-                continue
-
-            result_list = rsp_data["result_list"]
+        return merge_results(
+            [self._search_resource(query, resource) for resource in resources]
+        )
 
-            for item in result_list:
-                doc_info = item.get("doc_info", {})
-                doc_id = doc_info.get("doc_id")
+    async def aquery_relevant_documents(
+        self, query: str, resources: list[Resource] = []
+    ) -> list[Document]:
+        """
+        Query all resources concurrently, at most ``max_concurrency`` at a time.
 
-                if not doc_id:
-                    continue
+        A resource that does not answer within ``timeout`` seconds is skipped and
+        the documents of the other resources are returned; any other error is raised.
+        """
+        if not resources:
+            return []
 
-                if doc_id not in all_documents:
-                    all_documents[doc_id] = Document(
-                        id=doc_id, title=doc_info.get("doc_name"), chunks=[]
-                    )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-                chunk = Chunk(
-                    content=item.get("content", ""), similarity=item.get("score", 0.0)
+        async def search(resource: Resource) -> list[dict]:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(
+                        self._search_resource, query, resource, self.timeout
+                    ),
+                    self.timeout,
                 )
-                all_documents[doc_id].chunks.append(chunk)
 
-        return list(all_documents.values())
+        results = await asyncio.gather(
+            *(search(resource) for resource in resources), return_exceptions=True
+        )
+        result_lists = []
+        for resource, result in zip(resources, results):
+            if isinstance(result, (TimeoutError, requests.Timeout)):
+                logger.warning(
+                    f"VikingDB search of {resource.uri} timed out after {self.timeout}s, skipping it"
+                )
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            result_lists.append(result)
+        return merge_results(result_lists)
 
     def list_resources(self, query: str | None = None) -> list[Resource]:
         """
@@ -166,7 +205,7 @@ class VikingDBKnowledgeBaseProvider(Retriever):
         method = "POST"
         path = "/api/knowledge/collection/list"
         info_req = self.prepare_request(method=method, path=path)
-        rsp = requests.request(
+        rsp = self.session.request(
             method=info_req.method,
             url="http://{}{}".format(self.api_url, info_req.path),
             headers=info_req.headers,
@@ -206,3 +245,39 @@ def parse_uri(uri: str) -> tuple[str, str]:
     if parsed.scheme != "rag":
         raise ValueError(f"Invalid URI: {uri}")
     return parsed.path.split("/")[1], parsed.fragment
+
+
+def merge_results(result_lists: list[list[dict]]) -> list[Document]:
+    """
+    Group search results by document, in resource order, dropping repeated chunks.
+
+    The same chunk comes back once per resource that contains the document; only
+    its highest score is kept.
+    """
+    all_documents: dict[str, Document] = {}
+    seen_chunks: dict[tuple[str, str], Chunk] = {}
+    for result_list in result_lists:
+        for item in result_list:
+            doc_info = item.get("doc_info", {})
+            doc_id = doc_info.get("doc_id")
+
+            if not doc_id:
+                continue
+
+            if doc_id not in all_documents:
+                all_documents[doc_id] = Document(
+                    id=doc_id, title=doc_info.get("doc_name"), chunks=[]
+                )
+
+            content = item.get("content", "")
+            score = item.get("score", 0.0)
+            seen = seen_chunks.get((doc_id, content))
+            if seen is not None:
+                seen.similarity = max(seen.similarity, score)
+                continue
+
+            chunk = Chunk(content=content, similarity=score)
+            seen_chunks[(doc_id, content)] = chunk
+            all_documents[doc_id].chunks.append(chunk)
+
+    return list(all_documents.values())
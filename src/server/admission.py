@@ -0,0 +1,242 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Admission control for chat workflow runs.
+
+Every ``/api/chat/stream`` request is admitted before the graph starts:
+
+- one active run per ``thread_id``; a later request for the same thread waits
+  for it (or is rejected, with ``CHAT_SAME_THREAD_POLICY=reject``), so two runs
+  never interleave on the same checkpointed state;
+- a global budget of concurrent runs, handed out by priority class and fairly
+  across tenants (a ``ResourcePool`` of the dispatch scheduler);
+- bounded queues and a bounded queue time: when the queue is full or a request
+  has waited ``queue_timeout`` seconds it is rejected with 429 and a
+  ``Retry-After`` estimate, so admitted requests never see unbounded delay.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from src.graph_solver.dispatch_scheduler import (
+    DEFAULT_TENANT,
+    DispatchPriority,
+    ResourcePool,
+)
+from src.utils.registry import component_registry
+
+
+class AdmissionRejected(Exception):
+    """The run cannot be admitted now; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Chat run rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _ThreadWaiter:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake):
+        self.granted = False
+        self.wake = wake
+
+
+class AdmissionTicket:
+    """An admitted run; ``release`` frees its thread and global slot (idempotent)."""
+
+    def __init__(
+        self,
+        controller: "AdmissionController",
+        thread_id: str,
+        tenant: str,
+        queued_seconds: float,
+    ):
+        self.controller = controller
+        self.thread_id = thread_id
+        self.tenant = tenant
+        self.queued_seconds = queued_seconds
+        self.started_at = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self.controller._finish(self)
+
+
+class AdmissionController:
+    """Global concurrency budget plus per-thread serialisation of chat runs."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queued: int = 64,
+        queue_timeout: float = 15.0,
+        same_thread_policy: str = "queue",
+        max_queued_per_thread: int = 1,
+    ):
+        if same_thread_policy not in ("queue", "reject"):
+            raise ValueError(f"Unknown same-thread policy: {same_thread_policy}")
+        self.pool = ResourcePool("chat", max_concurrent)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.same_thread_policy = same_thread_policy
+        self.max_queued_per_thread = max_queued_per_thread
+        self._lock = threading.Lock()
+        self._threads: Dict[str, Deque[_ThreadWaiter]] = {}
+        self._admitted = 0
+        self._completed = 0
+        self._rejected = {"queue_full": 0, "queue_timeout": 0, "thread_busy": 0}
+        self._queued_seconds_total = 0.0
+        self._queued_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+
+    # ---- per-thread serialisation ----
+
+    async def _acquire_thread(self, thread_id: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            waiters = self._threads.get(thread_id)
+            if waiters is None:
+                self._threads[thread_id] = deque()
+                return
+            if (
+                self.same_thread_policy == "reject"
+                or len(waiters) >= self.max_queued_per_thread
+            ):
+                self._rejected["thread_busy"] += 1
+                raise AdmissionRejected("thread_busy", self._retry_after())
+            waiter = _ThreadWaiter(
+                lambda: loop.call_soon_threadsafe(
+                    lambda: future.done() or future.set_result(None)
+                )
+            )
+            waiters.append(waiter)
+        try:
+            await future
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self._release_thread_locked(thread_id)
+                else:
+                    waiters.remove(waiter)
+            raise
+
+    def _release_thread_locked(self, thread_id: str):
+        waiters = self._threads.get(thread_id)
+        if waiters:
+            waiter = waiters.popleft()
+            waiter.granted = True
+            waiter.wake()
+        else:
+            self._threads.pop(thread_id, None)
+
+    # ---- admission ----
+
+    def _retry_after(self) -> int:
+        """Estimated seconds until a slot frees up, from the mean run time and queue depth."""
+        mean_run = self._run_seconds_total / self._completed if self._completed else 1.0
+        backlog = (self.pool.queued + 1) / self.pool.limit
+        return max(1, min(60, math.ceil(mean_run * backlog)))
+
+    async def admit(
+        self,
+        thread_id: str,
+        tenant: str = DEFAULT_TENANT,
+        priority: DispatchPriority = DispatchPriority.OPERATOR,
+    ) -> AdmissionTicket:
+        """
+        Wait for the thread and a global slot, both within ``queue_timeout``.
+
+        Raises:
+            AdmissionRejected: If the queue is full, the thread is busy or the wait timed out
+        """
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._acquire_thread(thread_id)
+                try:
+                    with self._lock:
+                        if (
+                            self.pool.in_use >= self.pool.limit
+                            and self.pool.queued >= self.max_queued
+                        ):
+                            self._rejected["queue_full"] += 1
+                            raise AdmissionRejected("queue_full", self._retry_after())
+                    await self.pool.wait_async(tenant, priority)
+                except BaseException:
+                    with self._lock:
+                        self._release_thread_locked(thread_id)
+                    raise
+        except TimeoutError:
+            with self._lock:
+                self._rejected["queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self._retry_after()) from None
+
+        queued_seconds = time.perf_counter() - start
+        with self._lock:
+            self._admitted += 1
+            self._queued_seconds_total += queued_seconds
+            self._queued_seconds_max = max(self._queued_seconds_max, queued_seconds)
+        return AdmissionTicket(self, thread_id, tenant, queued_seconds)
+
+    def _finish(self, ticket: AdmissionTicket):
+        self.pool.release(ticket.tenant)
+        with self._lock:
+            self._completed += 1
+            self._run_seconds_total += time.perf_counter() - ticket.started_at
+            self._release_thread_locked(ticket.thread_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Active and queued runs, rejections by reason and queue-time statistics."""
+        with self._lock:
+            thread_waiting = sum(len(waiters) for waiters in self._threads.values())
+            return {
+                "limit": self.pool.limit,
+                "active": self.pool.in_use,
+                "queued": self.pool.queued,
+                "queued_for_thread": thread_waiting,
+                "active_threads": len(self._threads),
+                "admitted_total": self._admitted,
+                "completed_total": self._completed,
+                "rejected": dict(self._rejected),
+                "avg_queue_ms": (
+                    round(self._queued_seconds_total / self._admitted * 1000, 3)
+                    if self._admitted
+                    else 0.0
+                ),
+                "max_queue_ms": round(self._queued_seconds_max * 1000, 3),
+                "avg_run_ms": (
+                    round(self._run_seconds_total / self._completed * 1000, 3)
+                    if self._completed
+                    else 0.0
+                ),
+                "pool": self.pool.metrics(),
+            }
+
+
+def build_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENT_RUNS", "16")),
+        max_queued=int(os.getenv("CHAT_MAX_QUEUED_RUNS", "64")),
+        queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "15")),
+        same_thread_policy=os.getenv("CHAT_SAME_THREAD_POLICY", "queue"),
+    )
+
+
+component_registry.register("server.admission_controller", build_admission_controller)
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller (created on first use)."""
+    return component_registry.get("server.admission_controller")
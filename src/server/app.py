@@ -1,29 +1,44 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
-import json
 import logging
 import os
-from typing import Annotated, List, cast
+import weakref
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Optional, cast
 from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage, AIMessage
 from langgraph.types import Command
 
 from src.config.report_style import ReportStyle
-from src.config.tools import SELECTED_RAG_PROVIDER
 from src.graph.builder import build_graph_with_memory
+from src.graph_solver.dispatch_scheduler import (
+    DispatchPriority,
+    dispatch_context,
+    get_dispatch_scheduler,
+    to_priority,
+)
 from src.llms.llm import get_configured_llm_models
-from src.podcast.graph.builder import build_graph as build_podcast_graph
-from src.ppt.graph.builder import build_graph as build_ppt_graph
-from src.prompt_enhancer.graph.builder import build_graph as build_prompt_enhancer_graph
-from src.prose.graph.builder import build_graph as build_prose_graph
-from src.rag.builder import build_retriever
+from src.podcast.graph import builder as podcast_builder
+from src.ppt.graph import builder as ppt_builder
+from src.prompt_enhancer.cache import get_enhancer_cache
+from src.prompt_enhancer.graph import builder as prompt_enhancer_builder
+from src.prose.graph import builder as prose_builder
+from src.prompts.template import precompile_templates, prompt_cache_stats
+from src.rag.builder import get_retriever
 from src.rag.retriever import Resource
+from src.server.admission import (
+    AdmissionRejected,
+    AdmissionTicket,
+    get_admission_controller,
+)
 from src.server.chat_request import (
     ChatRequest,
     EnhancePromptRequest,
@@ -33,25 +48,67 @@ from src.server.chat_request import (
     TTSRequest,
 )
 from src.server.config_request import ConfigResponse
+from src.server.dispatch_request import (
+    ParetoFrontRequest,
+    ParetoFrontResponse,
+    RollingDispatchRequest,
+    RollingDispatchResponse,
+    TelemetryRequest,
+    WhatIfRequest,
+    WhatIfResponse,
+)
 from src.server.mcp_request import MCPServerMetadataRequest, MCPServerMetadataResponse
+from src.server.jobs import (
+    JobQueueFull,
+    JobStatus,
+    get_job_manager,
+    podcast_job,
+    ppt_job,
+)
 from src.server.mcp_utils import load_mcp_tools
+from src.server.sse import (
+    build_chunk_coalescer,
+    build_sse_encoder,
+    build_stream_event_logger,
+    coalesce_events,
+)
 from src.server.rag_request import (
     RAGConfigResponse,
     RAGResourceRequest,
     RAGResourcesResponse,
 )
 from src.tools import VolcengineTTS
+from src.tools.mcp_sessions import get_mcp_session_manager
+from src.tools.tts import TTSError
+from src.utils.artifacts import expand_artifacts, get_artifact_store
+from src.utils.registry import component_registry
 
 logger = logging.getLogger(__name__)
 
 INTERNAL_SERVER_ERROR_DETAIL = "Internal Server Error"
 
+sse_encoder = build_sse_encoder()
+stream_event_logger = build_stream_event_logger()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Pooled MCP servers are subprocesses or open streams; do not leave them behind
+    if component_registry.is_built("tools.mcp_session_manager"):
+        await get_mcp_session_manager().close_all()
+
+
 app = FastAPI(
     title="Opt Agent API",
     description="API for Deer",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Compile prompt templates before the first request needs them
+precompile_templates()
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -70,7 +127,16 @@ async def chat_stream(request: ChatRequest):
     thread_id = request.thread_id
     if thread_id == "__default__":
         thread_id = str(uuid4())
-    return StreamingResponse(
+    try:
+        ticket = await get_admission_controller().admit(
+            thread_id, request.tenant_id, to_priority(request.dispatch_priority)
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+    return AdmittedStreamingResponse(
+        ticket,
         _astream_workflow_generator(
             request.model_dump()["messages"],
             thread_id,
@@ -84,11 +150,47 @@ async def chat_stream(request: ChatRequest):
             request.enable_background_investigation,
             request.report_style,
             request.enable_deep_thinking,
+            request.tenant_id,
+            request.dispatch_priority,
+            request.coalesce_ms,
+            request.coalesce_bytes,
         ),
         media_type="text/event-stream",
     )
 
 
+def _release_on_loop(loop: asyncio.AbstractEventLoop, ticket: AdmissionTicket):
+    # Runs from the garbage collector, possibly while the controller lock is held; defer to the loop
+    try:
+        loop.call_soon_threadsafe(ticket.release)
+    except RuntimeError:
+        ticket.release()
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response that holds an admission ticket until the response is over.
+
+    The ticket is released when the response finishes, however it ends: after
+    the body, on a client disconnect, when sending the response start fails
+    before the body is iterated, or when the response is dropped unsent.
+    """
+
+    def __init__(self, ticket: AdmissionTicket, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+        self._finalizer = weakref.finalize(
+            self, _release_on_loop, asyncio.get_running_loop(), ticket
+        )
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._finalizer.detach()
+            self.ticket.release()
+
+
 async def _astream_workflow_generator(
     messages: List[dict],
     thread_id: str,
@@ -102,6 +204,47 @@ async def _astream_workflow_generator(
     enable_background_investigation: bool,
     report_style: ReportStyle,
     enable_deep_thinking: bool,
+    tenant_id: str = "default",
+    dispatch_priority: DispatchPriority = DispatchPriority.OPERATOR,
+    coalesce_ms: Optional[float] = None,
+    coalesce_bytes: Optional[int] = None,
+):
+    events = _astream_workflow_events(
+        messages,
+        thread_id,
+        resources,
+        max_plan_iterations,
+        max_step_num,
+        max_search_results,
+        auto_accepted_plan,
+        interrupt_feedback,
+        mcp_settings,
+        enable_background_investigation,
+        report_style,
+        enable_deep_thinking,
+        tenant_id,
+        dispatch_priority,
+    )
+    coalescer = build_chunk_coalescer(coalesce_ms, coalesce_bytes)
+    async for event_type, data in coalesce_events(events, coalescer):
+        yield _make_event(event_type, data)
+
+
+async def _astream_workflow_events(
+    messages: List[dict],
+    thread_id: str,
+    resources: List[Resource],
+    max_plan_iterations: int,
+    max_step_num: int,
+    max_search_results: int,
+    auto_accepted_plan: bool,
+    interrupt_feedback: str,
+    mcp_settings: dict,
+    enable_background_investigation: bool,
+    report_style: ReportStyle,
+    enable_deep_thinking: bool,
+    tenant_id: str = "default",
+    dispatch_priority: DispatchPriority = DispatchPriority.OPERATOR,
 ):
     input_ = {
         "messages": messages,
@@ -114,7 +257,7 @@ async def _astream_workflow_generator(
         "research_topic": messages[-1]["content"] if messages else "",
         # "prompt": messages[-1]["content"],
     }
-    logger.info(f"input_: {input_}")
+    logger.debug("Starting chat stream for thread %s", thread_id)
     if not auto_accepted_plan and interrupt_feedback:
         resume_msg = f"[{interrupt_feedback}]"
         # add the last message to the resume message
@@ -132,6 +275,8 @@ async def _astream_workflow_generator(
             "mcp_settings": mcp_settings,
             "report_style": report_style.value,
             "enable_deep_thinking": enable_deep_thinking,
+            "tenant_id": tenant_id,
+            "dispatch_priority": to_priority(dispatch_priority).value,
         },
         stream_mode=["messages", "updates", "custom"],
         subgraphs=True,
@@ -140,10 +285,9 @@ async def _astream_workflow_generator(
         agent_name = "vpp"
         if agent and len(agent) > 0:
             agent_name = agent[0].split(":")[0] if ":" in agent[0] else agent[0]
-        logger.info(f"event_data: {event_data}")
         if isinstance(event_data, dict):
             if "__interrupt__" in event_data:
-                yield _make_event(
+                yield (
                     "interrupt",
                     {
                         "thread_id": thread_id,
@@ -156,6 +300,7 @@ async def _astream_workflow_generator(
                             {"text": "Start", "value": "accepted"},
                         ],
                     },
+                    False,
                 )
             # elif ("custom_text" in event_data):
             elif any(k.startswith("custom_text") for k in event_data.keys()):
@@ -171,22 +316,19 @@ async def _astream_workflow_generator(
                     # "content": event_data["custom_text"],
                     "content": content,
                 }
-                yield _make_event("message_chunk", event_stream_message)
-            logger.info(f"filtered event_data: {event_data}")
+                yield "message_chunk", event_stream_message, False
             continue
         message_chunk, message_metadata = cast(
             tuple[BaseMessage, dict[str, any]], event_data
         )
-        logger.info(f"message_chunk: {message_chunk}, type: {type(message_chunk)}")
         # Handle empty agent tuple gracefully
         event_stream_message: dict[str, any] = {
             "thread_id": thread_id,
             "agent": agent_name,
             "id": message_chunk.id,
             "role": "assistant",
-            "content": message_chunk.content,
+            "content": expand_artifacts(message_chunk.content),
         }
-        logger.info(f"event_stream_message: {event_stream_message}")
         if message_chunk.additional_kwargs.get("reasoning_content"):
             event_stream_message["reasoning_content"] = message_chunk.additional_kwargs[
                 "reasoning_content"
@@ -195,11 +337,10 @@ async def _astream_workflow_generator(
             event_stream_message["finish_reason"] = message_chunk.response_metadata.get(
                 "finish_reason"
             )
-        logger.info(f"message chunk: {message_chunk}")
         if isinstance(message_chunk, ToolMessage):
             # Tool Message - Return the result of the tool call
             event_stream_message["tool_call_id"] = message_chunk.tool_call_id
-            yield _make_event("tool_call_result", event_stream_message)
+            yield "tool_call_result", event_stream_message, False
         elif isinstance(message_chunk, AIMessageChunk):
             if agent_name == "coordinator":
                 continue
@@ -210,31 +351,31 @@ async def _astream_workflow_generator(
                 event_stream_message["tool_call_chunks"] = (
                     message_chunk.tool_call_chunks
                 )
-                yield _make_event("tool_calls", event_stream_message)
+                yield "tool_calls", event_stream_message, False
             elif message_chunk.tool_call_chunks:
                 # AI Message - Tool Call Chunks
                 event_stream_message["tool_call_chunks"] = (
                     message_chunk.tool_call_chunks
                 )
-                yield _make_event("tool_call_chunks", event_stream_message)
+                yield "tool_call_chunks", event_stream_message, False
             else:
                 # AI Message - Raw message tokens
-                yield _make_event("message_chunk", event_stream_message)
+                yield "message_chunk", event_stream_message, True
         elif isinstance(message_chunk, AIMessage):
             # AI Message - Raw message tokens
-            yield _make_event("message_chunk", event_stream_message)
+            yield "message_chunk", event_stream_message, False
 
 
 def _make_event(event_type: str, data: dict[str, any]):
-    if data.get("content") == "":
-        data.pop("content")
-    logger.info(f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n")
-    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    frame = sse_encoder.encode(event_type, data)
+    if stream_event_logger.enabled:
+        stream_event_logger.record(
+            event_type, frame, data.get("thread_id"), data.get("agent")
+        )
+    return frame
 
 
-@app.post("/api/tts")
-async def text_to_speech(request: TTSRequest):
-    """Convert text to speech using volcengine TTS API."""
+def _tts_client_from_env() -> VolcengineTTS:
     app_id = os.getenv("VOLCENGINE_TTS_APPID", "")
     if not app_id:
         raise HTTPException(status_code=400, detail="VOLCENGINE_TTS_APPID is not set")
@@ -243,17 +384,21 @@ async def text_to_speech(request: TTSRequest):
         raise HTTPException(
             status_code=400, detail="VOLCENGINE_TTS_ACCESS_TOKEN is not set"
         )
+    return VolcengineTTS(
+        appid=app_id,
+        access_token=access_token,
+        cluster=os.getenv("VOLCENGINE_TTS_CLUSTER", "volcano_tts"),
+        voice_type=os.getenv("VOLCENGINE_TTS_VOICE_TYPE", "BV700_V2_streaming"),
+        api_url=os.getenv("VOLCENGINE_TTS_API_URL") or None,
+    )
+
+
+@app.post("/api/tts")
+async def text_to_speech(request: TTSRequest):
+    """Convert text to speech using volcengine TTS API."""
+    tts_client = _tts_client_from_env()
 
     try:
-        cluster = os.getenv("VOLCENGINE_TTS_CLUSTER", "volcano_tts")
-        voice_type = os.getenv("VOLCENGINE_TTS_VOICE_TYPE", "BV700_V2_streaming")
-
-        tts_client = VolcengineTTS(
-            appid=app_id,
-            access_token=access_token,
-            cluster=cluster,
-            voice_type=voice_type,
-        )
         # Call the TTS API
         result = tts_client.text_to_speech(
             text=request.text[:1024],
@@ -288,13 +433,67 @@ async def text_to_speech(request: TTSRequest):
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
 
 
+# Encodings whose segments can be concatenated into one playable stream
+STREAMABLE_TTS_ENCODINGS = ("mp3", "ogg_opus", "pcm")
+
+
+@app.post("/api/tts/stream")
+async def text_to_speech_stream(request: TTSRequest):
+    """Synthesise text of any length sentence by sentence and stream the audio as segments complete."""
+    if request.encoding not in STREAMABLE_TTS_ENCODINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Streaming supports {', '.join(STREAMABLE_TTS_ENCODINGS)} encodings",
+        )
+    tts_client = _tts_client_from_env()
+    segments = tts_client.stream_speech(
+        request.text,
+        max_concurrency=int(os.getenv("TTS_STREAM_CONCURRENCY", "4")),
+        max_chars=int(os.getenv("TTS_SEGMENT_MAX_CHARS", "300")),
+        encoding=request.encoding,
+        speed_ratio=request.speed_ratio,
+        volume_ratio=request.volume_ratio,
+        pitch_ratio=request.pitch_ratio,
+        text_type=request.text_type,
+        with_frontend=request.with_frontend,
+        frontend_type=request.frontend_type,
+    )
+    # Synthesise the first segment before answering, so an outright failure is still a 500
+    try:
+        first = await run_in_threadpool(next, segments, None)
+    except TTSError as e:
+        logger.error(f"TTS stream failed: {e}")
+        raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
+    if first is None:
+        raise HTTPException(status_code=400, detail="Text is empty")
+    return StreamingResponse(
+        _audio_stream(first, segments),
+        media_type=f"audio/{request.encoding}",
+        headers={
+            "Content-Disposition": f"attachment; filename=tts_output.{request.encoding}"
+        },
+    )
+
+
+def _audio_stream(first: bytes, segments):
+    yield first
+    try:
+        yield from segments
+    except TTSError as e:
+        # Headers are sent already; end the stream with the audio delivered so far
+        logger.error(f"TTS stream stopped early: {e}")
+
+
 @app.post("/api/podcast/generate")
 async def generate_podcast(request: GeneratePodcastRequest):
     try:
         report_content = request.content
         print(report_content)
-        workflow = build_podcast_graph()
-        final_state = workflow.invoke({"input": report_content})
+        workflow = podcast_builder.workflow
+        # Keep the event loop free for other clients; prefer /api/jobs/podcast for long inputs
+        final_state = await run_in_threadpool(
+            workflow.invoke, {"input": report_content}
+        )
         audio_bytes = final_state["output"]
         return Response(content=audio_bytes, media_type="audio/mp3")
     except Exception as e:
@@ -307,8 +506,10 @@ async def generate_ppt(request: GeneratePPTRequest):
     try:
         report_content = request.content
         print(report_content)
-        workflow = build_ppt_graph()
-        final_state = workflow.invoke({"input": report_content})
+        workflow = ppt_builder.workflow
+        final_state = await run_in_threadpool(
+            workflow.invoke, {"input": report_content}
+        )
         generated_file_path = final_state["generated_file_path"]
         with open(generated_file_path, "rb") as f:
             ppt_bytes = f.read()
@@ -321,12 +522,64 @@ async def generate_ppt(request: GeneratePPTRequest):
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
 
 
+@app.post("/api/jobs/podcast", status_code=202)
+async def submit_podcast_job(request: GeneratePodcastRequest):
+    """Queue a podcast generation; poll /api/jobs/{job_id} and download its result."""
+    return _submit_job("podcast", podcast_job(request.content))
+
+
+@app.post("/api/jobs/ppt", status_code=202)
+async def submit_ppt_job(request: GeneratePPTRequest):
+    """Queue a PPT generation; poll /api/jobs/{job_id} and download its result."""
+    return _submit_job("ppt", ppt_job(request.content))
+
+
+def _submit_job(kind: str, func):
+    try:
+        return get_job_manager().submit(kind, func).to_dict()
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": "30"}
+        )
+
+
+# Declared before /api/jobs/{job_id} so "metrics" is not taken for a job id
+@app.get("/api/jobs/metrics")
+async def job_metrics():
+    """Get job counts by status and the pending-job limit of the background job queue."""
+    return get_job_manager().metrics()
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status and progress of a background job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def download_job_result(job_id: str):
+    """Download the result of a finished job."""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    path = manager.result_path(job)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Job result expired")
+    return FileResponse(path, media_type=job.media_type, filename=job.filename)
+
+
 @app.post("/api/prose/generate")
 async def generate_prose(request: GenerateProseRequest):
     try:
         sanitized_prompt = request.prompt.replace("\r\n", "").replace("\n", "")
         logger.info(f"Generating prose for prompt: {sanitized_prompt}")
-        workflow = build_prose_graph()
+        workflow = prose_builder.workflow
         events = workflow.astream(
             {
                 "content": request.prompt,
@@ -371,13 +624,15 @@ async def enhance_prompt(request: EnhancePromptRequest):
         else:
             report_style = ReportStyle.ACADEMIC
 
-        workflow = build_prompt_enhancer_graph()
-        final_state = workflow.invoke(
+        workflow = prompt_enhancer_builder.workflow
+        # In a worker thread, so concurrent identical requests can share one cached LLM call
+        final_state = await run_in_threadpool(
+            workflow.invoke,
             {
                 "prompt": request.prompt,
                 "context": request.context,
                 "report_style": report_style,
-            }
+            },
         )
         return {"result": final_state["output"]}
     except Exception as e:
@@ -385,6 +640,12 @@ async def enhance_prompt(request: EnhancePromptRequest):
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
 
 
+@app.get("/api/prompt/enhance/metrics")
+async def enhance_prompt_metrics():
+    """Get hit rate and size of the prompt enhancer response cache."""
+    return get_enhancer_cache().stats()
+
+
 @app.post("/api/mcp/server/metadata", response_model=MCPServerMetadataResponse)
 async def mcp_server_metadata(request: MCPServerMetadataRequest):
     """Get information about an MCP server."""
@@ -425,22 +686,194 @@ async def mcp_server_metadata(request: MCPServerMetadataRequest):
 @app.get("/api/rag/config", response_model=RAGConfigResponse)
 async def rag_config():
     """Get the config of the RAG."""
-    return RAGConfigResponse(provider=SELECTED_RAG_PROVIDER)
+    return RAGConfigResponse(provider=os.getenv("RAG_PROVIDER"))
 
 
 @app.get("/api/rag/resources", response_model=RAGResourcesResponse)
 async def rag_resources(request: Annotated[RAGResourceRequest, Query()]):
     """Get the resources of the RAG."""
-    retriever = build_retriever()
+    retriever = get_retriever()
     if retriever:
-        return RAGResourcesResponse(resources=retriever.list_resources(request.query))
+        resources = await run_in_threadpool(retriever.list_resources, request.query)
+        return RAGResourcesResponse(resources=resources)
     return RAGResourcesResponse(resources=[])
 
 
+@app.get("/api/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str):
+    """Fetch a stored artefact (e.g. an ECharts configuration) by its content hash."""
+    entry = get_artifact_store().get(artifact_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=404, detail=f"Artifact not found: {artifact_id}"
+        )
+    content, media_type = entry
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+@app.get("/api/chat/metrics")
+async def chat_metrics():
+    """Get active and queued chat runs, rejections and queue times of admission control."""
+    return get_admission_controller().metrics()
+
+
+@app.get("/api/prompts/metrics")
+async def prompt_metrics():
+    """Get prompt template memoisation counters and the prefix-cache-friendly ratio."""
+    return prompt_cache_stats()
+
+
+@app.get("/api/dispatch/metrics")
+async def dispatch_metrics():
+    """Get queue depth and wait times of the dispatch scheduler pools."""
+    return get_dispatch_scheduler().metrics()
+
+
+@app.post("/api/dispatch/pareto", response_model=ParetoFrontResponse)
+async def dispatch_pareto(request: ParetoFrontRequest):
+    """Compute the credit / direct-control / cost Pareto front for a fleet."""
+    # Imported here so numpy is not loaded at server start-up
+    from src.graph_solver.pareto import ParetoProblem, pareto_front
+
+    try:
+        problem = ParetoProblem(
+            device_names=request.device_names,
+            capacity=request.response_capacity,
+            credit=request.credit_scores,
+            direct_control=request.direct_control,
+            cost=request.response_cost,
+            demand=request.total_demand,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    with dispatch_context(request.tenant_id, request.dispatch_priority):
+        async with get_dispatch_scheduler().slot_async("solver"):
+            # CPU-bound; keep the event loop serving other clients
+            front = await asyncio.to_thread(
+                pareto_front,
+                problem,
+                method=request.method,
+                steps=request.steps,
+                response_price=request.response_price,
+            )
+    return ParetoFrontResponse(**front)
+
+
+@app.post("/api/dispatch/what-if", response_model=WhatIfResponse)
+async def dispatch_what_if(request: WhatIfRequest):
+    """Answer a small demand or capacity change from the last solve's sensitivity data."""
+    from src.graph_solver.sensitivity import answer_what_if
+
+    sensitivity = request.sensitivity
+    if sensitivity is None and request.thread_id:
+        snapshot = await graph.aget_state(
+            {"configurable": {"thread_id": request.thread_id}}
+        )
+        sensitivity = (snapshot.values or {}).get("dispatch_sensitivity")
+    if not sensitivity:
+        raise HTTPException(
+            status_code=404, detail="No sensitivity data available for this request"
+        )
+    try:
+        return WhatIfResponse(
+            **answer_what_if(
+                sensitivity, request.parameter, request.delta, device=request.device
+            )
+        )
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/dispatch/rolling", response_model=RollingDispatchResponse)
+async def start_rolling_dispatch(request: RollingDispatchRequest):
+    """Start re-dispatching the remaining intervals of a response window."""
+    from src.graph_solver.rolling_horizon import (
+        RollingDispatchSession,
+        get_rolling_dispatcher,
+    )
+
+    formulation, allocation = request.formulation, request.allocation
+    if formulation is None and request.thread_id:
+        snapshot = await graph.aget_state(
+            {"configurable": {"thread_id": request.thread_id}}
+        )
+        values = snapshot.values or {}
+        formulation = values.get("dispatch_formulation")
+        allocation = allocation or values.get("dispatch_allocation")
+    if not formulation:
+        raise HTTPException(
+            status_code=404, detail="No dispatch formulation available for this request"
+        )
+    try:
+        session = RollingDispatchSession(
+            formulation,
+            allocation=allocation,
+            start_time=request.start_time,
+            end_time=request.end_time,
+            plan_date=request.plan_date,
+            response_price=request.response_price,
+            tenant=request.tenant_id,
+            priority=request.dispatch_priority,
+            storage=request.storage or formulation.get("storage"),
+            initial_soc=request.initial_soc,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RollingDispatchResponse(session_id=get_rolling_dispatcher().start(session))
+
+
+@app.post("/api/dispatch/rolling/{session_id}/telemetry")
+async def rolling_dispatch_telemetry(session_id: str, request: TelemetryRequest):
+    """Push telemetry to a re-dispatch session and trigger a re-solve."""
+    from src.graph_solver.rolling_horizon import TelemetryUpdate, get_rolling_dispatcher
+
+    try:
+        get_rolling_dispatcher().submit_telemetry(
+            session_id,
+            [TelemetryUpdate(**item.model_dump()) for item in request.updates],
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"session_id": session_id, "accepted": len(request.updates)}
+
+
+@app.get("/api/dispatch/rolling/{session_id}/deltas")
+async def rolling_dispatch_deltas(session_id: str):
+    """Stream the plan deltas of a re-dispatch session."""
+    from src.graph_solver.rolling_horizon import get_rolling_dispatcher
+
+    try:
+        queue = get_rolling_dispatcher().subscribe(session_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def stream():
+        while (delta := await queue.get()) is not None:
+            yield _make_event("error" if "error" in delta else "plan_delta", delta)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.delete("/api/dispatch/rolling/{session_id}")
+async def stop_rolling_dispatch(session_id: str):
+    """Stop a re-dispatch session."""
+    from src.graph_solver.rolling_horizon import get_rolling_dispatcher
+
+    try:
+        await get_rolling_dispatcher().stop(session_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"session_id": session_id, "stopped": True}
+
+
 @app.get("/api/config", response_model=ConfigResponse)
 async def config():
     """Get the config of the server."""
     return ConfigResponse(
-        rag=RAGConfigResponse(provider=SELECTED_RAG_PROVIDER),
+        rag=RAGConfigResponse(provider=os.getenv("RAG_PROVIDER")),
         models=get_configured_llm_models(),
     )
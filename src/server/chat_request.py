@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 
 from src.rag.retriever import Resource
 from src.config.report_style import ReportStyle
+from src.graph_solver.dispatch_scheduler import DispatchPriority
 
 
 class ContentItem(BaseModel):
@@ -65,6 +66,23 @@ class ChatRequest(BaseModel):
     enable_deep_thinking: Optional[bool] = Field(
         False, description="Whether to enable deep thinking"
     )
+    tenant_id: Optional[str] = Field(
+        "default", description="The aggregator or VPP portfolio issuing the request"
+    )
+    dispatch_priority: Optional[DispatchPriority] = Field(
+        DispatchPriority.OPERATOR,
+        description="The priority class of the dispatch request",
+    )
+    coalesce_ms: Optional[float] = Field(
+        None,
+        ge=0,
+        description="Window for merging token chunks of a message, 0 disables (default from server)",
+    )
+    coalesce_bytes: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Flush merged token chunks once they reach this many bytes",
+    )
 
 
 class TTSRequest(BaseModel):
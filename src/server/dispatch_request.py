@@ -0,0 +1,159 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from src.graph_solver.dispatch_scheduler import DispatchPriority
+
+
+class ParetoFrontRequest(BaseModel):
+    """Request model for credit-versus-cost Pareto front generation."""
+
+    device_names: List[str] = Field(..., description="The devices of the VPP fleet")
+    response_capacity: List[float] = Field(
+        ..., description="The dispatchable capacity of each device (MW)"
+    )
+    credit_scores: List[float] = Field(
+        ..., description="The credit score of each device's user"
+    )
+    direct_control: List[float] = Field(
+        ..., description="Whether each device is directly controllable (1 or 0)"
+    )
+    response_cost: List[float] = Field(
+        ..., description="The response cost of each device (10k CNY/MW)"
+    )
+    total_demand: float = Field(..., description="The total response demand (MW)")
+    method: Literal["weighted_sum", "epsilon_constraint"] = Field(
+        "weighted_sum", description="The sweep used to build the front"
+    )
+    # A weighted-sum sweep solves (steps + 1)(steps + 2) / 2 weight vectors
+    steps: int = Field(10, ge=1, le=50, description="The number of sweep divisions")
+    response_price: float = Field(3.0, description="The response price used for profit")
+    tenant_id: Optional[str] = Field(
+        "default", description="The aggregator or VPP portfolio issuing the request"
+    )
+    dispatch_priority: Optional[DispatchPriority] = Field(
+        DispatchPriority.WHAT_IF, description="The priority class of the request"
+    )
+
+
+class ParetoPoint(BaseModel):
+    """A non-dominated allocation on the Pareto front."""
+
+    weights: Optional[Dict[str, float]] = Field(
+        None, description="The objective weights that produced this point"
+    )
+    cost_budget: Optional[float] = Field(
+        None, description="The cost bound that produced this point"
+    )
+    allocation: Dict[str, float] = Field(
+        ..., description="The allocation per device (MW)"
+    )
+    credit: float = Field(..., description="The capacity-weighted average credit score")
+    direct_control: float = Field(
+        ..., description="The share of demand served by directly controllable devices"
+    )
+    cost: float = Field(..., description="The total response cost")
+    profit: float = Field(..., description="The total response profit")
+    device_profit: Dict[str, float] = Field(..., description="The profit per device")
+
+
+class ParetoFrontResponse(BaseModel):
+    """Response model for Pareto front generation."""
+
+    method: str = Field(..., description="The sweep used to build the front")
+    evaluated: int = Field(..., description="The number of sweep points solved")
+    points: List[ParetoPoint] = Field(..., description="The non-dominated allocations")
+
+
+class WhatIfRequest(BaseModel):
+    """Request model for answering a what-if query from sensitivity data."""
+
+    thread_id: Optional[str] = Field(
+        None, description="The conversation whose last dispatch result is queried"
+    )
+    sensitivity: Optional[Dict[str, Any]] = Field(
+        None, description="Sensitivity data to use instead of the thread's last result"
+    )
+    parameter: Literal["demand", "capacity"] = Field(
+        ..., description="The parameter that changes"
+    )
+    delta: float = Field(..., description="The change of the parameter (MW)")
+    device: Optional[str] = Field(
+        None, description="The device whose capacity changes (for capacity)"
+    )
+
+
+class WhatIfResponse(BaseModel):
+    """Response model for a what-if query."""
+
+    answerable: bool = Field(
+        ..., description="Whether the change is within the current optimal basis"
+    )
+    profit_delta: Optional[float] = Field(None, description="The change of profit")
+    allocation: Optional[Dict[str, float]] = Field(
+        None, description="The allocation after the change (MW)"
+    )
+    explanation: str = Field(..., description="A short explanation of the answer")
+
+
+class RollingDispatchRequest(BaseModel):
+    """Request model for starting a rolling-horizon re-dispatch session."""
+
+    thread_id: Optional[str] = Field(
+        None, description="The conversation whose last dispatch result is reused"
+    )
+    formulation: Optional[Dict[str, Any]] = Field(
+        None, description="The formulation to reuse instead of the thread's last result"
+    )
+    allocation: Optional[Dict[str, float]] = Field(
+        None, description="The current allocation per device (MW)"
+    )
+    start_time: str = Field("16:00:00", description="The start of the response window")
+    end_time: str = Field("17:00:00", description="The end of the response window")
+    plan_date: Optional[date] = Field(
+        None, description="The date of the response event"
+    )
+    response_price: float = Field(3.0, description="The response price used for profit")
+    storage: Optional[Dict[str, Dict[str, float]]] = Field(
+        None,
+        description="The storage parameters per device (rated_power_kw, "
+        "energy_capacity_kwh, initial_soc, soc_min, soc_max); "
+        "defaults to STORAGE_DEVICES in conf.yaml",
+    )
+    initial_soc: Optional[Dict[str, float]] = Field(
+        None, description="The current state of charge per storage device (0-1)"
+    )
+    tenant_id: Optional[str] = Field(
+        "default", description="The aggregator or VPP portfolio issuing the request"
+    )
+    dispatch_priority: Optional[DispatchPriority] = Field(
+        DispatchPriority.GRID_EVENT, description="The priority class of the re-dispatch"
+    )
+
+
+class RollingDispatchResponse(BaseModel):
+    """Response model for a rolling-horizon re-dispatch session."""
+
+    session_id: str = Field(..., description="The re-dispatch session identifier")
+
+
+class TelemetryItem(BaseModel):
+    """A telemetry reading for one device."""
+
+    device: str = Field(..., description="The device identifier")
+    time: datetime = Field(..., description="The time of the reading")
+    power_kw: Optional[float] = Field(None, description="The measured power (kW)")
+    available_mw: Optional[float] = Field(
+        None, description="The currently available response capacity (MW)"
+    )
+    soc: Optional[float] = Field(None, description="The storage state of charge (0-1)")
+
+
+class TelemetryRequest(BaseModel):
+    """Request model for pushing telemetry to a re-dispatch session."""
+
+    updates: List[TelemetryItem] = Field(..., description="The telemetry readings")
@@ -0,0 +1,292 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Background jobs for long-running generations (podcast audio, PPT files).
+
+The podcast and PPT workflows make many blocking LLM and TTS calls and run
+``marp`` in a subprocess; running them in a request handler would hold an
+event-loop thread for minutes. A job is submitted instead and runs on a
+bounded worker pool. Clients poll its status and progress, then download the
+result, which is stored on local disk and removed after a TTL. Job metadata
+is written next to the result so it survives a restart of the API process.
+"""
+
+import enum
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.utils.registry import component_registry
+
+logger = logging.getLogger(__name__)
+
+# A job function receives a progress callback and returns (content, filename, media_type)
+ProgressCallback = Callable[[float, str], None]
+JobFunction = Callable[[ProgressCallback], Tuple[bytes, str, str]]
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting for a worker."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: JobStatus = JobStatus.QUEUED
+    progress: float = 0.0
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    filename: Optional[str] = None
+    media_type: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+
+class JobManager:
+    """Runs job functions on a thread pool and keeps their results on disk for ``ttl_seconds``."""
+
+    def __init__(
+        self,
+        root: str,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        ttl_seconds: float = 86400,
+    ):
+        self.root = root
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def _save(self, job: Job):
+        os.makedirs(self._dir(job.id), exist_ok=True)
+        tmp_path = os.path.join(
+            self._dir(job.id), f"job.json.{threading.get_ident()}.tmp"
+        )
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, os.path.join(self._dir(job.id), "job.json"))
+
+    def _update(self, job: Job, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            if job.finished:
+                job.finished_at = job.updated_at
+        self._save(job)
+
+    def submit(self, kind: str, func: JobFunction) -> Job:
+        """
+        Queue a job and return it immediately.
+
+        Raises:
+            JobQueueFull: If ``max_pending`` jobs are already queued or running
+        """
+        self.purge_expired()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs are pending, try again later")
+            job = Job(id=uuid.uuid4().hex, kind=kind)
+            self._jobs[job.id] = job
+        self._save(job)
+        self._executor.submit(self._execute, job, func)
+        return job
+
+    def _execute(self, job: Job, func: JobFunction):
+        self._update(job, status=JobStatus.RUNNING, stage="started")
+        try:
+            content, filename, media_type = func(
+                lambda progress, stage: self._update(
+                    job, progress=round(min(progress, 0.99), 3), stage=stage
+                )
+            )
+            with open(os.path.join(self._dir(job.id), filename), "wb") as f:
+                f.write(content)
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            self._update(
+                job,
+                status=JobStatus.FAILED,
+                stage=None,
+                error=str(e) or type(e).__name__,
+            )
+        else:
+            self._update(
+                job,
+                status=JobStatus.SUCCEEDED,
+                progress=1.0,
+                stage="done",
+                filename=filename,
+                media_type=media_type,
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job, loading it from disk when it was created by an earlier process."""
+        if not job_id.isalnum():
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        try:
+            with open(
+                os.path.join(self._dir(job_id), "job.json"), encoding="utf-8"
+            ) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        job = Job(**{**data, "status": JobStatus(data["status"])})
+        if not job.finished:
+            # Its worker died with the previous process
+            job.status, job.error, job.finished_at = (
+                JobStatus.FAILED,
+                "interrupted by a server restart",
+                time.time(),
+            )
+        return job
+
+    def result_path(self, job: Job) -> Optional[str]:
+        if job.status != JobStatus.SUCCEEDED or not job.filename:
+            return None
+        path = os.path.join(self._dir(job.id), job.filename)
+        return path if os.path.exists(path) else None
+
+    def purge_expired(self, force: bool = False) -> int:
+        """Delete finished jobs older than the TTL; runs at most once a minute unless forced."""
+        now = time.time()
+        if not force and now - self._last_purge < 60:
+            return 0
+        self._last_purge = now
+        expired = []
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if job.finished and now - job.finished_at > self.ttl_seconds:
+                    expired.append(self._jobs.pop(job_id).id)
+        if os.path.isdir(self.root):
+            for job_id in os.listdir(self.root):
+                if job_id not in self._jobs and job_id not in expired:
+                    if now - os.path.getmtime(self._dir(job_id)) > self.ttl_seconds:
+                        expired.append(job_id)
+        for job_id in expired:
+            shutil.rmtree(self._dir(job_id), ignore_errors=True)
+        return len(expired)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+        return {
+            "jobs": counts,
+            "max_pending": self.max_pending,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def run_workflow_with_progress(
+    workflow, inputs: dict, stages: Iterable[str], report: ProgressCallback
+) -> dict:
+    """Stream a workflow, reporting progress after each node in ``stages``, and return the final state."""
+    stages = list(stages)
+    final_state = dict(inputs)
+    for mode, chunk in workflow.stream(inputs, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+            continue
+        for node in chunk:
+            if node in stages:
+                report((stages.index(node) + 1) / len(stages), node)
+    return final_state
+
+
+def podcast_job(content: str) -> JobFunction:
+    def run(report: ProgressCallback):
+        from src.podcast.graph import builder
+
+        state = run_workflow_with_progress(
+            builder.workflow,
+            {"input": content},
+            ["script_writer", "tts", "audio_mixer"],
+            report,
+        )
+        return state["output"], "podcast.mp3", "audio/mp3"
+
+    return run
+
+
+def ppt_job(content: str) -> JobFunction:
+    def run(report: ProgressCallback):
+        from src.ppt.graph import builder
+
+        state = run_workflow_with_progress(
+            builder.workflow,
+            {"input": content},
+            ["ppt_composer", "ppt_generator"],
+            report,
+        )
+        path = state["generated_file_path"]
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        return (
+            data,
+            "presentation.pptx",
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        )
+
+    return run
+
+
+def build_job_manager() -> JobManager:
+    return JobManager(
+        os.getenv("JOB_STORE_DIR", os.path.join("data", "jobs")),
+        max_workers=int(os.getenv("JOB_WORKERS", "2")),
+        max_pending=int(os.getenv("JOB_MAX_PENDING", "32")),
+        ttl_seconds=float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400")),
+    )
+
+
+component_registry.register("server.job_manager", build_job_manager)
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager (created on first use)."""
+    return component_registry.get("server.job_manager")
@@ -0,0 +1,256 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Server-sent event encoding for the chat stream.
+
+Every streamed token becomes one SSE event, so the per-event cost matters:
+events are serialised exactly once, with a reused encoder and cached
+``event: <type>`` prefixes. ``SSE_JSON_BACKEND=orjson`` switches to orjson,
+which is several times faster but emits compact JSON (no space after ``:``
+and ``,``); the default keeps the stdlib byte format clients have seen so far.
+
+Consecutive token chunks of one message are merged by ``ChunkCoalescer``
+before encoding, so the client receives a few larger ``message_chunk`` events
+instead of one per token.
+
+Stream events are not logged at INFO. ``StreamEventLogger`` writes structured,
+size-capped DEBUG records for a sample of token events and for every other
+event type.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Token-level events dominate the stream and are sampled; everything else is always logged
+SAMPLED_EVENT_TYPES = frozenset({"message_chunk", "tool_call_chunks"})
+
+# (event_type, data, mergeable); only plain token chunks are mergeable
+StreamEvent = Tuple[str, Dict[str, Any], bool]
+
+
+def _load_backend(name: str) -> Callable[[Any], str]:
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            logger.warning(
+                "SSE_JSON_BACKEND=orjson but orjson is not installed, using json"
+            )
+        else:
+            dumps = orjson.dumps
+            return lambda data: dumps(data, default=str).decode("utf-8")
+    elif name != "json":
+        raise ValueError(f"Unknown SSE JSON backend: {name}")
+    return json.JSONEncoder(ensure_ascii=False).encode
+
+
+class SSEEncoder:
+    """Serialises stream events into SSE frames."""
+
+    def __init__(self, backend: str = "json"):
+        self.backend = backend
+        self._dumps = _load_backend(backend)
+        self._prefixes: Dict[str, str] = {}
+
+    def encode(self, event_type: str, data: Dict[str, Any]) -> str:
+        if data.get("content") == "":
+            data.pop("content")
+        prefix = self._prefixes.get(event_type)
+        if prefix is None:
+            prefix = self._prefixes[event_type] = f"event: {event_type}\ndata: "
+        return prefix + self._dumps(data) + "\n\n"
+
+
+class StreamEventLogger:
+    """Sampled, size-capped DEBUG logging of stream events."""
+
+    def __init__(
+        self,
+        sample_every: int = 100,
+        max_chars: int = 512,
+        log: logging.Logger = logger,
+    ):
+        self.sample_every = max(1, sample_every)
+        self.max_chars = max_chars
+        self.log = log
+        self._seen = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.log.isEnabledFor(logging.DEBUG)
+
+    def record(self, event_type: str, frame: str, thread_id: str, agent: str):
+        """Log one encoded event if it is picked by the sampler; call only when ``enabled``."""
+        self._seen += 1
+        if event_type in SAMPLED_EVENT_TYPES and self._seen % self.sample_every:
+            return
+        preview = frame[frame.find("data: ") + 6 :].rstrip("\n")
+        if len(preview) > self.max_chars:
+            preview = (
+                preview[: self.max_chars]
+                + f"...(+{len(preview) - self.max_chars} chars)"
+            )
+        self.log.debug(
+            "stream event type=%s thread=%s agent=%s bytes=%d data=%s",
+            event_type,
+            thread_id,
+            agent,
+            len(frame),
+            preview,
+            extra={
+                "event_type": event_type,
+                "thread_id": thread_id,
+                "agent": agent,
+                "frame_bytes": len(frame),
+                "events_seen": self._seen,
+                "data_preview": preview,
+            },
+        )
+
+
+class ChunkCoalescer:
+    """
+    Buffers consecutive ``message_chunk`` events of one message and merges them.
+
+    The buffer is flushed when it holds ``max_bytes`` of text, when it is older
+    than ``max_delay_ms``, when the message finishes, and before any other
+    event, so event order is preserved. A window of 0 disables coalescing.
+    """
+
+    def __init__(self, max_delay_ms: float = 30, max_bytes: int = 512):
+        self.max_delay = max_delay_ms / 1000
+        self.max_bytes = max_bytes
+        self._buffer: Optional[Dict[str, Any]] = None
+        self._buffer_bytes = 0
+        self._deadline = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_delay > 0 and self.max_bytes > 0
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the buffer must be flushed, or None when it is empty."""
+        if self._buffer is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def push(
+        self, event_type: str, data: Dict[str, Any], mergeable: bool
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Add an event and return the events that are ready to be sent, in order."""
+        if not mergeable or event_type != "message_chunk":
+            return self.flush() + [(event_type, data)]
+        ready = []
+        buffer = self._buffer
+        if buffer is not None and (
+            buffer.get("id") != data.get("id")
+            or buffer.get("agent") != data.get("agent")
+        ):
+            ready = self.flush()
+            buffer = None
+        if buffer is None:
+            self._buffer = buffer = dict(data)
+            self._buffer_bytes = 0
+            self._deadline = time.monotonic() + self.max_delay
+        else:
+            for key in ("content", "reasoning_content"):
+                if data.get(key):
+                    buffer[key] = (buffer.get(key) or "") + data[key]
+            if "finish_reason" in data:
+                buffer["finish_reason"] = data["finish_reason"]
+        self._buffer_bytes += sum(
+            len(data[key].encode("utf-8"))
+            for key in ("content", "reasoning_content")
+            if data.get(key)
+        )
+        if (
+            "finish_reason" in buffer
+            or self._buffer_bytes >= self.max_bytes
+            or time.monotonic() >= self._deadline
+        ):
+            ready += self.flush()
+        return ready
+
+    def flush(self) -> List[Tuple[str, Dict[str, Any]]]:
+        if self._buffer is None:
+            return []
+        buffer, self._buffer = self._buffer, None
+        return [("message_chunk", buffer)]
+
+
+async def coalesce_events(
+    events: AsyncIterator[StreamEvent], coalescer: ChunkCoalescer
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (event_type, data) from a stream of StreamEvent, merging token chunks.
+
+    The buffer is also flushed when the upstream is idle for the rest of the
+    window, so a stalled model does not hold back text already received.
+    """
+    if not coalescer.enabled:
+        async for event_type, data, _ in events:
+            yield event_type, data
+        return
+
+    iterator = events.__aiter__()
+    # Every step of the upstream generator runs in the same context, as it would without the timer
+    context = contextvars.copy_context()
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.create_task(anext(iterator), context=context)
+            done, _ = await asyncio.wait({pending}, timeout=coalescer.time_left())
+            if not done:
+                for event in coalescer.flush():
+                    yield event
+                continue
+            task, pending = pending, None
+            try:
+                event_type, data, mergeable = task.result()
+            except StopAsyncIteration:
+                break
+            for event in coalescer.push(event_type, data, mergeable):
+                yield event
+        for event in coalescer.flush():
+            yield event
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def build_sse_encoder() -> SSEEncoder:
+    return SSEEncoder(os.getenv("SSE_JSON_BACKEND", "json"))
+
+
+def build_stream_event_logger() -> StreamEventLogger:
+    return StreamEventLogger(
+        sample_every=int(os.getenv("SSE_LOG_SAMPLE_EVERY", "100")),
+        max_chars=int(os.getenv("SSE_LOG_MAX_CHARS", "512")),
+    )
+
+
+def build_chunk_coalescer(
+    max_delay_ms: Optional[float] = None, max_bytes: Optional[int] = None
+) -> ChunkCoalescer:
+    """Coalescer for one stream; per-request values override the environment defaults."""
+    return ChunkCoalescer(
+        max_delay_ms=(
+            float(os.getenv("STREAM_COALESCE_MS", "30"))
+            if max_delay_ms is None
+            else max_delay_ms
+        ),
+        max_bytes=(
+            int(os.getenv("STREAM_COALESCE_BYTES", "512"))
+            if max_bytes is None
+            else max_bytes
+        ),
+    )
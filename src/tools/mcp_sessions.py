@@ -0,0 +1,343 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Pool of long-lived MCP client sessions.
+
+Starting an MCP server (spawning a stdio subprocess or opening an SSE stream),
+running the handshake and listing tools is far more expensive than calling a
+tool. Sessions are therefore kept warm, keyed by server config, and shared by
+every agent step and request that uses the same server. Tool listings are
+cached for a TTL, sessions are pinged before reuse once the health-check
+interval has passed, and dead servers are restarted transparently. Sessions
+idle for longer than ``idle_ttl_seconds`` are closed, at most ``max_sessions``
+are kept (least recently used first out), and ``close_all`` runs on shutdown.
+
+Each session is owned by a background task: MCP transports are anyio task
+groups that must be exited by the task that entered them.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+
+from src.utils.registry import component_registry
+
+logger = logging.getLogger(__name__)
+
+# Tool metadata entry identifying the client session a converted MCP tool calls
+MCP_SESSION_METADATA_KEY = "mcp_session_id"
+
+_tools_changed_listeners: List[Callable[[List[str]], Any]] = []
+
+
+def on_tools_changed(callback: Callable[[List[str]], Any]):
+    """Register a callback invoked with the tool names of a server whose session was restarted."""
+    _tools_changed_listeners.append(callback)
+
+
+def _notify_tools_changed(tool_names: List[str]):
+    for callback in _tools_changed_listeners:
+        try:
+            callback(tool_names)
+        except Exception as e:
+            logger.warning(f"MCP tools-changed listener failed: {e}")
+
+
+class MCPServerSession:
+    """A warm connection to one MCP server."""
+
+    def __init__(
+        self,
+        name: str,
+        connection: dict,
+        client_factory: Callable = MultiServerMCPClient,
+    ):
+        self.name = name
+        self.connection = connection
+        self.client_factory = client_factory
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.client = None
+        self.session = None
+        self.started_at: Optional[float] = None
+        self.last_health_check = 0.0
+        self.last_used = time.monotonic()
+        self._langchain_tools: List[BaseTool] = []
+        self._mcp_tools: Optional[list] = None
+        self._listed_at = 0.0
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def start(self, timeout: float):
+        """Connect to the server and wait until its tools are listed."""
+        self.loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(
+                f"MCP server '{self.name}' did not start within {timeout}s"
+            ) from None
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            # The client mutates the connection (e.g. adds PATH to env), keep ours intact
+            async with self.client_factory(
+                {self.name: copy.deepcopy(self.connection)}
+            ) as client:
+                self.client = client
+                self.session = getattr(client, "sessions", {}).get(self.name)
+                self._langchain_tools = self._tag(client.get_tools())
+                self._listed_at = self.last_health_check = self.started_at = (
+                    time.monotonic()
+                )
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning(f"MCP server '{self.name}' session ended: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def healthy(self, timeout: float) -> bool:
+        """Ping the server; a session without a ping-capable client is healthy while alive."""
+        if not self.alive:
+            return False
+        if self.session is not None:
+            try:
+                await asyncio.wait_for(self.session.send_ping(), timeout)
+            except Exception as e:
+                logger.warning(f"MCP server '{self.name}' failed health check: {e}")
+                return False
+        self.last_health_check = time.monotonic()
+        return True
+
+    def _tag(self, tools) -> List[BaseTool]:
+        """Record which client session each tool calls; otherwise only its coroutine knows."""
+        tools = list(tools)
+        for tool in tools:
+            tool.metadata = {
+                **(getattr(tool, "metadata", None) or {}),
+                MCP_SESSION_METADATA_KEY: id(self.session),
+            }
+        return tools
+
+    async def _refresh(self):
+        listed = await self.session.list_tools()
+        self._mcp_tools = list(listed.tools)
+        self._langchain_tools = self._tag(
+            convert_mcp_tool_to_langchain_tool(self.session, t) for t in self._mcp_tools
+        )
+        self._listed_at = time.monotonic()
+
+    async def langchain_tools(self, ttl: float) -> List[BaseTool]:
+        if self.session is not None and time.monotonic() - self._listed_at > ttl:
+            await self._refresh()
+        return list(self._langchain_tools)
+
+    async def mcp_tools(self, ttl: float) -> list:
+        if self.session is not None and (
+            self._mcp_tools is None or time.monotonic() - self._listed_at > ttl
+        ):
+            await self._refresh()
+        return list(self._mcp_tools or [])
+
+    async def close(self):
+        self._stop.set()
+        if self._task is not None and self.alive:
+            try:
+                await asyncio.wait_for(self._task, 10)
+            except Exception as e:
+                logger.warning(f"Error closing MCP server '{self.name}': {e}")
+
+    async def close_from(self, loop: asyncio.AbstractEventLoop):
+        """Close the session from any event loop; the owning task lives on ``self.loop``."""
+        if self.loop is None or self.loop is loop:
+            await self.close()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        except RuntimeError:
+            # The owning loop is closed, and the session with it
+            pass
+
+
+class MCPSessionManager:
+    """Shares warm MCP sessions across agent steps and concurrent requests."""
+
+    def __init__(
+        self,
+        tool_ttl_seconds: float = 300.0,
+        health_check_interval: float = 30.0,
+        start_timeout: float = 60.0,
+        idle_ttl_seconds: float = 600.0,
+        max_sessions: int = 16,
+        client_factory: Callable = MultiServerMCPClient,
+    ):
+        self.tool_ttl_seconds = tool_ttl_seconds
+        self.health_check_interval = health_check_interval
+        self.start_timeout = start_timeout
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.client_factory = client_factory
+        # Least recently used first
+        self._sessions: "OrderedDict[str, MCPServerSession]" = OrderedDict()
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        self.restarts = 0
+        self.evictions = 0
+
+    @staticmethod
+    def connection_key(connection: dict) -> str:
+        return json.dumps(connection, sort_keys=True, default=str)
+
+    async def acquire(
+        self, name: str, connection: dict, timeout: Optional[float] = None
+    ) -> MCPServerSession:
+        """Return a healthy session for the server config, starting or restarting it if needed."""
+        key = self.connection_key(connection)
+        loop = asyncio.get_running_loop()
+        await self._evict(loop, keep=key)
+        lock = self._locks.setdefault((id(loop), key), asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(key)
+                recently_checked = (
+                    time.monotonic() - session.last_health_check
+                    < self.health_check_interval
+                )
+                if session.alive and (
+                    recently_checked or await session.healthy(timeout or 10)
+                ):
+                    return session
+                if session.loop is loop:
+                    logger.warning(f"Restarting MCP server '{session.name}'")
+                    self.restarts += 1
+                    await session.close()
+                _notify_tools_changed([tool.name for tool in session._langchain_tools])
+            session = MCPServerSession(name, connection, self.client_factory)
+            await session.start(timeout or self.start_timeout)
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            return session
+
+    async def _evict(self, loop: asyncio.AbstractEventLoop, keep: str):
+        """Close idle sessions and the least recently used ones above ``max_sessions``."""
+        deadline = time.monotonic() - self.idle_ttl_seconds
+        stale = [
+            key
+            for key, s in self._sessions.items()
+            if key != keep and s.last_used < deadline
+        ]
+        overflow = len(self._sessions) - len(stale) - self.max_sessions
+        if keep not in self._sessions:
+            overflow += 1  # Room for the session about to start
+        if overflow > 0:
+            stale += [
+                key for key in self._sessions if key != keep and key not in stale
+            ][:overflow]
+        for key in stale:
+            session = self._sessions.pop(key)
+            self.evictions += 1
+            logger.info(f"Closing idle MCP server '{session.name}'")
+            _notify_tools_changed([tool.name for tool in session._langchain_tools])
+            await session.close_from(loop)
+        # Locks of evicted or never-started sessions
+        for lock_key in [
+            k
+            for k, lock in self._locks.items()
+            if k[1] not in self._sessions and k[1] != keep and not lock.locked()
+        ]:
+            del self._locks[lock_key]
+
+    async def get_tools(self, servers: Dict[str, dict]) -> List[BaseTool]:
+        """LangChain tools of all given servers ({name: connection}), connecting concurrently."""
+        sessions = await asyncio.gather(
+            *(self.acquire(name, connection) for name, connection in servers.items())
+        )
+        tools: List[BaseTool] = []
+        for session in sessions:
+            tools.extend(await session.langchain_tools(self.tool_ttl_seconds))
+        return tools
+
+    async def list_tools(
+        self, connection: dict, timeout: Optional[float] = None
+    ) -> list:
+        """Raw MCP tool definitions of a server, as returned by ``tools/list``."""
+        session = await self.acquire(
+            connection.get("command") or connection.get("url") or "mcp",
+            connection,
+            timeout,
+        )
+        return await session.mcp_tools(self.tool_ttl_seconds)
+
+    async def close_all(self):
+        loop = asyncio.get_running_loop()
+        sessions, self._sessions = list(self._sessions.values()), OrderedDict()
+        self._locks.clear()
+        for session in sessions:
+            await session.close_from(loop)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "restarts": self.restarts,
+            "evictions": self.evictions,
+            "sessions": [
+                {
+                    "name": session.name,
+                    "alive": session.alive,
+                    "uptime_seconds": (
+                        round(now - session.started_at, 1)
+                        if session.started_at
+                        else None
+                    ),
+                    "tools": len(session._langchain_tools),
+                }
+                for session in self._sessions.values()
+            ],
+        }
+
+
+def build_mcp_session_manager() -> MCPSessionManager:
+    return MCPSessionManager(
+        tool_ttl_seconds=float(os.getenv("MCP_TOOL_CACHE_TTL_SECONDS", "300")),
+        health_check_interval=float(
+            os.getenv("MCP_HEALTH_CHECK_INTERVAL_SECONDS", "30")
+        ),
+        idle_ttl_seconds=float(os.getenv("MCP_SESSION_IDLE_SECONDS", "600")),
+        max_sessions=int(os.getenv("MCP_MAX_SESSIONS", "16")),
+    )
+
+
+component_registry.register("tools.mcp_session_manager", build_mcp_session_manager)
+
+
+def get_mcp_session_manager() -> MCPSessionManager:
+    """Return the process-wide MCP session manager (created on first use)."""
+    return component_registry.get("tools.mcp_session_manager")
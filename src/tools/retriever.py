@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 import logging
+import os
 from typing import List, Optional, Type
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import (
@@ -10,8 +11,7 @@ from langchain_core.callbacks import (
 )
 from pydantic import BaseModel, Field
 
-from src.config.tools import SELECTED_RAG_PROVIDER
-from src.rag import Document, Retriever, Resource, build_retriever
+from src.rag import Document, Retriever, Resource, get_retriever
 
 logger = logging.getLogger(__name__)
 
@@ -48,14 +48,22 @@ class RetrieverTool(BaseTool):
         keywords: str,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
     ) -> list[Document]:
-        return self._run(keywords, run_manager.get_sync())
+        logger.info(
+            f"Retriever tool query: {keywords}", extra={"resources": self.resources}
+        )
+        documents = await self.retriever.aquery_relevant_documents(
+            keywords, self.resources
+        )
+        if not documents:
+            return "No results found from the local knowledge base."
+        return [doc.to_dict() for doc in documents]
 
 
 def get_retriever_tool(resources: List[Resource]) -> RetrieverTool | None:
     if not resources:
         return None
-    logger.info(f"create retriever tool: {SELECTED_RAG_PROVIDER}")
-    retriever = build_retriever()
+    logger.info(f"create retriever tool: {os.getenv('RAG_PROVIDER')}")
+    retriever = get_retriever()
 
     if not retriever:
         return None
@@ -5,14 +5,65 @@
 Text-to-Speech module using volcengine TTS API.
 """
 
+import base64
 import json
+import re
 import uuid
 import logging
 import requests
-from typing import Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List
 
 logger = logging.getLogger(__name__)
 
+# Split after sentence-ending punctuation; "." only when followed by whitespace (not in 3.5 or URLs)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[。！？!?；;\n])|(?<=[.])(?=\s)")
+_CLAUSE_BOUNDARY = re.compile(r"(?<=[，,、：:])")
+_WORD_BOUNDARY = re.compile(r"(?<=\s)")
+
+
+class TTSError(Exception):
+    """A TTS request failed."""
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    segments, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            segments.append(current)
+            current = ""
+        current += piece
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _split_long(text: str, max_chars: int, boundaries: List[re.Pattern]) -> List[str]:
+    if len(text) <= max_chars:
+        return [text]
+    if not boundaries:
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+    pieces = []
+    for piece in _pack(boundaries[0].split(text), max_chars):
+        pieces.extend(_split_long(piece, max_chars, boundaries[1:]))
+    return pieces
+
+
+def split_text(text: str, max_chars: int = 300) -> List[str]:
+    """
+    Split text into segments of at most max_chars, at sentence boundaries where possible.
+
+    Sentences longer than max_chars are split at clause punctuation, then at
+    whitespace, and hard-cut only as a last resort.
+    """
+    pieces = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        pieces.extend(
+            _split_long(sentence, max_chars, [_CLAUSE_BOUNDARY, _WORD_BOUNDARY])
+        )
+    return [segment.strip() for segment in _pack(pieces, max_chars) if segment.strip()]
+
 
 class VolcengineTTS:
     """
@@ -26,6 +77,7 @@ class VolcengineTTS:
         cluster: str = "volcano_tts",
         voice_type: str = "BV700_V2_streaming",
         host: str = "openspeech.bytedance.com",
+        api_url: Optional[str] = None,
     ):
         """
         Initialize the volcengine TTS client.
@@ -36,13 +88,14 @@ class VolcengineTTS:
             cluster: TTS cluster name
             voice_type: Voice type to use
             host: API host
+            api_url: Full endpoint URL, overriding host (e.g. a local stub server)
         """
         self.appid = appid
         self.access_token = access_token
         self.cluster = cluster
         self.voice_type = voice_type
         self.host = host
-        self.api_url = f"https://{host}/api/v1/tts"
+        self.api_url = api_url or f"https://{host}/api/v1/tts"
         self.header = {"Authorization": f"Bearer;{access_token}"}
 
     def text_to_speech(
@@ -130,3 +183,46 @@ class VolcengineTTS:
         except Exception as e:
             logger.exception(f"Error in TTS API call: {str(e)}")
             return {"success": False, "error": "TTS API call error", "audio_data": None}
+
+    def stream_speech(
+        self,
+        text: str,
+        max_concurrency: int = 4,
+        max_chars: int = 300,
+        **kwargs,
+    ) -> Iterator[bytes]:
+        """
+        Synthesise long text segment by segment and yield the decoded audio in order.
+
+        Up to max_concurrency segments are synthesised ahead of the one being
+        yielded, so the first audio is available after one segment instead of
+        after the whole text.
+
+        Args:
+            text: Text of any length; split with split_text
+            max_concurrency: Segments requested concurrently
+            max_chars: Maximum characters per TTS request
+            **kwargs: Passed to text_to_speech (encoding, speed_ratio, ...)
+
+        Raises:
+            TTSError: When a segment fails; audio already yielded is kept
+        """
+        segments = iter(split_text(text, max_chars))
+        pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tts")
+        pending = deque()
+        try:
+            for segment in segments:
+                pending.append(pool.submit(self.text_to_speech, segment, **kwargs))
+                if len(pending) == max_concurrency:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                segment = next(segments, None)
+                if segment is not None:
+                    pending.append(pool.submit(self.text_to_speech, segment, **kwargs))
+                if not result["success"]:
+                    raise TTSError(str(result["error"]))
+                yield base64.b64decode(result["audio_data"])
+        finally:
+            # Stop requesting segments the client will never receive
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,166 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Content-addressed artefact store.
+
+Large payloads such as ECharts configurations are written once under the
+SHA-256 of their content and replaced in messages and graph state by a short
+reference ``[[artifact:<id>|<summary>]]``. Checkpoints and LLM prompts only
+carry the reference and its summary; the SSE stream expands references back
+to the original content for the client, and ``/api/artifacts/{id}`` serves
+the blob itself.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.utils.registry import component_registry
+
+logger = logging.getLogger(__name__)
+
+ECHARTS_MEDIA_TYPE = "application/vnd.echarts+json"
+ARTIFACT_REF_PATTERN = re.compile(r"\[\[artifact:([0-9a-f]{64})\|([^\]]*)\]\]")
+_ECHARTS_BLOCK_PATTERN = re.compile(r"```echarts\n(.*?)\n```", re.DOTALL)
+_ARTIFACT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_CHART_TYPES = {"line": "折线图", "bar": "柱状图", "pie": "饼图", "radar": "雷达图"}
+
+
+class ArtifactStore:
+    """Stores blobs on disk by content hash, with a small in-process LRU cache."""
+
+    def __init__(self, root: str, cache_size: int = 128):
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, artifact_id: str) -> str:
+        return os.path.join(self.root, artifact_id[:2], f"{artifact_id}.json")
+
+    def put(self, content: str, media_type: str = "text/plain") -> str:
+        """Store content and return its id; storing the same content twice is a no-op."""
+        artifact_id = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        path = self._path(artifact_id)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"media_type": media_type, "content": content},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        self._remember(artifact_id, (content, media_type))
+        return artifact_id
+
+    def get(self, artifact_id: str) -> Optional[Tuple[str, str]]:
+        """Return (content, media_type), or None when the artefact does not exist."""
+        if not _ARTIFACT_ID_PATTERN.match(artifact_id or ""):
+            return None
+        with self._lock:
+            if artifact_id in self._cache:
+                self._cache.move_to_end(artifact_id)
+                return self._cache[artifact_id]
+        try:
+            with open(self._path(artifact_id), encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        entry = (data["content"], data.get("media_type", "text/plain"))
+        self._remember(artifact_id, entry)
+        return entry
+
+    def _remember(self, artifact_id: str, entry: Tuple[str, str]):
+        with self._lock:
+            self._cache[artifact_id] = entry
+            self._cache.move_to_end(artifact_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def summarize_echarts(config_json: str) -> str:
+    """One-line description of an ECharts configuration, used in place of the chart in prompts."""
+    try:
+        config = json.loads(config_json)
+    except ValueError:
+        return "图表"
+    series = config.get("series") or []
+    kind = _CHART_TYPES.get(series[0].get("type"), "图表") if series else "图表"
+    title = (config.get("title") or {}).get("text") or ""
+    names = [str(s.get("name")) for s in series if s.get("name")]
+    points = len((config.get("xAxis") or {}).get("data") or [])
+    parts = [f"{kind}{(' ' + title) if title else ''}"]
+    if names:
+        shown = "、".join(names[:6]) + (
+            f" 等{len(names)}个系列" if len(names) > 6 else ""
+        )
+        parts.append(f"系列: {shown}")
+    if points:
+        parts.append(f"{points}个点")
+    return "，".join(parts).replace("|", "/").replace("]", ")")
+
+
+def offload_charts(text: str) -> str:
+    """Replace every ```echarts block in text with an artefact reference."""
+    if not text or "```echarts" not in text:
+        return text
+    store = get_artifact_store()
+
+    def replace(match: re.Match) -> str:
+        artifact_id = store.put(match.group(1), ECHARTS_MEDIA_TYPE)
+        return f"[[artifact:{artifact_id}|{summarize_echarts(match.group(1))}]]"
+
+    return _ECHARTS_BLOCK_PATTERN.sub(replace, text)
+
+
+def expand_artifacts(text: str) -> str:
+    """Replace artefact references with their original content (for clients)."""
+    if not isinstance(text, str) or "[[artifact:" not in text:
+        return text
+    store = get_artifact_store()
+
+    def replace(match: re.Match) -> str:
+        entry = store.get(match.group(1))
+        if entry is None:
+            logger.warning(
+                f"Artifact {match.group(1)} not found, keeping the reference"
+            )
+            return match.group(0)
+        content, media_type = entry
+        return (
+            f"```echarts\n{content}\n```"
+            if media_type == ECHARTS_MEDIA_TYPE
+            else content
+        )
+
+    return ARTIFACT_REF_PATTERN.sub(replace, text)
+
+
+def summarize_artifacts(text: str) -> str:
+    """Replace artefact references with their short summaries (for prompts)."""
+    if not isinstance(text, str) or "[[artifact:" not in text:
+        return text
+    return ARTIFACT_REF_PATTERN.sub(lambda m: f"[{m.group(2)}]", text)
+
+
+def build_artifact_store() -> ArtifactStore:
+    return ArtifactStore(
+        os.getenv("ARTIFACT_STORE_DIR", os.path.join("data", "artifacts"))
+    )
+
+
+component_registry.register("utils.artifact_store", build_artifact_store)
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artefact store (created on first use)."""
+    return component_registry.get("utils.artifact_store")
@@ -0,0 +1,95 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+In-process response cache shared by components that front slow remote calls
+(LLM responses, RAG resource listings).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache with single-flight computation."""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "shared": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get_or_compute(self, key: Optional[Hashable], compute: Callable[[], T]) -> T:
+        """
+        Return the cached value for key, computing it at most once across concurrent callers.
+
+        Exceptions are raised to every caller waiting on the computation and are not cached.
+        A key of None bypasses the cache.
+        """
+        if key is None:
+            return compute()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._counters["expirations"] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._counters["misses"] += 1
+            else:
+                self._counters["shared"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if self.max_size > 0:
+                self._entries[key] = (time.monotonic(), value)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the hit rate; requests served by a shared in-flight call count as hits."""
+        with self._lock:
+            stats = dict(
+                self._counters, size=len(self._entries), max_size=self.max_size
+            )
+        requests = stats["hits"] + stats["shared"] + stats["misses"]
+        stats["hit_rate"] = (
+            round((stats["hits"] + stats["shared"]) / requests, 4) if requests else 0.0
+        )
+        return stats
@@ -4,14 +4,23 @@
 @Time     : 2025/7/28 15:54
 @Author   : zhangshifeng
 @File     : curve.py
-@Description:
+@Description: HVAC 功率-末端稳态温度特性曲线。曲线由一次 NumPy 向量化计算得到，
+              并按 (ratedPower, t0, t1, resolution) 缓存，重复请求直接返回缓存结果。
 """
-import os
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
 import numpy as np
-import matplotlib.pyplot as plt
 from src.utils.extra_tools import generate_echarts_config
-import matplotlib
-matplotlib.use("Agg")
+
+
+class CurveParams(NamedTuple):
+    """单栋楼宇的曲线参数"""
+
+    ratedPower: float = 5000
+    t0: float = 20
+    t1: float = 32
+    resolution: float = 50  # 功率采样步长
 
 
 def get_p_temperature_curve(ratedPower, x, t0=20, t1=32):
@@ -19,7 +28,7 @@ def get_p_temperature_curve(ratedPower, x, t0=20, t1=32):
     计算HVAC系统功率-末端稳态温度特性曲线
     Args:
         ratedPower: 额定功率
-        x: 功率
+        x: 功率，可以是标量或数组
         t0: 最低温度，默认20
         t1: 室外温度，默认32
     Returns:
@@ -30,6 +39,43 @@ def get_p_temperature_curve(ratedPower, x, t0=20, t1=32):
     return T
 
 
+@lru_cache(maxsize=256)
+def curve_points(
+    ratedPower=5000, t0=20, t1=32, resolution=50
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    在 [0, ratedPower) 上按 resolution 步长采样整条曲线（一次向量化计算）。
+    Returns:
+        (功率数组, 温度数组)，结果被缓存，数组为只读
+    """
+    xs = np.arange(0, ratedPower, resolution)
+    ys = get_p_temperature_curve(ratedPower, xs, t0, t1)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+    return xs, ys
+
+
+def batch_curves(params: List[CurveParams]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    一次计算多栋楼宇的曲线。
+    Returns:
+        (功率矩阵, 温度矩阵)，形状均为 (楼宇数, 最大采样点数)，超出各自额定功率的位置为 NaN
+    """
+    params = [CurveParams(*p) for p in params]
+    if not params:
+        return np.empty((0, 0)), np.empty((0, 0))
+    rated = np.array([p.ratedPower for p in params], dtype=float)[:, None]
+    t0 = np.array([p.t0 for p in params], dtype=float)[:, None]
+    t1 = np.array([p.t1 for p in params], dtype=float)[:, None]
+    step = np.array([p.resolution for p in params], dtype=float)[:, None]
+
+    width = int(np.ceil(rated / step).max())
+    xs = np.arange(width)[None, :] * step
+    valid = xs < rated
+    ys = get_p_temperature_curve(rated, xs, t0, t1)
+    return np.where(valid, xs, np.nan), np.where(valid, ys, np.nan)
+
+
 def get_p_by_temperature(T_max, ratedPower, t0=20, t1=32):
     """
     计算HVAC系统功率-末端稳态温度特性曲线的反函数
@@ -41,26 +87,40 @@ def get_p_by_temperature(T_max, ratedPower, t0=20, t1=32):
     Returns:
         指定温度下，功率
     """
-    for x in range(0, ratedPower, 100):
-        if get_p_temperature_curve(ratedPower, x, t0, t1) <= T_max:
-            return x
-    return 0
+    xs, ys = curve_points(ratedPower, t0, t1, 100)
+    hits = np.nonzero(ys <= T_max)[0]
+    return int(xs[hits[0]]) if len(hits) else 0
 
 
-def plot_curve():
-    ratedPower = 5000
-
-    xs = []
-    ys = []
-    for xi in range(0, ratedPower, 50):
-        xs.append(xi)
-        y = get_p_temperature_curve(ratedPower, xi)
-        ys.append(y)
+@lru_cache(maxsize=64)
+def plot_curve(ratedPower=5000, t0=20, t1=32, resolution=50):
+    """生成单条曲线的 ECharts 配置，结果按参数缓存"""
+    xs, ys = curve_points(ratedPower, t0, t1, resolution)
 
     # 绘制曲线
-    series_list = [
-        {"name": "HVAC Power vs. Temperature Curve", "data": ys}
-    ]
-    output = generate_echarts_config("", chart_type="line", x_data=xs, series_list=series_list)
+    series_list = [{"name": "HVAC Power vs. Temperature Curve", "data": ys.tolist()}]
+    output = generate_echarts_config(
+        "", chart_type="line", x_data=xs.tolist(), series_list=series_list
+    )
 
     return output
+
+
+def plot_portfolio_curves(buildings: Dict[str, CurveParams]):
+    """
+    生成多栋楼宇曲线的 ECharts 配置，所有曲线在一次批量计算中得到；
+    X 轴取各楼宇采样点的并集，楼宇额定功率以外的点为空值
+    """
+    names = list(buildings)
+    xs, ys = batch_curves([buildings[name] for name in names])
+    grid = np.unique(xs[~np.isnan(xs)])
+    series_list = []
+    for name, row_x, row_y in zip(names, xs, ys):
+        valid = ~np.isnan(row_x)
+        lookup = dict(zip(row_x[valid].tolist(), row_y[valid].tolist()))
+        series_list.append(
+            {"name": name, "data": [lookup.get(x) for x in grid.tolist()]}
+        )
+    return generate_echarts_config(
+        "", chart_type="line", x_data=grid.tolist(), series_list=series_list
+    )
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Lazy component registry.
+
+Expensive objects such as LLM clients, structured-output chains and compiled
+graphs are registered as factories and only built the first time they are
+requested. The built instance is cached, so every later lookup is a dict read.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRegistry:
+    """
+    Thread-safe registry of named factories whose results are built on first use.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """
+        Register a factory under the given name.
+
+        Re-registering a name replaces the factory and drops any cached instance.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            self._build_seconds.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the cached component, building it first if necessary.
+
+        Raises:
+            KeyError: If no factory is registered under the name
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"No component registered under name: {name}")
+            start = time.perf_counter()
+            instance = self._factories[name]()
+            elapsed = time.perf_counter() - start
+            self._instances[name] = instance
+            self._build_seconds[name] = elapsed
+            logger.debug(f"Built component '{name}' in {elapsed * 1000:.1f} ms")
+            return instance
+
+    def is_built(self, name: str) -> bool:
+        """Return True if the component has already been built."""
+        return name in self._instances
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """
+        Drop cached instances so they are rebuilt on next use.
+
+        Args:
+            name: Component to drop; all components are dropped when omitted
+        """
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._build_seconds.clear()
+            else:
+                self._instances.pop(name, None)
+                self._build_seconds.pop(name, None)
+
+    def names(self) -> List[str]:
+        """Return all registered component names."""
+        return list(self._factories.keys())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return build status and build time (ms) for every registered component."""
+        return {
+            name: {
+                "built": name in self._instances,
+                "build_ms": round(self._build_seconds.get(name, 0.0) * 1000, 3),
+            }
+            for name in self._factories
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+
+# Process-wide registry shared by the graph builders and node modules.
+component_registry = LazyRegistry()
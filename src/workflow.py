@@ -3,6 +3,7 @@
 
 import logging
 from src.graph import build_graph
+from src.utils.registry import component_registry
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -20,8 +21,12 @@ def enable_debug_logging():
 
 logger = logging.getLogger(__name__)
 
-# Create the graph
-graph = build_graph()
+
+def __getattr__(name):
+    # The graph is compiled on first access (see src.graph.builder)
+    if name == "graph":
+        return component_registry.get("graph.main")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def run_agent_workflow_async(
@@ -125,6 +130,7 @@ async def run_agent_workflow_async(
             "recursion_limit": 100,
         }
         last_message_cnt = 0
+        graph = component_registry.get("graph.main")
         async for s in graph.astream(
             input=initial_state, config=config, stream_mode="values"
         ):
@@ -149,4 +155,5 @@ async def run_agent_workflow_async(
 
 
 if __name__ == "__main__":
+    graph = build_graph()
     print(graph.get_graph(xray=True).draw_mermaid())
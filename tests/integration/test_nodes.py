@@ -1103,14 +1103,8 @@ def patch_multiserver_mcp_client():
             self.name = name
             self.description = description
 
-    class FakeClient:
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
-
-        def get_tools(self):
+    class FakeManager:
+        async def get_tools(self, servers):
             return [
                 FakeTool("toolA", "descA"),
                 FakeTool("toolB", "descB"),
@@ -1118,7 +1112,7 @@ def patch_multiserver_mcp_client():
             ]
 
     with patch(
-        "src.graph.nodes.MultiServerMCPClient", return_value=FakeClient()
+        "src.graph.nodes.get_mcp_session_manager", return_value=FakeManager()
     ) as mock:
         yield mock
 
@@ -1231,23 +1225,19 @@ async def test_setup_and_execute_agent_step_with_mcp_tools_description_update(
     default_tools = [MagicMock(name="default_tool")]
     agent_type = "researcher"
 
-    # Patch MultiServerMCPClient to check description update
+    # Patch the MCP session manager to check description update
     class FakeTool:
         def __init__(self, name, description="desc"):
             self.name = name
             self.description = description
 
-    class FakeClient:
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
+    pooled_tool = FakeTool("toolA", "descA")
 
-        def get_tools(self):
-            return [FakeTool("toolA", "descA")]
+    class FakeManager:
+        async def get_tools(self, servers):
+            return [pooled_tool]
 
-    with patch("src.graph.nodes.MultiServerMCPClient", return_value=FakeClient()):
+    with patch("src.graph.nodes.get_mcp_session_manager", return_value=FakeManager()):
         await _setup_and_execute_agent_step(
             mock_state_with_steps,
             mock_config,
@@ -1263,6 +1253,8 @@ async def test_setup_and_execute_agent_step_with_mcp_tools_description_update(
                 assert t.description.startswith("Powered by 'server1'.\n")
                 found = True
         assert found
+        # The pooled tool shared with other requests is left untouched
+        assert pooled_tool.description == "descA"
 
 
 @pytest.fixture
@@ -47,8 +47,9 @@ def test_apply_prompt_template_empty_messages():
     }
 
     messages = apply_prompt_template("coder", test_state)
-    assert len(messages) == 1  # Only system message
-    assert messages[0]["role"] == "system"
+    assert len(messages) == 2  # System prompt and trailing runtime context
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert messages[1]["content"].startswith("Runtime context:")
 
 
 def test_apply_prompt_template_multiple_messages():
@@ -64,8 +65,9 @@ def test_apply_prompt_template_multiple_messages():
     }
 
     messages = apply_prompt_template("coder", test_state)
-    assert len(messages) == 4  # system + 3 messages
+    assert len(messages) == 5  # system + 3 messages + runtime context
     assert messages[0]["role"] == "system"
+    assert [m["role"] for m in messages[1:]].count("system") == 0
     assert all(m["role"] in ["system", "user", "assistant"] for m in messages)
 
 
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.tools import tool
+
+from src.agents import agents
+from src.agents.agents import AgentCache, create_agent, tool_fingerprint
+from src.tools.mcp_sessions import _notify_tools_changed
+from src.tools.retriever import RetrieverTool
+from src.rag import Resource, Retriever
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return query
+
+
+@tool
+def calculate(expression: str) -> str:
+    """Evaluate an expression."""
+    return expression
+
+
+@pytest.fixture
+def fresh_cache():
+    cache = AgentCache(max_size=2)
+    with (
+        patch.object(agents, "agent_cache", cache),
+        patch("src.agents.agents.get_llm_by_type", return_value=MagicMock()),
+        patch(
+            "src.agents.agents.create_react_agent", side_effect=lambda **kw: MagicMock()
+        ) as mock_create,
+    ):
+        yield cache, mock_create
+
+
+def test_same_tools_reuse_compiled_agent(fresh_cache):
+    cache, mock_create = fresh_cache
+
+    first = create_agent("researcher", "researcher", [lookup], "researcher")
+    second = create_agent("researcher", "researcher", [lookup], "researcher")
+
+    assert mock_create.call_count == 1
+    assert first._agent is second._agent
+    assert cache.stats()["hits"] == 1
+
+
+def test_different_tools_or_agent_type_build_new_agents(fresh_cache):
+    cache, mock_create = fresh_cache
+
+    create_agent("researcher", "researcher", [lookup], "researcher")
+    create_agent("researcher", "researcher", [lookup, calculate], "researcher")
+    create_agent("coder", "coder", [lookup], "coder")
+
+    assert mock_create.call_count == 3
+    # Bounded: the oldest entry was evicted
+    assert cache.stats()["size"] == 2
+
+
+def test_tool_configuration_is_part_of_fingerprint():
+    def retriever_tool(uri):
+        return RetrieverTool(
+            retriever=MagicMock(spec=Retriever),
+            resources=[Resource(uri=uri, title="t")],
+        )
+
+    a = retriever_tool("rag://dataset/1")
+    b = retriever_tool("rag://dataset/2")
+    a_again = retriever_tool("rag://dataset/1")
+
+    assert tool_fingerprint([a]) != tool_fingerprint([b])
+    assert tool_fingerprint([a]) == tool_fingerprint([a_again])
+
+
+def test_mcp_restart_invalidates_agents_using_its_tools(fresh_cache):
+    cache, mock_create = fresh_cache
+    create_agent("researcher", "researcher", [lookup], "researcher")
+    create_agent("coder", "coder", [calculate], "coder")
+
+    # The module-level listener targets the real cache, call the patched one directly
+    assert cache.invalidate(["lookup"]) == 1
+    create_agent("researcher", "researcher", [lookup], "researcher")
+    assert mock_create.call_count == 3
+
+
+def test_module_cache_listens_for_mcp_restarts():
+    agents.agent_cache._agents[("k",)] = (MagicMock(), frozenset({"github_trending"}))
+    _notify_tools_changed(["github_trending"])
+    assert ("k",) not in agents.agent_cache._agents
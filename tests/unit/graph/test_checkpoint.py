@@ -0,0 +1,149 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import operator
+import threading
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+import src.graph.builder as builder_mod
+from src.graph.checkpoint import SQLiteCheckpointSaver
+
+
+class _State(TypedDict):
+    messages: Annotated[list, operator.add]
+    counter: int
+
+
+def _graph(checkpointer):
+    builder = StateGraph(_State)
+    builder.add_node(
+        "step", lambda state: {"messages": ["reply"], "counter": state["counter"] + 1}
+    )
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _run(graph, thread_id, turns):
+    config = {"configurable": {"thread_id": thread_id}}
+    for i in range(turns):
+        graph.invoke({"messages": [f"question {i}"], "counter": i}, config)
+    return config
+
+
+def test_state_survives_reopening_the_database(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = SQLiteCheckpointSaver(path)
+    config = _run(_graph(saver), "t1", 2)
+    saver.close()
+
+    reopened = SQLiteCheckpointSaver(path)
+    state = _graph(reopened).get_state(config)
+    assert state.values["messages"] == ["question 0", "reply", "question 1", "reply"]
+    assert state.values["counter"] == 2
+    assert reopened.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
+
+
+def test_compaction_keeps_last_checkpoints_and_referenced_blobs(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "db.sqlite"), keep_last=3)
+    graph = _graph(saver)
+    config = _run(graph, "t1", 5)
+
+    assert len(list(saver.list(config))) == 3
+    assert graph.get_state(config).values["counter"] == 5
+    # Every stored blob is referenced by a retained checkpoint
+    referenced = set()
+    for item in saver.list(config):
+        referenced.update(
+            (c, str(v)) for c, v in item.checkpoint["channel_versions"].items()
+        )
+    stored = set(saver.conn.execute("SELECT channel, version FROM blobs").fetchall())
+    assert stored <= referenced
+
+
+def test_unchanged_channels_are_not_rewritten(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "db.sqlite"), keep_last=100)
+    graph = _graph(saver)
+    _run(graph, "t1", 3)
+    checkpoints = saver.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+    message_blobs = saver.conn.execute(
+        "SELECT COUNT(*) FROM blobs WHERE channel='messages'"
+    ).fetchone()[0]
+    # The messages list is written only when it changes, not once per checkpoint
+    assert message_blobs < checkpoints
+
+
+def test_storage_cap_evicts_least_recent_threads(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "db.sqlite"), keep_last=2)
+    graph = _graph(saver)
+    _run(graph, "old", 2)
+    saver.max_storage_bytes = saver.storage_bytes()
+    config = _run(graph, "new", 2)
+
+    threads = {
+        row[0]
+        for row in saver.conn.execute("SELECT DISTINCT thread_id FROM checkpoints")
+    }
+    assert threads == {"new"}
+    assert graph.get_state(config).values["counter"] == 2
+
+
+def test_delete_thread(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "db.sqlite"))
+    config = _run(_graph(saver), "t1", 1)
+    saver.delete_thread("t1")
+    assert saver.get_tuple(config) is None
+
+
+class _ThreadRecordingConnection:
+    """Wraps a sqlite3 connection and records the threads that execute statements."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.threads = set()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, *args):
+        self.threads.add(threading.get_ident())
+        return self._conn.execute(*args)
+
+
+@pytest.mark.asyncio
+async def test_async_methods_run_off_the_event_loop(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "db.sqlite"))
+    saver.conn = recorder = _ThreadRecordingConnection(saver.conn)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    await graph.ainvoke({"messages": ["question"], "counter": 0}, config)
+    state = await graph.aget_state(config)
+    history = [item async for item in saver.alist(config, limit=2)]
+
+    assert state.values["counter"] == 1
+    assert len(history) == 2
+    assert recorder.threads and threading.get_ident() not in recorder.threads
+    await saver.adelete_thread("t1")
+    assert [item async for item in saver.alist(config)] == []
+
+
+def test_build_checkpointer_backends(monkeypatch, tmp_path):
+    monkeypatch.delenv("CHECKPOINT_BACKEND", raising=False)
+    assert isinstance(builder_mod.build_checkpointer(), MemorySaver)
+
+    monkeypatch.setenv("CHECKPOINT_BACKEND", "sqlite")
+    monkeypatch.setenv("CHECKPOINT_SQLITE_PATH", str(tmp_path / "cp.sqlite"))
+    monkeypatch.setenv("CHECKPOINT_KEEP_LAST", "4")
+    saver = builder_mod.build_checkpointer()
+    assert isinstance(saver, SQLiteCheckpointSaver)
+    assert saver.keep_last == 4
+
+    monkeypatch.setenv("CHECKPOINT_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        builder_mod.build_checkpointer()
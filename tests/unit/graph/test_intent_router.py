@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import pytest
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.graph.intent_router import fast_path_enabled, parse_command
+from src.graph.nodes import coordinator_node
+
+
+@pytest.mark.parametrize(
+    "text, expected_args",
+    [
+        (
+            "20MW削峰，温度28度，信用优先",
+            {"demand": 20.0, "hvac_max_temp": 28.0, "requirement": "信用优先"},
+        ),
+        ("电网下发15兆瓦需求响应指令", {"demand": 15.0}),
+        ("5000kW削峰，成本优先", {"demand": 5.0, "requirement": "成本优先"}),
+        ("暖通温度不超过27℃", {"hvac_max_temp": 27.0}),
+    ],
+)
+def test_parse_command_vpp(text, expected_args):
+    result = parse_command(text)
+    assert result is not None
+    assert result.name == "vpp_trader"
+    for key, value in expected_args.items():
+        assert result.args[key] == value
+    assert result.args["user_modified_request"] == ""
+
+
+def test_parse_command_curve():
+    result = parse_command("查看功率温度特性曲线")
+    assert result.name == "curve_trader"
+    assert result.args == {"research_topic": "查看功率温度特性曲线"}
+    assert result.confidence == 1.0
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "你好",
+        "20MW削峰，美力储能损坏不可用",
+        "信用优先还是成本优先",
+        "不要信用优先",
+        "20MW削峰吗",
+        "20MW还是30MW削峰",
+        "削峰20MW,8点",
+        "削峰5MW 1h",
+        "20MW削峰 x2",
+        "取消20MW削峰，温度28度",
+        "停止20MW削峰，温度28度",
+        "撤销20MW削峰，温度28度，信用优先",
+        "暂停20MW削峰",
+    ],
+)
+def test_parse_command_falls_back_to_llm(text):
+    assert parse_command(text) is None
+
+
+def test_parse_command_confidence_threshold(monkeypatch):
+    monkeypatch.delenv("COORDINATOR_FAST_PATH_MIN_CONFIDENCE", raising=False)
+    result = parse_command("20MW削峰啦")
+    assert result is not None and result.confidence == 0.857
+    monkeypatch.setenv("COORDINATOR_FAST_PATH_MIN_CONFIDENCE", "0.9")
+    assert parse_command("20MW削峰啦") is None
+    assert parse_command("20MW削峰").confidence == 1.0
+
+
+def test_fast_path_enabled_env(monkeypatch):
+    monkeypatch.delenv("COORDINATOR_FAST_PATH", raising=False)
+    assert fast_path_enabled()
+    monkeypatch.setenv("COORDINATOR_FAST_PATH", "false")
+    assert not fast_path_enabled()
+
+
+def test_coordinator_node_skips_llm_for_structured_command(monkeypatch):
+    monkeypatch.delenv("COORDINATOR_FAST_PATH", raising=False)
+    state = {"messages": [HumanMessage(content="20MW削峰，温度28度，信用优先")]}
+    with patch("src.graph.nodes.get_llm_by_type") as mock_llm:
+        command = coordinator_node(state, {"configurable": {}})
+    mock_llm.assert_not_called()
+    assert command.goto == "planner"
+    assert command.update["demand"] == 20.0
+    assert command.update["temperature"] == 28.0
+    assert command.update["requirement"] == "信用优先"
+
+
+def test_coordinator_node_uses_llm_when_disabled(monkeypatch):
+    monkeypatch.setenv("COORDINATOR_FAST_PATH", "false")
+    state = {"messages": [{"role": "user", "content": "20MW削峰"}]}
+    with (
+        patch("src.graph.nodes.get_llm_by_type") as mock_llm,
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+    ):
+        response = mock_llm.return_value.bind_tools.return_value.invoke.return_value
+        response.tool_calls = [{"name": "vpp_trader", "args": {"demand": 30}}]
+        command = coordinator_node(state, {"configurable": {}})
+    mock_llm.assert_called_once()
+    assert command.goto == "planner"
+    assert command.update["demand"] == 30
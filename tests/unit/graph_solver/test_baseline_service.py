@@ -0,0 +1,167 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.graph_solver.baseline_service import (
+    BaselineService,
+    BaselineStore,
+    default_csv_path,
+)
+
+
+def _day_series(day: date, start_hour: int, values):
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour)
+    return [start + timedelta(minutes=15 * i) for i in range(len(values))], values
+
+
+@pytest.fixture
+def service(tmp_path):
+    return BaselineService(BaselineStore(str(tmp_path)), lookback_days=2, alpha=0.5)
+
+
+def test_ingest_csv_seeds_observed_horizon(service):
+    service.ingest_csv(default_csv_path, persist=False)
+
+    times, values = service.forecast_horizon(day=date(2025, 7, 28))
+    assert len(times) == 41
+    assert times[0] == datetime(2025, 7, 28, 11, 0)
+    assert times[-1] == datetime(2025, 7, 28, 21, 0)
+    assert set(values) == {"HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"}
+    assert values["HVAC"][0] == pytest.approx(15034.2)
+
+
+def test_similar_day_averages_same_day_type(service):
+    # 2025-07-21..23 为工作日，2025-07-26 为周六
+    for day, value in [
+        (date(2025, 7, 21), 10.0),
+        (date(2025, 7, 22), 20.0),
+        (date(2025, 7, 23), 40.0),
+    ]:
+        service.ingest("HVAC", *_day_series(day, 16, [value] * 4), persist=False)
+    service.ingest(
+        "HVAC", *_day_series(date(2025, 7, 26), 16, [1000.0] * 4), persist=False
+    )
+
+    times, values = service.forecast(
+        "HVAC",
+        datetime(2025, 7, 28, 16),
+        datetime(2025, 7, 28, 17),
+        method="similar_day",
+    )
+    assert len(times) == 4
+    # lookback_days=2：只取最近两个工作日 (20 + 40) / 2，周六被排除
+    np.testing.assert_allclose(values, [30.0] * 4)
+
+
+def test_exponential_smoothing_updates_incrementally(service):
+    service.ingest("EV", *_day_series(date(2025, 7, 21), 0, [100.0]), persist=False)
+    service.ingest("EV", *_day_series(date(2025, 7, 22), 0, [200.0]), persist=False)
+
+    _, values = service.forecast(
+        "EV",
+        datetime(2025, 7, 23, 0),
+        datetime(2025, 7, 23, 0, 15),
+        method="exp_smoothing",
+    )
+    assert values[0] == pytest.approx(150.0)
+
+    # 补录更早的数据会触发重新拟合，结果与按时间顺序写入一致
+    service.ingest("EV", *_day_series(date(2025, 7, 20), 0, [0.0]), persist=False)
+    _, values = service.forecast(
+        "EV",
+        datetime(2025, 7, 23, 0),
+        datetime(2025, 7, 23, 0, 15),
+        method="exp_smoothing",
+    )
+    assert values[0] == pytest.approx(125.0)
+
+
+def test_forecast_spans_midnight(service):
+    service.ingest(
+        "PV", *_day_series(date(2025, 7, 21), 0, list(range(96))), persist=False
+    )
+
+    times, values = service.forecast(
+        "PV", datetime(2025, 7, 22, 23, 30), datetime(2025, 7, 23, 0, 30)
+    )
+    assert [t.strftime("%H:%M") for t in times] == ["23:30", "23:45", "00:00", "00:15"]
+    np.testing.assert_allclose(values, [94, 95, 0, 1])
+
+
+def test_missing_slots_forecast_as_zero(service):
+    service.ingest("HVAC", *_day_series(date(2025, 7, 21), 16, [5.0]), persist=False)
+
+    _, values = service.forecast(
+        "HVAC", datetime(2025, 7, 22, 15), datetime(2025, 7, 22, 15, 30)
+    )
+    np.testing.assert_allclose(values, [0.0, 0.0])
+
+
+def test_store_persists_and_reloads(tmp_path):
+    service = BaselineService(BaselineStore(str(tmp_path)))
+    service.ingest("HVAC", *_day_series(date(2025, 7, 21), 16, [1.0, 2.0]))
+
+    reloaded = BaselineService(BaselineStore(str(tmp_path)), method="exp_smoothing")
+    assert reloaded.devices() == ["HVAC"]
+    assert reloaded.store.observed_slots() == (64, 65)
+    _, values = reloaded.forecast(
+        "HVAC", datetime(2025, 7, 22, 16), datetime(2025, 7, 22, 16, 30)
+    )
+    np.testing.assert_allclose(values, [1.0, 2.0])
+
+
+def test_store_appends_new_intervals_to_log(tmp_path):
+    service = BaselineService(BaselineStore(str(tmp_path)), method="similar_day")
+    service.ingest("HVAC", *_day_series(date(2025, 7, 21), 16, [1.0, 2.0]))
+    snapshot = (tmp_path / "HVAC.values.npy").stat().st_mtime_ns
+
+    service.ingest("HVAC", *_day_series(date(2025, 7, 22), 16, [3.0, 4.0]))
+    service.ingest("HVAC", *_day_series(date(2025, 7, 21), 16, [5.0]))
+
+    assert (tmp_path / "HVAC.values.npy").stat().st_mtime_ns == snapshot
+    assert (tmp_path / "HVAC.log").stat().st_size == 3 * 24
+    reloaded = BaselineStore(str(tmp_path))
+    days, values = reloaded.history("HVAC")
+    np.testing.assert_array_equal(
+        days, [date(2025, 7, 21).toordinal(), date(2025, 7, 22).toordinal()]
+    )
+    np.testing.assert_allclose(values[:, 64:66], [[5.0, 2.0], [3.0, 4.0]])
+
+
+def test_store_compacts_log_into_snapshot(tmp_path):
+    store = BaselineStore(str(tmp_path))
+    times, values = _day_series(date(2025, 7, 21), 0, [1.0] * 96)
+    store.ingest("HVAC", times, values)
+    store.save()
+    for _ in range(2):
+        store.ingest("HVAC", times, [2.0] * 96)
+        store.save()
+
+    assert not (tmp_path / "HVAC.log").exists()
+    np.testing.assert_allclose(
+        BaselineStore(str(tmp_path)).history("HVAC")[1], [[2.0] * 96]
+    )
+
+
+def test_similar_day_reads_only_the_lookback_window(service):
+    start = date(2025, 1, 6)  # 周一
+    for offset in range(60):
+        day = start + timedelta(days=offset)
+        service.ingest("HVAC", *_day_series(day, 16, [1.0]), persist=False)
+
+    # lookback_days=2 时只读取目标日之前最近 14 行，更早的行不参与计算
+    days, matrix = service.store.history("HVAC")
+    matrix[: days.size - 14] = 1e9
+    _, values = service.forecast(
+        "HVAC", datetime(2025, 3, 7, 16), datetime(2025, 3, 7, 16, 15)
+    )
+    np.testing.assert_allclose(values, [1.0])
+
+
+def test_unknown_method_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BaselineService(BaselineStore(str(tmp_path)), method="arima")
@@ -0,0 +1,206 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict
+from unittest.mock import patch
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, StateGraph
+
+from src.graph_solver.dispatch_scheduler import (
+    DispatchPriority,
+    DispatchScheduler,
+    ResourcePool,
+    dispatch_context,
+    dispatch_slot,
+)
+
+
+def _hold_and_queue(pool, waiters):
+    """占满池后按给定 (tenant, priority) 顺序排队，释放后返回出队顺序"""
+    order = []
+    release = threading.Event()
+
+    def holder():
+        with pool.acquire("holder"):
+            release.wait()
+
+    def waiter(tenant, priority):
+        with pool.acquire(tenant, priority):
+            order.append((tenant, priority))
+
+    threads = [threading.Thread(target=holder)]
+    threads[0].start()
+    while pool.metrics()["in_use"] < 1:
+        time.sleep(0.001)
+    for tenant, priority in waiters:
+        t = threading.Thread(target=waiter, args=(tenant, priority))
+        t.start()
+        threads.append(t)
+        expected = len(threads) - 1
+        while pool.metrics()["queued"] < expected:
+            time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+    return order
+
+
+def test_higher_priority_class_is_served_first():
+    pool = ResourcePool("llm", 1)
+    order = _hold_and_queue(
+        pool,
+        [
+            ("a", DispatchPriority.WHAT_IF),
+            ("b", DispatchPriority.OPERATOR),
+            ("c", DispatchPriority.GRID_EVENT),
+        ],
+    )
+    assert [p for _, p in order] == [
+        DispatchPriority.GRID_EVENT,
+        DispatchPriority.OPERATOR,
+        DispatchPriority.WHAT_IF,
+    ]
+
+
+def test_tenants_share_fairly_within_priority_class():
+    pool = ResourcePool("solver", 1)
+    # 租户 a 先突发 3 个请求，b 随后 1 个：b 不应排在 a 的全部请求之后
+    order = _hold_and_queue(
+        pool,
+        [("a", DispatchPriority.OPERATOR)] * 3 + [("b", DispatchPriority.OPERATOR)],
+    )
+    assert [tenant for tenant, _ in order] == ["a", "b", "a", "a"]
+
+
+def test_pool_never_exceeds_limit():
+    pool = ResourcePool("plan", 2)
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with pool.acquire("t"):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    metrics = pool.metrics()
+    assert peak == 2
+    assert metrics["granted_total"] == 8
+    assert metrics["in_use"] == 0
+    assert metrics["peak_queued"] > 0
+
+
+@pytest.mark.asyncio
+async def test_async_acquire_reports_queue_depth_and_cancels_cleanly():
+    pool = ResourcePool("llm", 1)
+    async with pool.acquire_async("a"):
+        task = asyncio.create_task(
+            pool.acquire_async("b", DispatchPriority.WHAT_IF).__aenter__()
+        )
+        await asyncio.sleep(0.01)
+        metrics = pool.metrics()
+        assert metrics["queued"] == 1
+        assert metrics["queued_by_priority"]["what_if"] == 1
+        assert metrics["queued_by_tenant"] == {"b": 1}
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    metrics = pool.metrics()
+    assert metrics["queued"] == 0
+    assert metrics["in_use"] == 0
+
+
+def test_invalid_pool_limit_rejected():
+    with pytest.raises(ValueError):
+        ResourcePool("llm", 0)
+
+
+class _State(TypedDict):
+    seen: dict
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_tenant_and_priority_to_sync_nodes():
+    scheduler = DispatchScheduler(
+        llm_concurrency=1, solver_concurrency=1, plan_concurrency=1
+    )
+
+    def node(state):
+        with scheduler.slot("solver"):
+            return {"seen": scheduler.pool("solver").metrics()["in_use_by_tenant"]}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("node", RunnableLambda(node))
+    workflow.set_entry_point("node")
+    workflow.add_edge("node", END)
+    graph = workflow.compile()
+
+    with patch("src.graph_solver.opt_subgraph.get_subgraph", return_value=graph):
+        result = await scheduler.run(
+            {"seen": {}}, tenant="vpp-1", priority="grid_event"
+        )
+
+    assert result["seen"] == {"vpp-1": 1}
+    metrics = scheduler.metrics()
+    assert metrics["runs"] == {"active": 0, "completed": 1, "failed": 0}
+    assert metrics["pools"]["solver"]["granted_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_slot_nodes_do_not_hold_executor_threads():
+    scheduler = DispatchScheduler(solver_concurrency=1)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=2))
+
+    @dispatch_slot("solver")
+    def node(state):
+        return {"seen": state["seen"] + 1}
+
+    runnable = RunnableLambda(node, afunc=node.afunc)
+    with patch(
+        "src.graph_solver.dispatch_scheduler.get_dispatch_scheduler",
+        return_value=scheduler,
+    ):
+        async with scheduler.slot_async("solver"):
+            queued = [
+                asyncio.create_task(runnable.ainvoke({"seen": i})) for i in range(4)
+            ]
+            while scheduler.pool("solver").queued < 4:
+                await asyncio.sleep(0.001)
+            # Both executor threads are still free while four nodes wait for the slot
+            assert (
+                await asyncio.wait_for(asyncio.to_thread(lambda: "free"), 1) == "free"
+            )
+        results = await asyncio.gather(*queued)
+
+    assert [r["seen"] for r in results] == [1, 2, 3, 4]
+    assert node({"seen": 0}) == {"seen": 1}
+
+
+def test_dispatch_context_defaults_and_restores():
+    scheduler = DispatchScheduler()
+    with dispatch_context("vpp-2", DispatchPriority.WHAT_IF):
+        with scheduler.slot("llm"):
+            assert scheduler.pool("llm").metrics()["in_use_by_tenant"] == {"vpp-2": 1}
+    with scheduler.slot("llm"):
+        assert scheduler.pool("llm").metrics()["in_use_by_tenant"] == {"default": 1}
+    with pytest.raises(ValueError):
+        with scheduler.slot("gpu"):
+            pass
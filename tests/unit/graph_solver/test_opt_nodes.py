@@ -0,0 +1,47 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import src.graph_solver.opt_nodes as opt_nodes
+import src.graph_solver.opt_subgraph as opt_subgraph
+from src.utils.registry import component_registry
+
+ROOT = Path(__file__).resolve().parents[3]
+
+
+def test_import_does_not_build_llm_or_load_pandas():
+    code = (
+        "import sys\n"
+        "import src.graph_solver.opt_subgraph\n"
+        "from src.utils.registry import component_registry\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert not any(component_registry.stats()[n]['built'] for n in component_registry.names())\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_get_chain_builds_from_prompt_and_llm():
+    mock_llm = MagicMock()
+    component_registry.reset("graph_solver.formulator_chain")
+    try:
+        with patch.object(opt_nodes, "get_llm", return_value=mock_llm):
+            opt_nodes.get_chain("formulator")
+        mock_llm.with_structured_output.assert_called_once_with(opt_nodes.Formulation)
+    finally:
+        component_registry.reset("graph_solver.formulator_chain")
+
+
+def test_subgraph_is_compiled_once_on_access():
+    component_registry.reset("graph_solver.subgraph")
+    assert not component_registry.is_built("graph_solver.subgraph")
+    graph = opt_subgraph.subgraph
+    assert component_registry.is_built("graph_solver.subgraph")
+    assert opt_subgraph.get_subgraph() is graph
+    assert "plan_node" in graph.get_graph().nodes
@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+import numpy as np
+import pytest
+
+from src.graph_solver import pareto
+from src.graph_solver.pareto import (
+    ParetoProblem,
+    non_dominated,
+    normalize,
+    pareto_front,
+    weight_grid,
+)
+
+
+@pytest.fixture
+def fleet():
+    return ParetoProblem(
+        device_names=["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+        capacity=[6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+        credit=[3, 4, 4, 5, 2, 5],
+        direct_control=[1, 1, 1, 1, 0, 0],
+        cost=[0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+        demand=20,
+    )
+
+
+def test_normalize_matches_generated_code_rule():
+    np.testing.assert_allclose(normalize([1, 2, 3]), [0.01, 0.505, 1.0])
+    np.testing.assert_allclose(normalize([4, 4]), [1.0, 1.0])
+
+
+def test_weighted_sum_fills_best_scored_devices_first(fleet):
+    cost_only, credit_only = fleet.solve_weighted(np.array([[0, 0, 1], [1, 0, 0]]))
+
+    # 成本优先：ESS_ML(0.04) → HVAC(0.1) → PV(0.15) → ESS_HBN(0.3)
+    np.testing.assert_allclose(cost_only, [6.0, 0.4, 10.0, 0.0, 3.6, 0.0])
+    # 信用优先：ESS_HY、EV 信用 5 先填满，其余按稳定顺序填 ESS_HBN
+    np.testing.assert_allclose(credit_only, [0.0, 8.2, 2.6, 7.0, 0.0, 2.2])
+
+
+def test_cost_bounded_solution_is_exact():
+    problem = ParetoProblem(
+        ["A", "B", "C"], [10, 10, 10], [1, 1, 1], [1, 1, 1], [3, 1, 0], 10
+    )
+
+    # max 3a + 2b + c，a + b + c = 10，3a + b ≤ 1.5：每单位成本 B 收益更高
+    np.testing.assert_allclose(
+        problem.solve_cost_bounded(np.array([3.0, 2.0, 1.0]), 1.5), [0, 1.5, 8.5]
+    )
+    assert problem.solve_cost_bounded(np.array([3.0, 2.0, 1.0]), 100) == pytest.approx(
+        [10, 0, 0]
+    )
+    assert problem.solve_cost_bounded(np.array([3.0, 2.0, 1.0]), -1) is None
+
+
+def test_non_dominated_filters_worse_points():
+    metrics = np.array(
+        [
+            [4.0, 1.0, 2.0],
+            [3.0, 1.0, 3.0],  # 被第一行支配
+            [5.0, 0.5, 4.0],
+        ]
+    )
+    assert non_dominated(metrics).tolist() == [True, False, True]
+
+
+def test_non_dominated_blocks_match_full_comparison(monkeypatch):
+    metrics = np.random.default_rng(0).integers(0, 5, size=(200, 3)).astype(float)
+    full = non_dominated(metrics)
+
+    monkeypatch.setattr(pareto, "_DOMINANCE_BLOCK_CELLS", 3 * 200 * 7)
+    assert (non_dominated(metrics) == full).all()
+    assert 0 < full.sum() < 200
+
+
+@pytest.mark.parametrize("method", ["weighted_sum", "epsilon_constraint"])
+def test_pareto_front_points_are_feasible_and_non_dominated(fleet, method):
+    front = pareto_front(fleet, method=method, steps=6)
+
+    points = front["points"]
+    assert points
+    costs = [p["cost"] for p in points]
+    assert costs == sorted(costs)
+    metrics = np.array([[p["credit"], p["direct_control"], p["cost"]] for p in points])
+    assert non_dominated(metrics).all()
+    for point in points:
+        alloc = np.array(list(point["allocation"].values()))
+        assert alloc.sum() == pytest.approx(20)
+        assert (alloc <= fleet.capacity + 1e-9).all()
+        assert point["profit"] == pytest.approx(
+            sum(point["device_profit"].values()), abs=0.05
+        )
+
+
+def test_weight_grid_covers_simplex():
+    grid = weight_grid(4)
+    assert len(grid) == 15
+    np.testing.assert_allclose(grid.sum(axis=1), 1.0)
+
+
+def test_problem_from_formulation():
+    formulation = {
+        "device_names": ["HVAC", "PV"],
+        "response_capacity": [6.0, 3.6],
+        "credit_scores": [3, 2],
+        "response_cost": [0.1, 0.15],
+        "notes": json.dumps({"direct_control": [1, 0], "TotalDemand": 5}),
+    }
+    problem = ParetoProblem.from_formulation(formulation)
+    assert problem.demand == 5
+    np.testing.assert_allclose(problem.direct_control, [1, 0])
+
+    with pytest.raises(ValueError):
+        ParetoProblem.from_formulation({**formulation, "notes": "{}"})
+    with pytest.raises(ValueError):
+        ParetoProblem(["A"], [1.0], [1], [1], [0.1], demand=2)
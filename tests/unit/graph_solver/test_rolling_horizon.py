@@ -0,0 +1,249 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+from datetime import date, datetime
+
+import pytest
+
+from src.graph_solver.baseline_service import (
+    BaselineService,
+    BaselineStore,
+    build_baseline_service,
+    default_csv_path,
+)
+from src.graph_solver.rolling_horizon import (
+    RollingDispatchSession,
+    RollingHorizonDispatcher,
+    TelemetryUpdate,
+    slot_label,
+)
+from src.utils.registry import component_registry
+
+FORMULATION = {
+    "device_names": ["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+    "response_capacity": [6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+    "credit_scores": [3, 4, 4, 5, 2, 5],
+    "response_cost": [0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+    "notes": json.dumps({"direct_control": [1, 1, 1, 1, 0, 0], "TotalDemand": 20}),
+}
+ALLOCATION = {
+    "HVAC": 3.0,
+    "ESS_HBN": 0.0,
+    "ESS_ML": 10.0,
+    "ESS_HY": 7.0,
+    "PV": 0.0,
+    "EV": 0.0,
+}
+STORAGE = {
+    name: {
+        "rated_power_kw": rated,
+        "energy_capacity_kwh": rated * 2,
+        "initial_soc": 0.8,
+        "soc_min": 0.1,
+        "soc_max": 0.9,
+    }
+    for name, rated in (("ESS_HBN", 1200), ("ESS_HY", 1500), ("ESS_ML", 1300))
+}
+EVENT_DAY = date(2025, 7, 29)
+
+
+@pytest.fixture(autouse=True)
+def baseline_service(tmp_path):
+    service = BaselineService(BaselineStore(str(tmp_path)))
+    service.ingest_csv(default_csv_path, persist=False)
+    component_registry.register("graph_solver.baseline_service", lambda: service)
+    yield service
+    component_registry.register("graph_solver.baseline_service", build_baseline_service)
+
+
+def _session(now):
+    return RollingDispatchSession(
+        FORMULATION,
+        allocation=ALLOCATION,
+        plan_date=EVENT_DAY,
+        clock=lambda: now,
+        storage=STORAGE,
+    )
+
+
+def test_slot_label_floors_to_interval():
+    assert slot_label(datetime(2025, 7, 29, 16, 29, 59)) == "16:15:00"
+
+
+def test_first_redispatch_publishes_remaining_intervals_only():
+    session = _session(datetime(2025, 7, 29, 16, 20))
+
+    delta = session.redispatch()
+
+    assert delta["version"] == 1
+    assert delta["remaining"] == ["16:15:00", "16:30:00", "16:45:00"]
+    assert delta["allocation"] == ALLOCATION
+    assert set(delta["plan_changes"]) == set(ALLOCATION)
+    assert all(change["old"] is None for change in delta["plan_changes"]["HVAC"])
+
+
+def test_session_requires_storage_capacity_and_soc():
+    storage = {name: dict(params) for name, params in STORAGE.items()}
+    del storage["ESS_ML"]["energy_capacity_kwh"]
+    with pytest.raises(ValueError, match="ESS_ML"):
+        RollingDispatchSession(FORMULATION, allocation=ALLOCATION, storage=storage)
+
+    storage = {name: dict(params) for name, params in STORAGE.items()}
+    del storage["ESS_HY"]["initial_soc"]
+    with pytest.raises(ValueError, match="ESS_HY"):
+        RollingDispatchSession(FORMULATION, allocation=ALLOCATION, storage=storage)
+    RollingDispatchSession(
+        FORMULATION, allocation=ALLOCATION, storage=storage, initial_soc={"ESS_HY": 0.6}
+    )
+
+
+def test_storage_soc_stays_within_bounds():
+    now = datetime(2025, 7, 29, 16, 20)
+    session = _session(now)
+    session.apply_telemetry([TelemetryUpdate("ESS_ML", now, soc=0.15)])
+    session.redispatch()
+
+    plan = session.plan["ESS_ML"]
+    # 2600kWh 从 SOC 0.15 放到下限 0.1 最多放出 130kWh × 0.95
+    assert sum(v for v in plan.values() if v > 0) * 0.25 <= 130 * 0.95 + 1e-2
+    assert all(abs(v) <= 1300 + 1e-6 for v in plan.values())
+
+
+def test_outage_telemetry_re_solves_without_llm():
+    now = datetime(2025, 7, 29, 16, 20)
+    session = _session(now)
+    session.redispatch()
+
+    session.apply_telemetry([TelemetryUpdate("HVAC", now, available_mw=0.0)])
+    delta = session.redispatch()
+
+    assert delta["allocation"]["HVAC"] == 0.0
+    assert sum(delta["allocation"].values()) == pytest.approx(20.0)
+    assert delta["allocation_changes"]["HVAC"] == {"old": 3.0, "new": 0.0}
+    assert "HVAC" in delta["plan_changes"]
+    assert delta["shortfall_mw"] == 0.0
+
+
+def test_unchanged_telemetry_publishes_empty_delta():
+    now = datetime(2025, 7, 29, 16, 20)
+    session = _session(now)
+    session.redispatch()
+
+    delta = session.redispatch()
+
+    assert delta["allocation_changes"] == {}
+    assert delta["plan_changes"] == {}
+
+
+def test_pre_window_power_is_written_to_baseline(baseline_service):
+    session = _session(datetime(2025, 7, 29, 15, 0))
+    session.apply_telemetry(
+        [TelemetryUpdate("PV", datetime(2025, 7, 29, 15, 0), power_kw=123.0)]
+    )
+
+    days, values = baseline_service.store.history("PV")
+    assert values[days == EVENT_DAY.toordinal()][0, 60] == 123.0
+
+
+def test_baseline_write_compares_full_datetimes(baseline_service):
+    session = _session(datetime(2025, 7, 28, 18, 0))
+    session.apply_telemetry(
+        [
+            TelemetryUpdate("PV", datetime(2025, 7, 28, 18, 0), power_kw=45.0),
+            TelemetryUpdate("PV", datetime(2025, 7, 29, 16, 30), power_kw=67.0),
+        ]
+    )
+
+    days, values = baseline_service.store.history("PV")
+    assert values[days == date(2025, 7, 28).toordinal()][0, 72] == 45.0
+    assert not (values == 67.0).any()
+
+
+def test_window_on_a_later_day_is_not_finished():
+    session = _session(datetime(2025, 7, 28, 16, 30))
+
+    assert session.remaining_window() == "16:00:00"
+
+
+def test_session_finishes_after_window():
+    session = _session(datetime(2025, 7, 29, 17, 0))
+
+    assert session.redispatch() is None
+    assert session.finished
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_pushes_deltas_on_telemetry():
+    now = datetime(2025, 7, 29, 16, 5)
+    dispatcher = RollingHorizonDispatcher(interval_seconds=60)
+    session_id = dispatcher.start(_session(now))
+    queue = dispatcher.subscribe(session_id)
+
+    first = await asyncio.wait_for(queue.get(), timeout=5)
+    assert first["version"] == 1
+
+    dispatcher.submit_telemetry(
+        session_id, [TelemetryUpdate("ESS_ML", now, available_mw=5.0)]
+    )
+    second = await asyncio.wait_for(queue.get(), timeout=5)
+    assert second["allocation"]["ESS_ML"] == 5.0
+
+    await dispatcher.stop(session_id)
+    assert await asyncio.wait_for(queue.get(), timeout=5) is None
+    assert len(dispatcher.history(session_id)) == 2
+    with pytest.raises(KeyError):
+        dispatcher.submit_telemetry("missing", [])
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_evicts_finished_sessions():
+    dispatcher = RollingHorizonDispatcher(
+        interval_seconds=60, retention_seconds=3600, max_finished=1
+    )
+    first = dispatcher.start(_session(datetime(2025, 7, 29, 16, 5)))
+    await dispatcher.stop(first)
+    assert dispatcher.get(first).finished
+
+    second = dispatcher.start(_session(datetime(2025, 7, 29, 17, 0)))
+    queue = dispatcher.subscribe(second)
+    assert await asyncio.wait_for(queue.get(), timeout=5) is None
+
+    with pytest.raises(KeyError):
+        dispatcher.history(first)
+    assert set(dispatcher.sessions) == {second}
+    assert not dispatcher._tasks
+
+    dispatcher.retention_seconds = 0
+    await dispatcher.stop(second)
+    dispatcher.start(_session(datetime(2025, 7, 29, 17, 0)))
+    assert second not in dispatcher.sessions
+    assert second not in dispatcher._history and second not in dispatcher._subscribers
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_fails_session_after_repeated_errors():
+    dispatcher = RollingHorizonDispatcher(interval_seconds=0, max_failures=3)
+    session = _session(datetime(2025, 7, 29, 16, 5))
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("solver down")
+
+    session.redispatch = broken
+    session_id = dispatcher.start(session)
+    queue = dispatcher.subscribe(session_id)
+
+    failure = await asyncio.wait_for(queue.get(), timeout=5)
+    assert failure == {"session_id": session_id, "error": "solver down"}
+    assert await asyncio.wait_for(queue.get(), timeout=5) is None
+    assert len(calls) == 3
+    assert session.finished and session.error == "solver down"
+
+
+@pytest.mark.asyncio
+async def test_stop_unknown_session_raises():
+    with pytest.raises(KeyError):
+        await RollingHorizonDispatcher().stop("missing")
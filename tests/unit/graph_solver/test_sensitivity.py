@@ -0,0 +1,124 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+
+from src.graph_solver.pareto import ParetoProblem
+from src.graph_solver.sensitivity import (
+    answer_what_if,
+    build_sensitivity,
+    extract_solver_duals,
+)
+
+FORMULATION = {
+    "device_names": ["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+    "response_capacity": [6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+    "credit_scores": [3, 4, 4, 5, 2, 5],
+    "response_cost": [0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+    "notes": json.dumps(
+        {
+            "direct_control": [1, 1, 1, 1, 0, 0],
+            "TotalDemand": 20,
+            "weights": [1.0, 1.0, 1.0],
+        }
+    ),
+}
+
+
+def _optimal_allocation(formulation, demand=None):
+    problem = ParetoProblem.from_formulation(formulation)
+    if demand is not None:
+        problem.demand = demand
+    return dict(zip(problem.device_names, problem.solve_weighted(np.ones((1, 3)))[0]))
+
+
+@pytest.fixture
+def report():
+    return build_sensitivity(FORMULATION, _optimal_allocation(FORMULATION))
+
+
+def test_demand_dual_comes_from_marginal_device(report):
+    constraint = report["demand_constraint"]
+    assert constraint["increase"]["device"] == "HVAC"
+    assert constraint["increase"]["range_mw"] == pytest.approx(3.0)
+    assert constraint["decrease"]["range_mw"] == pytest.approx(3.0)
+    assert report["devices"]["HVAC"]["status"] == "marginal"
+    assert report["devices"]["HVAC"]["reduced_cost"] == pytest.approx(0.0)
+
+
+def test_capacity_binding_flags(report):
+    devices = report["devices"]
+    assert devices["ESS_ML"]["capacity_binding"] is True
+    assert devices["ESS_ML"]["reduced_cost"] > 0
+    assert devices["PV"]["capacity_binding"] is False
+    assert devices["PV"]["status"] == "idle"
+    assert devices["PV"]["reduced_cost"] < 0
+
+
+def test_demand_what_if_matches_re_solve(report):
+    answer = answer_what_if(report, "demand", 1.0)
+
+    assert answer["answerable"] is True
+    expected = _optimal_allocation(FORMULATION, demand=21)
+    assert answer["allocation"] == pytest.approx(expected)
+    assert answer["profit_delta"] == pytest.approx((3.0 - 0.1) * 1000)
+
+
+def test_capacity_what_if_within_and_outside_range(report):
+    more_ml = answer_what_if(report, "capacity", 1.0, device="ESS_ML")
+    assert more_ml["answerable"] is True
+    assert more_ml["allocation"]["ESS_ML"] == pytest.approx(11.0)
+    assert more_ml["allocation"]["HVAC"] == pytest.approx(2.0)
+    assert more_ml["profit_delta"] == pytest.approx((0.1 - 0.04) * 1000)
+
+    assert answer_what_if(report, "capacity", 2.0, device="PV")["profit_delta"] == 0
+    assert answer_what_if(report, "demand", 5.0)["answerable"] is False
+    assert (
+        answer_what_if(report, "capacity", -8.0, device="ESS_HY")["answerable"] is False
+    )
+
+
+def test_unknown_what_if_inputs_rejected(report):
+    with pytest.raises(ValueError):
+        answer_what_if(report, "price", 1.0)
+    with pytest.raises(ValueError):
+        answer_what_if(report, "capacity", 1.0, device="GT")
+
+
+def test_extract_solver_duals_reads_import_suffixes():
+    model = pyo.ConcreteModel()
+    model.x = pyo.Var([0, 1], bounds=(0, 5))
+    model.demand = pyo.Constraint(expr=model.x[0] + model.x[1] == 6)
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    model.rc = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    model.dual[model.demand] = 1.5
+    model.rc[model.x[1]] = -0.25
+
+    assert extract_solver_duals({"model": model}) == {
+        "duals": {"demand": 1.5},
+        "reduced_costs": {"x[1]": -0.25},
+    }
+    assert extract_solver_duals({}) == {}
+
+
+def test_interpretation_sensitivity_from_node_state(caplog):
+    from src.graph_solver.opt_nodes import get_sensitivity
+
+    variables = [
+        {"name": k, "value": v} for k, v in _optimal_allocation(FORMULATION).items()
+    ]
+    state = {
+        "formulation": FORMULATION,
+        "solution": {"solver_duals": {"duals": {"demand": 1.2}}},
+    }
+
+    sensitivity = get_sensitivity(state, variables)
+    assert sensitivity["source"] == "solver+analytic"
+    assert sensitivity["solver_duals"] == {"duals": {"demand": 1.2}}
+    assert get_sensitivity({"formulation": {}}, variables) is None
+    assert "Sensitivity analysis failed" in caplog.text
+    assert get_sensitivity(state, []) is None
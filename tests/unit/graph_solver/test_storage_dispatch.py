@@ -0,0 +1,126 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pytest
+
+from src.graph_solver.storage_dispatch import (
+    StorageFleet,
+    build_storage_fleet,
+    dispatch_storage,
+)
+
+
+def _fleet(n, rated=100.0, capacity=10000.0, soc=0.8):
+    return StorageFleet(
+        names=[f"ESS_{i}" for i in range(n)],
+        rated_power=rated,
+        energy_capacity=capacity,
+        initial_soc=soc,
+        soc_min=0.1,
+    )
+
+
+def test_split_is_proportional_to_headroom():
+    result = dispatch_storage(
+        _fleet(1), np.array([[0.0, 50.0, 100.0, 150.0]]), np.array([75.0])
+    )
+
+    # 额定功率截断后可上调空间为 [100, 50, 0, 0]
+    np.testing.assert_allclose(result.increments, [[50.0, 25.0, 0.0, 0.0]])
+    np.testing.assert_allclose(result.power, [[50.0, 75.0, 100.0, 100.0]])
+    assert result.unmet == 0
+
+
+def test_clipped_energy_is_redistributed_across_intervals_and_units():
+    baseline = np.array([[90.0, 0.0], [0.0, 0.0]])
+    result = dispatch_storage(_fleet(2), baseline, np.array([150.0, 20.0]))
+
+    # 单元 0 最多上调 110，其余 40 转给单元 1
+    assert result.delivered[0] == pytest.approx(110.0)
+    assert result.delivered[1] == pytest.approx(60.0)
+    assert result.delivered.sum() == pytest.approx(170.0)
+    assert result.spilled == {"ESS_0": pytest.approx(40.0)}
+    assert (result.power <= 100.0 + 1e-9).all()
+
+
+def test_no_spill_keeps_unmet_amount():
+    baseline = np.array([[90.0, 0.0], [0.0, 0.0]])
+    result = dispatch_storage(_fleet(2), baseline, np.array([150.0, 20.0]), spill=False)
+
+    assert result.delivered[0] == pytest.approx(110.0)
+    assert result.unmet == pytest.approx(40.0)
+
+
+def test_state_of_charge_limits_discharge():
+    # 100kWh、初始 SOC 0.3、下限 0.1：最多再放出 20kWh × 0.95
+    fleet = _fleet(1, capacity=100.0, soc=0.3)
+    result = dispatch_storage(fleet, np.zeros((1, 4)), np.array([400.0]), dt=0.25)
+
+    assert result.delivered[0] == pytest.approx(20 * 0.95 / 0.25)
+    assert result.soc.min() == pytest.approx(0.1)
+    assert result.unmet == pytest.approx(400.0 - 76.0)
+
+
+def test_reducing_charge_uses_charge_efficiency():
+    fleet = _fleet(1, capacity=100.0, soc=0.1)
+    # 基线充电 40kW，SOC 已在下限：只能减少充电，不能多放电
+    result = dispatch_storage(fleet, np.array([[-40.0]]), np.array([100.0]), dt=1.0)
+
+    assert result.increments[0, 0] == pytest.approx(40.0)
+    assert result.soc[0, 0] == pytest.approx(0.1)
+
+
+def test_charging_baseline_is_clipped_to_rated_power_and_soc_max():
+    fleet = StorageFleet(
+        names=["ESS_0"],
+        rated_power=100.0,
+        energy_capacity=100.0,
+        initial_soc=0.8,
+        soc_min=0.1,
+        soc_max=0.9,
+    )
+    # 基线充电 -500kW 超过额定功率，且 0.8→0.9 只能再充 10kWh / 0.95
+    result = dispatch_storage(fleet, np.full((1, 4), -500.0), np.array([0.0]), dt=0.25)
+
+    assert (result.power >= -100.0 - 1e-9).all()
+    assert result.soc.max() == pytest.approx(0.9)
+    assert result.power[0, 0] == pytest.approx(-10 / 0.95 / 0.25)
+    np.testing.assert_allclose(result.power[0, 1:], 0.0, atol=1e-9)
+
+
+def test_build_storage_fleet_requires_capacity_and_initial_soc():
+    config = {
+        "ESS_A": {"rated_power_kw": 100, "energy_capacity_kwh": 200},
+        "ESS_B": {"rated_power_kw": 100, "initial_soc": 0.5},
+    }
+
+    with pytest.raises(ValueError, match="ESS_A.*initial_soc"):
+        build_storage_fleet(["ESS_A"], config)
+    with pytest.raises(ValueError, match="ESS_B.*energy_capacity_kwh"):
+        build_storage_fleet(["ESS_B"], config)
+
+    fleet = build_storage_fleet(["ESS_A"], config, initial_soc={"ESS_A": 0.4})
+    assert fleet.initial_soc[0] == pytest.approx(0.4)
+    assert fleet.energy_capacity[0] == pytest.approx(200.0)
+
+
+def test_large_fleet_hits_allocation_exactly():
+    rng = np.random.default_rng(0)
+    units, intervals = 500, 16
+    fleet = StorageFleet(
+        names=[str(i) for i in range(units)],
+        rated_power=rng.uniform(500, 2000, units),
+        energy_capacity=rng.uniform(4000, 8000, units),
+        initial_soc=0.9,
+        soc_min=0.1,
+    )
+    baseline = rng.uniform(-500, 1500, (units, intervals))
+    targets = rng.uniform(0, 3000, units)
+
+    result = dispatch_storage(fleet, baseline, targets)
+
+    assert result.delivered.sum() == pytest.approx(targets.sum())
+    assert result.unmet == pytest.approx(0.0, abs=1e-6)
+    assert (result.power <= fleet.rated_power[:, None] + 1e-6).all()
+    assert (result.soc >= 0.1 - 1e-9).all()
@@ -0,0 +1,109 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.config.report_style import ReportStyle
+from src.prompt_enhancer import cache as cache_module
+from src.prompt_enhancer.cache import ResponseCache, enhancer_cache_key
+from src.prompt_enhancer.graph.enhancer_node import prompt_enhancer_node
+from src.utils.registry import component_registry
+
+
+def _model(name="doubao-1.5-pro"):
+    model = MagicMock()
+    model.model_name = name
+    return model
+
+
+def test_key_ignores_whitespace_and_case_but_not_style_or_model():
+    model = _model()
+    key = enhancer_cache_key(
+        "  Write a  REPORT\non VPP ", None, ReportStyle.NEWS, model
+    )
+    assert key == enhancer_cache_key("write a report on vpp", "", "news", model)
+    assert key != enhancer_cache_key(
+        "write a report on vpp", "", ReportStyle.ACADEMIC, model
+    )
+    assert key != enhancer_cache_key(
+        "write a report on vpp", "", ReportStyle.NEWS, _model("deepseek-v3")
+    )
+    assert enhancer_cache_key("p", None, None, MagicMock()) is None
+
+
+def test_lru_and_ttl_eviction():
+    cache = ResponseCache(max_size=2, ttl_seconds=0.05)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda: key.upper())
+    assert cache.get_or_compute("a", lambda: "recomputed") == "recomputed"
+    assert cache.get_or_compute("c", lambda: "stale") == "C"
+
+    time.sleep(0.06)
+    assert cache.get_or_compute("c", lambda: "fresh") == "fresh"
+    stats = cache.stats()
+    assert stats["evictions"] == 2 and stats["expirations"] == 1 and stats["hits"] == 1
+
+
+def test_concurrent_identical_requests_share_one_call():
+    cache = ResponseCache()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "enhanced"
+
+    with ThreadPoolExecutor(8) as pool:
+        first = pool.submit(cache.get_or_compute, "k", slow)
+        started.wait(1)
+        rest = [pool.submit(cache.get_or_compute, "k", slow) for _ in range(7)]
+        results = [first.result()] + [f.result() for f in rest]
+
+    assert results == ["enhanced"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["hit_rate"] == pytest.approx(7 / 8)
+
+
+def test_failures_are_not_cached():
+    cache = ResponseCache()
+
+    def fail():
+        raise TimeoutError("llm timeout")
+
+    with pytest.raises(TimeoutError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+
+def test_enhancer_node_reuses_cached_response():
+    cache = ResponseCache()
+    component_registry.register("prompt_enhancer.response_cache", lambda: cache)
+    model = _model()
+    model.invoke.return_value = MagicMock(
+        content="<enhanced_prompt>Better prompt</enhanced_prompt>"
+    )
+    try:
+        with patch(
+            "src.prompt_enhancer.graph.enhancer_node.get_llm_by_type",
+            return_value=model,
+        ):
+            first = prompt_enhancer_node(
+                {"prompt": "Write about VPP", "report_style": ReportStyle.NEWS}
+            )
+            second = prompt_enhancer_node(
+                {"prompt": "write about  vpp", "report_style": ReportStyle.NEWS}
+            )
+    finally:
+        component_registry.register(
+            "prompt_enhancer.response_cache", cache_module.build_enhancer_cache
+        )
+
+    assert model.invoke.call_count == 1
+    assert first.update["output"] == second.update["output"] == "Better prompt"
@@ -0,0 +1,74 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import patch
+
+from src.config.configuration import Configuration
+from src.prompts import template
+from src.prompts.template import (
+    RUNTIME_CONTEXT_PLACEHOLDER,
+    apply_prompt_template,
+    precompile_templates,
+    prompt_cache_stats,
+)
+
+
+def _state(**extra):
+    return {"messages": [{"role": "user", "content": "削峰20MW"}], **extra}
+
+
+def test_system_prompt_is_byte_identical_across_calls():
+    with patch.object(template, "datetime") as mock_datetime:
+        mock_datetime.now.return_value.strftime.return_value = (
+            "Mon Jan 01 2025 10:00:00"
+        )
+        first = apply_prompt_template(
+            "planner", _state(locale="zh-CN"), Configuration(max_step_num=3)
+        )
+        mock_datetime.now.return_value.strftime.return_value = (
+            "Mon Jan 01 2025 10:00:07"
+        )
+        second = apply_prompt_template(
+            "planner", _state(locale="zh-CN"), Configuration(max_step_num=3)
+        )
+
+    assert first[0]["content"] == second[0]["content"]
+    assert RUNTIME_CONTEXT_PLACEHOLDER in first[0]["content"]
+    assert "10:00:00" not in first[0]["content"]
+    assert first[-1] == {
+        "role": "user",
+        "content": "Runtime context:\nCURRENT_TIME: Mon Jan 01 2025 10:00:00",
+    }
+    assert second[-1]["content"].endswith("10:00:07")
+    assert first[1]["content"] == "削峰20MW"
+
+
+def test_configuration_variables_still_select_the_prompt():
+    zh = apply_prompt_template(
+        "reporter", _state(report_style="social_media", locale="zh-CN")
+    )
+    en = apply_prompt_template(
+        "reporter", _state(report_style="social_media", locale="en-US")
+    )
+    assert "小红书" in zh[0]["content"]
+    assert "Twitter/X" in en[0]["content"]
+
+
+def test_static_renders_are_memoised_and_reported():
+    precompile_templates()
+    apply_prompt_template("coder", _state(locale="en-US"))
+    before = prompt_cache_stats()
+    apply_prompt_template("coder", _state(locale="en-US", unrelated=[1, 2, 3]))
+    after = prompt_cache_stats()
+
+    assert after["memo_hits"] == before["memo_hits"] + 1
+    assert after["compiled_templates"] >= 5
+    assert 0.9 < after["prefix_cache_ratio"] <= 1.0
+
+
+def test_stable_prefix_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("PROMPT_STABLE_PREFIX", "false")
+    messages = apply_prompt_template("coder", _state())
+
+    assert len(messages) == 2
+    assert RUNTIME_CONTEXT_PLACEHOLDER not in messages[0]["content"]
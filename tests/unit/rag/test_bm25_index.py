@@ -0,0 +1,183 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pytest
+
+from src.rag import builder
+from src.rag.bm25_index import (
+    BM25Index,
+    BM25Provider,
+    HybridRetriever,
+    decode_postings,
+    encode_postings,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from src.rag.local_index import LocalIndexProvider
+from src.rag.retriever import Chunk, Document, Resource
+
+DOCS = [
+    (
+        "gb50052",
+        "GB50052-2009 第3.2.1条：一级负荷应由双重电源供电。",
+        "供配电设计规范",
+        None,
+    ),
+    ("tou", "分时电价：峰时段电价高于谷时段电价，储能在谷时段充电。", "分时电价", None),
+    (
+        "pcs",
+        "PCS-500 储能变流器的额定功率为 500 kW。",
+        "设备手册",
+        "http://example.com/pcs",
+    ),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add_dataset("regs", "Regulations")
+    index.add_dataset("devices", "Devices")
+    index.add_documents("regs", DOCS[:2])
+    index.add_documents("devices", DOCS[2:])
+    return index
+
+
+def hit_documents(index, query, **kwargs):
+    return [doc.id for doc in index.documents_for(index.search(query, **kwargs))]
+
+
+def test_tokenize_keeps_codes_and_splits_chinese_into_bigrams():
+    assert tokenize("GB50052-2009 第3.2.1条 PCS-500") == [
+        "gb50052-2009",
+        "第",
+        "3.2.1",
+        "条",
+        "pcs-500",
+    ]
+    assert tokenize("储能变流器") == ["储能", "能变", "变流", "流器"]
+
+
+@pytest.mark.parametrize("max_id", [200, 60000, 5_000_000])
+def test_posting_lists_round_trip(max_id):
+    ids = np.unique(np.random.default_rng(0).integers(0, max_id, 1000))
+    tfs = np.random.default_rng(1).integers(1, 300, len(ids))
+    decoded_ids, decoded_tfs = decode_postings(encode_postings(ids, tfs))
+    assert np.array_equal(decoded_ids, ids)
+    assert np.array_equal(decoded_tfs, tfs)
+
+
+def test_exact_terms_are_ranked_first(index):
+    assert hit_documents(index, "GB50052-2009 第3.2.1条")[0] == "gb50052"
+    assert hit_documents(index, "PCS-500 额定功率")[0] == "pcs"
+    assert hit_documents(index, "谷时段电价")[0] == "tou"
+    assert index.search("nothing matches this") == []
+
+
+def test_search_is_limited_to_the_given_resources(index):
+    assert hit_documents(index, "储能", scopes=[("devices", "")]) == ["pcs"]
+    assert hit_documents(index, "储能", scopes=[("regs", "tou")]) == ["tou"]
+    assert hit_documents(index, "储能", scopes=[("unknown", "")]) == []
+
+
+def test_incremental_replace_remove_and_compact(index, tmp_path):
+    index.add_documents(
+        "devices", [("pcs", "PCS-630 储能变流器，额定功率 630 kW。", "设备手册", None)]
+    )
+    assert hit_documents(index, "PCS-500") == []
+    assert hit_documents(index, "PCS-630") == ["pcs"]
+
+    index.remove_document("tou")
+    assert "tou" not in hit_documents(index, "谷时段 电价")
+    assert len(index) == 2
+
+    reopened = BM25Index(str(tmp_path))
+    assert len(reopened) == 2
+    assert hit_documents(reopened, "PCS-630") == ["pcs"]
+    assert (
+        reopened._db.execute("SELECT df FROM postings WHERE term = '谷时'").fetchone()[
+            0
+        ]
+        == 0
+    )
+
+    assert index.compact() > 0
+    assert (
+        index._db.execute("SELECT 1 FROM postings WHERE term = '谷时'").fetchone()
+        is None
+    )
+    assert hit_documents(index, "GB50052-2009")[0] == "gb50052"
+
+
+def test_writes_from_another_connection_are_picked_up(index, tmp_path):
+    other = BM25Index(str(tmp_path))
+    other.add_documents(
+        "regs", [("new", "新增条款：分布式光伏应具备低电压穿越能力。", None, None)]
+    )
+    assert hit_documents(index, "低电压穿越") == ["new"]
+
+
+def test_compact_keeps_chunks_written_by_another_connection(index, tmp_path):
+    other = BM25Index(str(tmp_path))
+    other.add_documents(
+        "regs", [("new", "新增条款：储能电站应具备一次调频能力。", None, None)]
+    )
+
+    index.compact()
+
+    assert hit_documents(other, "一次调频") == ["new"]
+    assert hit_documents(index, "一次调频") == ["new"]
+
+
+def test_reciprocal_rank_fusion_merges_rankings():
+    a = Document(id="a", chunks=[Chunk("a1", 1.0)])
+    b = Document(id="b", chunks=[Chunk("b1", 1.0)])
+    b_dense = Document(id="b", title="B", chunks=[Chunk("b1", 0.5), Chunk("b2", 0.4)])
+    c = Document(id="c", chunks=[Chunk("c1", 0.9)])
+
+    fused = reciprocal_rank_fusion([[a, b], [b_dense, c]])
+
+    assert [doc.id for doc in fused] == ["b", "a", "c"]
+    assert [chunk.content for chunk in fused[0].chunks] == ["b1", "b2"]
+    assert fused[0].title == "B"
+
+
+def test_hybrid_provider_from_build_retriever(index, tmp_path, monkeypatch):
+    monkeypatch.setenv("BM25_INDEX_DIR", str(tmp_path))
+    monkeypatch.setenv("LOCAL_RAG_INDEX_DIR", str(tmp_path / "dense"))
+    monkeypatch.setenv("RAG_PROVIDER", "hybrid")
+
+    retriever = builder.build_retriever()
+    assert isinstance(retriever, HybridRetriever)
+    assert isinstance(retriever.lexical, BM25Provider)
+    assert isinstance(retriever.dense, LocalIndexProvider)
+
+    dense_index = retriever.dense.index
+    dense_index.add_dataset("devices", "Devices")
+    dense_index.add_document("devices", "pcs", DOCS[2][1], title="设备手册")
+    resources = [Resource(uri="rag://dataset/devices", title="Devices")]
+
+    docs = retriever.query_relevant_documents("PCS-500 额定功率", resources)
+    assert [doc.id for doc in docs] == ["pcs"]
+    assert [r.uri for r in retriever.list_resources()] == [
+        "rag://dataset/devices",
+        "rag://dataset/regs",
+    ]
+
+    monkeypatch.setenv("HYBRID_DENSE_PROVIDER", "bm25")
+    with pytest.raises(ValueError):
+        builder.build_retriever()
+
+
+@pytest.mark.asyncio
+async def test_hybrid_async_query_matches_sync(index, tmp_path, monkeypatch):
+    monkeypatch.setenv("BM25_INDEX_DIR", str(tmp_path))
+    lexical = BM25Provider()
+    retriever = HybridRetriever(lexical, lexical)
+    resources = [Resource(uri="rag://dataset/regs", title="Regulations")]
+    sync_ids = [doc.id for doc in retriever.query_relevant_documents("电价", resources)]
+    async_ids = [
+        doc.id for doc in await retriever.aquery_relevant_documents("电价", resources)
+    ]
+    assert sync_ids == async_ids == ["tou"]
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.rag import builder
+from src.rag.builder import CachedRetriever, get_retriever, reset_retriever
+from src.rag.http import get_http_session
+from src.rag.retriever import Resource, Retriever
+
+
+@pytest.fixture(autouse=True)
+def ragflow_env(monkeypatch):
+    monkeypatch.setenv("RAGFLOW_API_URL", "http://api")
+    monkeypatch.setenv("RAGFLOW_API_KEY", "key")
+    monkeypatch.setenv("RAG_PROVIDER", "ragflow")
+    reset_retriever()
+    yield
+    reset_retriever()
+
+
+def test_retriever_is_shared_per_configuration(monkeypatch):
+    first = get_retriever()
+    assert get_retriever() is first
+    assert first.retriever.session is get_http_session()
+
+    monkeypatch.setenv("RAGFLOW_API_KEY", "rotated")
+    second = get_retriever()
+    assert second is not first
+    assert second.retriever.api_key == "rotated"
+
+    monkeypatch.setenv("RAG_PROVIDER", "")
+    assert get_retriever() is None
+
+
+def test_concurrent_first_use_builds_one_provider():
+    with patch.object(
+        builder, "build_retriever", wraps=builder.build_retriever
+    ) as build:
+        with ThreadPoolExecutor(8) as pool:
+            retrievers = list(pool.map(lambda _: get_retriever(), range(16)))
+    assert build.call_count == 1
+    assert all(r is retrievers[0] for r in retrievers)
+
+
+def test_list_resources_is_cached_per_query_until_ttl():
+    provider = MagicMock(spec=Retriever)
+    provider.list_resources.side_effect = lambda query: [
+        Resource(uri=f"rag://dataset/{query}", title=str(query))
+    ]
+    retriever = CachedRetriever(provider, resources_ttl_seconds=0.05)
+
+    assert retriever.list_resources("grid") == retriever.list_resources("  grid ")
+    retriever.list_resources("load")
+    assert provider.list_resources.call_count == 2
+
+    time.sleep(0.06)
+    retriever.list_resources("grid")
+    assert provider.list_resources.call_count == 3
+
+    retriever.query_relevant_documents("q", [])
+    retriever.query_relevant_documents("q", [])
+    assert provider.query_relevant_documents.call_count == 2
+
+
+def test_concurrent_listings_share_one_call():
+    provider = MagicMock(spec=Retriever)
+    started = threading.Event()
+
+    def slow_list(query):
+        started.set()
+        time.sleep(0.05)
+        return []
+
+    provider.list_resources.side_effect = slow_list
+    retriever = CachedRetriever(provider)
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: retriever.list_resources(None), range(4)))
+    assert provider.list_resources.call_count == 1
+
+
+def test_zero_ttl_disables_the_resource_cache():
+    provider = MagicMock(spec=Retriever)
+    provider.list_resources.return_value = []
+    retriever = CachedRetriever(provider, resources_ttl_seconds=0)
+    retriever.list_resources("a")
+    retriever.list_resources("a")
+    assert provider.list_resources.call_count == 2
@@ -0,0 +1,192 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import zlib
+
+import numpy as np
+import pytest
+
+from src.rag import builder
+from src.rag.local_index import (
+    HashingEmbedder,
+    LocalIndexProvider,
+    LocalVectorIndex,
+    chunk_text,
+    load_embedder,
+)
+from src.rag.retriever import Resource
+
+GRID_DOCS = {
+    "peak": "虚拟电厂在晚高峰削减负荷，储能放电支撑电网频率。",
+    "solar": "Rooftop solar output peaks at noon and drops to zero after sunset.",
+    "tariff": "Time-of-use tariffs make evening electricity more expensive than night electricity.",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), HashingEmbedder(dim=256))
+    index.add_dataset("grid", "Grid operations", "dispatch notes")
+    index.add_dataset("market", "Market rules")
+    index.add_document("grid", "peak", GRID_DOCS["peak"], title="Peak shaving")
+    index.add_document("grid", "solar", GRID_DOCS["solar"], title="Solar")
+    index.add_document(
+        "market",
+        "tariff",
+        GRID_DOCS["tariff"],
+        title="Tariffs",
+        url="http://example.com/tou",
+    )
+    return index
+
+
+def test_hashing_embedder_is_normalised_and_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    vectors = embedder.embed(["削峰填谷", "peak shaving", ""])
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.array_equal(vectors, embedder.embed(["削峰填谷", "peak shaving", ""]))
+
+
+def test_chunk_text_keeps_paragraphs_together():
+    text = "\n\n".join(["a" * 300, "b" * 300, "c" * 300, "d" * 2000])
+    chunks = chunk_text(text, max_chars=700)
+    assert chunks[0] == "a" * 300 + "\n\n" + "b" * 300
+    assert all(len(chunk) <= 700 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+
+
+def test_search_ranks_the_matching_chunk_first(index):
+    assert len(index) == 3
+    (peak_hits, solar_hits) = index.search(
+        ["晚高峰 削减负荷", "solar output at noon"], k=2
+    )
+    assert index.documents_for(peak_hits)[0].id == "peak"
+    assert index.documents_for(solar_hits)[0].id == "solar"
+    assert peak_hits[0][1] >= peak_hits[1][1]
+
+
+def test_search_is_limited_to_the_given_resources(index):
+    hits = index.search(["solar output at noon"], k=5, scopes=[("market", "")])[0]
+    assert {doc.id for doc in index.documents_for(hits)} == {"tariff"}
+
+    hits = index.search(["solar output"], k=5, scopes=[("grid", "peak")])[0]
+    assert {doc.id for doc in index.documents_for(hits)} == {"peak"}
+
+
+def test_replacing_a_document_hides_its_old_chunks_and_survives_reopen(index, tmp_path):
+    index.add_document(
+        "grid", "solar", "Wind turbines produce more power at night.", title="Wind"
+    )
+    hits = index.search(["wind turbines at night"], k=5)[0]
+    docs = index.documents_for(hits)
+    assert [c.content for d in docs if d.id == "solar" for c in d.chunks] == [
+        "Wind turbines produce more power at night."
+    ]
+
+    reopened = LocalVectorIndex(str(tmp_path), HashingEmbedder(dim=256))
+    assert len(reopened) == 3
+    assert (
+        reopened.documents_for(reopened.search(["wind turbines"], k=1)[0])[0].title
+        == "Wind"
+    )
+
+    with pytest.raises(ValueError, match="dimension"):
+        LocalVectorIndex(str(tmp_path), HashingEmbedder(dim=128))
+
+
+def test_incremental_updates_match_a_fresh_load(index, tmp_path):
+    index.add_documents(
+        "grid",
+        [
+            ("peak", "Batteries discharge during the evening peak.", None, None),
+            ("peak", "Demand response shifts load to the night.", None, None),
+        ],
+    )
+    index.remove_document("tariff")
+
+    reopened = LocalVectorIndex(str(tmp_path), HashingEmbedder(dim=256))
+    np.testing.assert_array_equal(index._row_document >= 0, reopened._row_document >= 0)
+    assert len(index) == len(reopened) == 2
+    hits = index.search(["demand response night"], k=5)[0]
+    assert [c.content for d in index.documents_for(hits) for c in d.chunks] == [
+        "Demand response shifts load to the night.",
+        GRID_DOCS["solar"],
+    ]
+
+
+def test_writes_from_another_connection_are_picked_up(index, tmp_path):
+    other = LocalVectorIndex(str(tmp_path), HashingEmbedder(dim=256))
+    other.remove_document("solar")
+    other.add_document("market", "capacity", "Capacity payments reward firm power.")
+
+    hits = index.search(["capacity payments firm power"], k=5)[0]
+    assert {doc.id for doc in index.documents_for(hits)} == {
+        "peak",
+        "tariff",
+        "capacity",
+    }
+    assert len(index) == 3
+
+
+def test_ivf_search_matches_brute_force(tmp_path):
+    centers = np.random.default_rng(0).normal(size=(8, 32)).astype(np.float32)
+
+    class ClusterEmbedder:
+        dim = 32
+
+        def embed(self, texts):
+            vectors = np.stack(
+                [
+                    centers[int(t.split()[0])]
+                    + 0.05
+                    * np.random.default_rng(zlib.crc32(t.encode())).normal(size=32)
+                    for t in texts
+                ]
+            )
+            return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(
+                np.float32
+            )
+
+    index = LocalVectorIndex(str(tmp_path), ClusterEmbedder(), nprobe=2, block_rows=64)
+    index.add_dataset("d", "D")
+    for i in range(400):
+        index.add_document("d", f"doc{i}", f"{i % 8} item {i}", chunk_chars=50)
+    query = ClusterEmbedder().embed(["3 query"])
+
+    brute_force = index.search(["3 query"], k=10)[0]
+    assert index.build_ivf(n_lists=8) == 8
+    candidates = index._candidate_rows(query)
+    assert candidates is not None and len(candidates) < 400
+    assert index.search(["3 query"], k=10)[0] == brute_force
+    assert all(row % 8 == 3 for row, _ in brute_force)
+
+    index.add_document("d", "late", "3 added after clustering", chunk_chars=50)
+    assert 400 in index._candidate_rows(query)
+
+
+def test_provider_plugs_into_build_retriever(index, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCAL_RAG_INDEX_DIR", str(tmp_path))
+    monkeypatch.setenv("LOCAL_RAG_EMBEDDER", f"{__name__}:small_embedder")
+    monkeypatch.setenv("RAG_PROVIDER", "local_index")
+
+    provider = builder.build_retriever()
+    assert isinstance(provider, LocalIndexProvider)
+    assert [r.title for r in provider.list_resources("grid")] == ["Grid operations"]
+
+    docs = provider.query_relevant_documents(
+        "削减负荷", [Resource(uri="rag://dataset/grid", title="Grid operations")]
+    )
+    assert docs[0].id == "peak"
+    assert docs[0].to_dict()["title"] == "Peak shaving"
+    assert provider.query_relevant_documents("削减负荷", []) == []
+
+
+def small_embedder():
+    return HashingEmbedder(dim=256)
+
+
+def test_load_embedder_rejects_bad_spec():
+    assert isinstance(load_embedder(None), HashingEmbedder)
+    with pytest.raises(ValueError):
+        load_embedder("not_a_factory")
@@ -79,7 +79,7 @@ def test_init_missing_env(monkeypatch):
         RAGFlowProvider()
 
 
-@patch("src.rag.ragflow.requests.post")
+@patch("requests.Session.post")
 def test_query_relevant_documents_success(mock_post, monkeypatch):
     monkeypatch.setenv("RAGFLOW_API_URL", "http://api")
     monkeypatch.setenv("RAGFLOW_API_KEY", "key")
@@ -105,7 +105,7 @@ def test_query_relevant_documents_success(mock_post, monkeypatch):
     assert docs[0].chunks[0].similarity == 0.9
 
 
-@patch("src.rag.ragflow.requests.post")
+@patch("requests.Session.post")
 def test_query_relevant_documents_error(mock_post, monkeypatch):
     monkeypatch.setenv("RAGFLOW_API_URL", "http://api")
     monkeypatch.setenv("RAGFLOW_API_KEY", "key")
@@ -118,7 +118,7 @@ def test_query_relevant_documents_error(mock_post, monkeypatch):
         provider.query_relevant_documents("query", [])
 
 
-@patch("src.rag.ragflow.requests.get")
+@patch("requests.Session.get")
 def test_list_resources_success(mock_get, monkeypatch):
     monkeypatch.setenv("RAGFLOW_API_URL", "http://api")
     monkeypatch.setenv("RAGFLOW_API_KEY", "key")
@@ -142,7 +142,7 @@ def test_list_resources_success(mock_get, monkeypatch):
     assert resources[1].description == "desc2"
 
 
-@patch("src.rag.ragflow.requests.get")
+@patch("requests.Session.get")
 def test_list_resources_error(mock_get, monkeypatch):
     monkeypatch.setenv("RAGFLOW_API_URL", "http://api")
     monkeypatch.setenv("RAGFLOW_API_KEY", "key")
@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: MIT
 
 import os
+import threading
+import time
 import pytest
 import json
 from unittest.mock import patch, MagicMock
@@ -231,7 +233,7 @@ class TestVikingDBKnowledgeBaseProviderQueryRelevantDocuments:
         result = provider.query_relevant_documents("test query", [])
         assert result == []
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_query_relevant_documents_success(self, mock_request, provider):
         """Test successful document query"""
         # Mock response
@@ -274,7 +276,7 @@ class TestVikingDBKnowledgeBaseProviderQueryRelevantDocuments:
             assert result[0].chunks[0].content == "Test content"
             assert result[0].chunks[0].similarity == 0.95
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_query_relevant_documents_with_document_filter(
         self, mock_request, provider
     ):
@@ -301,7 +303,7 @@ class TestVikingDBKnowledgeBaseProviderQueryRelevantDocuments:
             assert doc_filter["field"] == "doc_id"
             assert doc_filter["conds"] == ["doc456"]
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_query_relevant_documents_api_error(self, mock_request, provider):
         """Test handling of API error response"""
         mock_response = MagicMock()
@@ -315,7 +317,7 @@ class TestVikingDBKnowledgeBaseProviderQueryRelevantDocuments:
             ):
                 provider.query_relevant_documents("test query", resources)
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_query_relevant_documents_json_decode_error(self, mock_request, provider):
         """Test handling of JSON decode error"""
         mock_response = MagicMock()
@@ -327,7 +329,7 @@ class TestVikingDBKnowledgeBaseProviderQueryRelevantDocuments:
             with pytest.raises(ValueError, match="Failed to parse JSON response"):
                 provider.query_relevant_documents("test query", resources)
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_query_relevant_documents_multiple_resources(self, mock_request, provider):
         """Test querying multiple resources and merging results"""
         # Mock responses for different resources
@@ -398,7 +400,7 @@ class TestVikingDBKnowledgeBaseProviderListResources:
     def provider(self, env_vars):
         return VikingDBKnowledgeBaseProvider()
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_list_resources_success(self, mock_request, provider):
         """Test successful resource listing"""
         mock_response = MagicMock()
@@ -437,7 +439,7 @@ class TestVikingDBKnowledgeBaseProviderListResources:
             assert result[1].title == "Dataset 2"
             assert result[1].description == "Description 2"
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_list_resources_with_query_filter(self, mock_request, provider):
         """Test resource listing with query filter"""
         mock_response = MagicMock()
@@ -469,7 +471,7 @@ class TestVikingDBKnowledgeBaseProviderListResources:
             assert len(result) == 1
             assert result[0].title == "Test Dataset"
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_list_resources_api_error(self, mock_request, provider):
         """Test handling of API error in list_resources"""
         mock_response = MagicMock()
@@ -480,7 +482,7 @@ class TestVikingDBKnowledgeBaseProviderListResources:
             with pytest.raises(Exception, match="Failed to list resources: API Error"):
                 provider.list_resources()
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_list_resources_json_decode_error(self, mock_request, provider):
         """Test handling of JSON decode error in list_resources"""
         mock_response = MagicMock()
@@ -491,7 +493,7 @@ class TestVikingDBKnowledgeBaseProviderListResources:
             with pytest.raises(ValueError, match="Failed to parse JSON response"):
                 provider.list_resources()
 
-    @patch("src.rag.vikingdb_knowledge_base.requests.request")
+    @patch("requests.Session.request")
     def test_list_resources_empty_response(self, mock_request, provider):
         """Test handling of empty response"""
         mock_response = MagicMock()
@@ -501,3 +503,103 @@ class TestVikingDBKnowledgeBaseProviderListResources:
         with patch.object(provider, "prepare_request"):
             result = provider.list_resources()
             assert result == []
+
+
+def _result(doc_id, content, score):
+    return {
+        "doc_info": {"doc_id": doc_id, "doc_name": doc_id.upper()},
+        "content": content,
+        "score": score,
+    }
+
+
+class TestVikingDBKnowledgeBaseProviderAsyncQuery:
+    @pytest.fixture
+    def provider(self, env_vars):
+        provider = VikingDBKnowledgeBaseProvider()
+        provider.max_concurrency = 2
+        provider.timeout = 0.2
+        return provider
+
+    @staticmethod
+    def fake_search(delays, results, errors=None):
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def search(query, resource, timeout=None):
+            resource_id, _ = parse_uri(resource.uri)
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(delays.get(resource_id, 0.05))
+            with lock:
+                state["active"] -= 1
+            if errors and resource_id in errors:
+                raise errors[resource_id]
+            return results.get(resource_id, [])
+
+        return search, state
+
+    @pytest.mark.asyncio
+    async def test_resources_are_searched_concurrently_and_bounded(self, provider):
+        resources = [MockResource(f"rag://dataset/{i}") for i in range(4)]
+        results = {str(i): [_result(f"doc{i}", f"content {i}", 0.5)] for i in range(4)}
+        search, state = self.fake_search({str(i): 0.05 for i in range(4)}, results)
+
+        with patch.object(provider, "_search_resource", side_effect=search):
+            start = time.perf_counter()
+            docs = await provider.aquery_relevant_documents("q", resources)
+            elapsed = time.perf_counter() - start
+
+        assert [doc.id for doc in docs] == ["doc0", "doc1", "doc2", "doc3"]
+        assert state["peak"] == 2
+        assert elapsed < 0.05 * 4
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_merged_and_deduplicated_by_document(self, provider):
+        resources = [MockResource("rag://dataset/a"), MockResource("rag://dataset/b")]
+        results = {
+            "a": [_result("doc1", "shared", 0.4), _result("doc1", "only a", 0.9)],
+            "b": [_result("doc1", "shared", 0.7), _result("doc2", "only b", 0.6)],
+        }
+        search, _ = self.fake_search({}, results)
+
+        with patch.object(provider, "_search_resource", side_effect=search):
+            docs = await provider.aquery_relevant_documents("q", resources)
+
+        doc1, doc2 = docs
+        assert [(c.content, c.similarity) for c in doc1.chunks] == [
+            ("shared", 0.7),
+            ("only a", 0.9),
+        ]
+        assert [c.content for c in doc2.chunks] == ["only b"]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_resource_returns_partial_results(self, provider):
+        resources = [
+            MockResource("rag://dataset/slow"),
+            MockResource("rag://dataset/fast"),
+        ]
+        results = {
+            "slow": [_result("doc1", "late", 0.9)],
+            "fast": [_result("doc2", "on time", 0.5)],
+        }
+        search, _ = self.fake_search({"slow": 0.5, "fast": 0.01}, results)
+
+        with patch.object(provider, "_search_resource", side_effect=search):
+            docs = await provider.aquery_relevant_documents("q", resources)
+
+        assert [doc.id for doc in docs] == ["doc2"]
+
+    @pytest.mark.asyncio
+    async def test_api_error_is_raised(self, provider):
+        resources = [MockResource("rag://dataset/a"), MockResource("rag://dataset/b")]
+        search, _ = self.fake_search(
+            {},
+            {},
+            errors={"b": ValueError("Failed to query documents from resource: boom")},
+        )
+
+        with patch.object(provider, "_search_resource", side_effect=search):
+            with pytest.raises(ValueError, match="boom"):
+                await provider.aquery_relevant_documents("q", resources)
@@ -0,0 +1,100 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+import pytest
+
+from src.graph_solver.dispatch_scheduler import DispatchPriority
+from src.server.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_runs_on_the_same_thread_are_serialised():
+    controller = AdmissionController(max_concurrent=4, queue_timeout=1)
+    first = await controller.admit("thread-1")
+    second = asyncio.create_task(controller.admit("thread-1"))
+    other = await controller.admit("thread-2")
+
+    await asyncio.sleep(0.01)
+    assert not second.done()
+    assert controller.metrics()["queued_for_thread"] == 1
+
+    first.release()
+    first.release()  # idempotent
+    ticket = await second
+    assert controller.metrics()["active"] == 2
+
+    # A third run on a busy thread exceeds the per-thread queue
+    waiting = asyncio.create_task(controller.admit("thread-1"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.admit("thread-1")
+    assert exc_info.value.reason == "thread_busy"
+
+    ticket.release()
+    (await waiting).release()
+    other.release()
+    assert controller.metrics()["active_threads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reject_policy_refuses_a_busy_thread():
+    controller = AdmissionController(same_thread_policy="reject")
+    ticket = await controller.admit("thread-1")
+    with pytest.raises(AdmissionRejected):
+        await controller.admit("thread-1")
+    ticket.release()
+    (await controller.admit("thread-1")).release()
+
+
+@pytest.mark.asyncio
+async def test_saturation_rejects_with_retry_after():
+    controller = AdmissionController(max_concurrent=1, max_queued=1, queue_timeout=0.05)
+    running = await controller.admit("a")
+    queued = asyncio.create_task(controller.admit("b"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as full:
+        await controller.admit("c")
+    assert full.value.reason == "queue_full"
+    assert full.value.retry_after >= 1
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await queued
+    assert timed_out.value.reason == "queue_timeout"
+
+    running.release()
+    metrics = controller.metrics()
+    assert metrics["rejected"] == {
+        "queue_full": 1,
+        "queue_timeout": 1,
+        "thread_busy": 0,
+    }
+    assert (
+        metrics["active"] == 0
+        and metrics["queued"] == 0
+        and metrics["active_threads"] == 0
+    )
+
+
+@pytest.mark.asyncio
+async def test_grid_events_are_admitted_first():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=1)
+    running = await controller.admit("a")
+    order = []
+
+    async def admit(thread_id, priority):
+        ticket = await controller.admit(thread_id, priority=priority)
+        order.append(thread_id)
+        ticket.release()
+
+    what_if = asyncio.create_task(admit("what-if", DispatchPriority.WHAT_IF))
+    await asyncio.sleep(0.01)
+    grid = asyncio.create_task(admit("grid", DispatchPriority.GRID_EVENT))
+    await asyncio.sleep(0.01)
+    running.release()
+    await asyncio.gather(what_if, grid)
+
+    assert order == ["grid", "what-if"]
+    assert controller.metrics()["max_queue_ms"] > 0
@@ -1,17 +1,26 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
+import gc
 import os
-from unittest.mock import MagicMock, patch, mock_open
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
-from src.server.app import app, _make_event, _astream_workflow_generator
+from src.server.admission import AdmissionController, build_admission_controller
+from src.server.jobs import JobManager, build_job_manager
+from src.server.app import app, _make_event, _astream_workflow_generator, chat_stream
+from src.server.chat_request import ChatRequest
 from src.config.report_style import ReportStyle
 from langgraph.types import Command
 from langchain_core.messages import ToolMessage
 from langchain_core.messages import AIMessageChunk
+from src.tools.mcp_sessions import build_mcp_session_manager
+from src.utils.registry import component_registry
 
 
 @pytest.fixture
@@ -149,10 +158,10 @@ class TestTTSEndpoint:
 
 
 class TestPodcastEndpoint:
-    @patch("src.server.app.build_podcast_graph")
-    def test_generate_podcast_success(self, mock_build_graph, client):
+    @patch("src.server.app.podcast_builder")
+    def test_generate_podcast_success(self, mock_builder, client):
         mock_workflow = MagicMock()
-        mock_build_graph.return_value = mock_workflow
+        mock_builder.workflow = mock_workflow
         mock_workflow.invoke.return_value = {"output": b"fake_audio_data"}
 
         request_data = {"content": "Test content for podcast"}
@@ -163,9 +172,11 @@ class TestPodcastEndpoint:
         assert response.headers["content-type"] == "audio/mp3"
         assert response.content == b"fake_audio_data"
 
-    @patch("src.server.app.build_podcast_graph")
-    def test_generate_podcast_error(self, mock_build_graph, client):
-        mock_build_graph.side_effect = Exception("Podcast generation failed")
+    @patch("src.server.app.podcast_builder")
+    def test_generate_podcast_error(self, mock_builder, client):
+        mock_builder.workflow.invoke.side_effect = Exception(
+            "Podcast generation failed"
+        )
 
         request_data = {"content": "Test content"}
 
@@ -176,11 +187,11 @@ class TestPodcastEndpoint:
 
 
 class TestPPTEndpoint:
-    @patch("src.server.app.build_ppt_graph")
+    @patch("src.server.app.ppt_builder")
     @patch("builtins.open", new_callable=mock_open, read_data=b"fake_ppt_data")
-    def test_generate_ppt_success(self, mock_file, mock_build_graph, client):
+    def test_generate_ppt_success(self, mock_file, mock_builder, client):
         mock_workflow = MagicMock()
-        mock_build_graph.return_value = mock_workflow
+        mock_builder.workflow = mock_workflow
         mock_workflow.invoke.return_value = {
             "generated_file_path": "/fake/path/test.pptx"
         }
@@ -196,9 +207,9 @@ class TestPPTEndpoint:
         )
         assert response.content == b"fake_ppt_data"
 
-    @patch("src.server.app.build_ppt_graph")
-    def test_generate_ppt_error(self, mock_build_graph, client):
-        mock_build_graph.side_effect = Exception("PPT generation failed")
+    @patch("src.server.app.ppt_builder")
+    def test_generate_ppt_error(self, mock_builder, client):
+        mock_builder.workflow.invoke.side_effect = Exception("PPT generation failed")
 
         request_data = {"content": "Test content"}
 
@@ -208,11 +219,77 @@ class TestPPTEndpoint:
         assert response.json()["detail"] == "Internal Server Error"
 
 
+class TestJobEndpoints:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = JobManager(str(tmp_path))
+        component_registry.register("server.job_manager", lambda: manager)
+        yield manager
+        component_registry.register("server.job_manager", build_job_manager)
+
+    @patch("src.server.app.podcast_job")
+    def test_podcast_job_submit_poll_and_download(
+        self, mock_podcast_job, manager, client
+    ):
+        mock_podcast_job.return_value = lambda report: (
+            b"fake_audio_data",
+            "podcast.mp3",
+            "audio/mp3",
+        )
+
+        response = client.post("/api/jobs/podcast", json={"content": "Test content"})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        mock_podcast_job.assert_called_once_with("Test content")
+
+        for _ in range(200):
+            status = client.get(f"/api/jobs/{job_id}").json()
+            if status["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+        assert status["progress"] == 1.0
+
+        result = client.get(f"/api/jobs/{job_id}/result")
+        assert result.status_code == 200
+        assert result.content == b"fake_audio_data"
+        assert result.headers["content-type"] == "audio/mp3"
+
+    @patch("src.server.app.ppt_job")
+    def test_unfinished_and_unknown_jobs(self, mock_ppt_job, manager, client):
+        release = threading.Event()
+
+        def slow(report):
+            release.wait(5)
+            return b"pptx", "presentation.pptx", "application/octet-stream"
+
+        mock_ppt_job.return_value = slow
+        job_id = client.post("/api/jobs/ppt", json={"content": "Test content"}).json()[
+            "id"
+        ]
+
+        assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+        assert client.get("/api/jobs/0123abcd").status_code == 404
+        release.set()
+
+    def test_job_metrics(self, manager, client):
+        manager.submit(
+            "ppt",
+            lambda report: (b"pptx", "presentation.pptx", "application/octet-stream"),
+        )
+
+        response = client.get("/api/jobs/metrics")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert sum(data["jobs"].values()) == 1
+        assert data["max_pending"] == manager.max_pending
+
+
 class TestEnhancePromptEndpoint:
-    @patch("src.server.app.build_prompt_enhancer_graph")
-    def test_enhance_prompt_success(self, mock_build_graph, client):
+    @patch("src.server.app.prompt_enhancer_builder")
+    def test_enhance_prompt_success(self, mock_builder, client):
         mock_workflow = MagicMock()
-        mock_build_graph.return_value = mock_workflow
+        mock_builder.workflow = mock_workflow
         mock_workflow.invoke.return_value = {"output": "Enhanced prompt"}
 
         request_data = {
@@ -226,10 +303,10 @@ class TestEnhancePromptEndpoint:
         assert response.status_code == 200
         assert response.json()["result"] == "Enhanced prompt"
 
-    @patch("src.server.app.build_prompt_enhancer_graph")
-    def test_enhance_prompt_with_different_styles(self, mock_build_graph, client):
+    @patch("src.server.app.prompt_enhancer_builder")
+    def test_enhance_prompt_with_different_styles(self, mock_builder, client):
         mock_workflow = MagicMock()
-        mock_build_graph.return_value = mock_workflow
+        mock_builder.workflow = mock_workflow
         mock_workflow.invoke.return_value = {"output": "Enhanced prompt"}
 
         styles = [
@@ -246,9 +323,9 @@ class TestEnhancePromptEndpoint:
             response = client.post("/api/prompt/enhance", json=request_data)
             assert response.status_code == 200
 
-    @patch("src.server.app.build_prompt_enhancer_graph")
-    def test_enhance_prompt_error(self, mock_build_graph, client):
-        mock_build_graph.side_effect = Exception("Enhancement failed")
+    @patch("src.server.app.prompt_enhancer_builder")
+    def test_enhance_prompt_error(self, mock_builder, client):
+        mock_builder.workflow.invoke.side_effect = Exception("Enhancement failed")
 
         request_data = {"prompt": "Test prompt"}
 
@@ -258,6 +335,25 @@ class TestEnhancePromptEndpoint:
         assert response.json()["detail"] == "Internal Server Error"
 
 
+class TestSharedWorkflows:
+    def test_endpoint_workflows_are_compiled_once(self):
+        from src.podcast.graph import builder as podcast_builder
+        from src.ppt.graph import builder as ppt_builder
+        from src.prompt_enhancer.graph import builder as prompt_enhancer_builder
+        from src.prose.graph import builder as prose_builder
+
+        for builder in (
+            podcast_builder,
+            ppt_builder,
+            prose_builder,
+            prompt_enhancer_builder,
+        ):
+            assert builder.workflow is builder.workflow
+
+        # Single-shot enhancement must not need a thread_id
+        assert prompt_enhancer_builder.workflow.checkpointer is None
+
+
 class TestMCPEndpoint:
     @patch("src.server.app.load_mcp_tools")
     def test_mcp_server_metadata_success(self, mock_load_tools, client):
@@ -294,6 +390,22 @@ class TestMCPEndpoint:
 
         assert response.status_code == 200
         mock_load_tools.assert_called_once()
+        # Metadata probes use a one-off connection, never the shared session pool
+        assert "pooled" not in mock_load_tools.call_args.kwargs
+
+    def test_shutdown_closes_pooled_mcp_sessions(self):
+        manager = MagicMock()
+        manager.close_all = AsyncMock()
+        component_registry.register("tools.mcp_session_manager", lambda: manager)
+        try:
+            component_registry.get("tools.mcp_session_manager")
+            with TestClient(app):
+                manager.close_all.assert_not_awaited()
+            manager.close_all.assert_awaited_once()
+        finally:
+            component_registry.register(
+                "tools.mcp_session_manager", build_mcp_session_manager
+            )
 
     @patch("src.server.app.load_mcp_tools")
     def test_mcp_server_metadata_with_exception(self, mock_load_tools, client):
@@ -315,14 +427,25 @@ class TestMCPEndpoint:
 
 
 class TestRAGEndpoints:
-    @patch("src.server.app.SELECTED_RAG_PROVIDER", "test_provider")
-    def test_rag_config(self, client):
+    def test_rag_config(self, client, monkeypatch):
+        monkeypatch.setenv("RAG_PROVIDER", "test_provider")
         response = client.get("/api/rag/config")
 
         assert response.status_code == 200
         assert response.json()["provider"] == "test_provider"
 
-    @patch("src.server.app.build_retriever")
+    @patch("src.server.app.get_configured_llm_models", return_value={})
+    def test_config_reads_rag_provider_at_request_time(
+        self, mock_models, client, monkeypatch
+    ):
+        monkeypatch.setenv("RAG_PROVIDER", "local_index")
+
+        response = client.get("/api/config")
+
+        assert response.status_code == 200
+        assert response.json()["rag"]["provider"] == "local_index"
+
+    @patch("src.server.app.get_retriever")
     def test_rag_resources_with_retriever(self, mock_build_retriever, client):
         mock_retriever = MagicMock()
         mock_retriever.list_resources.return_value = [
@@ -339,7 +462,7 @@ class TestRAGEndpoints:
         assert response.status_code == 200
         assert len(response.json()["resources"]) == 1
 
-    @patch("src.server.app.build_retriever")
+    @patch("src.server.app.get_retriever")
     def test_rag_resources_without_retriever(self, mock_build_retriever, client):
         mock_build_retriever.return_value = None
 
@@ -377,6 +500,64 @@ class TestChatStreamEndpoint:
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/event-stream; charset=utf-8"
 
+    def test_chat_stream_returns_429_when_saturated(self, client):
+        controller = AdmissionController(max_concurrent=1, same_thread_policy="reject")
+        component_registry.register("server.admission_controller", lambda: controller)
+        try:
+            ticket = asyncio.run(controller.admit("busy_thread"))
+            response = client.post(
+                "/api/chat/stream",
+                json={
+                    "thread_id": "busy_thread",
+                    "messages": [{"role": "user", "content": "削峰20MW"}],
+                },
+            )
+            ticket.release()
+        finally:
+            component_registry.register(
+                "server.admission_controller", build_admission_controller
+            )
+
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        assert controller.metrics()["rejected"]["thread_busy"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dropped_response_releases_admission(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.2)
+        component_registry.register("server.admission_controller", lambda: controller)
+        request = ChatRequest(
+            thread_id="dropped", messages=[{"role": "user", "content": "削峰20MW"}]
+        )
+        try:
+            response = await chat_stream(request)
+            assert controller.metrics()["active"] == 1
+            # Never sent nor iterated, e.g. dropped by a middleware
+            del response
+            gc.collect()
+            await asyncio.sleep(0)
+            assert controller.metrics()["active"] == 0
+
+            response = await chat_stream(request)
+
+            async def failing_send(message):
+                raise OSError("client went away")
+
+            async def receive():
+                await asyncio.sleep(10)
+
+            # Sending http.response.start fails before the body is iterated
+            with pytest.raises(OSError):
+                await response({"type": "http"}, receive, failing_send)
+            assert controller.metrics()["active"] == 0
+
+            ticket = await controller.admit("dropped")
+            ticket.release()
+        finally:
+            component_registry.register(
+                "server.admission_controller", build_admission_controller
+            )
+
 
 class TestAstreamWorkflowGenerator:
     @pytest.mark.asyncio
@@ -677,13 +858,56 @@ class TestAstreamWorkflowGenerator:
             assert config["report_style"] == ReportStyle.NEWS.value
             yield ("agent1", "messages", [mock_ai_message])
 
+    @pytest.mark.asyncio
+    @patch("src.server.app.graph")
+    async def test_astream_workflow_generator_coalesces_token_chunks(self, mock_graph):
+        def token(content, finish_reason=None):
+            chunk = AIMessageChunk(content=content, id="msg_tokens")
+            if finish_reason:
+                chunk.response_metadata = {"finish_reason": finish_reason}
+            return ("reporter:1", "messages", (chunk, {}))
+
+        async def mock_astream(*args, **kwargs):
+            for item in [token("削峰"), token("方案"), token("已生成", "stop")]:
+                yield item
+
+        mock_graph.astream = mock_astream
+        kwargs = dict(
+            messages=[],
+            thread_id="test_thread",
+            resources=[],
+            max_plan_iterations=3,
+            max_step_num=10,
+            max_search_results=5,
+            auto_accepted_plan=True,
+            interrupt_feedback="",
+            mcp_settings={},
+            enable_background_investigation=False,
+            report_style=ReportStyle.ACADEMIC,
+            enable_deep_thinking=False,
+        )
+
+        merged = [
+            event
+            async for event in _astream_workflow_generator(**kwargs, coalesce_ms=1000)
+        ]
+        separate = [
+            event
+            async for event in _astream_workflow_generator(**kwargs, coalesce_ms=0)
+        ]
+
+        assert len(merged) == 1
+        assert '"content": "削峰方案已生成"' in merged[0]
+        assert '"finish_reason": "stop"' in merged[0]
+        assert len(separate) == 3
+
 
 class TestGenerateProseEndpoint:
-    @patch("src.server.app.build_prose_graph")
-    def test_generate_prose_success(self, mock_build_graph, client):
+    @patch("src.server.app.prose_builder")
+    def test_generate_prose_success(self, mock_builder, client):
         # Mock the workflow and its astream method
         mock_workflow = MagicMock()
-        mock_build_graph.return_value = mock_workflow
+        mock_builder.workflow = mock_workflow
 
         class MockEvent:
             def __init__(self, content):
@@ -709,9 +933,9 @@ class TestGenerateProseEndpoint:
         content = b"".join(response.iter_bytes())
         assert b"Generated prose 1" in content or b"Generated prose 2" in content
 
-    @patch("src.server.app.build_prose_graph")
-    def test_generate_prose_error(self, mock_build_graph, client):
-        mock_build_graph.side_effect = Exception("Prose generation failed")
+    @patch("src.server.app.prose_builder")
+    def test_generate_prose_error(self, mock_builder, client):
+        mock_builder.workflow.astream.side_effect = Exception("Prose generation failed")
         request_data = {
             "prompt": "Write a story.",
             "option": "default",
@@ -720,3 +944,118 @@ class TestGenerateProseEndpoint:
         response = client.post("/api/prose/generate", json=request_data)
         assert response.status_code == 500
         assert response.json()["detail"] == "Internal Server Error"
+
+
+class TestDispatchEndpoints:
+    fleet = {
+        "device_names": ["HVAC", "ESS_HBN", "ESS_ML", "ESS_HY", "PV", "EV"],
+        "response_capacity": [6.0, 8.2, 10.0, 7.0, 3.6, 2.2],
+        "credit_scores": [3, 4, 4, 5, 2, 5],
+        "direct_control": [1, 1, 1, 1, 0, 0],
+        "response_cost": [0.1, 0.3, 0.04, 0.4, 0.15, 0.5],
+        "total_demand": 20,
+    }
+
+    def test_dispatch_metrics(self, client):
+        response = client.get("/api/dispatch/metrics")
+
+        assert response.status_code == 200
+        assert set(response.json()["pools"]) == {"llm", "solver", "plan"}
+
+    def test_dispatch_pareto(self, client):
+        response = client.post("/api/dispatch/pareto", json={**self.fleet, "steps": 4})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["method"] == "weighted_sum"
+        assert data["evaluated"] == 15
+        assert data["points"]
+        for point in data["points"]:
+            assert sum(point["allocation"].values()) == pytest.approx(20)
+
+    def test_dispatch_pareto_caps_steps(self, client):
+        response = client.post("/api/dispatch/pareto", json={**self.fleet, "steps": 51})
+
+        assert response.status_code == 422
+
+    def test_dispatch_pareto_rejects_infeasible_demand(self, client):
+        response = client.post(
+            "/api/dispatch/pareto", json={**self.fleet, "total_demand": 100}
+        )
+
+        assert response.status_code == 400
+
+    def test_dispatch_what_if_with_inline_sensitivity(self, client):
+        sensitivity = {
+            "response_price": 3.0,
+            "response_cost": {"HVAC": 0.1, "PV": 0.15},
+            "demand_constraint": {
+                "increase": {"device": "HVAC", "range_mw": 3.0},
+                "decrease": {"device": "HVAC", "range_mw": 3.0},
+            },
+            "devices": {
+                "HVAC": {"allocation": 3.0, "capacity": 6.0, "capacity_binding": False},
+                "PV": {"allocation": 0.0, "capacity": 3.6, "capacity_binding": False},
+            },
+        }
+        response = client.post(
+            "/api/dispatch/what-if",
+            json={"sensitivity": sensitivity, "parameter": "demand", "delta": 1},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["profit_delta"] == pytest.approx(2900.0)
+        assert response.json()["allocation"]["HVAC"] == pytest.approx(4.0)
+
+    @patch("src.server.app.graph")
+    def test_dispatch_what_if_without_sensitivity(self, mock_graph, client):
+        async def aget_state(config):
+            return MagicMock(values={})
+
+        mock_graph.aget_state = aget_state
+        response = client.post(
+            "/api/dispatch/what-if",
+            json={"thread_id": "t1", "parameter": "demand", "delta": 1},
+        )
+
+        assert response.status_code == 404
+
+    def test_rolling_dispatch_requires_formulation(self, client):
+        response = client.post("/api/dispatch/rolling", json={})
+
+        assert response.status_code == 404
+
+    def test_rolling_dispatch_unknown_session(self, client):
+        response = client.post(
+            "/api/dispatch/rolling/missing/telemetry",
+            json={"updates": [{"device": "HVAC", "time": "2025-07-29T16:00:00"}]},
+        )
+
+        assert response.status_code == 404
+
+    def test_stop_rolling_dispatch_unknown_session(self, client):
+        response = client.delete("/api/dispatch/rolling/missing")
+
+        assert response.status_code == 404
+
+
+class TestArtifactEndpoint:
+    def test_get_artifact(self, client, tmp_path):
+        from src.utils import artifacts
+        from src.utils.registry import component_registry
+
+        store = artifacts.ArtifactStore(str(tmp_path))
+        component_registry.register("utils.artifact_store", lambda: store)
+        try:
+            artifact_id = store.put('{"series": []}', artifacts.ECHARTS_MEDIA_TYPE)
+            response = client.get(f"/api/artifacts/{artifact_id}")
+            missing = client.get(f"/api/artifacts/{'0' * 64}")
+        finally:
+            component_registry.register(
+                "utils.artifact_store", artifacts.build_artifact_store
+            )
+
+        assert response.status_code == 200
+        assert response.text == '{"series": []}'
+        assert response.headers["content-type"].startswith(artifacts.ECHARTS_MEDIA_TYPE)
+        assert missing.status_code == 404
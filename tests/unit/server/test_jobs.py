@@ -0,0 +1,117 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src.server.jobs import (
+    JobManager,
+    JobQueueFull,
+    JobStatus,
+    run_workflow_with_progress,
+)
+
+
+def _wait(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_runs_in_background_and_stores_result(tmp_path):
+    manager = JobManager(str(tmp_path))
+    release = threading.Event()
+
+    def work(report):
+        report(0.5, "tts")
+        release.wait(5)
+        return b"mp3-bytes", "podcast.mp3", "audio/mp3"
+
+    job = manager.submit("podcast", work)
+    assert job.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+    time.sleep(0.05)
+    assert manager.get(job.id).stage == "tts"
+    assert manager.get(job.id).progress == 0.5
+
+    release.set()
+    done = _wait(manager, job.id)
+    assert done.status == JobStatus.SUCCEEDED and done.progress == 1.0
+    with open(manager.result_path(done), "rb") as f:
+        assert f.read() == b"mp3-bytes"
+
+
+def test_failed_job_reports_error(tmp_path):
+    manager = JobManager(str(tmp_path))
+
+    def work(report):
+        raise RuntimeError("marp not found")
+
+    job = _wait(manager, manager.submit("ppt", work).id)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "marp not found"
+    assert manager.result_path(job) is None
+
+
+def test_pending_jobs_are_bounded(tmp_path):
+    manager = JobManager(str(tmp_path), max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def slow(report):
+        release.wait(5)
+        return b"", "presentation.pptx", "application/octet-stream"
+
+    manager.submit("ppt", slow)
+    with pytest.raises(JobQueueFull):
+        manager.submit("ppt", lambda report: (b"", "x", "y"))
+    release.set()
+
+
+def test_jobs_survive_restart_and_expire(tmp_path):
+    manager = JobManager(str(tmp_path), ttl_seconds=3600)
+    job = _wait(
+        manager,
+        manager.submit(
+            "podcast", lambda report: (b"audio", "podcast.mp3", "audio/mp3")
+        ).id,
+    )
+
+    # A new process sees the finished job; an unfinished one is reported as interrupted
+    restarted = JobManager(str(tmp_path), ttl_seconds=3600)
+    assert restarted.get(job.id).status == JobStatus.SUCCEEDED
+    assert restarted.get("../etc") is None
+    os.makedirs(tmp_path / "abc123")
+    with open(tmp_path / "abc123" / "job.json", "w") as f:
+        json.dump({"id": "abc123", "kind": "ppt", "status": "running"}, f)
+    assert restarted.get("abc123").status == JobStatus.FAILED
+
+    restarted.ttl_seconds = 0
+    time.sleep(0.01)
+    assert restarted.purge_expired(force=True) == 2
+    assert restarted.get(job.id) is None
+
+
+def test_workflow_progress_follows_nodes():
+    class Workflow:
+        def stream(self, inputs, stream_mode):
+            yield "updates", {"script_writer": {}}
+            yield "values", {"input": "x", "script": "s"}
+            yield "updates", {"tts": {}}
+            yield "values", {"input": "x", "output": b"audio"}
+
+    reports = []
+    state = run_workflow_with_progress(
+        Workflow(),
+        {"input": "x"},
+        ["script_writer", "tts"],
+        lambda *a: reports.append(a),
+    )
+    assert reports == [(0.5, "script_writer"), (1.0, "tts")]
+    assert state["output"] == b"audio"
@@ -0,0 +1,145 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+from src.server.sse import (
+    ChunkCoalescer,
+    SSEEncoder,
+    StreamEventLogger,
+    coalesce_events,
+)
+
+
+def test_default_backend_keeps_the_stdlib_byte_format():
+    data = {"thread_id": "t", "agent": "vpp", "content": "削峰 20MW", "tool_calls": []}
+    frame = SSEEncoder().encode("message_chunk", dict(data))
+    assert (
+        frame
+        == f"event: message_chunk\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    )
+
+
+def test_orjson_backend_is_equivalent_json():
+    pytest.importorskip("orjson")
+    data = {
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [{"name": "web_search", "args": {"q": "电价"}}],
+    }
+    frame = SSEEncoder("orjson").encode("tool_calls", data)
+
+    assert frame.startswith("event: tool_calls\ndata: ")
+    assert json.loads(frame.split("data: ", 1)[1]) == {
+        "role": "assistant",
+        "tool_calls": [{"name": "web_search", "args": {"q": "电价"}}],
+    }
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        SSEEncoder("yaml")
+
+
+def test_stream_logging_is_sampled_and_capped(caplog):
+    log = logging.getLogger("tests.sse")
+    stream_log = StreamEventLogger(sample_every=10, max_chars=20, log=log)
+    assert not stream_log.enabled
+
+    with caplog.at_level(logging.DEBUG, logger="tests.sse"):
+        assert stream_log.enabled
+        encoder = SSEEncoder()
+        for _ in range(30):
+            frame = encoder.encode(
+                "message_chunk", {"thread_id": "t", "agent": "a", "content": "x" * 100}
+            )
+            stream_log.record("message_chunk", frame, "t", "a")
+        stream_log.record(
+            "interrupt",
+            encoder.encode("interrupt", {"content": "plan"}),
+            "t",
+            "planner",
+        )
+
+    assert [r.event_type for r in caplog.records] == ["message_chunk"] * 3 + [
+        "interrupt"
+    ]
+    assert all(len(r.data_preview) < 50 for r in caplog.records)
+    assert caplog.records[0].data_preview.endswith("chars)")
+
+
+def _token(content, message_id="m1", **extra):
+    return (
+        "message_chunk",
+        {
+            "thread_id": "t",
+            "agent": "reporter",
+            "id": message_id,
+            "role": "assistant",
+            "content": content,
+            **extra,
+        },
+        True,
+    )
+
+
+async def _collect(events, coalescer):
+    async def source():
+        for event in events:
+            if event == "pause":
+                await asyncio.sleep(0.05)
+            else:
+                yield event
+
+    return [event async for event in coalesce_events(source(), coalescer)]
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_merged_until_the_message_finishes():
+    out = await _collect(
+        [_token("削"), _token("峰"), _token("完成", finish_reason="stop")],
+        ChunkCoalescer(max_delay_ms=1000, max_bytes=512),
+    )
+    assert out == [
+        ("message_chunk", {**_token("削峰完成")[1], "finish_reason": "stop"})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_order_is_preserved_around_other_events():
+    tool_calls = ("tool_calls", {"id": "m1", "tool_calls": []}, False)
+    out = await _collect(
+        [_token("a"), _token("b"), tool_calls, _token("c", "m2"), _token("d", "m3")],
+        ChunkCoalescer(max_delay_ms=1000, max_bytes=512),
+    )
+    assert [(t, d.get("id"), d.get("content")) for t, d in out] == [
+        ("message_chunk", "m1", "ab"),
+        ("tool_calls", "m1", None),
+        ("message_chunk", "m2", "c"),
+        ("message_chunk", "m3", "d"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_size_and_idle_time_flush_the_buffer():
+    by_size = await _collect(
+        [_token("x" * 6), _token("y" * 6), _token("z")],
+        ChunkCoalescer(1000, max_bytes=10),
+    )
+    assert [d["content"] for _, d in by_size] == ["xxxxxxyyyyyy", "z"]
+
+    by_time = await _collect(
+        [_token("a"), "pause", _token("b")],
+        ChunkCoalescer(max_delay_ms=10, max_bytes=512),
+    )
+    assert [d["content"] for _, d in by_time] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_zero_window_disables_coalescing():
+    out = await _collect([_token("a"), _token("b")], ChunkCoalescer(max_delay_ms=0))
+    assert [d["content"] for _, d in out] == ["a", "b"]
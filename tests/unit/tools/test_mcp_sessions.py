@@ -0,0 +1,168 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from mcp.types import Tool
+
+from src.agents.agents import tool_fingerprint
+from src.tools.mcp_sessions import MCPSessionManager
+
+
+class FakeSession:
+    def __init__(self):
+        self.pings = 0
+        self.listings = 0
+        self.healthy = True
+
+    async def send_ping(self):
+        self.pings += 1
+        if not self.healthy:
+            raise ConnectionError("server gone")
+
+    async def list_tools(self):
+        self.listings += 1
+        return SimpleNamespace(
+            tools=[
+                Tool(name="trending", description="d", inputSchema={"type": "object"})
+            ]
+        )
+
+
+class FakeClientFactory:
+    """Stands in for MultiServerMCPClient and records every connection it opens."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.sessions = []
+
+    def __call__(self, connections):
+        factory = self
+        name = next(iter(connections))
+
+        class Client:
+            async def __aenter__(self):
+                factory.opened += 1
+                await asyncio.sleep(0.01)
+                self.sessions = {name: FakeSession()}
+                factory.sessions.append(self.sessions[name])
+                return self
+
+            async def __aexit__(self, *exc):
+                factory.closed += 1
+
+            def get_tools(self):
+                return [SimpleNamespace(name="trending", description="d")]
+
+        return Client()
+
+
+CONNECTION = {"transport": "stdio", "command": "uvx", "args": ["mcp-github-trending"]}
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_and_shared_by_concurrent_requests():
+    factory = FakeClientFactory()
+    manager = MCPSessionManager(client_factory=factory)
+
+    results = await asyncio.gather(
+        *(manager.get_tools({"github": CONNECTION}) for _ in range(5))
+    )
+    await manager.get_tools({"github": dict(CONNECTION)})
+
+    assert factory.opened == 1
+    assert all(tools[0].name == "trending" for tools in results)
+    await manager.close_all()
+    assert factory.closed == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_listing_is_cached_for_ttl():
+    factory = FakeClientFactory()
+    manager = MCPSessionManager(client_factory=factory, tool_ttl_seconds=60)
+
+    first = await manager.list_tools(CONNECTION)
+    await manager.list_tools(CONNECTION)
+    assert [t.name for t in first] == ["trending"]
+    assert factory.sessions[0].listings == 1
+
+    manager.tool_ttl_seconds = 0
+    await manager.list_tools(CONNECTION)
+    assert factory.sessions[0].listings == 2
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_same_tools_on_different_servers_fingerprint_differently():
+    factory = FakeClientFactory()
+    manager = MCPSessionManager(client_factory=factory)
+    other = {**CONNECTION, "env": {"GITHUB_TOKEN": "other"}}
+
+    first = await manager.get_tools({"github": CONNECTION})
+    again = await manager.get_tools({"github": CONNECTION})
+    second = await manager.get_tools({"github": other})
+
+    assert tool_fingerprint(first) == tool_fingerprint(again)
+    assert tool_fingerprint(first) != tool_fingerprint(second)
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_and_least_recently_used_sessions_are_closed():
+    factory = FakeClientFactory()
+    manager = MCPSessionManager(client_factory=factory, max_sessions=2)
+    servers = [{**CONNECTION, "args": [f"server-{i}"]} for i in range(3)]
+
+    for connection in servers[:2]:
+        await manager.get_tools({"github": connection})
+    await manager.get_tools({"github": servers[0]})
+    await manager.get_tools({"github": servers[2]})
+
+    # servers[1] was the least recently used
+    assert [s["name"] for s in manager.stats()["sessions"]] == ["github", "github"]
+    assert manager.connection_key(servers[1]) not in manager._sessions
+    assert factory.closed == 1
+    assert len(manager._locks) == 2
+
+    manager.idle_ttl_seconds = 0
+    await manager.get_tools({"github": servers[2]})
+    assert list(manager._sessions) == [manager.connection_key(servers[2])]
+    assert manager.stats()["evictions"] == 2
+    await manager.close_all()
+    assert factory.closed == 3
+    assert not manager._locks
+
+
+@pytest.mark.asyncio
+async def test_dead_server_is_restarted_after_failed_health_check():
+    factory = FakeClientFactory()
+    manager = MCPSessionManager(client_factory=factory, health_check_interval=0)
+
+    await manager.get_tools({"github": CONNECTION})
+    factory.sessions[0].healthy = False
+    await manager.get_tools({"github": CONNECTION})
+
+    assert factory.opened == 2
+    assert manager.restarts == 1
+    assert manager.stats()["sessions"][0]["alive"]
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_start_failure_is_raised():
+    def broken_factory(connections):
+        class Client:
+            async def __aenter__(self):
+                raise OSError("command not found")
+
+            async def __aexit__(self, *exc):
+                pass
+
+        return Client()
+
+    manager = MCPSessionManager(client_factory=broken_factory)
+    with pytest.raises(OSError):
+        await manager.get_tools({"github": CONNECTION})
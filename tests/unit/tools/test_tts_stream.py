@@ -0,0 +1,147 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import base64
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.tools.tts import TTSError, VolcengineTTS, split_text
+
+
+class StubTTSServer:
+    """Local stand-in for the volcengine TTS API: the "audio" is the UTF-8 text itself."""
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.requests = []
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                text = body["request"]["text"]
+                with stub._lock:
+                    stub.requests.append(text)
+                    stub.active += 1
+                    stub.peak_active = max(stub.peak_active, stub.active)
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.active -= 1
+                if stub.fail_on and stub.fail_on in text:
+                    status, payload = 500, {"code": 3001, "message": "synthesis failed"}
+                else:
+                    status, payload = 200, {
+                        "code": 3000,
+                        "data": base64.b64encode(text.encode()).decode(),
+                    }
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/tts"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubTTSServer()
+    yield server
+    server.close()
+
+
+LONG_TEXT = "".join(f"第{i}句，虚拟电厂在晚高峰削减负荷。" for i in range(40))
+
+
+def test_split_text_prefers_sentence_boundaries():
+    assert split_text("第一句话。第二句话！Third sentence. Price is 3.5 yuan?", 12) == [
+        "第一句话。第二句话！",
+        "Third",
+        "sentence.",
+        "Price is",
+        "3.5 yuan?",
+    ]
+    segments = split_text(LONG_TEXT, 60)
+    assert all(len(s) <= 60 and s.endswith("。") for s in segments)
+    assert "".join(segments) == LONG_TEXT
+    assert split_text("  \n ") == []
+
+
+def test_stream_is_in_order_with_bounded_concurrency(stub):
+    client = VolcengineTTS("app", "token", api_url=stub.url)
+
+    chunks = list(client.stream_speech(LONG_TEXT, max_concurrency=3, max_chars=60))
+
+    assert b"".join(chunks).decode() == LONG_TEXT
+    assert 1 < stub.peak_active <= 3
+
+
+def test_first_audio_arrives_before_the_whole_text_is_synthesised(stub):
+    client = VolcengineTTS("app", "token", api_url=stub.url)
+    start = time.perf_counter()
+    stream = client.stream_speech(LONG_TEXT, max_concurrency=2, max_chars=60)
+    next(stream)
+    time_to_first_audio = time.perf_counter() - start
+    list(stream)
+    total = time.perf_counter() - start
+
+    assert time_to_first_audio < total / 3
+
+
+def test_failed_segment_stops_the_stream():
+    server = StubTTSServer(delay=0, fail_on="第3句")
+    try:
+        client = VolcengineTTS("app", "token", api_url=server.url)
+        stream = client.stream_speech(LONG_TEXT, max_concurrency=2, max_chars=20)
+        received = []
+        with pytest.raises(TTSError):
+            for chunk in stream:
+                received.append(chunk)
+        assert len(received) == 3
+    finally:
+        server.close()
+
+
+def test_stream_endpoint_delivers_long_text_untruncated(stub):
+    from src.server.app import app
+
+    env = {
+        "VOLCENGINE_TTS_APPID": "app",
+        "VOLCENGINE_TTS_ACCESS_TOKEN": "token",
+        "VOLCENGINE_TTS_API_URL": stub.url,
+    }
+    with patch.dict(os.environ, env):
+        client = TestClient(app)
+        response = client.post("/api/tts/stream", json={"text": LONG_TEXT * 2})
+        empty = client.post("/api/tts/stream", json={"text": "   "})
+        wav = client.post(
+            "/api/tts/stream", json={"text": LONG_TEXT, "encoding": "wav"}
+        )
+
+    assert len(LONG_TEXT * 2) > 1024
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mp3"
+    assert response.content.decode() == LONG_TEXT * 2
+    assert empty.status_code == 400
+    assert wav.status_code == 400
@@ -0,0 +1,82 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.prompts.template import _summarize_message
+from src.utils import artifacts
+from src.utils.artifacts import (
+    ECHARTS_MEDIA_TYPE,
+    ArtifactStore,
+    expand_artifacts,
+    offload_charts,
+    summarize_artifacts,
+)
+from src.utils.extra_tools import generate_echarts_config
+from src.utils.registry import component_registry
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path), cache_size=2)
+    component_registry.register("utils.artifact_store", lambda: store)
+    yield store
+    component_registry.register("utils.artifact_store", artifacts.build_artifact_store)
+
+
+def _chart():
+    return generate_echarts_config(
+        "调度计划",
+        "line",
+        x_data=["16:00", "16:15"],
+        series_list=[{"name": "HVAC", "data": [1, 2]}],
+    )
+
+
+def test_put_is_content_addressed(store, tmp_path):
+    first = store.put("payload", "text/plain")
+    assert store.put("payload", "text/plain") == first
+    assert len(first) == 64
+    reopened = ArtifactStore(str(tmp_path))
+    assert reopened.get(first) == ("payload", "text/plain")
+
+
+def test_get_rejects_unknown_and_malformed_ids(store):
+    assert store.get("0" * 64) is None
+    assert store.get("../../etc/passwd") is None
+
+
+def test_offload_and_expand_round_trip(store):
+    text = "表格\n" + _chart() + "\n结尾"
+    offloaded = offload_charts(text)
+
+    assert "```echarts" not in offloaded
+    assert "[[artifact:" in offloaded
+    assert expand_artifacts(offloaded) == text
+    content, media_type = store.get(
+        artifacts.ARTIFACT_REF_PATTERN.search(offloaded).group(1)
+    )
+    assert media_type == ECHARTS_MEDIA_TYPE
+    assert '"HVAC"' in content
+
+
+def test_summaries_replace_charts_in_prompts(store):
+    offloaded = offload_charts(_chart())
+    summary = summarize_artifacts(offloaded)
+
+    assert summary == "[折线图 调度计划，系列: HVAC，2个点]"
+    message = AIMessage(content=offloaded, name="vpp")
+    prompt_message = _summarize_message(message)
+    assert prompt_message.content == summary
+    assert message.content == offloaded
+    assert _summarize_message({"role": "user", "content": "hi"}) == {
+        "role": "user",
+        "content": "hi",
+    }
+
+
+def test_text_without_charts_is_unchanged(store):
+    assert offload_charts("plain") == "plain"
+    assert expand_artifacts("plain") == "plain"
+    assert expand_artifacts(None) is None
@@ -0,0 +1,74 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+import numpy as np
+import pytest
+
+from src.utils.curve import (
+    CurveParams,
+    batch_curves,
+    curve_points,
+    get_p_by_temperature,
+    get_p_temperature_curve,
+    plot_curve,
+    plot_portfolio_curves,
+)
+
+
+def _echarts_config(output: str) -> dict:
+    return json.loads(output.removeprefix("```echarts\n").removesuffix("\n```"))
+
+
+def test_curve_points_match_scalar_evaluation():
+    xs, ys = curve_points(5000, 20, 32, 50)
+    assert xs.tolist() == list(range(0, 5000, 50))
+    expected = [get_p_temperature_curve(5000, x) for x in range(0, 5000, 50)]
+    assert np.allclose(ys, expected)
+
+
+def test_curve_points_are_cached_and_read_only():
+    first = curve_points(4000, 20, 32, 50)
+    assert curve_points(4000, 20, 32, 50) is first
+    with pytest.raises(ValueError):
+        first[1][0] = 0
+
+
+def test_plot_curve_is_cached():
+    assert plot_curve() is plot_curve()
+    config = _echarts_config(plot_curve())
+    assert len(config["xAxis"]["data"]) == 100
+    assert config["series"][0]["name"] == "HVAC Power vs. Temperature Curve"
+
+
+def test_batch_curves_matches_individual_curves():
+    params = [CurveParams(5000), CurveParams(800, 25, 35, 100)]
+    xs, ys = batch_curves(params)
+    assert xs.shape == ys.shape == (2, 100)
+    for row, p in enumerate(params):
+        single_x, single_y = curve_points(*p)
+        n = len(single_x)
+        assert np.allclose(xs[row, :n], single_x)
+        assert np.allclose(ys[row, :n], single_y)
+        assert np.isnan(ys[row, n:]).all()
+
+
+def test_plot_portfolio_curves_pads_shorter_buildings():
+    config = _echarts_config(
+        plot_portfolio_curves(
+            {
+                "A": CurveParams(200, resolution=100),
+                "B": CurveParams(300, resolution=100),
+            }
+        )
+    )
+    assert config["xAxis"]["data"] == [0.0, 100.0, 200.0]
+    series = {s["name"]: s["data"] for s in config["series"]}
+    assert series["A"][2] is None
+    assert series["B"][2] is not None
+
+
+def test_get_p_by_temperature():
+    assert get_p_by_temperature(28, 5000) == 2100
+    assert get_p_by_temperature(10, 5000) == 0
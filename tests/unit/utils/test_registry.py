@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import threading
+
+import pytest
+
+from src.utils.registry import LazyRegistry
+
+
+def test_factory_not_called_until_get():
+    calls = []
+    registry = LazyRegistry()
+    registry.register("llm", lambda: calls.append(1) or object())
+
+    assert calls == []
+    assert not registry.is_built("llm")
+    registry.get("llm")
+    assert calls == [1]
+    assert registry.is_built("llm")
+
+
+def test_get_returns_cached_instance():
+    registry = LazyRegistry()
+    registry.register("chain", object)
+
+    assert registry.get("chain") is registry.get("chain")
+
+
+def test_get_unknown_name_raises():
+    registry = LazyRegistry()
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_reset_forces_rebuild():
+    registry = LazyRegistry()
+    registry.register("graph", object)
+    first = registry.get("graph")
+
+    registry.reset("graph")
+    assert not registry.is_built("graph")
+    assert registry.get("graph") is not first
+
+
+def test_register_replaces_cached_instance():
+    registry = LazyRegistry()
+    registry.register("graph", lambda: "old")
+    assert registry.get("graph") == "old"
+
+    registry.register("graph", lambda: "new")
+    assert registry.get("graph") == "new"
+
+
+def test_concurrent_get_builds_once():
+    calls = []
+    barrier = threading.Barrier(8)
+    registry = LazyRegistry()
+    registry.register("llm", lambda: calls.append(1) or object())
+
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get("llm"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_stats_reports_build_status():
+    registry = LazyRegistry()
+    registry.register("a", object)
+    registry.register("b", object)
+    registry.get("a")
+
+    stats = registry.stats()
+    assert stats["a"]["built"] is True
+    assert stats["b"]["built"] is False
+    assert "a" in registry and "c" not in registry